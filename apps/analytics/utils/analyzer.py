@@ -6,10 +6,11 @@ import json
 from datetime import datetime, timedelta
 from collections import Counter, defaultdict
 from django.utils import timezone
-from django.db.models import Count, Q, Avg, Max, Min, F, Window
-from django.db.models.functions import TruncHour, TruncDay, TruncWeek, TruncMonth
+from django.db.models import Count, Q, Avg, Max, Min, F, Sum, Window
+from django.db.models.functions import ExtractHour, TruncDay, TruncWeek, TruncMonth
 
-from apps.core.utils.audit import AuditLog
+from apps.core.models import AuditLog
+from apps.core.services.audit_rollup_service import AuditRollupService
 
 
 class AuditAnalyzer:
@@ -17,54 +18,63 @@ class AuditAnalyzer:
     
     def __init__(self, tenant_id=None):
         self.tenant_id = tenant_id
+        # Keep a timestamp bound on every query: audit_logs is partitioned by
+        # month, so PostgreSQL then scans only the partitions in the window
         self.base_query = AuditLog.objects.all()
         
         if tenant_id:
             self.base_query = self.base_query.filter(tenant_id=tenant_id)
     
+    def rollups(self, since, until=None):
+        """Hourly rollups for this analyzer's tenant (whole hours from ``since``)"""
+        filters = {'tenant_id': str(self.tenant_id)} if self.tenant_id else {}
+        return AuditRollupService.rollups(since, until, **filters)
+    
     def get_user_activity_summary(self, days=7, top_n=10):
-        """Get summary of user activity"""
+        """Get summary of user activity (read from the hourly rollups)"""
         since = timezone.now() - timedelta(days=days)
+        rollups = self.rollups(since)
         
         # User activity stats
         user_stats = (
-            self.base_query
-            .filter(timestamp__gte=since)
-            .values('user_email', 'user')
+            rollups
+            .values('user_email', user=F('user_id'))
             .annotate(
-                total_actions=Count('id'),
-                last_activity=Max('timestamp'),
+                total_actions=Sum('event_count'),
+                last_activity=Max('last_event_at'),
                 distinct_resources=Count('resource_type', distinct=True),
-                create_count=Count('id', filter=Q(action='CREATE')),
-                update_count=Count('id', filter=Q(action='UPDATE')),
-                delete_count=Count('id', filter=Q(action__in=['DELETE', 'SOFT_DELETE']))
+                create_count=Sum('event_count', filter=Q(action='CREATE'), default=0),
+                update_count=Sum('event_count', filter=Q(action='UPDATE'), default=0),
+                delete_count=Sum('event_count', filter=Q(action__in=['DELETE', 'SOFT_DELETE']), default=0)
             )
             .order_by('-total_actions')[:top_n]
         )
         
         # Hourly distribution
         hourly_dist = (
-            self.base_query
-            .filter(timestamp__gte=since)
-            .annotate(hour=TruncHour('timestamp'))
+            rollups
             .values('hour')
-            .annotate(count=Count('id'))
+            .annotate(count=Sum('event_count'))
             .order_by('hour')
         )
         
         # Action distribution
         action_dist = (
-            self.base_query
-            .filter(timestamp__gte=since)
+            rollups
             .values('action')
-            .annotate(count=Count('id'))
+            .annotate(count=Sum('event_count'))
             .order_by('-count')
         )
         
+        totals = rollups.aggregate(
+            total_events=Sum('event_count', default=0),
+            active_users=Count('user_id', distinct=True, filter=~Q(user_id=''))
+        )
+        
         return {
             'period_days': days,
-            'total_events': self.base_query.filter(timestamp__gte=since).count(),
-            'active_users': self.base_query.filter(timestamp__gte=since).values('user').distinct().count(),
+            'total_events': totals['total_events'],
+            'active_users': totals['active_users'],
             'top_users': list(user_stats),
             'hourly_distribution': list(hourly_dist),
             'action_distribution': list(action_dist),
@@ -79,13 +89,10 @@ class AuditAnalyzer:
         
         # 1. Detect failed login spikes
         failed_logins = (
-            self.base_query
-            .filter(
-                timestamp__gte=since,
-                action='LOGIN_FAILED'
-            )
+            self.rollups(since)
+            .filter(action='LOGIN_FAILED')
             .values('user_ip')
-            .annotate(count=Count('id'))
+            .annotate(count=Sum('event_count'))
             .filter(count__gte=threshold)
         )
         
@@ -117,13 +124,12 @@ class AuditAnalyzer:
         business_hours = range(9, 18)
         
         unusual_activity = (
-            self.base_query
-            .filter(timestamp__gte=since)
-            .annotate(hour=F('timestamp__hour'))
-            .exclude(hour__in=business_hours)
+            self.rollups(since)
+            .annotate(hour_of_day=ExtractHour('hour'))
+            .exclude(hour_of_day__in=business_hours)
             .filter(action__in=['DELETE', 'SOFT_DELETE', 'UPDATE'])
-            .values('user_email', 'hour', 'action')
-            .annotate(count=Count('id'))
+            .values('user_email', 'hour_of_day', 'action')
+            .annotate(count=Sum('event_count'))
             .filter(count__gte=3)
             .order_by('-count')
         )
@@ -134,7 +140,7 @@ class AuditAnalyzer:
                 'severity': 'MEDIUM',
                 'user': entry['user_email'],
                 'action': entry['action'],
-                'hour': entry['hour'],
+                'hour': entry['hour_of_day'],
                 'count': entry['count'],
                 'description': f'User {entry["user_email"]} performed {entry["count"]} {entry["action"]} actions during unusual hours'
             })
@@ -187,7 +193,7 @@ class AuditAnalyzer:
             },
             'summary': {
                 'total_events': logs.count(),
-                'unique_users': logs.values('user').distinct().count(),
+                'unique_users': logs.values('user_id').distinct().count(),
                 'unique_resources': logs.values('resource_type').distinct().count(),
             },
             'user_activity': self._get_user_compliance_activity(logs),
@@ -371,26 +377,24 @@ class RealTimeMonitor:
     def get_realtime_metrics(self):
         """Get real-time metrics dashboard"""
         now = timezone.now()
+        filters = {'tenant_id': str(self.analyzer.tenant_id)} if self.analyzer.tenant_id else {}
         
+        # Hour and day windows come mostly from the hourly rollups; the
+        # minute-level figures only touch the last few minutes of AuditLog
         metrics = {
             'current_minute': self.analyzer.base_query.filter(
                 timestamp__gte=now - timedelta(minutes=1)
             ).count(),
-            'current_hour': self.analyzer.base_query.filter(
-                timestamp__gte=now - timedelta(hours=1)
-            ).count(),
-            'current_day': self.analyzer.base_query.filter(
-                timestamp__gte=now - timedelta(days=1)
-            ).count(),
+            'current_hour': AuditRollupService.count_events(now - timedelta(hours=1), now, **filters),
+            'current_day': AuditRollupService.count_events(now - timedelta(days=1), now, **filters),
             'active_users_now': self.analyzer.base_query.filter(
                 timestamp__gte=now - timedelta(minutes=5)
-            ).values('user').distinct().count(),
-            'failed_logins_hour': self.analyzer.base_query.filter(
-                timestamp__gte=now - timedelta(hours=1),
-                action='LOGIN_FAILED'
-            ).count(),
+            ).values('user_id').distinct().count(),
+            'failed_logins_hour': AuditRollupService.count_events(
+                now - timedelta(hours=1), now, action='LOGIN_FAILED', **filters
+            ),
             'alerts_active': len([a for a in self.alerts if a.get('is_new', False)]),
             'last_updated': now.isoformat()
         }
         
-        return metrics
\ No newline at end of file
+        return metrics
@@ -3,15 +3,10 @@ Complete Attendance API Views for School Management System
 Includes: QR Scanning, DeepFace Face Recognition, Manual Attendance, and Dashboard
 """
 
-import base64
-import io
-import tempfile
 import os
 import re
-import csv
 from datetime import datetime, timedelta
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponse
 
 from django.utils import timezone
 from django.db import transaction
@@ -23,7 +18,7 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 
 from apps.core.api.views import (
-    BaseListCreateAPIView, BaseRetrieveUpdateDestroyAPIView
+    BaseListCreateAPIView, BaseRetrieveUpdateDestroyAPIView, ExportAPIView
 )
 from apps.academics.models import StudentAttendance, SchoolClass, Section
 from apps.hr.models import StaffAttendance, Staff
@@ -34,6 +29,7 @@ from apps.attendance.api.serializers import (
     HostelAttendanceSerializer, TransportAttendanceSerializer
 )
 from apps.students.models import Student
+from apps.attendance.services.stats_service import AttendanceStatsService
 
 # Optional imports for DeepFace
 try:
@@ -49,11 +45,15 @@ except ImportError:
 
 # Import DeepFace service
 try:
-    from apps.attendance.services.face_recognition_service import deepface_service
+    from apps.attendance.services.face_recognition_service import (
+        deepface_service, decode_base64_image, decode_image_bytes
+    )
     DEEPFACE_AVAILABLE = True
 except ImportError:
     DEEPFACE_AVAILABLE = False
     deepface_service = None
+    decode_base64_image = None
+    decode_image_bytes = None
 
 import logging
 
@@ -210,7 +210,7 @@ class MarkQRAttendanceAPIView(APIView):
             admission_number = match.group(1)
 
         try:
-            student = Student.objects.get(admission_number=admission_number)
+            student = Student.objects.with_photo().get(admission_number=admission_number)
             if hasattr(request, 'tenant') and request.tenant and student.tenant != request.tenant:
                 return Response(
                     {"error": "Student not found in this school."}, 
@@ -329,100 +329,50 @@ class DeepFaceBaseView(APIView):
         return True
     
     def process_image(self, image_data, image_file):
-        """Process image input and return file path"""
-        temp_file_path = None
-        
-        try:
-            if image_file:
-                # Handle uploaded file
-                temp_file_path = self._save_uploaded_file(image_file)
-            elif image_data:
-                # Handle base64 image
-                temp_file_path = self._process_base64_image(image_data)
-            
-            # Verify image is valid
-            self._verify_image(temp_file_path)
-            
-            return temp_file_path
-            
-        except Exception as e:
-            # Cleanup on error
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
-            raise
-    
-    def _save_uploaded_file(self, uploaded_file):
-        """Save uploaded file to temporary location"""
-        temp_dir = tempfile.gettempdir()
-        filename = f"deepface_{int(timezone.now().timestamp())}_{uploaded_file.name}"
-        temp_path = os.path.join(temp_dir, filename)
+        """
+        Decode image input into an in-memory BGR array.
+        Nothing is written to disk and the image is not re-encoded.
+        """
+        if image_file:
+            # Handle uploaded file
+            image = self._decode_uploaded_file(image_file)
+        else:
+            # Handle base64 image
+            image = self._decode_base64_image(image_data)
         
-        with open(temp_path, 'wb') as f:
-            for chunk in uploaded_file.chunks():
-                f.write(chunk)
+        # Verify image is valid
+        self._verify_image(image)
         
-        return temp_path
+        return image
     
-    def _process_base64_image(self, image_data):
-        """Process base64 image data"""
-        # Extract base64 data
-        if 'base64,' in image_data:
-            image_data = image_data.split('base64,')[1]
-        
+    def _decode_uploaded_file(self, uploaded_file):
+        """Decode an uploaded file without saving it"""
         try:
-            # Decode base64
-            image_bytes = base64.b64decode(image_data)
-            
-            # Verify it's a valid image
-            image = Image.open(io.BytesIO(image_bytes))
-            image.verify()
-            
-            # Re-open for processing
-            image = Image.open(io.BytesIO(image_bytes))
-            
-            # Convert to RGB if needed
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Save to temporary file
-            temp_dir = tempfile.gettempdir()
-            temp_path = os.path.join(temp_dir, f"deepface_{int(timezone.now().timestamp())}.jpg")
-            
-            image.save(temp_path, 'JPEG', quality=85)
-            
-            return temp_path
-            
-        except Exception as e:
-            raise ValueError(f"Invalid base64 image: {str(e)}")
+            return decode_image_bytes(b''.join(uploaded_file.chunks()))
+        except ValueError as e:
+            raise ValueError(f"Invalid image file: {str(e)}")
     
-    def _verify_image(self, image_path):
-        """Verify image is valid and readable"""
+    def _decode_base64_image(self, image_data):
+        """Decode base64 image data"""
         try:
-            # Try to read with OpenCV
-            img = cv2.imread(image_path)
-            if img is None:
-                raise ValueError("Could not read image file")
-            
-            # Check image dimensions
-            height, width = img.shape[:2]
-            if height < 50 or width < 50:
-                raise ValueError("Image dimensions too small (min 50x50)")
-            
-            if height > 4000 or width > 4000:
-                raise ValueError("Image dimensions too large (max 4000x4000)")
-            
-            return True
-            
-        except Exception as e:
-            raise ValueError(f"Invalid image: {str(e)}")
+            return decode_base64_image(image_data)
+        except ValueError as e:
+            raise ValueError(f"Invalid base64 image: {str(e)}")
     
-    def cleanup_temp_file(self, file_path):
-        """Clean up temporary file"""
-        try:
-            if file_path and os.path.exists(file_path):
-                os.unlink(file_path)
-        except Exception as e:
-            logger.warning(f"Failed to cleanup temp file {file_path}: {e}")
+    def _verify_image(self, image):
+        """Verify decoded image dimensions"""
+        if image is None:
+            raise ValueError("Invalid image: could not decode image")
+        
+        # Check image dimensions
+        height, width = image.shape[:2]
+        if height < 50 or width < 50:
+            raise ValueError("Invalid image: dimensions too small (min 50x50)")
+        
+        if height > 4000 or width > 4000:
+            raise ValueError("Invalid image: dimensions too large (max 4000x4000)")
+        
+        return True
 
 
 class MarkDeepFaceAttendanceAPIView(DeepFaceBaseView):
@@ -439,7 +389,9 @@ class MarkDeepFaceAttendanceAPIView(DeepFaceBaseView):
             "image_file": File,
             "type": "student|staff|transport|hostel",
             "trip_type": "PICKUP|DROP",
-            "min_confidence": 0.5  # Optional
+            "min_confidence": 0.5,  # Optional
+            "class_id": "uuid",  # Optional, search only this class
+            "section_id": "uuid"  # Optional, search only this section
         }
         """
         # Check if DeepFace is available
@@ -458,6 +410,8 @@ class MarkDeepFaceAttendanceAPIView(DeepFaceBaseView):
         att_type = request.data.get('type', 'student')
         trip_type = request.data.get('trip_type')
         min_confidence = float(request.data.get('min_confidence', 0.5))
+        class_id = request.data.get('class_id')
+        section_id = request.data.get('section_id')
         
         # Validate inputs
         try:
@@ -479,16 +433,20 @@ class MarkDeepFaceAttendanceAPIView(DeepFaceBaseView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        temp_file_path = None
+        try:
+            image = self.process_image(image_data, image_file)
+        except ValueError as e:
+            return Response(
+                {"error": "Invalid input", "detail": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         try:
-            # Process image
-            temp_file_path = self.process_image(image_data, image_file)
-            
-            # Perform face recognition
+            # Perform face recognition against the relevant shard only
             recognition_result, message, confidence, distance = deepface_service.recognize_face(
-                image_path=temp_file_path,
-                min_confidence=min_confidence
+                image_array=image,
+                min_confidence=min_confidence,
+                filters=self.get_recognition_filters(att_type, class_id, section_id)
             )
             
             if not recognition_result:
@@ -535,11 +493,16 @@ class MarkDeepFaceAttendanceAPIView(DeepFaceBaseView):
                 "error": "Internal server error",
                 "detail": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            
-        finally:
-            # Cleanup temp file
-            if temp_file_path:
-                self.cleanup_temp_file(temp_file_path)
+    
+    def get_recognition_filters(self, att_type, class_id=None, section_id=None):
+        """Face index partition to search for an attendance type"""
+        if att_type == 'staff':
+            return {'type': 'staff'}
+        return {
+            'type': 'student',
+            'class_id': class_id,
+            'section_id': section_id,
+        }
     
     @transaction.atomic
     def mark_attendance(self, request, person_data, att_type, trip_type, confidence, distance):
@@ -584,7 +547,7 @@ class MarkDeepFaceAttendanceAPIView(DeepFaceBaseView):
             if person_type == 'student':
                 return Student.objects.select_related(
                     'current_class', 'section'
-                ).get(id=person_id)
+                ).with_photo().get(id=person_id)
             else:  # staff
                 return Staff.objects.select_related(
                     'user', 'department', 'designation'
@@ -809,30 +772,39 @@ class DeepFaceBatchRecognitionAPIView(DeepFaceBaseView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        temp_file_path = None
+        try:
+            self.validate_image_input(None, image_file)
+            image = self.process_image(None, image_file)
+        except ValueError as e:
+            return Response(
+                {"error": "Invalid input", "detail": str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
         try:
-            # Process image
-            temp_file_path = self.process_image(None, image_file)
-            
-            # Recognize multiple faces
-            recognized_faces, message = deepface_service.recognize_multiple_faces(temp_file_path)
-            
-            # Filter by class if specified
-            if class_id and recognized_faces:
-                recognized_faces = [
-                    f for f in recognized_faces 
-                    if f.get('class_id') == class_id
-                ]
+            # Recognize multiple faces, searching only the requested class
+            recognized_faces, message = deepface_service.recognize_multiple_faces(
+                image_array=image,
+                min_confidence=min_confidence,
+                filters={'type': 'student', 'class_id': class_id}
+            )
             
             # Mark attendance for each recognized face
             results = []
             successful = 0
             
+            # Load all matched students (with photos) in one go
+            students = {
+                str(student.pk): student
+                for student in Student.objects.select_related('current_class', 'section').with_photo().filter(
+                    id__in=[face['id'] for face in recognized_faces if face.get('type') == 'student' and face.get('id')]
+                )
+            }
+            
             for face_data in recognized_faces:
                 try:
                     if face_data.get('confidence', 0) >= min_confidence:
-                        result = self.mark_single_attendance(request, face_data)
+                        result = self.mark_single_attendance(request, face_data, students.get(str(face_data.get('id'))))
                         if result.get('success'):
                             successful += 1
                         results.append(result)
@@ -865,16 +837,14 @@ class DeepFaceBatchRecognitionAPIView(DeepFaceBaseView):
                 "error": "Batch processing failed",
                 "message": str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        finally:
-            if temp_file_path:
-                self.cleanup_temp_file(temp_file_path)
     
-    def mark_single_attendance(self, request, face_data):
+    def mark_single_attendance(self, request, face_data, student=None):
         """Mark attendance for single recognized face"""
         if face_data['type'] != 'student':
             raise ValueError("Only student attendance supported")
         
-        student = Student.objects.get(id=face_data['id'])
+        if student is None:
+            student = Student.objects.get(id=face_data['id'])
         confidence = face_data.get('confidence', 0)
         
         attendance, created = StudentAttendance.objects.update_or_create(
@@ -923,7 +893,7 @@ class StudentListByClassAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
              
-        students = Student.objects.filter(current_class_id=class_id, status='ACTIVE')
+        students = Student.objects.filter(current_class_id=class_id, status='ACTIVE').with_photo()
         if section_id:
             students = students.filter(section_id=section_id)
             
@@ -1016,54 +986,40 @@ class BulkAttendanceUpdateAPIView(APIView):
 class AttendanceStatsAPIView(APIView):
     """
     GET /api/v1/attendance/stats/
-    Returns aggregated stats for a specific date (defaults to today).
+    Returns aggregated stats for a specific date (defaults to today),
+    or for date..end_date when end_date is given.
     Filters: class_id, section_id
     """
     
     def get(self, request):
         date_str = request.query_params.get('date')
-        if date_str:
-            try:
-                target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-            except ValueError:
-                return Response(
-                    {'error': 'Invalid date format (YYYY-MM-DD)'}, 
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        else:
-            target_date = timezone.now().date()
+        end_date_str = request.query_params.get('end_date')
+        try:
+            target_date = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else timezone.now().date()
+            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date() if end_date_str else None
+        except ValueError:
+            return Response(
+                {'error': 'Invalid date format (YYYY-MM-DD)'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if end_date and end_date < target_date:
+            return Response(
+                {'error': 'end_date must not be before date'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
             
         class_id = request.query_params.get('class_id')
         section_id = request.query_params.get('section_id')
-        
-        # Base Query
-        queryset = StudentAttendance.objects.filter(date=target_date)
-        
-        # Tenant Filter
-        if hasattr(request, 'tenant') and request.tenant:
-            queryset = queryset.filter(tenant=request.tenant)
-            
-        if class_id:
-            queryset = queryset.filter(class_name_id=class_id)
-        if section_id:
-            queryset = queryset.filter(section_id=section_id)
-            
-        # Aggregation
-        total = queryset.count()
-        present = queryset.filter(status='PRESENT').count()
-        absent = queryset.filter(status='ABSENT').count()
-        late = queryset.filter(status='LATE').count()
-        half_day = queryset.filter(status='HALFDAY').count()
-        
-        return Response({
-            "date": target_date,
-            "total_marked": total,
-            "present": present,
-            "absent": absent,
-            "late": late,
-            "half_day": half_day,
-            "attendance_percentage": round((present / total * 100), 1) if total > 0 else 0.0
-        })
+        tenant = request.tenant if getattr(request, 'tenant', None) else None
+
+        # One grouped query over the daily rollups (briefly cached)
+        return Response(AttendanceStatsService.daily_stats(
+            target_date,
+            tenant=tenant,
+            class_id=class_id,
+            section_id=section_id,
+            end_date=end_date,
+        ))
 
 
 class AttendanceHistoryListAPIView(BaseListCreateAPIView):
@@ -1100,22 +1056,29 @@ class AttendanceHistoryListAPIView(BaseListCreateAPIView):
         return qs.order_by('-date', 'student__first_name')
 
 
-class AttendanceExportAPIView(APIView):
+class AttendanceExportAPIView(ExportAPIView):
     """
     GET /api/v1/attendance/export/
-    Export attendance records to CSV.
+    Export attendance records (CSV by default). Built by a background job;
+    the response carries the job status and download URL.
     """
+    model = StudentAttendance
+    serializer_class = StudentAttendanceSerializer
+    permission_classes = [IsAuthenticated]
+    default_export_format = 'csv'
+    export_in_background = True
+    export_fields = [
+        'date', 'student__first_name', 'student__middle_name', 'student__last_name',
+        'student__admission_number', 'class_name__name', 'section__name', 'status', 'remarks',
+    ]
     
-    def get(self, request):
-        # Reuse filter logic (simplified)
-        queryset = StudentAttendance.objects.all()
-        if hasattr(request, 'tenant') and request.tenant:
-            queryset = queryset.filter(tenant=request.tenant)
-            
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        
         # Apply filters
-        start_date = request.query_params.get('start_date')
-        end_date = request.query_params.get('end_date')
-        class_id = request.query_params.get('class_id')
+        start_date = self.request.query_params.get('start_date')
+        end_date = self.request.query_params.get('end_date')
+        class_id = self.request.query_params.get('class_id')
         
         if start_date: 
             queryset = queryset.filter(date__gte=start_date)
@@ -1124,23 +1087,25 @@ class AttendanceExportAPIView(APIView):
         if class_id: 
             queryset = queryset.filter(class_name_id=class_id)
         
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="attendance_report_{timezone.now().date()}.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow(['Date', 'Student Name', 'Admission No', 'Class', 'Status', 'Remarks'])
-
-        for att in queryset.select_related('student', 'class_name'):
-            writer.writerow([
-                att.date,
-                att.student.full_name if att.student else 'N/A',
-                att.student.admission_number if att.student else 'N/A',
-                f"{att.class_name.name} {att.section.name}" if att.class_name else 'N/A',
-                att.status,
-                att.remarks
-            ])
-
-        return response
+        return queryset.order_by('date', 'pk')
+    
+    def get_export_filename(self):
+        return f"attendance_report_{timezone.now().date()}"
+    
+    def get_export_headers(self):
+        return ['Date', 'Student Name', 'Admission No', 'Class', 'Status', 'Remarks']
+    
+    def get_export_row(self, values):
+        date, first_name, middle_name, last_name, admission_number, class_name, section_name, att_status, remarks = values
+        student_name = " ".join(filter(None, [first_name, middle_name, last_name])) or 'N/A'
+        return [
+            date,
+            student_name,
+            admission_number or 'N/A',
+            f"{class_name} {section_name or ''}".strip() if class_name else 'N/A',
+            att_status,
+            remarks,
+        ]
 
 
 # ============================================================================
@@ -1158,58 +1123,9 @@ class AttendanceDashboardAPIView(APIView):
     def get(self, request):
         from django.urls import reverse
         today = timezone.now().date()
-        
-        # Student Stats
-        student_total = Student.objects.filter(status='ACTIVE').count()
-        student_present = StudentAttendance.objects.filter(
-            date=today, status='PRESENT'
-        ).count()
-        student_absent = StudentAttendance.objects.filter(
-            date=today, status='ABSENT'
-        ).count()
-        student_late = StudentAttendance.objects.filter(
-            date=today, status='LATE'
-        ).count()
-        student_percentage = (student_present / student_total * 100) if student_total > 0 else 0
-        
-        # Staff Stats
-        staff_total = Staff.objects.filter(employment_status='ACTIVE').count()
-        staff_present = StaffAttendance.objects.filter(
-            date=today, status='PRESENT'
-        ).count()
-        staff_absent = StaffAttendance.objects.filter(
-            date=today, status='ABSENT'
-        ).count()
-        staff_late = StaffAttendance.objects.filter(
-            date=today, status='LATE'
-        ).count()
-        staff_percentage = (staff_present / staff_total * 100) if staff_total > 0 else 0
-        
-        # Hostel Stats (students with hostel allocation)
-        hostel_total = Student.objects.filter(status='ACTIVE', hostel_allocation__isnull=False).count()
-        hostel_present = HostelAttendance.objects.filter(
-            date=today, status='PRESENT'
-        ).count()
-        hostel_absent = HostelAttendance.objects.filter(
-            date=today, status='ABSENT'
-        ).count()
-        hostel_late = HostelAttendance.objects.filter(
-            date=today, status='LATE'
-        ).count()
-        hostel_percentage = (hostel_present / hostel_total * 100) if hostel_total > 0 else 0
-        
-        # Transport Stats (students with transport allocation)
-        transport_total = Student.objects.filter(status='ACTIVE', transport_allocation__isnull=False).count()
-        transport_present = TransportAttendance.objects.filter(
-            date=today, status='PRESENT'
-        ).count()
-        transport_absent = TransportAttendance.objects.filter(
-            date=today, status='ABSENT'
-        ).count()
-        transport_late = TransportAttendance.objects.filter(
-            date=today, status='LATE'
-        ).count()
-        transport_percentage = (transport_present / transport_total * 100) if transport_total > 0 else 0
+
+        # Status counts per attendance type: one grouped query per table
+        stats = AttendanceStatsService.dashboard_stats(today)
         
         # Recent Attendance (last 10 records across all types)
         recent_student = list(StudentAttendance.objects.filter(date=today).select_related('student')[:5])
@@ -1261,36 +1177,7 @@ class AttendanceDashboardAPIView(APIView):
             }
         
         return Response({
-            'stats': {
-                'student': {
-                    'total': student_total,
-                    'present': student_present,
-                    'absent': student_absent,
-                    'late': student_late,
-                    'percentage': round(student_percentage, 1),
-                },
-                'staff': {
-                    'total': staff_total,
-                    'present': staff_present,
-                    'absent': staff_absent,
-                    'late': staff_late,
-                    'percentage': round(staff_percentage, 1),
-                },
-                'hostel': {
-                    'total': hostel_total,
-                    'present': hostel_present,
-                    'absent': hostel_absent,
-                    'late': hostel_late,
-                    'percentage': round(hostel_percentage, 1),
-                },
-                'transport': {
-                    'total': transport_total,
-                    'present': transport_present,
-                    'absent': transport_absent,
-                    'late': transport_late,
-                    'percentage': round(transport_percentage, 1),
-                },
-            },
+            'stats': stats,
             'quick_actions': {
                 'qr_scan': {
                     'student': reverse('mark-qr-attendance'),
@@ -1384,7 +1271,7 @@ class MarkFaceAttendanceAPIView(APIView):
                 # Efficient query for students with photos and required academic info
                 student_qs = Student.objects.filter(
                     status__in=['ACTIVE', 'TRANSFERRED']
-                ).select_related('current_class', 'section')
+                ).select_related('current_class', 'section').with_photo()
                 
                 for s in student_qs:
                     # Verify student has required class info for attendance
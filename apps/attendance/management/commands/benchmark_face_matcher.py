@@ -0,0 +1,71 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.attendance.services.face_index import FaceEmbeddingIndex
+
+
+def _loop_distance(metric, probe, known):
+    """Reference per-face distance, as computed by the old Python loop"""
+    if metric == 'euclidean':
+        return np.linalg.norm(probe - known)
+    if metric == 'euclidean_l2':
+        return np.linalg.norm(probe / np.linalg.norm(probe) - known / np.linalg.norm(known))
+    return 1 - np.dot(probe, known) / (np.linalg.norm(probe) * np.linalg.norm(known))
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the vectorized face matcher against the per-face Python loop'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 50000],
+            help='Numbers of synthetic enrolled faces',
+        )
+        parser.add_argument('--dimension', type=int, default=128, help='Embedding dimension (Facenet: 128)')
+        parser.add_argument('--probes', type=int, default=20, help='Probe embeddings per size')
+        parser.add_argument('--metric', default='cosine', choices=FaceEmbeddingIndex.METRICS)
+        parser.add_argument('--skip-loop', action='store_true', help='Only time the vectorized matcher')
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(42)
+        metric = options['metric']
+        dimension = options['dimension']
+
+        self.stdout.write(f'Metric: {metric}, dimension: {dimension}, probes: {options["probes"]}\n')
+        self.stdout.write(f'  {"faces":>8}  {"loop ms":>10}  {"matrix ms":>10}  {"speedup":>8}')
+
+        for size in options['sizes']:
+            embeddings = rng.standard_normal((size, dimension)).astype(np.float32)
+            metadata = [{'id': str(i), 'type': 'student', 'name': f'Person {i}'} for i in range(size)]
+
+            index = FaceEmbeddingIndex()
+            index.rebuild(embeddings, metadata)
+            probes = embeddings[rng.integers(0, size, options['probes'])] + 0.01
+
+            started = time.perf_counter()
+            for probe in probes:
+                index.search(probe, metric=metric, top_k=5)
+            matrix_ms = (time.perf_counter() - started) * 1000 / len(probes)
+
+            loop_ms = None
+            if not options['skip_loop']:
+                started = time.perf_counter()
+                for probe in probes:
+                    best = float('inf')
+                    for known in embeddings:
+                        distance = _loop_distance(metric, probe, known)
+                        if distance < best:
+                            best = distance
+                loop_ms = (time.perf_counter() - started) * 1000 / len(probes)
+
+            if loop_ms is None:
+                self.stdout.write(f'  {size:>8}  {"-":>10}  {matrix_ms:>10.3f}  {"-":>8}')
+            else:
+                self.stdout.write(f'  {size:>8}  {loop_ms:>10.3f}  {matrix_ms:>10.3f}  {loop_ms / matrix_ms:>7.1f}x')
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark complete'))
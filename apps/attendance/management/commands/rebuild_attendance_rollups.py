@@ -0,0 +1,75 @@
+# apps/attendance/management/commands/rebuild_attendance_rollups.py
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import schema_context
+
+
+class Command(BaseCommand):
+    help = 'Rebuild daily attendance rollups from the raw attendance tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Tenant schema name to rebuild',
+        )
+        parser.add_argument(
+            '--all-tenants',
+            action='store_true',
+            help='Rebuild for all active tenants',
+        )
+        parser.add_argument(
+            '--start-date',
+            help='First day to rebuild (YYYY-MM-DD); defaults to all history',
+        )
+        parser.add_argument(
+            '--end-date',
+            help='Last day to rebuild (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--type',
+            action='append',
+            choices=['student', 'staff', 'hostel', 'transport'],
+            dest='types',
+            help='Attendance type to rebuild (repeatable; defaults to all)',
+        )
+
+    def handle(self, *args, **options):
+        from apps.attendance.services.rollup_service import AttendanceRollupService
+        from apps.tenants.models import Tenant
+
+        if options['all_tenants']:
+            schemas = list(
+                Tenant.objects.filter(is_active=True).exclude(schema_name='public').values_list('schema_name', flat=True)
+            )
+        elif options['tenant']:
+            schemas = [options['tenant']]
+        else:
+            raise CommandError('Please specify --tenant or --all-tenants')
+
+        try:
+            start_date = self.parse_date(options['start_date'])
+            end_date = self.parse_date(options['end_date'])
+        except ValueError:
+            raise CommandError('Dates must be in YYYY-MM-DD format')
+
+        total = 0
+        for schema_name in schemas:
+            started = time.perf_counter()
+            with schema_context(schema_name):
+                written = AttendanceRollupService.rebuild(
+                    start_date=start_date,
+                    end_date=end_date,
+                    attendance_types=options['types'],
+                )
+            total += sum(written.values())
+            summary = ', '.join(f'{attendance_type}: {rows}' for attendance_type, rows in written.items())
+            self.stdout.write(f'  {schema_name}: {summary} ({(time.perf_counter() - started) * 1000:.1f} ms)')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Wrote {total} rollup rows'))
+
+    @staticmethod
+    def parse_date(value):
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tenants', '0007_tenantconfiguration_square_logo'),
+        ('academics', '0003_alter_classteacher_start_date_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAttendanceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('attendance_type', models.CharField(choices=[('student', 'Student'), ('staff', 'Staff'), ('hostel', 'Hostel'), ('transport', 'Transport')], max_length=10, verbose_name='Attendance Type')),
+                ('status', models.CharField(max_length=20, verbose_name='Status')),
+                ('count', models.IntegerField(default=0, verbose_name='Count')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('class_name', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='academics.schoolclass', verbose_name='Class')),
+                ('section', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='academics.section', verbose_name='Section')),
+                ('tenant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='attendance_rollups', to='tenants.tenant', verbose_name='Tenant')),
+            ],
+            options={
+                'verbose_name': 'Daily Attendance Rollup',
+                'verbose_name_plural': 'Daily Attendance Rollups',
+                'db_table': 'attendance_daily_rollup',
+                'indexes': [
+                    models.Index(fields=['attendance_type', 'date', 'status'], name='attendance__attenda_4ad0b0_idx'),
+                    models.Index(fields=['attendance_type', 'class_name', 'section', 'date'], name='attendance__attenda_2a8430_idx'),
+                    models.Index(fields=['tenant', 'date'], name='attendance__tenant__1d5e8d_idx'),
+                ],
+            },
+        ),
+    ]
@@ -1,2 +1,61 @@
-
 from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class DailyAttendanceRollup(models.Model):
+    """
+    Attendance counts per (tenant, date, class, section, type, status).
+
+    Maintained incrementally from attendance saves/deletes and rebuilt with
+    ``manage.py rebuild_attendance_rollups``. Reads should always ``Sum`` the
+    ``count`` column so concurrent first writes of the same key stay correct.
+    """
+    ATTENDANCE_TYPES = (
+        ("student", _("Student")),
+        ("staff", _("Staff")),
+        ("hostel", _("Hostel")),
+        ("transport", _("Transport")),
+    )
+
+    tenant = models.ForeignKey(
+        'tenants.Tenant',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_rollups',
+        verbose_name=_("Tenant")
+    )
+    date = models.DateField(verbose_name=_("Date"))
+    attendance_type = models.CharField(max_length=10, choices=ATTENDANCE_TYPES, verbose_name=_("Attendance Type"))
+    class_name = models.ForeignKey(
+        'academics.SchoolClass',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_rollups',
+        verbose_name=_("Class")
+    )
+    section = models.ForeignKey(
+        'academics.Section',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='attendance_rollups',
+        verbose_name=_("Section")
+    )
+    status = models.CharField(max_length=20, verbose_name=_("Status"))
+    count = models.IntegerField(default=0, verbose_name=_("Count"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
+
+    class Meta:
+        db_table = "attendance_daily_rollup"
+        verbose_name = _("Daily Attendance Rollup")
+        verbose_name_plural = _("Daily Attendance Rollups")
+        indexes = [
+            models.Index(fields=['attendance_type', 'date', 'status']),
+            models.Index(fields=['attendance_type', 'class_name', 'section', 'date']),
+            models.Index(fields=['tenant', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.attendance_type} {self.status}: {self.count}"
@@ -0,0 +1,259 @@
+"""
+Contiguous in-memory index of face embeddings.
+
+All known embeddings live in one float32 matrix so a probe is compared
+against every enrolled face with a single matrix-vector product instead of
+a Python loop over DeepFace distance helpers.
+"""
+
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+
+class FaceEmbeddingIndex:
+    """
+    Embedding matrix + metadata with incremental add/update/remove.
+
+    Rows are also grouped by the metadata fields in ``PARTITION_FIELDS``
+    (person type, class, section) so a search can be restricted to one
+    sub-partition without scanning the rest of the matrix.
+    """
+
+    METRICS = ('cosine', 'euclidean', 'euclidean_l2')
+    PARTITION_FIELDS = ('type', 'class_id', 'section_id')
+
+    def __init__(self, dtype=np.float32, initial_capacity=64):
+        self.dtype = dtype
+        self._initial_capacity = initial_capacity
+        self._lock = threading.RLock()
+        self._reset(dimension=None)
+
+    def _reset(self, dimension):
+        self._dimension = dimension
+        self._size = 0
+        capacity = self._initial_capacity if dimension else 0
+        self._matrix = np.zeros((capacity, dimension or 0), dtype=self.dtype)
+        self._norms = np.zeros(capacity, dtype=self.dtype)
+        self._metadata = []
+        self._positions = {}
+        self._partitions = defaultdict(set)
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    @property
+    def dimension(self):
+        return self._dimension or 0
+
+    @property
+    def embeddings(self):
+        """View of the populated rows (do not mutate)"""
+        return self._matrix[:self._size]
+
+    @property
+    def metadata(self):
+        return self._metadata
+
+    @property
+    def nbytes(self):
+        return self._matrix.nbytes + self._norms.nbytes
+
+    def position(self, person_id):
+        return self._positions.get(str(person_id))
+
+    def get_metadata(self, person_id):
+        idx = self.position(person_id)
+        return self._metadata[idx] if idx is not None else None
+
+    def to_lists(self):
+        """Serializable (encodings, metadata) pair for the Django cache"""
+        with self._lock:
+            return self.embeddings.tolist(), list(self._metadata)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+    def rebuild(self, embeddings, metadata):
+        """Replace the whole index in one allocation"""
+        with self._lock:
+            if not len(embeddings):
+                self._reset(dimension=None)
+                return
+            matrix = np.asarray(embeddings, dtype=self.dtype)
+            if matrix.ndim != 2 or matrix.shape[0] != len(metadata):
+                raise ValueError("Embeddings and metadata must describe the same faces")
+            self._reset(dimension=matrix.shape[1])
+            self._matrix = np.ascontiguousarray(matrix)
+            self._norms = np.linalg.norm(self._matrix, axis=1).astype(self.dtype)
+            self._size = matrix.shape[0]
+            self._metadata = list(metadata)
+            self._positions = {
+                str(meta.get('id')): idx for idx, meta in enumerate(self._metadata) if meta.get('id')
+            }
+            for idx, meta in enumerate(self._metadata):
+                self._add_to_partitions(idx, meta)
+
+    def upsert(self, person_id, embedding, metadata):
+        """
+        Add or replace the embedding for ``person_id``.
+        Returns "added" or "updated".
+        """
+        vector = np.asarray(embedding, dtype=self.dtype).ravel()
+        with self._lock:
+            if self._dimension is None:
+                self._reset(dimension=vector.shape[0])
+            elif vector.shape[0] != self._dimension:
+                raise ValueError(f"Embedding dimension {vector.shape[0]} does not match index dimension {self._dimension}")
+
+            idx = self.position(person_id)
+            if idx is not None:
+                self._remove_from_partitions(idx, self._metadata[idx])
+                self._metadata[idx] = metadata
+                action = 'updated'
+            else:
+                self._ensure_capacity(self._size + 1)
+                idx = self._size
+                self._size += 1
+                self._metadata.append(metadata)
+                self._positions[str(person_id)] = idx
+                action = 'added'
+
+            self._add_to_partitions(idx, metadata)
+            self._matrix[idx] = vector
+            self._norms[idx] = np.linalg.norm(vector)
+            return action
+
+    def remove(self, person_id):
+        """Remove a face by moving the last row into its slot"""
+        with self._lock:
+            idx = self._positions.pop(str(person_id), None)
+            if idx is None:
+                return False
+            last = self._size - 1
+            self._remove_from_partitions(idx, self._metadata[idx])
+            if idx != last:
+                self._remove_from_partitions(last, self._metadata[last])
+                self._matrix[idx] = self._matrix[last]
+                self._norms[idx] = self._norms[last]
+                self._metadata[idx] = self._metadata[last]
+                self._add_to_partitions(idx, self._metadata[idx])
+                moved_id = self._metadata[idx].get('id')
+                if moved_id:
+                    self._positions[str(moved_id)] = idx
+            self._metadata.pop()
+            self._size = last
+            return True
+
+    def _add_to_partitions(self, idx, metadata):
+        for field in self.PARTITION_FIELDS:
+            value = metadata.get(field)
+            if value:
+                self._partitions[(field, str(value))].add(idx)
+
+    def _remove_from_partitions(self, idx, metadata):
+        for field in self.PARTITION_FIELDS:
+            value = metadata.get(field)
+            if value:
+                rows = self._partitions.get((field, str(value)))
+                if rows is not None:
+                    rows.discard(idx)
+                    if not rows:
+                        del self._partitions[(field, str(value))]
+
+    def rows_for(self, filters=None):
+        """
+        Sorted row positions matching every ``field=value`` in ``filters``,
+        or None when no filter applies (search the whole index).
+        """
+        filters = {field: value for field, value in (filters or {}).items() if value and field in self.PARTITION_FIELDS}
+        if not filters:
+            return None
+        with self._lock:
+            groups = sorted(
+                (self._partitions.get((field, str(value)), set()) for field, value in filters.items()),
+                key=len,
+            )
+            rows = set(groups[0])
+            for group in groups[1:]:
+                rows &= group
+        return np.fromiter(sorted(rows), dtype=np.intp, count=len(rows))
+
+    def partition_sizes(self, field):
+        """Number of faces per value of a partition field"""
+        return {value: len(rows) for (name, value), rows in self._partitions.items() if name == field}
+
+    def _ensure_capacity(self, required):
+        capacity = self._matrix.shape[0]
+        if required <= capacity:
+            return
+        new_capacity = max(required, capacity * 2, self._initial_capacity)
+        matrix = np.zeros((new_capacity, self._dimension), dtype=self.dtype)
+        matrix[:self._size] = self._matrix[:self._size]
+        norms = np.zeros(new_capacity, dtype=self.dtype)
+        norms[:self._size] = self._norms[:self._size]
+        self._matrix, self._norms = matrix, norms
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def distances(self, embedding, metric='cosine', rows=None):
+        """
+        Distances from ``embedding`` to every indexed face (or to ``rows``)
+        computed from one matrix-vector product.
+        """
+        if metric not in self.METRICS:
+            metric = 'cosine'
+
+        query = np.asarray(embedding, dtype=self.dtype).ravel()
+        with self._lock:
+            matrix = self._matrix[:self._size]
+            norms = self._norms[:self._size]
+            if rows is not None:
+                matrix = matrix[rows]
+                norms = norms[rows]
+            dots = matrix @ query
+
+        query_norm = np.linalg.norm(query)
+        if metric == 'euclidean':
+            squared = norms * norms - 2.0 * dots + query_norm * query_norm
+            return np.sqrt(np.maximum(squared, 0.0))
+
+        denominator = norms * query_norm
+        similarity = np.divide(dots, denominator, out=np.zeros_like(dots), where=denominator > 0)
+        if metric == 'euclidean_l2':
+            return np.sqrt(np.maximum(2.0 - 2.0 * similarity, 0.0))
+        return 1.0 - similarity
+
+    def search(self, embedding, metric='cosine', top_k=1, filters=None, rows=None):
+        """
+        Return up to ``top_k`` (position, distance) pairs, nearest first.
+        Positions index into ``metadata``. ``filters`` restricts the search
+        to one partition, e.g. ``{'type': 'student', 'class_id': ...}``.
+        """
+        if not self._size:
+            return []
+
+        if rows is None:
+            rows = self.rows_for(filters)
+
+        distances = self.distances(embedding, metric=metric, rows=rows)
+        if not len(distances):
+            return []
+
+        k = max(1, min(int(top_k), len(distances)))
+        if k < len(distances):
+            nearest = np.argpartition(distances, k - 1)[:k]
+            nearest = nearest[np.argsort(distances[nearest])]
+        else:
+            nearest = np.argsort(distances)
+
+        positions = np.asarray(rows)[nearest] if rows is not None else nearest
+        return [(int(pos), float(distances[i])) for pos, i in zip(positions, nearest)]
@@ -5,23 +5,57 @@ Simpler installation and maintenance than dlib/face_recognition
 
 import os
 import json
+import base64
+import binascii
 import numpy as np
 import cv2
 import pickle
+import threading
 from deepface import DeepFace
-from deepface.commons import functions, distance as dst
+from deepface.commons import functions
 from django.conf import settings
-from django.core.cache import cache
-from django.db import transaction
+from django.core.cache import caches
+from django.db import connection, transaction
 from django.utils import timezone
+from django.utils.connection import ConnectionProxy
 from apps.students.models import Student
 from apps.hr.models import Staff
+from apps.attendance.services.face_index import FaceEmbeddingIndex
 import logging
 from datetime import datetime, timedelta
 import hashlib
 
 logger = logging.getLogger(__name__)
 
+# Encodings are shared by every worker through the deepface cache alias
+cache = ConnectionProxy(caches, 'deepface')
+
+
+def decode_image_bytes(image_bytes):
+    """
+    Decode encoded image bytes (JPEG/PNG/...) straight into a BGR array.
+    Raises ValueError if the bytes are not a readable image.
+    """
+    if not image_bytes:
+        raise ValueError("Empty image data")
+    
+    image = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("Could not decode image data")
+    return image
+
+
+def decode_base64_image(image_data):
+    """Decode a base64 string (optionally a data URL) into a BGR array"""
+    if 'base64,' in image_data:
+        image_data = image_data.split('base64,', 1)[1]
+    
+    try:
+        image_bytes = base64.b64decode(image_data)
+    except (binascii.Error, ValueError) as e:
+        raise ValueError(f"Invalid base64 data: {str(e)}")
+    return decode_image_bytes(image_bytes)
+
 
 class DeepFaceRecognitionService:
     """Advanced face recognition service using DeepFace with multiple model support"""
@@ -55,15 +89,9 @@ class DeepFaceRecognitionService:
             self.distance_metric = getattr(settings, 'DEEPFACE_METRIC', 'cosine')
             self.threshold = getattr(settings, 'DEEPFACE_THRESHOLD', 0.4)
             
-            # Cache keys
-            self.encodings_cache_key = f'deepface_encodings_{self.model_name}'
-            self.metadata_cache_key = f'deepface_metadata_{self.model_name}'
-            self.last_trained_key = 'deepface_last_trained'
-            
-            # Initialize
-            self.known_face_encodings = []
-            self.known_face_metadata = []
-            self.encoding_cache = {}  # For quick lookup
+            # One face index per tenant schema, loaded on first use
+            self.face_indexes = {}
+            self._indexes_lock = threading.RLock()
             
             # Load pre-trained model
             try:
@@ -77,7 +105,6 @@ class DeepFaceRecognitionService:
                 self.model = None
             
             self._lock = True
-            self.load_or_train_encodings()
     
     def get_model_info(self):
         """Get information about the current model"""
@@ -90,24 +117,85 @@ class DeepFaceRecognitionService:
             'available_metrics': self.AVAILABLE_METRICS
         }
     
+    # ------------------------------------------------------------------
+    # Per-tenant shards
+    # ------------------------------------------------------------------
+    def _current_schema(self):
+        """Schema of the active tenant connection"""
+        return getattr(connection, 'schema_name', None) or 'public'
+    
+    def get_index(self, schema_name=None):
+        """
+        Face index for one tenant schema. Each school only ever searches its
+        own faces; the index is loaded from cache (or trained) on first use.
+        """
+        schema_name = schema_name or self._current_schema()
+        index = self.face_indexes.get(schema_name)
+        if index is None:
+            with self._indexes_lock:
+                index = self.face_indexes.get(schema_name)
+                if index is None:
+                    index = FaceEmbeddingIndex()
+                    self.load_or_train_encodings(index=index, schema_name=schema_name)
+                    self.face_indexes[schema_name] = index
+        return index
+    
+    def drop_index(self, schema_name=None):
+        """Forget a tenant's in-memory index (it is reloaded on next use)"""
+        with self._indexes_lock:
+            self.face_indexes.pop(schema_name or self._current_schema(), None)
+    
+    @property
+    def face_index(self):
+        """Face index of the current tenant"""
+        return self.get_index()
+    
+    def _cache_key(self, kind, schema_name=None):
+        schema_name = schema_name or self._current_schema()
+        if kind == 'last_trained':
+            return f'deepface_last_trained_{schema_name}'
+        return f'deepface_{kind}_{schema_name}_{self.model_name}'
+    
+    @property
+    def encodings_cache_key(self):
+        return self._cache_key('encodings')
+    
+    @property
+    def metadata_cache_key(self):
+        return self._cache_key('metadata')
+    
+    @property
+    def last_trained_key(self):
+        return self._cache_key('last_trained')
+    
+    @property
+    def known_face_encodings(self):
+        """Matrix of known embeddings (one row per face)"""
+        return self.face_index.embeddings
+    
+    @property
+    def known_face_metadata(self):
+        """Metadata for each row of ``known_face_encodings``"""
+        return self.face_index.metadata
+    
     @transaction.atomic
-    def load_or_train_encodings(self):
+    def load_or_train_encodings(self, index=None, schema_name=None):
         """Load existing encodings or train new ones"""
-        cached_data = cache.get(self.encodings_cache_key)
-        cached_metadata = cache.get(self.metadata_cache_key)
+        schema_name = schema_name or self._current_schema()
+        index = index if index is not None else self.get_index(schema_name)
+        cached_data = cache.get(self._cache_key('encodings', schema_name))
+        cached_metadata = cache.get(self._cache_key('metadata', schema_name))
         
-        if cached_data and cached_metadata and self._validate_cache_data(cached_data, cached_metadata):
-            self.known_face_encodings = cached_data
-            self.known_face_metadata = cached_metadata
-            self._build_encoding_cache()
+        if cached_data and cached_metadata and self._validate_cache_data(cached_data, cached_metadata, schema_name):
+            index.rebuild(cached_data, cached_metadata)
             
-            logger.info(f"Loaded {len(self.known_face_encodings)} face encodings from cache")
+            logger.info(f"Loaded {len(index)} face encodings for {schema_name} from cache")
             logger.info(f"Model: {self.model_name}, Threshold: {self.threshold}")
         else:
-            logger.info("Cache invalid or expired, training new encodings")
-            self.train_all_faces()
+            logger.info(f"Cache invalid or expired for {schema_name}, training new encodings")
+            self.train_all_faces(index=index, schema_name=schema_name)
     
-    def _validate_cache_data(self, encodings, metadata):
+    def _validate_cache_data(self, encodings, metadata, schema_name=None):
         """Validate cache data integrity"""
         if not isinstance(encodings, list) or not isinstance(metadata, list):
             return False
@@ -116,39 +204,33 @@ class DeepFaceRecognitionService:
             return False
         
         # Check if cache is too old (max 30 days)
-        last_trained = cache.get(self.last_trained_key)
+        last_trained = cache.get(self._cache_key('last_trained', schema_name))
         if last_trained:
             if timezone.now() - last_trained > timedelta(days=30):
                 return False
         
         return True
     
-    def _build_encoding_cache(self):
-        """Build quick lookup cache for encodings"""
-        self.encoding_cache = {}
-        for idx, metadata in enumerate(self.known_face_metadata):
-            person_id = metadata.get('id')
-            if person_id:
-                self.encoding_cache[person_id] = idx
-    
-    def train_all_faces(self):
+    def train_all_faces(self, index=None, schema_name=None):
         """Train face encodings for all students and staff with photos"""
-        self.known_face_encodings = []
-        self.known_face_metadata = []
+        schema_name = schema_name or self._current_schema()
+        index = index if index is not None else self.get_index(schema_name)
+        encodings = []
+        metadata = []
         
-        logger.info(f"Starting face encoding training with model: {self.model_name}")
+        logger.info(f"Starting face encoding training for {schema_name} with model: {self.model_name}")
         
         # Train student faces
         students = Student.objects.filter(
             status='ACTIVE'
-        ).select_related('current_class', 'section')
+        ).select_related('current_class', 'section').with_photo()
         
         student_count = 0
         for student in students:
             encoding = self._get_face_encoding_for_student(student)
             if encoding is not None:
-                self.known_face_encodings.append(encoding)
-                self.known_face_metadata.append({
+                encodings.append(encoding)
+                metadata.append({
                     'id': str(student.id),
                     'type': 'student',
                     'name': student.full_name,
@@ -169,8 +251,8 @@ class DeepFaceRecognitionService:
         for staff in staff_members:
             encoding = self._get_face_encoding_for_staff(staff)
             if encoding is not None:
-                self.known_face_encodings.append(encoding)
-                self.known_face_metadata.append({
+                encodings.append(encoding)
+                metadata.append({
                     'id': str(staff.id),
                     'type': 'staff',
                     'name': staff.full_name,
@@ -182,20 +264,13 @@ class DeepFaceRecognitionService:
                 })
                 staff_count += 1
         
-        # Cache encodings and metadata
-        if self.known_face_encodings:
-            # Convert numpy arrays to lists for JSON serialization
-            encodings_list = [enc.tolist() if isinstance(enc, np.ndarray) else enc 
-                             for enc in self.known_face_encodings]
-            
-            cache.set(self.encodings_cache_key, encodings_list, timeout=86400 * 7)  # 7 days
-            cache.set(self.metadata_cache_key, self.known_face_metadata, timeout=86400 * 7)
-            cache.set(self.last_trained_key, timezone.now(), timeout=None)
-            
-            self._build_encoding_cache()
+        # Build the contiguous matrix once, then cache encodings and metadata
+        index.rebuild(encodings, metadata)
+        if index:
+            self._update_cache(index=index, schema_name=schema_name)
             
             logger.info(f"Trained {student_count} student faces and {staff_count} staff faces")
-            logger.info(f"Total encodings: {len(self.known_face_encodings)}")
+            logger.info(f"Total encodings: {len(index)}")
         else:
             logger.warning("No face encodings were generated during training")
     
@@ -305,12 +380,15 @@ class DeepFaceRecognitionService:
             logger.error(f"Error encoding face for staff {staff.id}: {str(e)}")
             return None
     
-    def _process_image(self, image_path, enforce_detection=True):
-        """Process image for face detection and alignment"""
+    def _process_image(self, image, enforce_detection=True):
+        """
+        Process image for face detection and alignment.
+        ``image`` is a file path or an in-memory BGR array.
+        """
         try:
             # Preprocess face
             img = functions.preprocess_face(
-                img=image_path,
+                img=image,
                 target_size=self.input_shape[:2],
                 enforce_detection=enforce_detection,
                 detector_backend='opencv',
@@ -331,130 +409,154 @@ class DeepFaceRecognitionService:
                 return None, False
             raise e
     
-    def recognize_face(self, image_path=None, image_array=None, min_confidence=0.5):
+    def find_matches(self, embedding, top_k=1, filters=None, schema_name=None):
+        """
+        Nearest known faces of the current (or given) tenant for an embedding.
+        ``filters`` narrows the search to a partition, e.g.
+        ``{'type': 'student', 'class_id': ..., 'section_id': ...}``.
+        Returns a list of (metadata, distance) pairs, nearest first.
+        """
+        index = self.get_index(schema_name)
+        matches = index.search(embedding, metric=self.distance_metric, top_k=top_k, filters=filters)
+        return [(index.metadata[idx], distance) for idx, distance in matches]
+    
+    def _distance_to_confidence(self, distance):
+        """Convert a distance into a 0..1 confidence relative to the threshold"""
+        return max(0.0, min(1.0, 1.0 - (distance / self.threshold)))
+    
+    def recognize_face(self, image_path=None, image_array=None, min_confidence=0.5, top_k=1, filters=None):
         """
         Recognize a face from an image using DeepFace
         Returns: (metadata, message, confidence, distance)
+        
+        With ``top_k`` > 1 the matched metadata also carries the nearest
+        ``candidates``. ``filters`` restricts the search (see find_matches).
         """
         try:
-            # Process image
+            # Process image (arrays go straight to detection, no disk round trip)
             if image_path:
                 embedding, detected = self._process_image(image_path, enforce_detection=True)
             elif image_array is not None:
-                # Save temporary image for processing
-                import tempfile
-                temp_file = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-                cv2.imwrite(temp_file.name, image_array)
-                temp_file.close()
-                
-                try:
-                    embedding, detected = self._process_image(temp_file.name, enforce_detection=True)
-                finally:
-                    os.unlink(temp_file.name)
+                embedding, detected = self._process_image(image_array, enforce_detection=True)
             else:
                 raise ValueError("Either image_path or image_array must be provided")
             
             if not detected or embedding is None:
                 return None, "No face detected in image", 0.0, 0.0
             
-            # Check if we have any known faces
-            if not self.known_face_encodings:
-                return None, "No faces trained in the system", 0.0, 0.0
-            
-            # Find best match
-            best_match_idx = -1
-            best_distance = float('inf')
-            
-            for idx, known_encoding in enumerate(self.known_face_encodings):
-                # Calculate distance
-                if self.distance_metric == 'cosine':
-                    distance = dst.findCosineDistance(embedding, known_encoding)
-                elif self.distance_metric == 'euclidean':
-                    distance = dst.findEuclideanDistance(embedding, known_encoding)
-                elif self.distance_metric == 'euclidean_l2':
-                    distance = dst.findEuclideanDistance(
-                        dst.l2_normalize(embedding),
-                        dst.l2_normalize(known_encoding)
-                    )
-                else:
-                    distance = dst.findCosineDistance(embedding, known_encoding)
-                
-                if distance < best_distance:
-                    best_distance = distance
-                    best_match_idx = idx
-            
-            # Convert distance to confidence
-            confidence = max(0.0, min(1.0, 1.0 - (best_distance / self.threshold)))
-            
-            # Check if match meets threshold
-            if best_match_idx != -1 and best_distance <= self.threshold and confidence >= min_confidence:
-                metadata = self.known_face_metadata[best_match_idx].copy()
-                metadata['confidence'] = float(confidence)
-                metadata['distance'] = float(best_distance)
-                metadata['threshold'] = float(self.threshold)
-                
-                return metadata, "Face recognized successfully", confidence, best_distance
-            else:
-                return None, "No matching face found in database", confidence, best_distance
+            return self.match_embedding(embedding, min_confidence=min_confidence, top_k=top_k, filters=filters)
             
         except Exception as e:
             logger.error(f"Face recognition error: {str(e)}", exc_info=True)
             return None, f"Recognition error: {str(e)}", 0.0, 0.0
     
-    def recognize_multiple_faces(self, image_path, min_confidence=0.5):
-        """Recognize multiple faces in a single image"""
-        try:
-            # Use DeepFace's built-in multi-face recognition
-            results = DeepFace.find(
-                img_path=image_path,
-                db_path=None,  # We'll handle our own database
-                model_name=self.model_name,
-                distance_metric=self.distance_metric,
-                enforce_detection=True,
-                detector_backend='opencv',
-                align=True,
-                silent=True
+    def match_embedding(self, embedding, min_confidence=0.5, top_k=1, filters=None, schema_name=None):
+        """
+        Match an already extracted embedding against the tenant's faces
+        Returns: (metadata, message, confidence, distance)
+        """
+        # Check if we have any known faces
+        if not self.get_index(schema_name):
+            return None, "No faces trained in the system", 0.0, 0.0
+        
+        # Find best match(es) with a single matrix-vector product
+        matches = self.find_matches(embedding, top_k=top_k, filters=filters, schema_name=schema_name)
+        if not matches:
+            return None, "No matching face found in database", 0.0, 0.0
+        best_metadata, best_distance = matches[0]
+        
+        # Convert distance to confidence
+        confidence = self._distance_to_confidence(best_distance)
+        
+        # Check if match meets threshold
+        if best_distance <= self.threshold and confidence >= min_confidence:
+            metadata = best_metadata.copy()
+            metadata['confidence'] = float(confidence)
+            metadata['distance'] = float(best_distance)
+            metadata['threshold'] = float(self.threshold)
+            if top_k > 1:
+                metadata['candidates'] = [
+                    {
+                        'id': candidate.get('id'),
+                        'type': candidate.get('type'),
+                        'name': candidate.get('name'),
+                        'distance': float(distance),
+                        'confidence': float(self._distance_to_confidence(distance)),
+                    }
+                    for candidate, distance in matches
+                ]
+            
+            return metadata, "Face recognized successfully", confidence, best_distance
+        else:
+            return None, "No matching face found in database", confidence, best_distance
+    
+    def extract_embeddings(self, images):
+        """
+        Embeddings for a batch of BGR arrays with one model call.
+        Entries where no face is detected are None.
+        """
+        faces = []
+        positions = []
+        for position, image in enumerate(images):
+            try:
+                faces.append(functions.preprocess_face(
+                    img=image,
+                    target_size=self.input_shape[:2],
+                    enforce_detection=True,
+                    detector_backend='opencv',
+                    grayscale=False,
+                    align=True
+                ))
+                positions.append(position)
+            except ValueError:
+                continue
+        
+        embeddings = [None] * len(images)
+        if faces:
+            batch = self.model.predict(np.vstack(faces))
+            if self.distance_metric == 'cosine':
+                batch = batch / np.linalg.norm(batch, axis=1, keepdims=True)
+            for position, embedding in zip(positions, batch):
+                embeddings[position] = embedding
+        return embeddings
+    
+    def _get_face_cascade(self):
+        """OpenCV Haar cascade, loaded once per process"""
+        if getattr(self, '_face_cascade', None) is None:
+            self._face_cascade = cv2.CascadeClassifier(
+                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
             )
-            
-            # Since we can't pass our custom db, we'll implement custom logic
+        return self._face_cascade
+    
+    def recognize_multiple_faces(self, image_path=None, min_confidence=0.5, filters=None, image_array=None):
+        """Recognize multiple faces in a single image (file path or BGR array)"""
+        try:
             # Load image and detect faces
-            img = cv2.imread(image_path)
+            img = image_array if image_array is not None else cv2.imread(image_path)
             if img is None:
                 return [], "Could not read image"
             
             # Detect faces using OpenCV cascade
             gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            face_cascade = cv2.CascadeClassifier(
-                cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
-            )
-            faces = face_cascade.detectMultiScale(gray, 1.1, 4)
+            faces = self._get_face_cascade().detectMultiScale(gray, 1.1, 4)
             
             if len(faces) == 0:
                 return [], "No faces detected in image"
             
             recognized_faces = []
             
-            # Process each face
+            # Process each face region in memory
             for (x, y, w, h) in faces:
                 try:
-                    # Extract face region
                     face_img = img[y:y+h, x:x+w]
                     
-                    # Save temporary face image
-                    import tempfile
-                    temp_face = tempfile.NamedTemporaryFile(suffix='.jpg', delete=False)
-                    cv2.imwrite(temp_face.name, face_img)
-                    temp_face.close()
-                    
                     # Recognize this face
                     metadata, message, confidence, distance = self.recognize_face(
-                        image_path=temp_face.name,
-                        min_confidence=min_confidence
+                        image_array=face_img,
+                        min_confidence=min_confidence,
+                        filters=filters
                     )
                     
-                    # Cleanup
-                    os.unlink(temp_face.name)
-                    
                     if metadata:
                         metadata['face_location'] = {'x': int(x), 'y': int(y), 'w': int(w), 'h': int(h)}
                         recognized_faces.append(metadata)
@@ -514,14 +616,13 @@ class DeepFaceRecognitionService:
                 return False, "No face found in the provided image"
             
             # Check if person already has encoding
-            existing_idx = self.encoding_cache.get(str(person_id))
-            
-            if existing_idx is not None:
-                # Update existing encoding
-                self.known_face_encodings[existing_idx] = embedding
-                self.known_face_metadata[existing_idx]['encoding_hash'] = self._generate_encoding_hash(embedding)
-                self.known_face_metadata[existing_idx]['updated_at'] = timezone.now().isoformat()
-                action = "updated"
+            existing = self.face_index.get_metadata(person_id)
+            
+            if existing is not None:
+                # Update existing encoding in place
+                metadata = dict(existing)
+                metadata['encoding_hash'] = self._generate_encoding_hash(embedding)
+                metadata['updated_at'] = timezone.now().isoformat()
             else:
                 # Add new encoding
                 metadata = {
@@ -546,10 +647,8 @@ class DeepFaceRecognitionService:
                         'designation': person.designation.name if person.designation else None
                     })
                 
-                self.known_face_encodings.append(embedding)
-                self.known_face_metadata.append(metadata)
-                self.encoding_cache[str(person_id)] = len(self.known_face_encodings) - 1
-                action = "added"
+            
+            action = self.face_index.upsert(person_id, embedding, metadata)
             
             # Update cache
             self._update_cache()
@@ -560,15 +659,17 @@ class DeepFaceRecognitionService:
             logger.error(f"Error adding new face: {str(e)}")
             return False, f"Error: {str(e)}"
     
-    def _update_cache(self):
+    def _update_cache(self, index=None, schema_name=None):
         """Update cache with current encodings"""
-        # Convert numpy arrays to lists
-        encodings_list = [enc.tolist() if isinstance(enc, np.ndarray) else enc 
-                         for enc in self.known_face_encodings]
+        schema_name = schema_name or self._current_schema()
+        index = index if index is not None else self.get_index(schema_name)
+        
+        # Convert the embedding matrix to lists
+        encodings_list, metadata_list = index.to_lists()
         
-        cache.set(self.encodings_cache_key, encodings_list, timeout=86400 * 7)
-        cache.set(self.metadata_cache_key, self.known_face_metadata, timeout=86400 * 7)
-        cache.set(self.last_trained_key, timezone.now(), timeout=None)
+        cache.set(self._cache_key('encodings', schema_name), encodings_list, timeout=86400 * 7)
+        cache.set(self._cache_key('metadata', schema_name), metadata_list, timeout=86400 * 7)
+        cache.set(self._cache_key('last_trained', schema_name), timezone.now(), timeout=None)
     
     def retrain_model(self, model_name=None, metric=None):
         """Retrain model with optional new configuration"""
@@ -582,18 +683,16 @@ class DeepFaceRecognitionService:
             if metric and metric in self.AVAILABLE_METRICS:
                 self.distance_metric = metric
             
-            # Update cache keys
-            self.encodings_cache_key = f'deepface_encodings_{self.model_name}'
-            self.metadata_cache_key = f'deepface_metadata_{self.model_name}'
-            
-            # Clear old cache
-            cache.delete(f'deepface_encodings_*')
-            cache.delete(f'deepface_metadata_*')
-            
-            # Retrain
-            self.train_all_faces()
+            # Embeddings from another model/metric are not comparable:
+            # drop every tenant shard, then retrain the current one
+            with self._indexes_lock:
+                self.face_indexes.clear()
+            index = FaceEmbeddingIndex()
+            self.train_all_faces(index=index)
+            with self._indexes_lock:
+                self.face_indexes[self._current_schema()] = index
             
-            return True, f"Model retrained with {len(self.known_face_encodings)} encodings"
+            return True, f"Model retrained with {len(index)} encodings"
             
         except Exception as e:
             logger.error(f"Retraining error: {str(e)}")
@@ -604,13 +703,15 @@ class DeepFaceRecognitionService:
         stats = {
             'system_status': 'active',
             'model': self.get_model_info(),
-            'total_encodings': len(self.known_face_encodings),
-            'student_encodings': len([m for m in self.known_face_metadata if m['type'] == 'student']),
-            'staff_encodings': len([m for m in self.known_face_metadata if m['type'] == 'staff']),
+            'total_encodings': len(self.face_index),
+            'student_encodings': self.face_index.partition_sizes('type').get('student', 0),
+            'staff_encodings': self.face_index.partition_sizes('type').get('staff', 0),
+            'class_partitions': len(self.face_index.partition_sizes('class_id')),
+            'loaded_tenants': len(self.face_indexes),
             'cache_timestamp': cache.get(self.last_trained_key),
             'cache_size_mb': self._estimate_cache_size(),
             'threshold': self.threshold,
-            'encoding_dimension': self.known_face_encodings[0].shape[0] if self.known_face_encodings else 0
+            'encoding_dimension': self.face_index.dimension
         }
         
         return stats
@@ -621,9 +722,8 @@ class DeepFaceRecognitionService:
             import sys
             total_size = 0
             
-            # Estimate size of encodings
-            for enc in self.known_face_encodings:
-                total_size += enc.nbytes if isinstance(enc, np.ndarray) else sys.getsizeof(enc)
+            # Estimate size of the embedding matrix
+            total_size += self.face_index.nbytes
             
             # Estimate size of metadata
             import json
@@ -640,16 +740,16 @@ class DeepFaceRecognitionService:
         health = {
             'status': 'healthy',
             'model_loaded': self.model is not None,
-            'encodings_loaded': len(self.known_face_encodings) > 0,
+            'encodings_loaded': len(self.face_index) > 0,
             'cache_valid': bool(cache.get(self.encodings_cache_key)),
             'timestamp': timezone.now().isoformat()
         }
         
         # Test with a sample if available
-        if self.known_face_encodings:
+        if self.face_index:
             try:
                 # Create a dummy test
-                test_embedding = np.random.randn(*self.known_face_encodings[0].shape)
+                test_embedding = np.random.randn(self.face_index.dimension)
                 test_embedding = test_embedding / np.linalg.norm(test_embedding)
                 
                 health['test_embedding_generated'] = True
@@ -0,0 +1,227 @@
+"""
+Micro-batching inference worker for real-time face recognition.
+
+Websocket consumers submit raw frames; the worker keeps at most one pending
+frame per camera (older ones are dropped as stale), groups frames from many
+cameras into one model call on a thread pool, and resolves each caller's
+future with its result. The event loop never runs OpenCV or the model.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _FrameJob:
+    __slots__ = ('camera_key', 'frame_data', 'filters', 'schema_name', 'min_confidence', 'future', 'submitted_at')
+
+    def __init__(self, camera_key, frame_data, filters, schema_name, min_confidence, future):
+        self.camera_key = camera_key
+        self.frame_data = frame_data
+        self.filters = filters
+        self.schema_name = schema_name
+        self.min_confidence = min_confidence
+        self.future = future
+        self.submitted_at = time.monotonic()
+
+
+class InferenceMetrics:
+    """Counters and recent samples for queue depth, batch size and latency"""
+
+    def __init__(self, window=500):
+        self.frames_submitted = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+        self.batches = 0
+        self.max_queue_depth = 0
+        self.batch_sizes = deque(maxlen=window)
+        self.latencies_ms = deque(maxlen=window)
+
+    def snapshot(self, queue_depth):
+        latencies = sorted(self.latencies_ms)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 2)
+
+        return {
+            'queue_depth': queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'frames_submitted': self.frames_submitted,
+            'frames_processed': self.frames_processed,
+            'frames_dropped': self.frames_dropped,
+            'batches': self.batches,
+            'avg_batch_size': round(sum(self.batch_sizes) / len(self.batch_sizes), 2) if self.batch_sizes else 0.0,
+            'latency_ms_p50': percentile(0.50),
+            'latency_ms_p95': percentile(0.95),
+        }
+
+
+class FaceInferenceWorker:
+    """Per-process worker shared by every FaceRecognitionConsumer"""
+
+    DROPPED = 'dropped'
+
+    def __init__(self, batch_size=None, max_wait_ms=None, max_pending=None, workers=None):
+        config = getattr(settings, 'DEEPFACE_SETTINGS', {})
+        self.batch_size = batch_size or config.get('BATCH_SIZE', 10)
+        self.max_wait = (max_wait_ms or config.get('BATCH_WAIT_MS', 20)) / 1000.0
+        self.max_pending = max_pending or config.get('MAX_PENDING_FRAMES', 64)
+        self.workers = workers or config.get('INFERENCE_WORKERS', 1)
+
+        self.metrics = InferenceMetrics()
+        self._pending = OrderedDict()
+        self._wakeup = None
+        self._slots = None
+        self._loop = None
+        self._runner = None
+        self._executor = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._runner is None or self._runner.done():
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._slots = asyncio.Semaphore(self.workers)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='face-inference')
+            self._runner = loop.create_task(self._run())
+
+    @property
+    def queue_depth(self):
+        return len(self._pending)
+
+    def get_metrics(self):
+        return self.metrics.snapshot(self.queue_depth)
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+    async def submit(self, camera_key, frame_data, schema_name, filters=None, min_confidence=0.5):
+        """
+        Queue a frame and wait for its result.
+        Returns a list of recognized faces, or ``DROPPED`` if a newer frame
+        from the same camera (or backpressure) replaced it.
+        """
+        self._ensure_started()
+        future = self._loop.create_future()
+        job = _FrameJob(camera_key, frame_data, filters, schema_name, min_confidence, future)
+        self.metrics.frames_submitted += 1
+
+        stale = self._pending.pop(camera_key, None)
+        if stale is not None:
+            self._drop(stale)
+        elif len(self._pending) >= self.max_pending:
+            _, oldest = self._pending.popitem(last=False)
+            self._drop(oldest)
+
+        self._pending[camera_key] = job
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, len(self._pending))
+        self._wakeup.set()
+        return await future
+
+    def _drop(self, job):
+        self.metrics.frames_dropped += 1
+        if not job.future.done():
+            job.future.set_result(self.DROPPED)
+
+    # ------------------------------------------------------------------
+    # Batching loop
+    # ------------------------------------------------------------------
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            # Give other cameras a moment to join this batch
+            if len(self._pending) < self.batch_size:
+                await asyncio.sleep(self.max_wait)
+
+            while self._pending:
+                # Wait for a free inference thread; frames keep coalescing meanwhile
+                await self._slots.acquire()
+                batch = []
+                while self._pending and len(batch) < self.batch_size:
+                    _, job = self._pending.popitem(last=False)
+                    batch.append(job)
+                if not batch:
+                    self._slots.release()
+                    break
+                self._loop.create_task(self._process(batch))
+
+    async def _process(self, batch):
+        try:
+            await self._process_batch(batch)
+        finally:
+            self._slots.release()
+
+    async def _process_batch(self, batch):
+        self.metrics.batches += 1
+        self.metrics.batch_sizes.append(len(batch))
+        try:
+            results = await self._loop.run_in_executor(self._executor, _recognize_batch, batch)
+        except Exception as e:
+            logger.error(f"Face inference batch failed: {str(e)}", exc_info=True)
+            results = [e] * len(batch)
+
+        finished = time.monotonic()
+        for job, result in zip(batch, results):
+            self.metrics.frames_processed += 1
+            self.metrics.latencies_ms.append((finished - job.submitted_at) * 1000)
+            if job.future.done():
+                continue
+            if isinstance(result, Exception):
+                job.future.set_exception(result)
+            else:
+                job.future.set_result(result)
+
+
+def _recognize_batch(batch):
+    """Runs on the worker thread: decode frames, one model call, match"""
+    from django_tenants.utils import schema_context
+
+    from apps.attendance.services.face_recognition_service import decode_base64_image, deepface_service
+
+    images = []
+    decoded = []
+    for job in batch:
+        try:
+            images.append(decode_base64_image(job.frame_data))
+            decoded.append(job)
+        except ValueError:
+            continue
+
+    results = {id(job): [] for job in batch}
+    if not images:
+        return [results[id(job)] for job in batch]
+
+    # Frames from different tenants are matched against their own shard
+    embeddings = deepface_service.extract_embeddings(images)
+    for job, embedding in zip(decoded, embeddings):
+        if embedding is None:
+            continue
+        with schema_context(job.schema_name):
+            metadata, message, confidence, distance = deepface_service.match_embedding(
+                embedding,
+                min_confidence=job.min_confidence,
+                filters=job.filters,
+                schema_name=job.schema_name,
+            )
+        if metadata:
+            results[id(job)].append(metadata)
+
+    return [results[id(job)] for job in batch]
+
+
+# Shared per-process worker
+face_inference_worker = FaceInferenceWorker()
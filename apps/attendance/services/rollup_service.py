@@ -0,0 +1,237 @@
+"""
+Daily attendance rollups.
+
+``DailyAttendanceRollup`` holds one count per (tenant, date, class, section,
+attendance type, status). Attendance saves and deletes move a record's count
+from its old key to its new one, and ``rebuild`` regenerates a date range
+from the raw attendance tables with one grouped query per table. Month and
+year reports then read a handful of rows per day instead of every record.
+"""
+
+import logging
+from collections import namedtuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+logger = logging.getLogger(__name__)
+
+RollupKey = namedtuple('RollupKey', 'tenant_id date class_id section_id status')
+
+# attendance type -> model plus the fields that give its class and section
+RollupSource = namedtuple('RollupSource', 'app_label model_name class_lookup section_lookup')
+
+
+class AttendanceRollupService:
+    """Incremental maintenance, rebuilds and reads of DailyAttendanceRollup"""
+
+    SOURCES = {
+        'student': RollupSource('academics', 'StudentAttendance', 'class_name_id', 'section_id'),
+        'staff': RollupSource('hr', 'StaffAttendance', None, None),
+        'hostel': RollupSource('hostel', 'HostelAttendance', 'class_name_id', 'section_id'),
+        'transport': RollupSource('transportation', 'TransportAttendance', 'class_name_id', 'section_id'),
+    }
+
+    @staticmethod
+    def enabled():
+        return getattr(settings, 'ATTENDANCE_ROLLUP', {}).get('ENABLED', True)
+
+    @classmethod
+    def reads_enabled(cls):
+        return cls.enabled() and getattr(settings, 'ATTENDANCE_ROLLUP', {}).get('USE_FOR_READS', False)
+
+    @classmethod
+    def source_model(cls, attendance_type):
+        source = cls.SOURCES[attendance_type]
+        return apps.get_model(source.app_label, source.model_name)
+
+    @classmethod
+    def attendance_type_for(cls, model):
+        for attendance_type, source in cls.SOURCES.items():
+            if model._meta.app_label == source.app_label and model.__name__ == source.model_name:
+                return attendance_type
+        return None
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+    SNAPSHOT_FIELDS = {'tenant_id', 'date', 'status', 'is_active', 'class_name_id', 'section_id'}
+    UNKNOWN = 'unknown'
+
+    @classmethod
+    def affects_rollup(cls, update_fields):
+        """Whether a save with ``update_fields`` can change the rollup key"""
+        if update_fields is None:
+            return True
+        names = {name[:-3] if name.endswith('_id') else name for name in update_fields}
+        return bool(names & {name[:-3] if name.endswith('_id') else name for name in cls.SNAPSHOT_FIELDS})
+
+    @classmethod
+    def stored_snapshot(cls, attendance_type, instance):
+        """Snapshot of ``instance``'s row as stored, or None if there is none"""
+        stored = type(instance)._base_manager.filter(pk=instance.pk).first()
+        return cls.snapshot(attendance_type, stored) if stored is not None else None
+
+    @classmethod
+    def snapshot(cls, attendance_type, instance):
+        """
+        ``instance``'s rollup key. None when it does not count
+        (soft-deleted), ``UNKNOWN`` when it was only partially loaded.
+        Hostel and transport records carry the class and section they were
+        marked under, so later edits leave the same bucket.
+        """
+        if instance.get_deferred_fields() & cls.SNAPSHOT_FIELDS:
+            return cls.UNKNOWN
+        if not getattr(instance, 'is_active', True) or not instance.date or not instance.status:
+            return None
+        if cls.SOURCES[attendance_type].class_lookup:
+            return RollupKey(instance.tenant_id, instance.date, instance.class_name_id, instance.section_id, instance.status)
+        return RollupKey(instance.tenant_id, instance.date, None, None, instance.status)
+
+    @classmethod
+    def record_change(cls, attendance_type, old, new):
+        """Move one attendance record from snapshot ``old`` to ``new``"""
+        if old == new or not cls.enabled():
+            return
+        if cls.UNKNOWN in (old, new):
+            logger.warning(f"Skipped {attendance_type} attendance rollup update for a partially loaded record; rebuild to resync")
+            return
+        try:
+            with transaction.atomic():
+                if old is not None:
+                    cls._add(attendance_type, old, -1)
+                if new is not None:
+                    cls._add(attendance_type, new, 1)
+        except Exception as e:
+            logger.error(f"Failed to update {attendance_type} attendance rollup: {str(e)}", exc_info=True)
+
+    @classmethod
+    def _add(cls, attendance_type, key, delta):
+        from apps.attendance.models import DailyAttendanceRollup
+
+        rows = DailyAttendanceRollup.objects.filter(
+            tenant_id=key.tenant_id,
+            date=key.date,
+            attendance_type=attendance_type,
+            class_name_id=key.class_id,
+            section_id=key.section_id,
+            status=key.status,
+        )
+        pk = rows.values_list('pk', flat=True).first()
+        if pk is not None:
+            DailyAttendanceRollup.objects.filter(pk=pk).update(count=F('count') + delta)
+        elif delta > 0:
+            DailyAttendanceRollup.objects.create(
+                tenant_id=key.tenant_id,
+                date=key.date,
+                attendance_type=attendance_type,
+                class_name_id=key.class_id,
+                section_id=key.section_id,
+                status=key.status,
+                count=delta,
+            )
+
+    # ------------------------------------------------------------------
+    # Rebuild
+    # ------------------------------------------------------------------
+    @classmethod
+    def rebuild(cls, start_date=None, end_date=None, attendance_types=None, batch_size=1000):
+        """
+        Regenerate rollups for a date range (everything when no range is
+        given) from the raw attendance tables. Returns rows written per type.
+        """
+        from apps.attendance.models import DailyAttendanceRollup
+
+        written = {}
+        for attendance_type in attendance_types or cls.SOURCES:
+            source = cls.SOURCES[attendance_type]
+            records = cls.source_model(attendance_type).objects.filter(is_active=True)
+            rollups = DailyAttendanceRollup.objects.filter(attendance_type=attendance_type)
+            if start_date:
+                records = records.filter(date__gte=start_date)
+                rollups = rollups.filter(date__gte=start_date)
+            if end_date:
+                records = records.filter(date__lte=end_date)
+                rollups = rollups.filter(date__lte=end_date)
+
+            annotations = {'group_tenant': F('tenant_id'), 'group_date': F('date'), 'group_status': F('status')}
+            if source.class_lookup:
+                annotations['group_class'] = F(source.class_lookup)
+                annotations['group_section'] = F(source.section_lookup)
+            grouped = records.order_by().annotate(**annotations).values(*annotations).annotate(total=Count('pk'))
+
+            with transaction.atomic():
+                rollups.delete()
+                batch = []
+                count = 0
+                for row in grouped.iterator():
+                    batch.append(DailyAttendanceRollup(
+                        tenant_id=row['group_tenant'],
+                        date=row['group_date'],
+                        attendance_type=attendance_type,
+                        class_name_id=row.get('group_class'),
+                        section_id=row.get('group_section'),
+                        status=row['group_status'],
+                        count=row['total'],
+                    ))
+                    if len(batch) >= batch_size:
+                        DailyAttendanceRollup.objects.bulk_create(batch)
+                        count += len(batch)
+                        batch = []
+                if batch:
+                    DailyAttendanceRollup.objects.bulk_create(batch)
+                    count += len(batch)
+            written[attendance_type] = count
+        return written
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    @classmethod
+    def rollups(cls, attendance_type, start_date, end_date=None, tenant=None, class_id=None, section_id=None):
+        from apps.attendance.models import DailyAttendanceRollup
+
+        queryset = DailyAttendanceRollup.objects.filter(
+            attendance_type=attendance_type,
+            date__gte=start_date,
+            date__lte=end_date or start_date,
+        )
+        if tenant is not None:
+            queryset = queryset.filter(tenant=tenant)
+        if class_id:
+            queryset = queryset.filter(class_name_id=class_id)
+        if section_id:
+            queryset = queryset.filter(section_id=section_id)
+        return queryset.order_by()
+
+    @classmethod
+    def status_counts(cls, attendance_type, start_date, end_date=None, **filters):
+        """``{status: count}`` over a date range"""
+        rows = cls.rollups(attendance_type, start_date, end_date, **filters).values('status').annotate(
+            total=Sum('count')
+        )
+        return {row['status']: row['total'] for row in rows if row['total']}
+
+    @classmethod
+    def daily_counts(cls, attendance_type, start_date, end_date, **filters):
+        """``{date: {status: count}}`` over a date range"""
+        rows = cls.rollups(attendance_type, start_date, end_date, **filters).values('date', 'status').annotate(
+            total=Sum('count')
+        )
+        days = {}
+        for row in rows:
+            if row['total']:
+                days.setdefault(row['date'], {})[row['status']] = row['total']
+        return days
+
+    @classmethod
+    def attendance_percentage(cls, attendance_type, start_date, end_date, present_statuses=('PRESENT', 'LATE'), **filters):
+        """Share of marked records with a present status, or None if nothing was marked"""
+        counts = cls.status_counts(attendance_type, start_date, end_date, **filters)
+        total = sum(counts.values())
+        if not total:
+            return None
+        present = sum(counts.get(status, 0) for status in present_statuses)
+        return round(present / total * 100, 2)
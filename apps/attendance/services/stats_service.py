@@ -0,0 +1,157 @@
+"""
+Attendance statistics for dashboards and reporting APIs.
+
+Every status count of an attendance type is read with one grouped query
+(``GROUP BY status``) instead of one ``count()`` per status - from the daily
+rollups when enabled - and results are kept in the Django cache for a few
+seconds so a busy dashboard does not hit the database on every poll.
+"""
+
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count, Q
+
+logger = logging.getLogger(__name__)
+
+
+class AttendanceStatsService:
+    """Grouped, cached status counts per attendance type"""
+
+    # attendance type -> (app_label, model_name)
+    ATTENDANCE_MODELS = {
+        'student': ('academics', 'StudentAttendance'),
+        'staff': ('hr', 'StaffAttendance'),
+        'hostel': ('hostel', 'HostelAttendance'),
+        'transport': ('transportation', 'TransportAttendance'),
+    }
+
+    CACHE_PREFIX = 'attendance_stats'
+
+    @staticmethod
+    def cache_timeout():
+        return getattr(settings, 'ATTENDANCE_STATS_CACHE_TIMEOUT', 30)
+
+    @classmethod
+    def _cache_key(cls, *parts):
+        schema = getattr(connection, 'schema_name', None) or 'public'
+        return ':'.join([cls.CACHE_PREFIX, schema] + [str(part) for part in parts])
+
+    @classmethod
+    def _cached(cls, key, compute):
+        timeout = cls.cache_timeout()
+        if not timeout:
+            return compute()
+        try:
+            value = cache.get(key)
+        except Exception:
+            value = None
+        if value is None:
+            value = compute()
+            try:
+                cache.set(key, value, timeout)
+            except Exception as e:
+                logger.warning(f"Could not cache attendance stats: {str(e)}")
+        return value
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    @classmethod
+    def get_model(cls, attendance_type):
+        return apps.get_model(*cls.ATTENDANCE_MODELS[attendance_type])
+
+    @classmethod
+    def status_counts(cls, attendance_type, date, end_date=None, tenant=None, class_id=None, section_id=None):
+        """
+        ``{status: count}`` for one attendance type and date (or date range).
+        Read from the daily rollups when they are enabled, otherwise with one
+        grouped query over the attendance table.
+        """
+        from apps.attendance.services.rollup_service import AttendanceRollupService
+
+        if AttendanceRollupService.reads_enabled():
+            return AttendanceRollupService.status_counts(
+                attendance_type, date, end_date, tenant=tenant, class_id=class_id, section_id=section_id
+            )
+
+        queryset = cls.get_model(attendance_type).objects.filter(date__gte=date, date__lte=end_date or date)
+        if tenant is not None:
+            queryset = queryset.filter(tenant=tenant)
+        if class_id:
+            queryset = queryset.filter(class_name_id=class_id)
+        if section_id:
+            queryset = queryset.filter(section_id=section_id)
+        rows = queryset.order_by().values('status').annotate(count=Count('pk'))
+        return {row['status']: row['count'] for row in rows}
+
+    @staticmethod
+    def roster_totals():
+        """Active students (overall, in hostel, on transport) and active staff"""
+        from apps.hr.models import Staff
+        from apps.students.models import Student
+
+        students = Student.objects.filter(status='ACTIVE').aggregate(
+            student=Count('pk', distinct=True),
+            hostel=Count('pk', distinct=True, filter=Q(hostel_allocation__isnull=False)),
+            transport=Count('pk', distinct=True, filter=Q(transport_allocation__isnull=False)),
+        )
+        students['staff'] = Staff.objects.filter(employment_status='ACTIVE').count()
+        return students
+
+    # ------------------------------------------------------------------
+    # Endpoint payloads
+    # ------------------------------------------------------------------
+    @staticmethod
+    def summarize(counts, total):
+        present = counts.get('PRESENT', 0)
+        return {
+            'total': total,
+            'present': present,
+            'absent': counts.get('ABSENT', 0),
+            'late': counts.get('LATE', 0),
+            'percentage': round(present / total * 100, 1) if total > 0 else 0,
+        }
+
+    @classmethod
+    def dashboard_stats(cls, date):
+        """Per-type summary for AttendanceDashboardAPIView (five queries)"""
+        def compute():
+            totals = cls.roster_totals()
+            return {
+                attendance_type: cls.summarize(cls.status_counts(attendance_type, date), totals[attendance_type])
+                for attendance_type in cls.ATTENDANCE_MODELS
+            }
+
+        return cls._cached(cls._cache_key('dashboard', date), compute)
+
+    @classmethod
+    def daily_stats(cls, date, tenant=None, class_id=None, section_id=None, end_date=None):
+        """Student attendance summary for AttendanceStatsAPIView (one query)"""
+        def compute():
+            counts = cls.status_counts(
+                'student', date, end_date=end_date, tenant=tenant, class_id=class_id, section_id=section_id
+            )
+            total = sum(counts.values())
+            present = counts.get('PRESENT', 0)
+            stats = {
+                "date": date,
+                "total_marked": total,
+                "present": present,
+                "absent": counts.get('ABSENT', 0),
+                "late": counts.get('LATE', 0),
+                "half_day": counts.get('HALF_DAY', 0),
+                "by_status": counts,
+                "attendance_percentage": round((present / total * 100), 1) if total > 0 else 0.0
+            }
+            if end_date:
+                stats["end_date"] = end_date
+            return stats
+
+        key = cls._cache_key(
+            'daily', date, end_date or '', getattr(tenant, 'pk', ''), class_id or '', section_id or ''
+        )
+        return cls._cached(key, compute)
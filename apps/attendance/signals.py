@@ -0,0 +1,48 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+
+from apps.attendance.services.rollup_service import AttendanceRollupService
+
+
+# ---------------------------------------------------------
+# Keep daily attendance rollups in step with attendance records
+# ---------------------------------------------------------
+def remember_rollup_key(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Snapshot the stored rollup key of a record about to be updated"""
+    if raw or instance._state.adding or not AttendanceRollupService.enabled():
+        instance._rollup_snapshot = None
+        return
+    attendance_type = AttendanceRollupService.attendance_type_for(sender)
+    if AttendanceRollupService.affects_rollup(update_fields):
+        instance._rollup_snapshot = AttendanceRollupService.stored_snapshot(attendance_type, instance)
+    else:
+        # Saves that leave the key fields alone keep the record where it is
+        instance._rollup_snapshot = AttendanceRollupService.snapshot(attendance_type, instance)
+
+
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    attendance_type = AttendanceRollupService.attendance_type_for(sender)
+    previous = None if created else getattr(instance, '_rollup_snapshot', AttendanceRollupService.UNKNOWN)
+    current = AttendanceRollupService.snapshot(attendance_type, instance)
+    AttendanceRollupService.record_change(attendance_type, previous, current)
+    instance._rollup_snapshot = current
+
+
+def remember_rollup_key_on_delete(sender, instance, **kwargs):
+    attendance_type = AttendanceRollupService.attendance_type_for(sender)
+    instance._rollup_snapshot = AttendanceRollupService.snapshot(attendance_type, instance)
+
+
+def update_rollup_on_delete(sender, instance, **kwargs):
+    attendance_type = AttendanceRollupService.attendance_type_for(sender)
+    previous = getattr(instance, '_rollup_snapshot', AttendanceRollupService.UNKNOWN)
+    AttendanceRollupService.record_change(attendance_type, previous, None)
+
+
+for attendance_type in AttendanceRollupService.SOURCES:
+    model = AttendanceRollupService.source_model(attendance_type)
+    pre_save.connect(remember_rollup_key, sender=model, dispatch_uid=f'attendance_rollup_pre_save_{attendance_type}')
+    post_save.connect(update_rollup_on_save, sender=model, dispatch_uid=f'attendance_rollup_save_{attendance_type}')
+    pre_delete.connect(remember_rollup_key_on_delete, sender=model, dispatch_uid=f'attendance_rollup_pre_delete_{attendance_type}')
+    post_delete.connect(update_rollup_on_delete, sender=model, dispatch_uid=f'attendance_rollup_delete_{attendance_type}')
@@ -0,0 +1,63 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from apps.attendance.services.face_index import FaceEmbeddingIndex
+
+
+class FaceEmbeddingIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.embeddings = self.rng.standard_normal((50, 16)).astype(np.float32)
+        self.metadata = [{'id': str(i), 'type': 'student', 'name': f'Student {i}'} for i in range(50)]
+        self.index = FaceEmbeddingIndex()
+        self.index.rebuild(self.embeddings, self.metadata)
+
+    def test_distances_match_reference(self):
+        probe = self.rng.standard_normal(16).astype(np.float32)
+        for metric in FaceEmbeddingIndex.METRICS:
+            distances = self.index.distances(probe, metric=metric)
+            for known, distance in zip(self.embeddings, distances):
+                if metric == 'euclidean':
+                    expected = np.linalg.norm(probe - known)
+                elif metric == 'euclidean_l2':
+                    expected = np.linalg.norm(probe / np.linalg.norm(probe) - known / np.linalg.norm(known))
+                else:
+                    expected = 1 - np.dot(probe, known) / (np.linalg.norm(probe) * np.linalg.norm(known))
+                self.assertAlmostEqual(float(distance), float(expected), places=4)
+
+    def test_search_returns_nearest_first(self):
+        matches = self.index.search(self.embeddings[7], top_k=3)
+        self.assertEqual(len(matches), 3)
+        self.assertEqual(matches[0][0], 7)
+        self.assertLessEqual(matches[0][1], matches[1][1])
+
+    def test_upsert_and_remove(self):
+        vector = self.rng.standard_normal(16)
+        self.assertEqual(self.index.upsert('new', vector, {'id': 'new'}), 'added')
+        self.assertEqual(self.index.upsert('new', vector, {'id': 'new'}), 'updated')
+        self.assertEqual(len(self.index), 51)
+        self.assertEqual(self.index.search(vector)[0][0], self.index.position('new'))
+
+        self.assertTrue(self.index.remove('3'))
+        self.assertEqual(len(self.index), 50)
+        self.assertIsNone(self.index.position('3'))
+        self.assertEqual(self.index.metadata[self.index.position('new')]['id'], 'new')
+
+    def test_search_within_partition(self):
+        index = FaceEmbeddingIndex()
+        metadata = [
+            {'id': str(i), 'type': 'student' if i % 2 else 'staff', 'class_id': 'A' if i < 25 else 'B'}
+            for i in range(50)
+        ]
+        index.rebuild(self.embeddings, metadata)
+
+        matches = index.search(self.embeddings[30], top_k=50, filters={'type': 'student', 'class_id': 'A'})
+        self.assertTrue(matches)
+        for position, _ in matches:
+            self.assertEqual(index.metadata[position]['type'], 'student')
+            self.assertEqual(index.metadata[position]['class_id'], 'A')
+
+        self.assertEqual(index.search(self.embeddings[0], filters={'class_id': 'missing'}), [])
+
+        index.remove('1')
+        self.assertEqual(index.partition_sizes('class_id'), {'A': 24, 'B': 25})
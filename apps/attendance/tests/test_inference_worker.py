@@ -0,0 +1,43 @@
+import asyncio
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.attendance.services.inference_worker import FaceInferenceWorker
+
+
+def fake_recognize_batch(batch):
+    return [[{'frame': job.frame_data}] for job in batch]
+
+
+@mock.patch('apps.attendance.services.inference_worker._recognize_batch', side_effect=fake_recognize_batch)
+class FaceInferenceWorkerTests(SimpleTestCase):
+    def run_async(self, coroutine):
+        return asyncio.new_event_loop().run_until_complete(coroutine)
+
+    def test_frames_from_many_cameras_share_a_batch(self, recognize):
+        worker = FaceInferenceWorker(batch_size=8, max_wait_ms=10, max_pending=16, workers=1)
+
+        async def scenario():
+            return await asyncio.gather(*(
+                worker.submit(f'camera-{i}', f'frame-{i}', 'public') for i in range(4)
+            ))
+
+        results = self.run_async(scenario())
+        self.assertEqual([r[0]['frame'] for r in results], [f'frame-{i}' for i in range(4)])
+        self.assertEqual(recognize.call_count, 1)
+        self.assertEqual(worker.get_metrics()['avg_batch_size'], 4)
+
+    def test_stale_frame_is_dropped(self, recognize):
+        worker = FaceInferenceWorker(batch_size=8, max_wait_ms=10, max_pending=16, workers=1)
+
+        async def scenario():
+            return await asyncio.gather(
+                worker.submit('camera', 'old', 'public'),
+                worker.submit('camera', 'new', 'public'),
+            )
+
+        old, new = self.run_async(scenario())
+        self.assertEqual(old, FaceInferenceWorker.DROPPED)
+        self.assertEqual(new[0]['frame'], 'new')
+        self.assertEqual(worker.get_metrics()['frames_dropped'], 1)
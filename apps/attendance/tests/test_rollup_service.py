@@ -0,0 +1,127 @@
+import datetime
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.attendance.services.rollup_service import AttendanceRollupService, RollupKey
+
+
+def record(deferred=(), **fields):
+    values = dict(tenant_id=1, date=datetime.date(2024, 1, 1), status='PRESENT', is_active=True)
+    values.update(fields)
+    return SimpleNamespace(get_deferred_fields=lambda: set(deferred), **values)
+
+
+class AttendanceRollupServiceTests(SimpleTestCase):
+    def test_snapshot(self):
+        student = record(class_name_id='c1', section_id='s1')
+        self.assertEqual(
+            AttendanceRollupService.snapshot('student', student),
+            RollupKey(1, datetime.date(2024, 1, 1), 'c1', 's1', 'PRESENT')
+        )
+        self.assertIsNone(AttendanceRollupService.snapshot('staff', record(is_active=False)))
+        self.assertEqual(
+            AttendanceRollupService.snapshot('student', record(deferred={'status'})),
+            AttendanceRollupService.UNKNOWN
+        )
+
+    def test_status_change_moves_count(self):
+        old = AttendanceRollupService.snapshot('staff', record(status='ABSENT'))
+        new = AttendanceRollupService.snapshot('staff', record(status='PRESENT'))
+        with mock.patch.object(AttendanceRollupService, '_add') as add, \
+                mock.patch('apps.attendance.services.rollup_service.transaction'):
+            AttendanceRollupService.record_change('staff', old, new)
+
+        day = datetime.date(2024, 1, 1)
+        self.assertEqual(add.call_args_list, [
+            mock.call('staff', RollupKey(1, day, None, None, 'ABSENT'), -1),
+            mock.call('staff', RollupKey(1, day, None, None, 'PRESENT'), 1),
+        ])
+
+    def test_unchanged_or_unknown_records_are_skipped(self):
+        snapshot = AttendanceRollupService.snapshot('staff', record())
+        with mock.patch.object(AttendanceRollupService, '_add') as add:
+            AttendanceRollupService.record_change('staff', snapshot, snapshot)
+            AttendanceRollupService.record_change('staff', AttendanceRollupService.UNKNOWN, snapshot)
+        add.assert_not_called()
+
+    def test_saves_that_skip_key_fields_need_no_snapshot(self):
+        self.assertTrue(AttendanceRollupService.affects_rollup(None))
+        self.assertTrue(AttendanceRollupService.affects_rollup(['status', 'remarks']))
+        self.assertTrue(AttendanceRollupService.affects_rollup(['section']))
+        self.assertFalse(AttendanceRollupService.affects_rollup(['remarks', 'updated_at']))
+
+
+class HostelRollupClassChangeTests(TestCase):
+    def setUp(self):
+        from apps.academics.models import AcademicYear, SchoolClass, Section
+        from apps.students.models import Student
+        from apps.tenants.models import Domain, Tenant
+
+        self.tenant = Tenant(name="Test School", schema_name="test_school", subdomain="test-school", status="active")
+        self.tenant.auto_create_schema = False
+        self.tenant.save()
+        Domain.objects.create(tenant=self.tenant, domain="test-school.com", is_primary=True)
+
+        today = timezone.now().date()
+        academic_year = AcademicYear.objects.create(
+            name="2024-2025",
+            code="AY2425",
+            start_date=today,
+            end_date=today + datetime.timedelta(days=365),
+            tenant=self.tenant
+        )
+        self.class_one = SchoolClass.objects.create(
+            name="Class 1", numeric_name=1, code="C1", level="PRIMARY", order=1, tenant=self.tenant
+        )
+        self.class_two = SchoolClass.objects.create(
+            name="Class 2", numeric_name=2, code="C2", level="PRIMARY", order=2, tenant=self.tenant
+        )
+        self.section_one = Section.objects.create(class_name=self.class_one, name="A", code="A", tenant=self.tenant)
+        self.section_two = Section.objects.create(class_name=self.class_two, name="A", code="A", tenant=self.tenant)
+        self.student = Student.objects.create(
+            tenant=self.tenant,
+            admission_number="HOSTEL001",
+            first_name="Hostel",
+            last_name="Student",
+            personal_email="hostel@example.com",
+            status="ACTIVE",
+            date_of_birth=datetime.date(2010, 1, 1),
+            academic_year=academic_year,
+            gender="M",
+            mobile_primary="+919999999999",
+            reg_no="REG-HOSTEL001",
+            current_class=self.class_one,
+            section=self.section_one
+        )
+
+    def counts(self):
+        from apps.attendance.models import DailyAttendanceRollup
+
+        return {
+            (row.class_name_id, row.status): row.count
+            for row in DailyAttendanceRollup.objects.filter(attendance_type='hostel')
+        }
+
+    def test_edit_after_class_change_stays_in_marked_class(self):
+        from apps.core.utils.tenant import tenant_context
+        from apps.hostel.models import HostelAttendance
+        from apps.students.models import Student
+
+        with tenant_context(self.tenant):
+            record = HostelAttendance.objects.create(tenant=self.tenant, student=self.student, status="PRESENT")
+            Student.objects.filter(pk=self.student.pk).update(
+                current_class=self.class_two, section=self.section_two
+            )
+
+            record = HostelAttendance.objects.get(pk=record.pk)
+            record.status = "ABSENT"
+            record.save()
+
+        self.assertEqual(record.class_name_id, self.class_one.pk)
+        counts = self.counts()
+        self.assertEqual(counts.get((self.class_one.pk, "PRESENT")), 0)
+        self.assertEqual(counts.get((self.class_one.pk, "ABSENT")), 1)
+        self.assertFalse(any(class_id == self.class_two.pk for class_id, _ in counts))
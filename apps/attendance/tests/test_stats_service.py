@@ -0,0 +1,38 @@
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.attendance.services.stats_service import AttendanceStatsService
+
+
+class AttendanceStatsServiceTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_summarize(self):
+        summary = AttendanceStatsService.summarize({'PRESENT': 3, 'ABSENT': 1}, 4)
+        self.assertEqual(summary, {'total': 4, 'present': 3, 'absent': 1, 'late': 0, 'percentage': 75.0})
+        self.assertEqual(AttendanceStatsService.summarize({}, 0)['percentage'], 0)
+
+    def test_daily_stats_cached(self):
+        today = datetime.date(2024, 1, 1)
+        counts = {'PRESENT': 8, 'HALF_DAY': 2}
+        with mock.patch.object(AttendanceStatsService, 'status_counts', return_value=counts) as status_counts:
+            first = AttendanceStatsService.daily_stats(today, class_id='c1')
+            second = AttendanceStatsService.daily_stats(today, class_id='c1')
+
+        self.assertEqual(status_counts.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first['total_marked'], 10)
+        self.assertEqual(first['half_day'], 2)
+        self.assertEqual(first['attendance_percentage'], 80.0)
+
+    @override_settings(ATTENDANCE_STATS_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        today = datetime.date(2024, 1, 1)
+        with mock.patch.object(AttendanceStatsService, 'status_counts', return_value={}) as status_counts:
+            AttendanceStatsService.daily_stats(today)
+            AttendanceStatsService.daily_stats(today)
+        self.assertEqual(status_counts.call_count, 2)
@@ -149,6 +149,9 @@ class StudentAttendanceListView(BaseListView):
     template_name = 'attendance/student_attendance_list.html'
     context_object_name = 'attendances'
     ordering = ['-date']
+    # Attendance history grows without bound; page through it by date
+    pagination_mode = 'keyset'
+    keyset_ordering = ('-date', '-id')
     search_fields = ['student__first_name', 'student__admission_number']
     roles_required = ['admin', 'teacher', 'principal']
 
@@ -191,6 +194,9 @@ class StaffAttendanceListView(BaseListView):
     template_name = 'attendance/staff_attendance_list.html'
     context_object_name = 'attendances'
     ordering = ['-date']
+    # Attendance history grows without bound; page through it by date
+    pagination_mode = 'keyset'
+    keyset_ordering = ('-date', '-id')
     roles_required = ['admin', 'hr_manager', 'principal']
 
 class StaffAttendanceDetailView(BaseDetailView):
@@ -1242,10 +1242,13 @@ class HealthCheckView(TemplateView):
         all_healthy = all(checks.values())
         
         if request.GET.get('format') == 'json':
+            from apps.core.cache import cache_metrics
+
             return JsonResponse({
                 'status': 'healthy' if all_healthy else 'unhealthy',
                 'timestamp': timezone.now().isoformat(),
                 'checks': checks,
+                'cache_metrics': cache_metrics.snapshot(),
             })
         
         context = self.get_context_data(**kwargs)
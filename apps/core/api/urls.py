@@ -1,10 +1,14 @@
 from django.urls import path
 from apps.core.api.views import (
     DashboardAPIView,
-    GlobalSearchAPIView
+    GlobalSearchAPIView,
+    ExportJobDetailAPIView,
+    ExportJobDownloadAPIView
 )
 
 urlpatterns = [
     path('dashboard/', DashboardAPIView.as_view(), name='dashboard'),
     path('search/', GlobalSearchAPIView.as_view(), name='global-search'),
+    path('exports/<uuid:pk>/', ExportJobDetailAPIView.as_view(), name='export-job-detail'),
+    path('exports/<uuid:pk>/download/', ExportJobDownloadAPIView.as_view(), name='export-job-download'),
 ]
@@ -8,15 +8,16 @@ from rest_framework.generics import (
     UpdateAPIView, DestroyAPIView, ListCreateAPIView,
     RetrieveUpdateDestroyAPIView
 )
-from rest_framework.exceptions import APIException
+from rest_framework.exceptions import APIException, NotFound
 from rest_framework.permissions import IsAuthenticated, BasePermission
 from rest_framework.authentication import TokenAuthentication, SessionAuthentication
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.throttling import UserRateThrottle
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q, Sum
+from django.db.models import Sum
 from django.http import Http404
 from django.db import transaction
 import logging
@@ -27,6 +28,7 @@ from apps.core.permissions.mixins import (
 from django.core.exceptions import ValidationError as DjangoValidationError
 
 from apps.core.services.audit_service import AuditService
+from apps.core.utils.pagination import InvalidCursor, KeysetPaginator
 from apps.core.utils.tenant import get_current_tenant
 from apps.users.models import User
 
@@ -134,6 +136,63 @@ class StandardResultsSetPagination(PageNumberPagination):
         })
 
 
+class KeysetResultsSetPagination(BasePagination):
+    """
+    Cursor pagination on the view's keyset_ordering (plus pk): constant cost
+    per page and an approximate count instead of COUNT(*)/OFFSET
+    """
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = '-created_at'
+    approximate_count = True
+    
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.paginator = KeysetPaginator(
+            queryset,
+            self.get_page_size(request),
+            getattr(view, 'keyset_ordering', self.ordering),
+            count=getattr(view, 'approximate_count', self.approximate_count)
+        )
+        try:
+            self.page = self.paginator.page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise NotFound('Invalid cursor.')
+        return list(self.page)
+    
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+    
+    def get_next_link(self):
+        return self.get_link(self.page.next_cursor)
+    
+    def get_previous_link(self):
+        return self.get_link(self.page.previous_cursor)
+    
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.paginator.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+            'page_size': self.paginator.per_page
+        })
+
+
 # ============================================================================
 # BASE API VIEWS
 # ============================================================================
@@ -292,6 +351,10 @@ class BaseListAPIView(BaseAPIView, ListAPIView):
     ordering_fields = ['created_at', 'updated_at']
     ordering = ['-created_at']
     
+    # Used with pagination_class = KeysetResultsSetPagination
+    keyset_ordering = '-created_at'
+    approximate_count = True
+    
     def get_queryset(self):
         """Get filtered queryset"""
         queryset = super().get_queryset()
@@ -595,12 +658,25 @@ class BulkOperationAPIView(BaseAPIView):
 class ExportAPIView(BaseListAPIView):
     """
     API view for exporting data
+
+    Exports are streamed (see ExportService): rows come from
+    ``queryset.iterator()`` - or from a ``values_list`` projection when
+    ``export_fields`` is set, in which case ``get_export_row`` receives the
+    value tuple instead of an instance.
     """
-    export_formats = ['csv', 'excel', 'json']
+    export_formats = ['csv', 'excel', 'json', 'ndjson']
+    default_export_format = 'json'
+    export_fields = None
+    export_chunk_size = 2000
+    # Build the file in a Celery job (ExportJob) and answer 202 with its status
+    export_in_background = False
     
     def get(self, request, *args, **kwargs):
         """Handle export request"""
-        export_format = request.query_params.get('format', 'json')
+        export_format = request.query_params.get('format', self.default_export_format)
+        
+        if self.export_in_background and export_format in self.export_formats:
+            return self.start_export_job(export_format)
         
         if export_format == 'csv':
             return self.export_csv()
@@ -608,70 +684,67 @@ class ExportAPIView(BaseListAPIView):
             return self.export_excel()
         elif export_format == 'json':
             return self.export_json()
+        elif export_format == 'ndjson':
+            return self.export_ndjson()
         else:
             return Response(
                 {'error': f'Unsupported export format: {export_format}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
     
-    def export_csv(self):
-        """Export data as CSV"""
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="export.csv"'
-        
-        writer = csv.writer(response)
+    def get_export_filename(self):
+        """Override to name the download (without extension)"""
+        return 'export'
+    
+    def start_export_job(self, export_format):
+        """Queue (or join) a background export and return its status"""
+        from apps.core.services.export_jobs import ExportJobService
         
-        # Write headers
-        headers = self.get_export_headers()
-        writer.writerow(headers)
+        job, created = ExportJobService.submit(self, export_format)
+        return Response(
+            ExportJobService.serialize(job, self.request),
+            status=status.HTTP_202_ACCEPTED
+        )
+    
+    def get_export_rows(self):
+        """Lazily produced export rows"""
+        from apps.core.services.export_service import ExportService
         
-        # Write data
-        queryset = self.get_queryset()
-        for obj in queryset:
-            writer.writerow(self.get_export_row(obj))
+        return ExportService.iter_rows(
+            self.get_queryset(),
+            self.get_export_row,
+            fields=self.export_fields,
+            chunk_size=self.export_chunk_size,
+        )
+    
+    def export_csv(self):
+        """Export data as CSV"""
+        from apps.core.services.export_service import ExportService
         
-        return response
+        return ExportService.stream('csv', self.get_export_filename(), self.get_export_headers(), self.get_export_rows())
     
     def export_excel(self):
         """Export data as Excel"""
-        import openpyxl
-        from django.http import HttpResponse
-        
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Export"
-        
-        # Write headers
-        headers = self.get_export_headers()
-        for col_idx, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col_idx, value=header)
-        
-        # Write data
-        queryset = self.get_queryset()
-        for row_idx, obj in enumerate(queryset, 2):
-            row_data = self.get_export_row(obj)
-            for col_idx, value in enumerate(row_data, 1):
-                ws.cell(row=row_idx, column=col_idx, value=value)
-        
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = 'attachment; filename="export.xlsx"'
-        wb.save(response)
+        from apps.core.services.export_service import ExportService
         
-        return response
+        return ExportService.stream('excel', self.get_export_filename(), self.get_export_headers(), self.get_export_rows())
+    
+    def export_ndjson(self):
+        """Export data as newline-delimited JSON keyed by export headers"""
+        from apps.core.services.export_service import ExportService
+        
+        return ExportService.stream('ndjson', self.get_export_filename(), self.get_export_headers(), self.get_export_rows())
     
     def export_json(self):
         """Export data as JSON"""
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
+        from apps.core.services.export_service import ExportService
         
-        response = Response(serializer.data)
-        response['Content-Disposition'] = 'attachment; filename="export.json"'
-        return response
+        return ExportService.export_to_json(
+            self.get_queryset(),
+            self.get_export_filename(),
+            self.get_serializer_class(),
+            context=self.get_serializer_context(),
+        )
     
     def get_export_headers(self):
         """Override to provide export headers"""
@@ -682,6 +755,53 @@ class ExportAPIView(BaseListAPIView):
         raise NotImplementedError("Subclasses must implement get_export_row")
 
 
+class ExportJobAccessMixin:
+    """Export jobs are visible to the user who requested them (and superusers)"""
+    permission_classes = [IsAuthenticated]
+    
+    def get_job(self, pk):
+        from apps.core.models import ExportJob
+        
+        jobs = ExportJob.objects.select_related('tenant')
+        if not self.request.user.is_superuser:
+            jobs = jobs.filter(requested_by=self.request.user)
+        try:
+            return jobs.get(pk=pk)
+        except ExportJob.DoesNotExist:
+            raise Http404("Export job not found")
+
+
+class ExportJobDetailAPIView(ExportJobAccessMixin, APIView):
+    """
+    GET /api/v1/core/exports/<id>/
+    Status and progress of a background export
+    """
+    
+    def get(self, request, pk):
+        from apps.core.services.export_jobs import ExportJobService
+        
+        return Response(ExportJobService.serialize(self.get_job(pk), request))
+
+
+class ExportJobDownloadAPIView(ExportJobAccessMixin, APIView):
+    """
+    GET /api/v1/core/exports/<id>/download/
+    Download a finished export; supports ``Range: bytes=...`` to resume
+    """
+    
+    def get(self, request, pk):
+        from apps.core.models import ExportJob
+        from apps.core.services.export_jobs import ExportJobService
+        
+        job = self.get_job(pk)
+        if job.status != ExportJob.Status.COMPLETED or not job.file:
+            return Response(
+                ExportJobService.serialize(job, request),
+                status=status.HTTP_409_CONFLICT
+            )
+        return ExportJobService.download_response(request, job)
+
+
 class DashboardAPIView(BaseAPIView):
     """
     API view for dashboard statistics
@@ -796,87 +916,84 @@ class GlobalSearchAPIView(BaseAPIView):
     """
     API view for global search
     """
+    # Entity types each role may search
+    SEARCH_ROLES = {
+        'student': ['ADMIN', 'SUPER_ADMIN', 'PRINCIPAL', 'VICE_PRINCIPAL', 'TEACHER'],
+        'staff': ['ADMIN', 'SUPER_ADMIN', 'PRINCIPAL', 'VICE_PRINCIPAL', 'HR'],
+        'book': ['ADMIN', 'SUPER_ADMIN', 'LIBRARIAN', 'TEACHER'],
+        'invoice': ['ADMIN', 'SUPER_ADMIN', 'ACCOUNTANT'],
+    }
+
     def get(self, request, *args, **kwargs):
         """Perform global search"""
+        from apps.core.services.search_service import SearchIndexService
+
         query = request.query_params.get('q', '').strip()
         
         if not query:
             return Response({'error': 'Search query required'}, status=400)
         
-        results = {}
-        
-        # Search students (if user has permission)
-        if request.user.role in ['ADMIN', 'SUPER_ADMIN', 'PRINCIPAL', 'VICE_PRINCIPAL', 'TEACHER']:
-            results['students'] = self.search_students(query)
-        
-        # Search staff (if user has permission)
-        if request.user.role in ['ADMIN', 'SUPER_ADMIN', 'PRINCIPAL', 'VICE_PRINCIPAL', 'HR']:
-            results['staff'] = self.search_staff(query)
+        entity_types = [
+            entity_type for entity_type, roles in self.SEARCH_ROLES.items() if request.user.role in roles
+        ]
         
-        # Search books (if user has permission)
-        if request.user.role in ['ADMIN', 'SUPER_ADMIN', 'LIBRARIAN', 'TEACHER']:
-            results['books'] = self.search_books(query)
+        # One ranked index query covers every entity type the user may search
+        matches = SearchIndexService.search(self.tenant, query, entity_types)
         
-        # Search invoices (if user has permission)
-        if request.user.role in ['ADMIN', 'SUPER_ADMIN', 'ACCOUNTANT']:
-            results['invoices'] = self.search_invoices(query)
+        results = {}
+        if 'student' in matches:
+            results['students'] = self.search_students(matches['student'])
+        if 'staff' in matches:
+            results['staff'] = self.search_staff(matches['staff'])
+        if 'book' in matches:
+            results['books'] = self.search_books(matches['book'])
+        if 'invoice' in matches:
+            results['invoices'] = self.search_invoices(matches['invoice'])
         
         return Response(results)
     
-    def search_students(self, query):
-        """Search students"""
+    def search_students(self, ids):
+        """Students with the given ids, in search rank order"""
+        from apps.core.services.search_service import SearchIndexService
         from apps.students.models import Student
         
-        students = Student.objects.filter(
-            Q(first_name__icontains=query) | 
-            Q(last_name__icontains=query) |
-            Q(admission_number__icontains=query) |
-            Q(email__icontains=query),
-            tenant=self.tenant
-        ).select_related('current_class', 'section')[:10]
+        students = SearchIndexService.in_order(
+            Student.objects.filter(tenant=self.tenant).select_related('current_class', 'section'), ids
+        )
         
         from apps.students.api.serializers import StudentListSerializer
         return StudentListSerializer(students, many=True).data
     
-    def search_staff(self, query):
-        """Search staff"""
+    def search_staff(self, ids):
+        """Staff with the given ids, in search rank order"""
+        from apps.core.services.search_service import SearchIndexService
         from apps.hr.models import Staff
         
-        staff = Staff.objects.filter(
-            Q(user__first_name__icontains=query) | 
-            Q(user__last_name__icontains=query) |
-            Q(employee_id__icontains=query) |
-            Q(user__email__icontains=query),
-            tenant=self.tenant
-        ).select_related('user', 'department', 'designation')[:10]
+        staff = SearchIndexService.in_order(
+            Staff.objects.filter(tenant=self.tenant).select_related('user', 'department', 'designation'), ids
+        )
         
         from apps.hr.api.serializers import StaffListSerializer
         return StaffListSerializer(staff, many=True).data
     
-    def search_books(self, query):
-        """Search books"""
+    def search_books(self, ids):
+        """Books with the given ids, in search rank order"""
+        from apps.core.services.search_service import SearchIndexService
         from apps.library.models import Book
         
-        books = Book.objects.filter(
-            Q(title__icontains=query) |
-            Q(author__icontains=query) |
-            Q(isbn__icontains=query),
-            tenant=self.tenant
-        )[:10]
+        books = SearchIndexService.in_order(Book.objects.filter(tenant=self.tenant), ids)
         
         from apps.library.api.serializers import BookSerializer
         return BookSerializer(books, many=True).data
     
-    def search_invoices(self, query):
-        """Search invoices"""
+    def search_invoices(self, ids):
+        """Invoices with the given ids, in search rank order"""
+        from apps.core.services.search_service import SearchIndexService
         from apps.finance.models import Invoice
         
-        invoices = Invoice.objects.filter(
-            Q(invoice_number__icontains=query) |
-            Q(student__first_name__icontains=query) |
-            Q(student__last_name__icontains=query),
-            tenant=self.tenant
-        ).select_related('student')[:10]
+        invoices = SearchIndexService.in_order(
+            Invoice.objects.filter(tenant=self.tenant).select_related('student'), ids
+        )
         
         from apps.finance.api.serializers import InvoiceListSerializer
-        return InvoiceListSerializer(invoices, many=True).data
\ No newline at end of file
+        return InvoiceListSerializer(invoices, many=True).data
@@ -1,28 +1,318 @@
-from django_tenants.cache import TenantCache
-from django.core.cache import cache as default_cache
+import copy
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+from django.db import connection
 
 
 def tenant_cache_key(key, key_prefix, version):
     """
-    Generate cache key with tenant context
+    Cache KEY_FUNCTION namespacing keys by the active tenant schema, so
+    tenants sharing one Redis database never read each other's entries.
+    Outside a tenant (public schema, Celery without schema_context) keys
+    fall under ``public``.
     """
-    from django_tenants.utils import get_tenant
-    
-    try:
-        tenant = get_tenant()
-        if tenant:
-            return f"{tenant.schema_name}:{key_prefix}:{key}:{version}"
-    except Exception:
-        pass
-    
-    return f"{key_prefix}:{key}:{version}"
+    schema_name = getattr(connection, 'schema_name', None) or 'public'
+    return f"{schema_name}:{key_prefix}:{version}:{key}"
 
 
-class CustomTenantCache(TenantCache):
+class CacheMetrics:
     """
-    Custom tenant-aware cache implementation
+    Hit, miss and latency counters per cache alias, kept per process and
+    recorded by the instrumented cache backends below.
     """
-    
-    def make_key(self, key, version=None):
-        key = super().make_key(key, version)
-        return tenant_cache_key(key, self._key_prefix, version or self._version)
\ No newline at end of file
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = defaultdict(self._empty)
+
+    @staticmethod
+    def _empty():
+        return {'hits': 0, 'misses': 0, 'sets': 0, 'deletes': 0, 'calls': 0, 'time_ms': 0.0, 'max_ms': 0.0}
+
+    def record(self, alias, operation, elapsed, hits=0, misses=0):
+        elapsed_ms = elapsed * 1000
+        with self._lock:
+            stats = self._stats[alias]
+            stats['hits'] += hits
+            stats['misses'] += misses
+            if operation == 'set':
+                stats['sets'] += 1
+            elif operation == 'delete':
+                stats['deletes'] += 1
+            stats['calls'] += 1
+            stats['time_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+
+    def snapshot(self, alias=None):
+        """Counters per alias with hit ratio and average latency"""
+        with self._lock:
+            stats = {name: dict(values) for name, values in self._stats.items() if alias in (None, name)}
+        for values in stats.values():
+            lookups = values['hits'] + values['misses']
+            values['hit_ratio'] = round(values['hits'] / lookups, 4) if lookups else None
+            values['avg_ms'] = round(values['time_ms'] / values['calls'], 3) if values['calls'] else None
+            values['time_ms'] = round(values['time_ms'], 3)
+            values['max_ms'] = round(values['max_ms'], 3)
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+cache_metrics = CacheMetrics()
+
+
+class InstrumentedCacheMixin:
+    """
+    Records every read and write of a cache backend in ``cache_metrics``
+    under the ``ALIAS`` given in its CACHES entry.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, location, params):
+        super().__init__(location, params)
+        self.metrics_alias = params.get('ALIAS') or location or self.__class__.__name__
+
+    def _timed(self, operation, call, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return call(*args, **kwargs)
+        finally:
+            cache_metrics.record(self.metrics_alias, operation, time.perf_counter() - started)
+
+    def get(self, key, default=None, version=None):
+        started = time.perf_counter()
+        value = super().get(key, self._MISSING, version=version)
+        hit = value is not self._MISSING
+        cache_metrics.record(self.metrics_alias, 'get', time.perf_counter() - started, hits=int(hit), misses=int(not hit))
+        return value if hit else default
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        started = time.perf_counter()
+        values = super().get_many(keys, version=version)
+        cache_metrics.record(
+            self.metrics_alias, 'get', time.perf_counter() - started,
+            hits=len(values), misses=len(keys) - len(values)
+        )
+        return values
+
+    def set(self, *args, **kwargs):
+        return self._timed('set', super().set, *args, **kwargs)
+
+    def add(self, *args, **kwargs):
+        return self._timed('set', super().add, *args, **kwargs)
+
+    def set_many(self, *args, **kwargs):
+        return self._timed('set', super().set_many, *args, **kwargs)
+
+    def incr(self, *args, **kwargs):
+        return self._timed('set', super().incr, *args, **kwargs)
+
+    def touch(self, *args, **kwargs):
+        return self._timed('set', super().touch, *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._timed('delete', super().delete, *args, **kwargs)
+
+    def delete_many(self, *args, **kwargs):
+        return self._timed('delete', super().delete_many, *args, **kwargs)
+
+
+class CustomTenantCache(InstrumentedCacheMixin, RedisCache):
+    """
+    Redis cache shared by every worker. Keys are namespaced per tenant by
+    ``tenant_cache_key`` unless the CACHES entry sets its own KEY_FUNCTION
+    (aliases holding cross-tenant entries use the plain Django key).
+    """
+
+    def __init__(self, server, params):
+        params = {'KEY_FUNCTION': tenant_cache_key, **params}
+        super().__init__(server, params)
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    """Per-process stand-in for CustomTenantCache (development and tests)"""
+
+    def __init__(self, name, params):
+        params = {'KEY_FUNCTION': tenant_cache_key, **params}
+        super().__init__(name, params)
+
+
+class TenantResolutionCache:
+    """
+    Two-level cache for tenant lookups performed by TenantMiddleware.
+
+    Resolved tenants are kept in a small in-process LRU and mirrored to the
+    shared Django cache so other workers can skip the database as well.
+    Misses are cached too (for a shorter time) because most paths never map
+    to a tenant. Entries are invalidated from Tenant/Domain signals.
+
+    The 'id', 'slug' and 'domain' kinds hold active tenants only (what the
+    middleware may route to); 'id_any' resolves a primary key whatever the
+    tenant's state, for callers that must see inactive tenants too.
+    """
+
+    KEY_PREFIX = 'tenant_resolution'
+    MISSING = '__missing__'
+
+    def __init__(self, max_entries=None, local_timeout=None, timeout=None, miss_timeout=None, cache_alias=None):
+        import threading
+        from collections import OrderedDict
+
+        self._max_entries = max_entries
+        self._local_timeout = local_timeout
+        self._timeout = timeout
+        self._miss_timeout = miss_timeout
+        self._cache_alias = cache_alias
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+    def _setting(self, name, default):
+        from django.conf import settings
+
+        return getattr(settings, 'TENANT_RESOLUTION_CACHE', {}).get(name, default)
+
+    @property
+    def max_entries(self):
+        return self._max_entries or self._setting('MAX_ENTRIES', 512)
+
+    @property
+    def local_timeout(self):
+        return self._local_timeout or self._setting('LOCAL_TIMEOUT', 30)
+
+    @property
+    def timeout(self):
+        from django.conf import settings
+
+        return self._timeout or self._setting('TIMEOUT', getattr(settings, 'TENANT_CACHE_TIMEOUT', 300))
+
+    @property
+    def miss_timeout(self):
+        return self._miss_timeout or self._setting('MISS_TIMEOUT', 60)
+
+    @property
+    def shared_cache(self):
+        from django.core.cache import caches
+
+        return caches[self._cache_alias or self._setting('CACHE_ALIAS', 'default')]
+
+    @property
+    def enabled(self):
+        return self._setting('ENABLED', True)
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+    def make_key(self, kind, value):
+        value = str(value).strip()
+        if kind == 'domain':
+            value = value.lower()
+        return f"{self.KEY_PREFIX}:{kind}:{value}"
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def get_or_resolve(self, kind, value, resolver):
+        """
+        Return the tenant cached under (kind, value), calling ``resolver()``
+        on a miss. ``resolver`` must return a Tenant or None.
+        """
+        if not value:
+            return None
+        if not self.enabled:
+            return resolver()
+
+        key = self.make_key(kind, value)
+        cached = self._get_local(key)
+        if cached is None:
+            try:
+                cached = self.shared_cache.get(key)
+            except Exception:
+                cached = None
+            if cached is not None:
+                self._set_local(key, cached)
+
+        if cached is not None:
+            self.hits += 1
+            return None if cached == self.MISSING else copy.copy(cached)
+
+        self.misses += 1
+        tenant = resolver()
+        self.set(key, tenant)
+        return tenant
+
+    def set(self, key, tenant):
+        value = tenant if tenant is not None else self.MISSING
+        timeout = self.timeout if tenant is not None else self.miss_timeout
+        self._set_local(key, value)
+        try:
+            self.shared_cache.set(key, value, timeout)
+        except Exception:
+            pass
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return value
+
+    def _set_local(self, key, value):
+        with self._lock:
+            self._local[key] = (value, time.monotonic() + self.local_timeout)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+    def invalidate(self, *keys):
+        keys = [key for key in keys if key]
+        with self._lock:
+            for key in keys:
+                self._local.pop(key, None)
+        try:
+            self.shared_cache.delete_many(keys)
+        except Exception:
+            pass
+
+    def invalidate_tenant(self, tenant, old_slug=None):
+        """Drop every entry that can resolve to ``tenant``."""
+        keys = [self.make_key('id', tenant.pk), self.make_key('id_any', tenant.pk)]
+        for slug in {tenant.slug, old_slug}:
+            if slug:
+                keys.append(self.make_key('slug', slug))
+        if tenant.pk:
+            keys.extend(self.make_key('domain', domain) for domain in tenant.domains.values_list('domain', flat=True))
+        self.invalidate(*keys)
+
+    def invalidate_domain(self, domain_name):
+        self.invalidate(self.make_key('domain', domain_name))
+
+    def clear(self):
+        """Clear the in-process LRU (shared entries expire on their own)."""
+        with self._lock:
+            self._local.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+tenant_resolution_cache = TenantResolutionCache()
@@ -0,0 +1,110 @@
+# apps/core/management/commands/benchmark_signatures.py
+import hashlib
+import itertools
+import time
+from contextlib import nullcontext
+from unittest import mock
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+
+class _Rollback(Exception):
+    pass
+
+
+def legacy_signature(instance):
+    """What calculate_signature used to do: serialize the row to JSON, then hash it"""
+    data = serializers.serialize('json', [instance])
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class Command(BaseCommand):
+    help = 'Compare the serializer-based data signature with the field-tuple signature engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            default='students.Student',
+            help='Signed model to benchmark (app_label.Model)',
+        )
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=1000,
+            help='Number of signatures / saves per run',
+        )
+        parser.add_argument(
+            '--skip-saves',
+            action='store_true',
+            help='Only time signature computation',
+        )
+
+    def handle(self, *args, **options):
+        from apps.core.services.signature_service import DataSignatureService
+
+        try:
+            model = apps.get_model(options['model'])
+        except (LookupError, ValueError):
+            raise CommandError(f'Unknown model {options["model"]}')
+        if model not in DataSignatureService.signed_models():
+            raise CommandError(f'{options["model"]} has no data_signature')
+
+        rows = list(model.all_objects.all()[:100])
+        if not rows:
+            raise CommandError(f'Benchmark needs at least one {options["model"]} row')
+        total = options['count']
+        self.stdout.write(
+            f'{options["model"]}: {len(DataSignatureService.signed_fields(model))} signed fields, '
+            f'{total} operations per run\n'
+        )
+
+        sign_runs = (
+            ('Legacy', lambda: self.time_signatures(legacy_signature, rows, total)),
+            ('Engine', lambda: self.time_signatures(DataSignatureService.calculate, rows, total)),
+        )
+        for label, run in sign_runs:
+            elapsed = run()
+            self.stdout.write(
+                f'  {label} signature  {elapsed * 1000:>9.1f} ms  {total / elapsed:>10.0f} per second'
+            )
+
+        if not options['skip_saves']:
+            for label, signer in (('Legacy', legacy_signature), ('Engine', None)):
+                elapsed = self.time_saves(rows, total, signer)
+                self.stdout.write(
+                    f'  {label} save       {elapsed * 1000:>9.1f} ms  {total / elapsed:>10.0f} per second'
+                )
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark complete (all saves rolled back)'))
+
+    @staticmethod
+    def time_signatures(signer, rows, total):
+        started = time.perf_counter()
+        for row in itertools.islice(itertools.cycle(rows), total):
+            signer(row)
+        return time.perf_counter() - started
+
+    @staticmethod
+    def time_saves(rows, total, signer=None):
+        """
+        Save rows ``total`` times with an empty signature, as on insert, so
+        both schemes sign once per save. ``signer`` replaces the engine.
+        """
+        from apps.core.services.signature_service import DataSignatureService
+
+        patch = mock.patch.object(DataSignatureService, 'calculate', signer) if signer else nullcontext()
+        elapsed = 0.0
+        try:
+            with transaction.atomic(), patch:
+                started = time.perf_counter()
+                for row in itertools.islice(itertools.cycle(rows), total):
+                    row.data_signature = ''
+                    row.save()
+                elapsed = time.perf_counter() - started
+                raise _Rollback
+        except _Rollback:
+            pass
+        return elapsed
@@ -0,0 +1,77 @@
+# apps/core/management/commands/benchmark_tenant_resolution.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request query counts of TenantMiddleware with and without the resolution cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Number of simulated requests per run',
+        )
+        parser.add_argument(
+            '--host',
+            help='Host header to resolve (defaults to the first active tenant domain)',
+        )
+        parser.add_argument(
+            '--path',
+            default='/dashboard/',
+            help='Request path to resolve',
+        )
+
+    def handle(self, *args, **options):
+        from apps.core.cache import tenant_resolution_cache
+        from apps.core.middleware.tenant import TenantMiddleware
+        from apps.tenants.models import Domain
+
+        host = options['host']
+        if not host:
+            domain = Domain.objects.filter(tenant__is_active=True).first()
+            if not domain:
+                raise CommandError('No active tenant domain found; pass --host explicitly')
+            host = domain.domain
+
+        factory = RequestFactory()
+        middleware = TenantMiddleware(lambda request: None)
+        total = options['requests']
+
+        def run():
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                for _ in range(total):
+                    request = factory.get(options['path'], HTTP_HOST=host)
+                    request.session = {}
+                    middleware.get_tenant_from_request(request)
+                elapsed = time.perf_counter() - started
+            return len(ctx.captured_queries), elapsed
+
+        self.stdout.write(f'Resolving {host}{options["path"]} x {total}\n')
+
+        with override_settings(ALLOWED_HOSTS=['*'], TENANT_RESOLUTION_CACHE={'ENABLED': False}):
+            before_queries, before_time = run()
+
+        tenant_resolution_cache.clear()
+        with override_settings(ALLOWED_HOSTS=['*']):
+            after_queries, after_time = run()
+
+        for label, queries, elapsed in (
+            ('Uncached', before_queries, before_time),
+            ('Cached', after_queries, after_time),
+        ):
+            self.stdout.write(
+                f'  {label:<9} {queries:>6} queries  '
+                f'{queries / total:>6.2f} per request  '
+                f'{elapsed * 1000 / total:>8.3f} ms per request'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Cache hits: {tenant_resolution_cache.hits}, misses: {tenant_resolution_cache.misses}'
+        ))
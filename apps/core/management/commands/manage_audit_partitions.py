@@ -0,0 +1,94 @@
+# apps/core/management/commands/manage_audit_partitions.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django_tenants.utils import get_public_schema_name, schema_context
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly audit log partitions and detach or drop expired ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Also maintain security audit partitions of this tenant schema',
+        )
+        parser.add_argument(
+            '--all-tenants',
+            action='store_true',
+            help='Also maintain security audit partitions of all active tenants',
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            help='Months of partitions to prepare (default: AUDIT_LOG_SETTINGS["PARTITION_MONTHS_AHEAD"])',
+        )
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            help='Expire months older than this (default: AUDIT_LOG_SETTINGS["RETENTION_DAYS"])',
+        )
+        parser.add_argument(
+            '--drop',
+            action='store_true',
+            help='Drop expired partitions instead of detaching them',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report expired partitions',
+        )
+
+    def handle(self, *args, **options):
+        from apps.core.services.partition_service import AuditPartitionService
+        from apps.tenants.models import Tenant
+
+        if not AuditPartitionService.is_supported(connection):
+            raise CommandError('Audit partitioning requires PostgreSQL')
+
+        public = get_public_schema_name()
+        targets = [
+            (public, AuditPartitionService.CORE_AUDIT_LOGS),
+            (public, AuditPartitionService.SECURITY_AUDIT_LOGS),
+        ]
+        if options['all_tenants']:
+            schemas = Tenant.objects.filter(is_active=True).exclude(schema_name=public).values_list('schema_name', flat=True)
+        elif options['tenant']:
+            schemas = [options['tenant']]
+        else:
+            schemas = []
+        targets.extend((schema_name, AuditPartitionService.SECURITY_AUDIT_LOGS) for schema_name in schemas)
+
+        created_total = expired_total = 0
+        for schema_name, spec in targets:
+            with schema_context(schema_name):
+                with connection.cursor() as cursor:
+                    if not AuditPartitionService.is_partitioned(cursor, spec.table):
+                        self.stdout.write(self.style.WARNING(f'  {schema_name}.{spec.table}: not partitioned, skipped'))
+                        continue
+
+                if options['dry_run']:
+                    created = []
+                    expired = [
+                        partition.name for partition in AuditPartitionService.expired_partitions(
+                            connection, spec, options['retention_days']
+                        )
+                    ]
+                else:
+                    with transaction.atomic():
+                        created = AuditPartitionService.ensure_partitions(connection, spec, options['months_ahead'])
+                        expired = AuditPartitionService.expire_partitions(
+                            connection, spec, options['retention_days'], drop=options['drop']
+                        )
+
+            created_total += len(created)
+            expired_total += len(expired)
+            action = 'would expire' if options['dry_run'] else ('dropped' if options['drop'] else 'detached')
+            self.stdout.write(
+                f'  {schema_name}.{spec.table}: created {len(created)}, {action} {len(expired)}'
+                + (f' ({", ".join(expired)})' if expired else '')
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✅ Created {created_total} partitions, {"found" if options["dry_run"] else "expired"} {expired_total} expired'
+        ))
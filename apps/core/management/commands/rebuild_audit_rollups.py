@@ -0,0 +1,50 @@
+# apps/core/management/commands/rebuild_audit_rollups.py
+import time
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Rebuild hourly audit rollups from the audit log'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours',
+            type=int,
+            help='Rebuild only the last N hours',
+        )
+        parser.add_argument(
+            '--start',
+            help='First day to rebuild (YYYY-MM-DD); defaults to all history',
+        )
+        parser.add_argument(
+            '--end',
+            help='Last day to rebuild (YYYY-MM-DD)',
+        )
+
+    def handle(self, *args, **options):
+        from apps.core.services.audit_rollup_service import AuditRollupService
+
+        try:
+            start = self.parse_date(options['start'])
+            end = self.parse_date(options['end'])
+        except ValueError:
+            raise CommandError('Dates must be in YYYY-MM-DD format')
+        if end:
+            end += timedelta(days=1)
+        if options['hours']:
+            start = timezone.now() - timedelta(hours=options['hours'])
+
+        started = time.perf_counter()
+        written = AuditRollupService.rebuild(start=start, end=end)
+        self.stdout.write(
+            self.style.SUCCESS(f'\n✅ Wrote {written} rollup rows ({(time.perf_counter() - started) * 1000:.1f} ms)')
+        )
+
+    @staticmethod
+    def parse_date(value):
+        if not value:
+            return None
+        return timezone.make_aware(datetime.strptime(value, '%Y-%m-%d'))
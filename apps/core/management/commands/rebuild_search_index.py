@@ -0,0 +1,52 @@
+# apps/core/management/commands/rebuild_search_index.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import schema_context
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search documents of students, staff, books and invoices'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Tenant schema name to rebuild',
+        )
+        parser.add_argument(
+            '--all-tenants',
+            action='store_true',
+            help='Rebuild for all active tenants',
+        )
+        parser.add_argument(
+            '--type',
+            action='append',
+            choices=['student', 'staff', 'book', 'invoice'],
+            dest='types',
+            help='Entity type to rebuild (repeatable; defaults to all)',
+        )
+
+    def handle(self, *args, **options):
+        from apps.core.services.search_service import SearchIndexService
+        from apps.tenants.models import Tenant
+
+        if options['all_tenants']:
+            schemas = list(
+                Tenant.objects.filter(is_active=True).exclude(schema_name='public').values_list('schema_name', flat=True)
+            )
+        elif options['tenant']:
+            schemas = [options['tenant']]
+        else:
+            raise CommandError('Please specify --tenant or --all-tenants')
+
+        total = 0
+        for schema_name in schemas:
+            started = time.perf_counter()
+            with schema_context(schema_name):
+                written = SearchIndexService.rebuild(entity_types=options['types'])
+            total += sum(written.values())
+            summary = ', '.join(f'{entity_type}: {count}' for entity_type, count in written.items())
+            self.stdout.write(f'  {schema_name}: {summary} ({(time.perf_counter() - started) * 1000:.1f} ms)')
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Wrote {total} search documents'))
@@ -0,0 +1,86 @@
+# apps/core/management/commands/verify_signatures.py
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import schema_context
+
+
+class Command(BaseCommand):
+    help = 'Check data_signature of signed rows in chunks and report (or re-sign) mismatches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Tenant schema name to verify tenant models in',
+        )
+        parser.add_argument(
+            '--all-tenants',
+            action='store_true',
+            help='Verify tenant models in all active tenants',
+        )
+        parser.add_argument(
+            '--model',
+            action='append',
+            dest='models',
+            help='Model to verify as app_label.Model (repeatable; defaults to all signed models)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Rows loaded per query',
+        )
+        parser.add_argument(
+            '--resign',
+            action='store_true',
+            help='Store a fresh signature on rows that do not verify',
+        )
+
+    def handle(self, *args, **options):
+        from apps.core.services.signature_service import DataSignatureService
+        from apps.tenants.models import Tenant
+
+        models = DataSignatureService.signed_models()
+        if options['models']:
+            try:
+                models = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+
+        # Without a tenant the public schema is checked, which only holds shared apps
+        if options['all_tenants']:
+            schemas = list(
+                Tenant.objects.filter(is_active=True).exclude(schema_name='public').values_list('schema_name', flat=True)
+            )
+            app_names = set(settings.TENANT_APPS)
+        elif options['tenant']:
+            schemas = [options['tenant']]
+            app_names = set(settings.TENANT_APPS)
+        else:
+            schemas = ['public']
+            app_names = set(settings.SHARED_APPS)
+        models = [model for model in models if model._meta.app_config.name in app_names]
+
+        total_checked = total_invalid = 0
+        for schema_name in schemas:
+            self.stdout.write(f'{schema_name}:')
+            with schema_context(schema_name):
+                for model in models:
+                    started = time.perf_counter()
+                    checked, invalid = DataSignatureService.verify_model(
+                        model, chunk_size=options['chunk_size'], resign=options['resign']
+                    )
+                    total_checked += checked
+                    total_invalid += invalid
+                    if checked:
+                        self.stdout.write(
+                            f'  {model._meta.label:<40} {checked:>8} rows  {invalid:>6} invalid  '
+                            f'({(time.perf_counter() - started) * 1000:.1f} ms)'
+                        )
+
+        action = 're-signed' if options['resign'] else 'invalid'
+        style = self.style.SUCCESS if not total_invalid or options['resign'] else self.style.WARNING
+        self.stdout.write(style(f'\nChecked {total_checked} rows, {total_invalid} {action}'))
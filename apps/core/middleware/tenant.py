@@ -2,6 +2,7 @@
 from django.utils.deprecation import MiddlewareMixin
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django_tenants.utils import get_public_schema_name
 import jwt
 
@@ -13,6 +14,7 @@ from apps.core.utils.tenant import (
     clear_user,
     get_current_user
 )
+from apps.core.cache import tenant_resolution_cache
 from apps.tenants.models import Tenant, Domain
 
 User = get_user_model()
@@ -89,10 +91,9 @@ class TenantMiddleware(MiddlewareMixin):
         # Strategy 1: Direct session/header override (for debugging/API)
         tenant_id = self._get_tenant_from_debug_header(request)
         if tenant_id:
-            try:
-                return Tenant.objects.get(id=tenant_id, is_active=True)
-            except (Tenant.DoesNotExist, ValueError):
-                pass
+            tenant = self._lookup_tenant_by_id(tenant_id)
+            if tenant:
+                return tenant
 
         # Strategy 2: Subdomain-based tenant identification (primary method)
         tenant = self._get_tenant_from_subdomain(request)
@@ -122,6 +123,48 @@ class TenantMiddleware(MiddlewareMixin):
         # No tenant found - will use public schema
         return None
 
+    # ------------------------------------------------------------------
+    # Cached lookups (shared by all strategies)
+    # ------------------------------------------------------------------
+    def _lookup_tenant_by_id(self, tenant_id):
+        """
+        Get an active tenant by primary key through the resolution cache
+        """
+        def resolve():
+            try:
+                return Tenant.objects.get(id=tenant_id, is_active=True)
+            except (Tenant.DoesNotExist, ValueError, ValidationError):
+                return None
+
+        return tenant_resolution_cache.get_or_resolve('id', tenant_id, resolve)
+
+    def _lookup_tenant_by_slug(self, slug):
+        """
+        Get an active tenant by slug through the resolution cache
+        """
+        def resolve():
+            try:
+                return Tenant.objects.get(slug=slug, is_active=True)
+            except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
+                return None
+
+        return tenant_resolution_cache.get_or_resolve('slug', slug, resolve)
+
+    def _lookup_tenant_by_domain(self, host):
+        """
+        Get the active tenant owning a domain through the resolution cache
+        """
+        def resolve():
+            try:
+                return Domain.objects.select_related('tenant').get(
+                    domain=host,
+                    tenant__is_active=True
+                ).tenant
+            except Domain.DoesNotExist:
+                return None
+
+        return tenant_resolution_cache.get_or_resolve('domain', host, resolve)
+
     def _get_tenant_from_debug_header(self, request):
         """
         Get tenant from debug header (for development/testing)
@@ -156,22 +199,13 @@ class TenantMiddleware(MiddlewareMixin):
                 return None
             
             # Check if this is a valid tenant domain
-            try:
-                # First, try to get by domain name
-                domain = Domain.objects.select_related('tenant').get(
-                    domain=host,
-                    tenant__is_active=True
-                )
-                return domain.tenant
-            except Domain.DoesNotExist:
-                # Fallback to tenant slug/schema name
-                try:
-                    return Tenant.objects.get(
-                        slug=subdomain,
-                        is_active=True
-                    )
-                except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
-                    pass
+            # First, try to get by domain name
+            tenant = self._lookup_tenant_by_domain(host)
+            if tenant:
+                return tenant
+
+            # Fallback to tenant slug/schema name
+            return self._lookup_tenant_by_slug(subdomain)
         
         return None
 
@@ -184,20 +218,12 @@ class TenantMiddleware(MiddlewareMixin):
             tenant_header = request.headers.get('Tenant-ID')
         
         if tenant_header:
-            try:
-                return Tenant.objects.get(
-                    id=tenant_header,
-                    is_active=True
-                )
-            except (Tenant.DoesNotExist, ValueError):
-                # Try slug if ID doesn't work
-                try:
-                    return Tenant.objects.get(
-                        slug=tenant_header,
-                        is_active=True
-                    )
-                except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
-                    pass
+            tenant = self._lookup_tenant_by_id(tenant_header)
+            if tenant:
+                return tenant
+
+            # Try slug if ID doesn't work
+            return self._lookup_tenant_by_slug(tenant_header)
         
         return None
 
@@ -209,13 +235,9 @@ class TenantMiddleware(MiddlewareMixin):
             # Method 1: Direct user attribute
             tenant_id = getattr(request.user, 'tenant_id', None)
             if tenant_id:
-                try:
-                    return Tenant.objects.get(
-                        id=tenant_id,
-                        is_active=True
-                    )
-                except Tenant.DoesNotExist:
-                    pass
+                tenant = self._lookup_tenant_by_id(tenant_id)
+                if tenant:
+                    return tenant
             
             # Method 2: JWT token in Authorization header
             auth_header = request.headers.get('Authorization', '')
@@ -227,11 +249,8 @@ class TenantMiddleware(MiddlewareMixin):
                     decoded = jwt.decode(token, options={"verify_signature": False})
                     tenant_id = decoded.get('tenant_id')
                     if tenant_id:
-                        return Tenant.objects.get(
-                            id=tenant_id,
-                            is_active=True
-                        )
-                except (jwt.DecodeError, jwt.InvalidTokenError, Tenant.DoesNotExist):
+                        return self._lookup_tenant_by_id(tenant_id)
+                except (jwt.DecodeError, jwt.InvalidTokenError):
                     pass
         
         return None
@@ -243,13 +262,10 @@ class TenantMiddleware(MiddlewareMixin):
         if hasattr(request, 'session'):
             tenant_id = request.session.get('tenant_id')
             if tenant_id:
-                try:
-                    return Tenant.objects.get(
-                        id=tenant_id,
-                        is_active=True
-                    )
-                except (Tenant.DoesNotExist, ValueError):
-                    request.session.pop('tenant_id', None)
+                tenant = self._lookup_tenant_by_id(tenant_id)
+                if tenant:
+                    return tenant
+                request.session.pop('tenant_id', None)
         
         return None
 
@@ -270,13 +286,7 @@ class TenantMiddleware(MiddlewareMixin):
             
             # Check if this looks like a tenant slug
             if tenant_slug and tenant_slug not in ['static', 'media', 'auth', 'login', 'logout']:
-                try:
-                    return Tenant.objects.get(
-                        slug=tenant_slug,
-                        is_active=True
-                    )
-                except (Tenant.DoesNotExist, Tenant.MultipleObjectsReturned):
-                    pass
+                return self._lookup_tenant_by_slug(tenant_slug)
         
         return None
 
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def partition_audit_logs(apps, schema_editor):
+    from apps.core.services.partition_service import AuditPartitionService
+
+    # Other databases (SQLite in tests) keep the plain table
+    if not AuditPartitionService.is_supported(schema_editor.connection):
+        return
+    AuditPartitionService.convert_to_partitioned(schema_editor.connection, AuditPartitionService.CORE_AUDIT_LOGS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_alter_auditlog_timestamp'),
+    ]
+
+    operations = [
+        # The partitioned table has the same columns, so the reverse is a no-op
+        migrations.RunPython(partition_audit_logs, migrations.RunPython.noop),
+    ]
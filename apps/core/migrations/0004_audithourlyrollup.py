@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_partition_audit_logs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditHourlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('tenant_id', models.CharField(blank=True, default='', max_length=100)),
+                ('user_id', models.CharField(blank=True, default='', max_length=100)),
+                ('user_email', models.CharField(blank=True, default='', max_length=254)),
+                ('action', models.CharField(max_length=50)),
+                ('resource_type', models.CharField(max_length=100)),
+                ('user_ip', models.CharField(blank=True, default='', max_length=45)),
+                ('event_count', models.PositiveIntegerField(default=0)),
+                ('failure_count', models.PositiveIntegerField(default=0)),
+                ('total_duration_ms', models.FloatField(default=0)),
+                ('duration_count', models.PositiveIntegerField(default=0)),
+                ('last_event_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'audit_hourly_rollups',
+                'ordering': ['-hour'],
+                'indexes': [
+                    models.Index(fields=['tenant_id', 'hour'], name='audit_hourl_tenant__bdc9e2_idx'),
+                    models.Index(fields=['hour', 'action'], name='audit_hourl_hour_1264b1_idx'),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='audithourlyrollup',
+            constraint=models.UniqueConstraint(
+                fields=('hour', 'tenant_id', 'user_id', 'user_email', 'action', 'resource_type', 'user_ip'),
+                name='audit_rollup_unique_key',
+            ),
+        ),
+    ]
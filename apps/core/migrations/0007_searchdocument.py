@@ -0,0 +1,50 @@
+from django.db import migrations, models
+
+
+def create_search_indexes(apps, schema_editor):
+    from apps.core.services.search_service import SearchIndexService
+
+    # Other databases (SQLite in tests) search the content column directly
+    if not SearchIndexService.is_supported(schema_editor.connection):
+        return
+    SearchIndexService.create_postgres_indexes(schema_editor.connection)
+
+
+def drop_search_indexes(apps, schema_editor):
+    from apps.core.services.search_service import SearchIndexService
+
+    if not SearchIndexService.is_supported(schema_editor.connection):
+        return
+    SearchIndexService.drop_postgres_indexes(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_numbersequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tenant_id', models.CharField(blank=True, default='', max_length=100)),
+                ('entity_type', models.CharField(max_length=20)),
+                ('object_id', models.CharField(max_length=64)),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('content', models.TextField(blank=True, help_text='Normalised search terms')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'search_documents',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(
+                fields=('tenant_id', 'entity_type', 'object_id'), name='search_document_unique_object'
+            ),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -1,6 +1,6 @@
 import uuid
 import json
-import hashlib
+from functools import lru_cache
 
 from django.db import models
 from django.conf import settings
@@ -63,19 +63,42 @@ class CryptographicModel(models.Model):
     class Meta:
         abstract = True
 
+    # Derived fields left out of data_signature (see DataSignatureService)
+    signature_exclude = ()
+
     def calculate_signature(self):
         """Calculate SHA-256 signature for data integrity"""
-        import json
-        from django.core import serializers
-        
-        data = serializers.serialize('json', [self])
-        return hashlib.sha256(data.encode()).hexdigest()
+        from apps.core.services.signature_service import DataSignatureService
+
+        return DataSignatureService.calculate(self)
 
     def verify_integrity(self):
         """Verify data hasn't been tampered with"""
-        if self.data_signature:
-            return self.data_signature == self.calculate_signature()
-        return False
+        from apps.core.services.signature_service import DataSignatureService
+
+        return DataSignatureService.verify(self)
+
+    def refresh_signature(self, update_fields=None):
+        """
+        Re-sign before a save. Returns ``update_fields`` with data_signature
+        added when a signed field is written; saves that only touch
+        unsigned fields keep the stored signature.
+        """
+        from apps.core.services.signature_service import DataSignatureService
+
+        if update_fields is not None:
+            if not DataSignatureService.touches_signed_fields(type(self), update_fields):
+                return update_fields
+            update_fields = frozenset(update_fields) | {'data_signature'}
+        self.data_signature = DataSignatureService.calculate(self)
+        return update_fields
+
+    def save_base(self, *args, raw=False, update_fields=None, **kwargs):
+        # Signed here rather than in save() so values filled in by subclass
+        # and TenantAwareModel saves are covered
+        if not raw:
+            update_fields = self.refresh_signature(update_fields)
+        super().save_base(*args, raw=raw, update_fields=update_fields, **kwargs)
 
 
 class TimeStampedModel(models.Model):
@@ -271,6 +294,11 @@ class SoftDeleteModel(models.Model):
         )
 
 
+@lru_cache(maxsize=None)
+def _relation_field_names(model):
+    return [field.name for field in model._meta.concrete_fields if field.is_relation]
+
+
 class TenantAwareModel(models.Model):
     """
     Secure multi-tenant model with strict isolation
@@ -284,6 +312,10 @@ class TenantAwareModel(models.Model):
             editable=False
         )
 
+    # Validation run by save() (see apps/core/utils/validation.py);
+    # None uses MODEL_VALIDATION["SAVE_MODE"]
+    save_validation_mode = None
+
     class Meta:
         abstract = True
         indexes = [
@@ -299,7 +331,6 @@ class TenantAwareModel(models.Model):
         if hasattr(self, 'is_superuser') and self.is_superuser:
             return
 
-        from apps.tenants.models import Tenant
         from apps.core.utils.tenant import get_current_tenant
         
         if not self.tenant_id:
@@ -308,16 +339,15 @@ class TenantAwareModel(models.Model):
             )
 
         # Verify tenant exists and is active
-        try:
-            tenant = Tenant.objects.get(id=self.tenant_id)
-            if not tenant.is_active:
-                raise ValidationError(
-                    'Cannot create record for inactive tenant.'
-                )
-        except Tenant.DoesNotExist:
+        tenant = self.get_owning_tenant()
+        if tenant is None:
             raise ValidationError(
                 'Referenced tenant does not exist.'
             )
+        if not tenant.is_active:
+            raise ValidationError(
+                'Cannot create record for inactive tenant.'
+            )
 
         # Ensure tenant matches current context (security check)
         current_tenant = get_current_tenant()
@@ -345,13 +375,51 @@ class TenantAwareModel(models.Model):
                     )
                 self.tenant = current_tenant
 
-        # Only run full validation if tenant is set
+        # Only validate if tenant is set
         # This allows forms to set tenant before validation
         if self.tenant_id:
-            self.full_clean()
+            self.validate_for_save()
         
         super().save(*args, **kwargs)
 
+    def get_owning_tenant(self):
+        """
+        Tenant of this record without a query where possible: the request's
+        tenant, an already loaded relation, then the tenant resolution cache
+        (in-process LRU and shared cache, invalidated on tenant changes)
+        """
+        from apps.core.cache import tenant_resolution_cache
+        from apps.core.utils.tenant import get_current_tenant
+        from apps.tenants.models import Tenant
+
+        current_tenant = get_current_tenant()
+        if current_tenant is not None and current_tenant.pk == self.tenant_id:
+            return current_tenant
+        if type(self).tenant.is_cached(self) and self.tenant.pk == self.tenant_id:
+            return self.tenant
+        # Inactive tenants must resolve too (to be rejected), so not the middleware's active-only 'id' entry
+        return tenant_resolution_cache.get_or_resolve(
+            'id_any', self.tenant_id, lambda: Tenant.objects.filter(pk=self.tenant_id).first()
+        )
+
+    def validate_for_save(self, mode=None):
+        """
+        Validate before saving according to the save validation mode
+        """
+        from apps.core.utils import validation
+
+        mode = mode or validation.get_save_validation() or self.save_validation_mode \
+            or validation.get_default_save_validation()
+        if mode == validation.FULL:
+            self.full_clean()
+        elif mode == validation.FIELDS:
+            # Uniqueness, constraints and foreign keys are enforced by the database
+            self.full_clean(
+                exclude=_relation_field_names(type(self)), validate_unique=False, validate_constraints=False
+            )
+        elif mode == validation.TENANT:
+            TenantAwareModel.clean(self)
+
 
 class RateLimitedModel(models.Model):
     """
@@ -418,11 +486,6 @@ class BaseSharedModel(UUIDModel, CryptographicModel, TimeStampedModel,
     def __str__(self):
         return f"{self.__class__.__name__}[{self.short_id}]"
 
-    def save(self, *args, **kwargs):
-        if not self.data_signature:
-            self.data_signature = self.calculate_signature()
-        super().save(*args, **kwargs)
-
     def audit_log(self, action, user, details=None, severity='INFO'):
         from apps.security.models import AuditLog
         return AuditLog.objects.create(
@@ -455,16 +518,6 @@ class BaseModel(UUIDModel, CryptographicModel, TimeStampedModel,
     def __str__(self):
         return f"{self.__class__.__name__}[{self.short_id}]"
 
-    def save(self, *args, **kwargs):
-        """
-        Enhanced save with integrity protection
-        """
-        # Calculate data integrity signature
-        if not self.data_signature:
-            self.data_signature = self.calculate_signature()
-        
-        super().save(*args, **kwargs)
-
     @classmethod
     def get_secure_queryset(cls, user):
         """
@@ -551,7 +604,8 @@ class AuditLog(models.Model):
     
     # Basic Information
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Event time, set by AuditService; rows may be inserted later in batches
+    timestamp = models.DateTimeField(default=timezone.now, db_index=True)
     
     # User Information (as strings, not foreign keys)
     user_id = models.CharField(max_length=100, null=True, blank=True, db_index=True)
@@ -614,3 +668,178 @@ class AuditLog(models.Model):
     
     def __str__(self):
         return f"{self.timestamp} - {self.user_email or 'System'} - {self.action} - {self.resource_type}"
+
+
+class AuditHourlyRollup(models.Model):
+    """
+    Audit event counts per hour and (tenant, user, action, resource type, IP).
+
+    Maintained by the audit writer in the same transaction as the AuditLog
+    rows and rebuilt with ``manage.py rebuild_audit_rollups``. Dimensions use
+    '' instead of NULL so the unique key also covers missing values.
+    """
+    hour = models.DateTimeField()
+    tenant_id = models.CharField(max_length=100, blank=True, default='')
+    user_id = models.CharField(max_length=100, blank=True, default='')
+    user_email = models.CharField(max_length=254, blank=True, default='')
+    action = models.CharField(max_length=50)
+    resource_type = models.CharField(max_length=100)
+    user_ip = models.CharField(max_length=45, blank=True, default='')
+
+    event_count = models.PositiveIntegerField(default=0)
+    failure_count = models.PositiveIntegerField(default=0)
+    total_duration_ms = models.FloatField(default=0)
+    duration_count = models.PositiveIntegerField(default=0)
+    last_event_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'audit_hourly_rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['hour', 'tenant_id', 'user_id', 'user_email', 'action', 'resource_type', 'user_ip'],
+                name='audit_rollup_unique_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['tenant_id', 'hour']),
+            models.Index(fields=['hour', 'action']),
+        ]
+        ordering = ['-hour']
+
+    def __str__(self):
+        return f"{self.hour} - {self.user_email or 'System'} - {self.action}: {self.event_count}"
+
+
+class ExportJob(models.Model):
+    """
+    A data export produced in the background by ``run_export_job``.
+
+    Identical requests (same view, parameters, format, user and schema) share
+    one active job through ``fingerprint``; the finished file is kept in media
+    storage until ``expires_at`` and served with HTTP range support.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        COMPLETED = 'COMPLETED', 'Completed'
+        FAILED = 'FAILED', 'Failed'
+
+    ACTIVE_STATUSES = (Status.PENDING, Status.RUNNING)
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tenant = models.ForeignKey(
+        'tenants.Tenant',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='export_jobs'
+    )
+    schema_name = models.CharField(max_length=63, default='public')
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='export_jobs'
+    )
+
+    # What to export
+    view_path = models.CharField(max_length=255)
+    request_path = models.CharField(max_length=500, blank=True)
+    params = models.JSONField(default=dict, blank=True)
+    export_format = models.CharField(max_length=10)
+    filename = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+
+    # Progress
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    total_rows = models.PositiveIntegerField(null=True, blank=True)
+    rows_written = models.PositiveIntegerField(default=0)
+    task_id = models.CharField(max_length=255, blank=True)
+    error_message = models.TextField(blank=True)
+
+    # Output
+    file = models.FileField(upload_to='exports/%Y/%m/', null=True, blank=True)
+    file_size = models.BigIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'export_jobs'
+        indexes = [
+            models.Index(fields=['fingerprint', 'status']),
+            models.Index(fields=['expires_at']),
+            models.Index(fields=['requested_by', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fingerprint'],
+                condition=models.Q(status__in=['PENDING', 'RUNNING']),
+                name='export_job_active_fingerprint',
+            ),
+        ]
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.filename}.{self.export_format} ({self.status})"
+
+    @property
+    def progress(self):
+        """Percentage complete, or None while the row count is unknown"""
+        if self.status == self.Status.COMPLETED:
+            return 100
+        if not self.total_rows:
+            return None
+        return min(int(self.rows_written * 100 / self.total_rows), 99)
+
+
+class NumberSequence(models.Model):
+    """
+    Last number handed out per tenant and prefix (invoice, payment, admission
+    numbers...). Rows are locked with SELECT ... FOR UPDATE by
+    ``NumberSequenceService``, so allocation is one indexed row update
+    however many numbers exist.
+    """
+    tenant_id = models.CharField(max_length=100, blank=True, default='')
+    key = models.CharField(max_length=100)
+    last_value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'number_sequences'
+        constraints = [
+            models.UniqueConstraint(fields=['tenant_id', 'key'], name='number_sequence_unique_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.tenant_id or 'global'}:{self.key} = {self.last_value}"
+
+
+class SearchDocument(models.Model):
+    """
+    Search text of one student, staff member, book or invoice, kept in step
+    by ``SearchIndexService``. On PostgreSQL the table also has a generated
+    ``search_vector`` tsvector column and GIN indexes (full text and
+    pg_trgm), added by migration, so one query searches every entity type.
+    """
+    tenant_id = models.CharField(max_length=100, blank=True, default='')
+    entity_type = models.CharField(max_length=20)
+    object_id = models.CharField(max_length=64)
+    title = models.CharField(max_length=255, blank=True)
+    content = models.TextField(blank=True, help_text='Normalised search terms')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'search_documents'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant_id', 'entity_type', 'object_id'], name='search_document_unique_object'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.entity_type}:{self.object_id} {self.title}"
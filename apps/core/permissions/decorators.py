@@ -148,17 +148,15 @@ def rate_limit_by_role(requests_per_minute=60):
             # Create cache key
             cache_key = f"rate_limit:{user_id}:{int(time.time() // 60)}"
             
-            # Get current count
-            current = cache.get(cache_key, 0)
+            # Count atomically so workers sharing the cache see one counter
+            cache.add(cache_key, 0, 60)
+            current = cache.incr(cache_key)
             
-            if current >= limit:
+            if current > limit:
                 return HttpResponseTooManyRequests(
                     "Rate limit exceeded. Please try again later."
                 )
             
-            # Increment counter
-            cache.set(cache_key, current + 1, 60)
-            
             return view_func(request, *args, **kwargs)
         return _wrapped_view
     return decorator
\ No newline at end of file
@@ -67,15 +67,13 @@ class RateLimitedViewMixin:
         
         cache_key = self.get_cache_key(request)
         
-        # Get current count
-        current = cache.get(cache_key, 0)
+        # Count atomically so workers sharing the cache see one counter
+        cache.add(cache_key, 0, time_window)
+        current = cache.incr(cache_key)
         
-        if current >= max_requests:
+        if current > max_requests:
             return self.rate_limit_exceeded(request)
         
-        # Increment counter
-        cache.set(cache_key, current + 1, time_window)
-        
         return super().dispatch(request, *args, **kwargs)
     
     def rate_limit_exceeded(self, request):
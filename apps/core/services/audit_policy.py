@@ -0,0 +1,252 @@
+# apps/core/services/audit_policy.py
+"""
+Audit policies of BaseView requests.
+
+A policy decides what a request leaves in the audit log, separately for
+writes and for reads (GET/HEAD/OPTIONS):
+
+- ``always``:    one AuditLog row per request
+- ``sample``:    a row for a random ``SAMPLE_RATE`` share of requests; the
+                 row records the rate so counts can be scaled back up
+- ``aggregate``: in-process counters per minute and (tenant, user, action,
+                 resource type, view), written as one row whose
+                 ``extra_data["event_count"]`` holds the number of requests
+- ``skip``:      nothing
+
+A request's policy is layered, later layers winning key by key:
+``AUDIT_LOG_SETTINGS["POLICY"]``, the view's ``audit_policy``, the
+settings ``RESOURCES`` entry of its resource type, then the tenant's
+``TenantConfiguration.audit_policy`` (same keys and ``RESOURCES``, cached
+in the shared cache and invalidated when the configuration is saved).
+A tenant can thin out write auditing but not turn it off: ``skip`` for
+writes is ignored in the tenant layers.
+"""
+
+import atexit
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from apps.core.services.audit_writer import audit_writer
+
+logger = logging.getLogger('audit_service')
+
+ALWAYS = 'always'
+SAMPLE = 'sample'
+AGGREGATE = 'aggregate'
+SKIP = 'skip'
+MODES = (ALWAYS, SAMPLE, AGGREGATE, SKIP)
+
+READ_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+class AuditPolicy(namedtuple('AuditPolicy', 'writes reads sample_rate')):
+    """Resolved audit modes of a view"""
+
+    def mode_for(self, method):
+        return self.reads if method.upper() in READ_METHODS else self.writes
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+
+AggregateKey = namedtuple(
+    'AggregateKey', 'minute tenant_id user_id user_email user_display_name action resource_type method view_class'
+)
+
+
+class AuditPolicyService:
+    """Resolution of AuditPolicy values"""
+
+    DEFAULTS = {'WRITES': ALWAYS, 'READS': ALWAYS, 'SAMPLE_RATE': 1.0}
+    CACHE_PREFIX = 'audit_policy'
+
+    @staticmethod
+    def settings():
+        return getattr(settings, 'AUDIT_LOG_SETTINGS', {}).get('POLICY', {})
+
+    @classmethod
+    def cache_timeout(cls):
+        return cls.settings().get('TENANT_CACHE_TIMEOUT', 300)
+
+    @classmethod
+    def cache_key(cls, tenant_id):
+        return f'{cls.CACHE_PREFIX}:{tenant_id}'
+
+    @classmethod
+    def tenant_overrides(cls, tenant):
+        """``TenantConfiguration.audit_policy`` of ``tenant`` ({} when unset)"""
+        if tenant is None or not getattr(tenant, 'pk', None):
+            return {}
+        cache = caches['shared']
+        key = cls.cache_key(tenant.pk)
+        overrides = cache.get(key)
+        if overrides is None:
+            from apps.tenants.models import TenantConfiguration
+
+            overrides = TenantConfiguration.objects.filter(tenant_id=tenant.pk).values_list(
+                'audit_policy', flat=True
+            ).first() or {}
+            cache.set(key, overrides, cls.cache_timeout())
+        return overrides
+
+    @classmethod
+    def invalidate_tenant(cls, tenant_id):
+        caches['shared'].delete(cls.cache_key(tenant_id))
+
+    @classmethod
+    def resolve(cls, resource_type, view_policy=None, tenant=None):
+        """AuditPolicy of a ``resource_type`` view for ``tenant``"""
+        base = cls.settings()
+        tenant_policy = cls.tenant_overrides(tenant)
+        layers = [
+            base,
+            view_policy or {},
+            base.get('RESOURCES', {}).get(resource_type, {}),
+        ]
+        tenant_layers = [
+            tenant_policy,
+            tenant_policy.get('RESOURCES', {}).get(resource_type, {}),
+        ]
+
+        policy = dict(cls.DEFAULTS)
+        for layer in layers:
+            policy.update((name, layer[name]) for name in cls.DEFAULTS if name in layer)
+        for layer in tenant_layers:
+            if layer.get('WRITES') == SKIP:
+                logger.warning(f"Ignoring tenant audit policy 'skip' for writes to {resource_type}")
+                layer = {name: value for name, value in layer.items() if name != 'WRITES'}
+            policy.update((name, layer[name]) for name in cls.DEFAULTS if name in layer)
+
+        for name in ('WRITES', 'READS'):
+            # A mistyped mode must not silently stop auditing
+            if policy[name] not in MODES:
+                logger.warning(f"Unknown audit policy mode {policy[name]!r} for {resource_type}; auditing every request")
+                policy[name] = ALWAYS
+        try:
+            sample_rate = min(max(float(policy['SAMPLE_RATE']), 0.0), 1.0)
+        except (TypeError, ValueError):
+            sample_rate = 1.0
+        return AuditPolicy(policy['WRITES'], policy['READS'], sample_rate)
+
+
+class AuditRequestAggregator:
+    """
+    Per-minute request counters. Minutes that have ended are handed to the
+    audit writer as one row per key when the next request is counted; a
+    background thread also flushes every counter each
+    ``POLICY["AGGREGATE_FLUSH_INTERVAL"]`` seconds, so idle workers don't
+    hold them back and a hard kill loses at most one interval. A minute can
+    then be written as several rows; rollups add their event counts.
+    """
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    @staticmethod
+    def flush_interval():
+        return AuditPolicyService.settings().get('AGGREGATE_FLUSH_INTERVAL', 15)
+
+    @property
+    def pending(self):
+        with self._lock:
+            return sum(self._counts.values())
+
+    def add(self, action, resource_type, user=None, request=None, tenant_id=None, view_class=''):
+        from apps.core.services.audit_service import AuditService
+
+        minute = timezone.now().replace(second=0, microsecond=0)
+        user_info = AuditService.get_user_info(user)
+        key = AggregateKey(
+            minute,
+            str(tenant_id or ''),
+            user_info['user_id'] or '',
+            user_info['user_email'] or '',
+            user_info['user_display_name'] or '',
+            action,
+            resource_type,
+            request.method[:10] if request else '',
+            view_class,
+        )
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+        self._ensure_started()
+        self.flush(before=minute)
+
+    def _ensure_started(self):
+        # Threads do not survive fork(); start one per worker process
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-aggregator', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        from django.db import close_old_connections
+
+        while True:
+            time.sleep(self.flush_interval())
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Audit aggregator flush failed: {str(e)}", exc_info=True)
+            finally:
+                close_old_connections()
+
+    def flush(self, before=None):
+        """Submit the counters of minutes before ``before`` (all when None); returns rows submitted"""
+        from apps.core.services.audit_service import AuditService
+
+        with self._lock:
+            due = [key for key in self._counts if before is None or key.minute < before]
+            counts = [(key, self._counts.pop(key)) for key in due]
+
+        for key, count in counts:
+            row = {
+                'id': uuid.uuid4(),
+                'timestamp': key.minute,
+                'user_id': key.user_id,
+                'user_email': key.user_email,
+                'user_display_name': key.user_display_name,
+                'action': key.action,
+                'severity': 'INFO',
+                'status': 'SUCCESS',
+                'resource_type': key.resource_type,
+                'request_method': key.method,
+                **AuditService.get_tenant_info(key.tenant_id),
+                'extra_data': {
+                    'aggregated': True,
+                    'event_count': count,
+                    'period_seconds': 60,
+                    'view_class': key.view_class,
+                },
+            }
+            audit_writer.submit({name: value for name, value in row.items() if value not in (None, '')})
+        return len(counts)
+
+
+audit_request_aggregator = AuditRequestAggregator()
+
+
+@atexit.register
+def _flush_on_exit():
+    # Registered after the audit writer's hook (imported above), so it runs first
+    if audit_request_aggregator.pending:
+        try:
+            audit_request_aggregator.flush()
+        except Exception:
+            pass
@@ -0,0 +1,302 @@
+# apps/core/services/audit_rollup_service.py
+"""
+Hourly audit rollups.
+
+``AuditHourlyRollup`` holds event counts per hour and (tenant, user, action,
+resource type, IP). The audit writer folds every batch it inserts into the
+rollups in the same transaction, and ``rebuild`` regenerates a time range
+from ``AuditLog`` with one grouped query. Reports over weeks or months then
+read a few rows per hour instead of every audit event.
+
+Rollup filters use the AuditLog field names (``tenant_id``, ``user_id``,
+``user_email``, ``action``, ``resource_type``, ``user_ip``), so the same
+lookups work against both tables. Rows written for aggregated requests
+(``audit_policy``) count as ``extra_data["event_count"]`` events.
+"""
+
+import logging
+from collections import namedtuple
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, IntegerField, Max, Q, Sum, Value
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast, Coalesce, Greatest, TruncHour
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger('audit_service')
+
+RollupKey = namedtuple('RollupKey', 'hour tenant_id user_id user_email action resource_type user_ip')
+
+
+class AuditRollupService:
+    """Incremental maintenance, rebuilds and reads of AuditHourlyRollup"""
+
+    DIMENSIONS = RollupKey._fields[1:]
+    COUNTERS = ('event_count', 'failure_count', 'total_duration_ms', 'duration_count')
+    FAILED_STATUSES = ('FAILED',)
+
+    @staticmethod
+    def enabled():
+        return getattr(settings, 'AUDIT_LOG_SETTINGS', {}).get('ROLLUPS_ENABLED', True)
+
+    # ------------------------------------------------------------------
+    # Hours
+    # ------------------------------------------------------------------
+    @staticmethod
+    def truncate(value):
+        """Start of the UTC hour containing ``value``"""
+        if isinstance(value, str):
+            value = parse_datetime(value)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, dt_timezone.utc)
+        return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+    @classmethod
+    def ceil(cls, value):
+        hour = cls.truncate(value)
+        return hour if hour == value else hour + timedelta(hours=1)
+
+    # ------------------------------------------------------------------
+    # Incremental maintenance
+    # ------------------------------------------------------------------
+    @classmethod
+    def key_for(cls, row):
+        """Rollup key of one AuditLog field dict"""
+        return RollupKey(
+            cls.truncate(row.get('timestamp') or timezone.now()),
+            *[str(row.get(dimension) or '') for dimension in cls.DIMENSIONS]
+        )
+
+    @staticmethod
+    def event_count(row):
+        """Events one AuditLog row stands for (aggregated request rows carry a count)"""
+        return int((row.get('extra_data') or {}).get('event_count') or 1)
+
+    @staticmethod
+    def event_count_expression():
+        """``event_count`` of each AuditLog row, as a query expression"""
+        return Coalesce(Cast(KT('extra_data__event_count'), IntegerField()), Value(1))
+
+    @classmethod
+    def aggregate_rows(cls, rows):
+        """``{RollupKey: counters}`` for a batch of AuditLog field dicts"""
+        deltas = {}
+        for row in rows:
+            key = cls.key_for(row)
+            counters = deltas.setdefault(key, dict(dict.fromkeys(cls.COUNTERS, 0), last_event_at=None))
+            counters['event_count'] += cls.event_count(row)
+            if row.get('status') in cls.FAILED_STATUSES:
+                counters['failure_count'] += 1
+            if row.get('duration_ms') is not None:
+                counters['total_duration_ms'] += float(row['duration_ms'])
+                counters['duration_count'] += 1
+            timestamp = row.get('timestamp') or timezone.now()
+            if isinstance(timestamp, str):
+                timestamp = parse_datetime(timestamp)
+            if counters['last_event_at'] is None or timestamp > counters['last_event_at']:
+                counters['last_event_at'] = timestamp
+        return deltas
+
+    @classmethod
+    def record(cls, rows):
+        """Add a batch of written AuditLog rows to the rollups"""
+        if not rows or not cls.enabled():
+            return
+        deltas = cls.aggregate_rows(rows)
+        # Sorted keys keep concurrent writers from deadlocking on each other
+        items = sorted(deltas.items(), key=lambda item: item[0])
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                cls._upsert(items)
+            else:
+                for key, counters in items:
+                    cls._add(key, counters)
+
+    @classmethod
+    def _upsert(cls, items):
+        from apps.core.models import AuditHourlyRollup
+
+        table = AuditHourlyRollup._meta.db_table
+        columns = list(RollupKey._fields) + list(cls.COUNTERS) + ['last_event_at']
+        placeholders = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        params = []
+        for key, counters in items:
+            params.extend(key)
+            params.extend(counters[name] for name in cls.COUNTERS)
+            params.append(counters['last_event_at'])
+        updates = [f'{name} = {table}.{name} + EXCLUDED.{name}' for name in cls.COUNTERS]
+        updates.append(f'last_event_at = GREATEST({table}.last_event_at, EXCLUDED.last_event_at)')
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({", ".join(columns)}) VALUES {", ".join([placeholders] * len(items))} '
+                f'ON CONFLICT ({", ".join(RollupKey._fields)}) DO UPDATE SET {", ".join(updates)}',
+                params,
+            )
+
+    @classmethod
+    def _add(cls, key, counters):
+        from django.db.models import F
+
+        from apps.core.models import AuditHourlyRollup
+
+        rows = AuditHourlyRollup.objects.filter(**key._asdict())
+        updated = rows.update(
+            last_event_at=Greatest('last_event_at', counters['last_event_at']),
+            **{name: F(name) + counters[name] for name in cls.COUNTERS}
+        )
+        if not updated:
+            AuditHourlyRollup.objects.create(**key._asdict(), **counters)
+
+    # ------------------------------------------------------------------
+    # Rebuild
+    # ------------------------------------------------------------------
+    @classmethod
+    def rebuild(cls, start=None, end=None, batch_size=1000):
+        """
+        Regenerate the rollups of whole hours in [start, end) (everything when
+        no range is given) from AuditLog. Returns the number of rows written.
+        """
+        from apps.core.models import AuditHourlyRollup, AuditLog
+
+        logs = AuditLog.objects.all()
+        rollups = AuditHourlyRollup.objects.all()
+        if start:
+            start = cls.truncate(start)
+            logs = logs.filter(timestamp__gte=start)
+            rollups = rollups.filter(hour__gte=start)
+        if end:
+            end = cls.ceil(end)
+            logs = logs.filter(timestamp__lt=end)
+            rollups = rollups.filter(hour__lt=end)
+
+        grouped = logs.order_by().annotate(bucket=TruncHour('timestamp', tzinfo=dt_timezone.utc)).values(
+            'bucket', *cls.DIMENSIONS
+        ).annotate(
+            event_count=Sum(cls.event_count_expression()),
+            failure_count=Count('pk', filter=Q(status__in=cls.FAILED_STATUSES)),
+            total_duration_ms=Sum('duration_ms'),
+            duration_count=Count('duration_ms'),
+            last_event_at=Max('timestamp'),
+        )
+
+        # NULL and '' dimensions share one rollup row
+        merged = {}
+        for row in grouped.iterator():
+            key = RollupKey(row['bucket'], *[str(row[dimension] or '') for dimension in cls.DIMENSIONS])
+            counters = merged.get(key)
+            if counters is None:
+                merged[key] = {
+                    'event_count': row['event_count'],
+                    'failure_count': row['failure_count'],
+                    'total_duration_ms': row['total_duration_ms'] or 0,
+                    'duration_count': row['duration_count'],
+                    'last_event_at': row['last_event_at'],
+                }
+                continue
+            for name in cls.COUNTERS:
+                counters[name] += row[name] or 0
+            counters['last_event_at'] = max(counters['last_event_at'], row['last_event_at'])
+
+        with transaction.atomic():
+            rollups.delete()
+            AuditHourlyRollup.objects.bulk_create(
+                [AuditHourlyRollup(**key._asdict(), **counters) for key, counters in merged.items()],
+                batch_size=batch_size,
+            )
+        return len(merged)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    @classmethod
+    def rollups(cls, start, end=None, **filters):
+        """Rollup rows of the hours in [start, end)"""
+        from apps.core.models import AuditHourlyRollup
+
+        queryset = AuditHourlyRollup.objects.filter(hour__gte=cls.truncate(start), **filters)
+        if end:
+            queryset = queryset.filter(hour__lt=end)
+        return queryset.order_by()
+
+    @classmethod
+    def count_events(cls, since, until=None, **filters):
+        """
+        Exact number of audit events in [since, until]: whole hours come from
+        the rollups, the partial hours at either end from AuditLog.
+        """
+        from apps.core.models import AuditLog
+
+        until = until or timezone.now()
+        first_hour, last_hour = cls.ceil(since), cls.truncate(until)
+        logs = AuditLog.objects.filter(**filters)
+        events = Sum(cls.event_count_expression())
+        if first_hour >= last_hour:
+            return logs.filter(timestamp__gte=since, timestamp__lte=until).aggregate(total=events)['total'] or 0
+
+        total = cls.rollups(first_hour, last_hour, **filters).aggregate(total=Sum('event_count'))['total'] or 0
+        total += logs.filter(
+            Q(timestamp__gte=since, timestamp__lt=first_hour) | Q(timestamp__gte=last_hour, timestamp__lte=until)
+        ).aggregate(total=events)['total'] or 0
+        return total
+
+    # ------------------------------------------------------------------
+    # Audit metrics
+    # ------------------------------------------------------------------
+    @classmethod
+    def metric_value(cls, metric, period_start, period_end):
+        """
+        Value of an analytics ``AuditMetric`` over whole hours, computed from
+        the rollups. ``query_filter`` may use the rollup dimensions.
+        Returns ``(value, sample_count)``.
+        """
+        filters = {
+            lookup: value for lookup, value in (metric.query_filter or {}).items()
+            if lookup.split('__')[0] in cls.DIMENSIONS
+        }
+        if metric.tenant_id:
+            filters['tenant_id'] = str(metric.tenant_id)
+        totals = cls.rollups(period_start, period_end, **filters).aggregate(
+            events=Sum('event_count'),
+            failures=Sum('failure_count'),
+            duration=Sum('total_duration_ms'),
+            timed=Sum('duration_count'),
+        )
+        events = totals['events'] or 0
+        hours = max((period_end - period_start).total_seconds() / 3600, 1)
+
+        if metric.metric_type == 'RATE':
+            value = events / hours
+        elif metric.metric_type == 'PERCENTAGE':
+            value = (totals['failures'] or 0) / events * 100 if events else 0
+        elif metric.metric_type in ('AVERAGE', 'DURATION'):
+            value = (totals['duration'] or 0) / totals['timed'] if totals['timed'] else 0
+        elif metric.metric_type == 'SUM':
+            value = totals['duration'] or 0
+        else:
+            value = events
+        return value, events
+
+    @classmethod
+    def record_metric_value(cls, metric, period_start, period_end, period_type='hour'):
+        """Store an ``AuditMetricValue`` for the period and update the metric"""
+        from apps.analytics.models import AuditMetricValue
+
+        value, sample_count = cls.metric_value(metric, period_start, period_end)
+        metric_value = AuditMetricValue.objects.create(
+            metric=metric,
+            tenant_id=metric.tenant_id,
+            timestamp=period_end,
+            value=value,
+            period_start=period_start,
+            period_end=period_end,
+            period_type=period_type,
+            sample_count=sample_count,
+        )
+        metric.last_calculated = timezone.now()
+        metric.last_value = value
+        metric.save(update_fields=['last_calculated', 'last_value'])
+        return metric_value
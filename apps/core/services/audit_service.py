@@ -8,10 +8,11 @@ from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.http import HttpRequest
-from django.db import transaction
 from django.contrib.contenttypes.models import ContentType
 from apps.tenants.models import Tenant
 from apps.core.models import AuditLog
+from apps.core.cache import tenant_resolution_cache
+from apps.core.services.audit_writer import audit_writer
 
 User = get_user_model()
 
@@ -73,7 +74,11 @@ class AuditService:
             return {'tenant_id': None, 'tenant_name': None}
         
         try:
-            tenant = Tenant.objects.filter(id=tenant_id).first()
+            # Resolved through the shared tenant cache; audit entries are written on hot paths.
+            # Inactive tenants are still named, so this is not the middleware's active-only 'id' entry
+            tenant = tenant_resolution_cache.get_or_resolve(
+                'id_any', tenant_id, lambda: Tenant.objects.filter(id=tenant_id).first()
+            )
             if tenant:
                 return {
                     'tenant_id': str(tenant.id),
@@ -151,6 +156,10 @@ class AuditService:
             
             # Prepare audit data - EXACTLY matching AuditLog model fields
             audit_data = {
+                # Identity and event time - kept even when the row is written later
+                'id': uuid.uuid4(),
+                'timestamp': timezone.now(),
+                
                 # User information - EXACT model field names
                 'user_id': user_info['user_id'],
                 'user_email': user_info['user_email'],
@@ -200,24 +209,26 @@ class AuditService:
             # Remove None values (except for fields that can legitimately be None)
             audit_data = {k: v for k, v in audit_data.items() if v is not None}
             
-            # Create the audit entry
-            with transaction.atomic():
-                audit_entry = AuditLog.objects.create(**audit_data)
-                
-                # Link to content object if available
-                if instance and hasattr(instance, '_meta'):
-                    try:
-                        content_type = ContentType.objects.get_for_model(instance.__class__)
-                        audit_entry.content_type = content_type
-                        audit_entry.object_uuid = getattr(instance, 'id', None)
-                        audit_entry.save(update_fields=['content_type', 'object_uuid'])
-                    except Exception:
-                        # Silently fail - optional feature
-                        pass
+            # Link to content object if available (ContentType lookups are cached)
+            if instance and hasattr(instance, '_meta'):
+                try:
+                    audit_data['content_type_id'] = ContentType.objects.get_for_model(instance.__class__).id
+                    object_uuid = getattr(instance, 'id', None)
+                    if object_uuid is not None:
+                        audit_data['object_uuid'] = str(object_uuid)
+                except Exception:
+                    # Silently fail - optional feature
+                    pass
+            
+            # Hand the entry to the batched writer; the returned instance is unsaved
+            # in async mode and is only meant for inspection, but carries the
+            # same id as the row that will be written
+            audit_entry = AuditLog(**audit_data)
+            audit_writer.submit(audit_data)
             
             # Log success in development
             if settings.DEBUG:
-                print(f"[AUDIT SUCCESS] Created audit entry: {audit_entry.id}")
+                print(f"[AUDIT SUCCESS] Queued audit entry: {audit_entry.id}")
             
             return audit_entry
             
@@ -0,0 +1,251 @@
+# apps/core/services/audit_writer.py
+"""
+Buffered audit-log writer.
+
+AuditService hands finished audit rows (plain dicts of AuditLog fields) to
+``audit_writer``. In ``async`` mode they go into a bounded in-process buffer
+that a daemon thread drains with ``bulk_create`` whenever ``BATCH_SIZE`` rows
+are waiting or ``FLUSH_INTERVAL`` seconds have passed, so request threads
+never wait on audit I/O. When the buffer is full, rows are spilled to disk
+(replayed by the flusher later) or sent to Celery, depending on
+``OVERFLOW``. ``sync`` mode writes immediately and is what tests use.
+"""
+
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger('audit_service')
+
+
+class AuditLogWriter:
+    """Bounded buffer + background bulk writer for AuditLog rows"""
+
+    SYNC = 'sync'
+    ASYNC = 'async'
+
+    def __init__(self, **overrides):
+        self._overrides = overrides
+        self._buffer = deque()
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.written = 0
+        self.spilled = 0
+        self.dropped = 0
+        self.failed_batches = 0
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+    def _setting(self, name, default):
+        if name in self._overrides:
+            return self._overrides[name]
+        config = getattr(settings, 'AUDIT_LOG_SETTINGS', {}).get('WRITER', {})
+        return config.get(name, default)
+
+    @property
+    def mode(self):
+        return self._setting('MODE', self.ASYNC)
+
+    @property
+    def max_buffer(self):
+        return self._setting('BUFFER_SIZE', 10000)
+
+    @property
+    def batch_size(self):
+        return self._setting('BATCH_SIZE', 500)
+
+    @property
+    def flush_interval(self):
+        return self._setting('FLUSH_INTERVAL', 2.0)
+
+    @property
+    def overflow(self):
+        return self._setting('OVERFLOW', 'spill')
+
+    @property
+    def spill_dir(self):
+        return self._setting('SPILL_DIR', os.path.join(settings.BASE_DIR, 'logs', 'audit_spill'))
+
+    @property
+    def pending(self):
+        return len(self._buffer)
+
+    def get_stats(self):
+        return {
+            'mode': self.mode,
+            'pending': self.pending,
+            'written': self.written,
+            'spilled': self.spilled,
+            'dropped': self.dropped,
+            'failed_batches': self.failed_batches,
+        }
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+    def submit(self, audit_data):
+        """Queue one audit row (dict of AuditLog field values)"""
+        if self.mode != self.ASYNC:
+            self.write_batch([audit_data])
+            return
+
+        self._ensure_started()
+        with self._condition:
+            if len(self._buffer) < self.max_buffer:
+                self._buffer.append(audit_data)
+                if len(self._buffer) >= self.batch_size:
+                    self._condition.notify()
+                return
+        self._overflow([audit_data])
+
+    def _overflow(self, rows):
+        if self.overflow == 'celery':
+            try:
+                from apps.core.tasks import write_audit_batch
+
+                write_audit_batch.delay(self._serialize(rows))
+                return
+            except Exception as e:
+                logger.warning(f"Audit Celery fallback failed, spilling to disk: {str(e)}")
+        if self.overflow in ('spill', 'celery'):
+            self._spill(rows)
+        else:
+            self.dropped += len(rows)
+
+    # ------------------------------------------------------------------
+    # Background flusher
+    # ------------------------------------------------------------------
+    def _ensure_started(self):
+        # Threads do not survive fork(); start one per worker process
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        from django.db import close_old_connections
+
+        while True:
+            with self._condition:
+                if len(self._buffer) < self.batch_size:
+                    self._condition.wait(timeout=self.flush_interval)
+            try:
+                self.flush()
+                self.replay_spill()
+            except Exception as e:
+                logger.error(f"Audit writer flush failed: {str(e)}", exc_info=True)
+            finally:
+                close_old_connections()
+
+    def _take(self, limit):
+        with self._condition:
+            batch = []
+            while self._buffer and len(batch) < limit:
+                batch.append(self._buffer.popleft())
+            return batch
+
+    def flush(self):
+        """Write everything buffered so far; returns rows written"""
+        total = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take(self.batch_size)
+                if not batch:
+                    break
+                total += self.write_batch(batch)
+        return total
+
+    def write_batch(self, rows, spill_on_error=True):
+        """Insert rows with one bulk_create (plus their hourly rollups); spill them if the database fails"""
+        from django.db import transaction
+
+        from apps.core.models import AuditLog
+        from apps.core.services.audit_rollup_service import AuditRollupService
+
+        try:
+            # AuditLog is a shared table, reachable from any tenant's search path
+            with transaction.atomic():
+                AuditLog.objects.bulk_create([AuditLog(**row) for row in rows], batch_size=self.batch_size)
+                AuditRollupService.record(rows)
+            self.written += len(rows)
+            return len(rows)
+        except Exception as e:
+            self.failed_batches += 1
+            logger.error(f"Failed to write {len(rows)} audit entries: {str(e)}", exc_info=True)
+            if spill_on_error and self.mode == self.ASYNC:
+                self._spill(rows)
+            return 0
+
+    # ------------------------------------------------------------------
+    # Spill files
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _serialize(rows):
+        return json.loads(json.dumps(rows, cls=DjangoJSONEncoder))
+
+    def _spill(self, rows):
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            path = os.path.join(self.spill_dir, f'audit-{os.getpid()}-{int(time.time())}.jsonl')
+            with open(path, 'a', encoding='utf-8') as spill:
+                for row in rows:
+                    spill.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            self.spilled += len(rows)
+        except Exception as e:
+            self.dropped += len(rows)
+            logger.error(f"Failed to spill {len(rows)} audit entries: {str(e)}")
+
+    def replay_spill(self):
+        """Load spilled rows back into the database (oldest file first)"""
+        replayed = 0
+        for path in sorted(glob.glob(os.path.join(self.spill_dir, 'audit-*.jsonl'))):
+            # Leave the file this process is still appending to
+            if path.endswith(f'-{int(time.time())}.jsonl'):
+                continue
+            processing = f'{path}.replaying'
+            try:
+                os.rename(path, processing)
+            except OSError:
+                continue  # another worker took it
+
+            with open(processing, encoding='utf-8') as spill:
+                rows = [json.loads(line) for line in spill if line.strip()]
+            for start in range(0, len(rows), self.batch_size):
+                written = self.write_batch(rows[start:start + self.batch_size], spill_on_error=False)
+                if not written:
+                    # Database still unavailable; keep the unwritten rest for next time
+                    self._spill(rows[start:])
+                    self.spilled -= len(rows) - start
+                    os.remove(processing)
+                    return replayed
+                replayed += written
+            os.remove(processing)
+        return replayed
+
+
+# Shared per-process writer
+audit_writer = AuditLogWriter()
+
+
+@atexit.register
+def _flush_on_exit():
+    if audit_writer.pending:
+        try:
+            audit_writer.flush()
+        except Exception:
+            pass
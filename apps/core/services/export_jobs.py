@@ -0,0 +1,354 @@
+# apps/core/services/export_jobs.py
+"""
+Background export jobs.
+
+An ``ExportAPIView`` with ``export_in_background = True`` answers with
+``202 Accepted`` and an ``ExportJob`` instead of building the file inside
+the request. ``run_export_job`` (Celery) rebuilds the view in the job's
+tenant schema, streams its rows into a temp file - recording progress after
+every chunk - and saves the result to media storage. Downloads support HTTP
+range requests so interrupted transfers of large files can resume.
+"""
+
+import hashlib
+import importlib
+import json
+import logging
+import re
+import tempfile
+from contextlib import nullcontext
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.http import FileResponse, HttpRequest, HttpResponse, QueryDict, StreamingHttpResponse
+from django.utils import timezone
+
+from apps.core.services.export_service import CONTENT_TYPES, EXTENSIONS, ExportService
+
+logger = logging.getLogger(__name__)
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class ExportJobService:
+    """Creation, execution, download and cleanup of ExportJob records"""
+
+    # Query parameters that do not change the exported data
+    IGNORED_PARAMS = ('format', 'page', 'page_size')
+
+    @staticmethod
+    def _setting(name, default):
+        return getattr(settings, 'EXPORT_JOBS', {}).get(name, default)
+
+    @classmethod
+    def chunk_size(cls):
+        return cls._setting('CHUNK_SIZE', 2000)
+
+    @classmethod
+    def retention(cls):
+        return timedelta(hours=cls._setting('RETENTION_HOURS', 24))
+
+    @classmethod
+    def stale_after(cls):
+        return timedelta(minutes=cls._setting('STALE_AFTER_MINUTES', 60))
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+    @classmethod
+    def fingerprint(cls, schema_name, view_path, export_format, params, user_id):
+        payload = json.dumps(
+            [schema_name, view_path, export_format, sorted(params.items()), str(user_id or '')],
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def request_params(request):
+        """Query parameters as a plain dict (lists for repeated keys)"""
+        params = {}
+        for key, values in request.query_params.lists():
+            if key in ExportJobService.IGNORED_PARAMS:
+                continue
+            params[key] = values if len(values) > 1 else values[0]
+        return params
+
+    @classmethod
+    def submit(cls, view, export_format):
+        """
+        Return ``(job, created)`` for an export requested through ``view``.
+        A pending or running job for the same request is reused.
+        """
+        from apps.core.models import ExportJob
+        from apps.core.tasks import run_export_job
+
+        request = view.request
+        user = request.user if request.user.is_authenticated else None
+        schema_name = getattr(connection, 'schema_name', None) or 'public'
+        view_path = f'{view.__class__.__module__}.{view.__class__.__name__}'
+        params = cls.request_params(request)
+        fingerprint = cls.fingerprint(schema_name, view_path, export_format, params, getattr(user, 'pk', None))
+
+        # A worker that died leaves its job RUNNING; release it after a while
+        ExportJob.objects.filter(
+            fingerprint=fingerprint,
+            status__in=ExportJob.ACTIVE_STATUSES,
+            updated_at__lt=timezone.now() - cls.stale_after(),
+        ).update(status=ExportJob.Status.FAILED, error_message='Export stalled')
+
+        existing = ExportJob.objects.filter(fingerprint=fingerprint, status__in=ExportJob.ACTIVE_STATUSES).first()
+        if existing:
+            return existing, False
+
+        try:
+            with transaction.atomic():
+                job = ExportJob.objects.create(
+                    tenant=getattr(view, 'tenant', None),
+                    schema_name=schema_name,
+                    requested_by=user,
+                    view_path=view_path,
+                    request_path=request.path[:500],
+                    params=params,
+                    export_format=export_format,
+                    filename=view.get_export_filename(),
+                    fingerprint=fingerprint,
+                )
+        except IntegrityError:
+            # An identical request created its job first; it may have finished since
+            existing = ExportJob.objects.filter(fingerprint=fingerprint).order_by('-created_at').first()
+            if existing is None:
+                raise
+            return existing, False
+
+        transaction.on_commit(lambda: cls.enqueue(job, run_export_job))
+        return job, True
+
+    @staticmethod
+    def enqueue(job, task):
+        from apps.core.models import ExportJob
+
+        result = task.delay(str(job.pk))
+        ExportJob.objects.filter(pk=job.pk, task_id='').update(task_id=result.id or '')
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+    @staticmethod
+    def tenant_context(schema_name):
+        # SQLite (tests) has no schemas
+        if not hasattr(connection, 'set_schema'):
+            return nullcontext()
+        from django_tenants.utils import schema_context
+
+        return schema_context(schema_name)
+
+    @staticmethod
+    def build_view(job):
+        """Recreate the export view as if ``job``'s request had just arrived"""
+        from django.contrib.auth.models import AnonymousUser
+        from rest_framework.request import Request
+
+        from apps.core.utils.tenant import set_current_tenant
+
+        module_name, class_name = job.view_path.rsplit('.', 1)
+        view_class = getattr(importlib.import_module(module_name), class_name)
+
+        django_request = HttpRequest()
+        django_request.method = 'GET'
+        django_request.path = job.request_path
+        django_request.GET = QueryDict(urlencode(job.params, doseq=True))
+        django_request.tenant = job.tenant
+
+        view = view_class()
+        view.setup(django_request)
+        request = Request(django_request)
+        request.user = job.requested_by or AnonymousUser()
+        view.request = request
+        view.format_kwarg = None
+        view.tenant = job.tenant
+        set_current_tenant(job.tenant)
+        return view
+
+    @classmethod
+    def run(cls, job_id):
+        """Produce the export file for a job; returns the finished job"""
+        from apps.core.models import ExportJob
+
+        job = ExportJob.objects.select_related('tenant', 'requested_by').get(pk=job_id)
+        # Claim the job; a redelivered task finds it no longer pending
+        claimed = ExportJob.objects.filter(pk=job.pk, status=ExportJob.Status.PENDING).update(
+            status=ExportJob.Status.RUNNING, started_at=timezone.now()
+        )
+        if not claimed:
+            return job
+        try:
+            with cls.tenant_context(job.schema_name):
+                view = cls.build_view(job)
+                with tempfile.TemporaryFile() as output:
+                    rows_written = cls.write(job, view, output)
+                    output.seek(0)
+                    job.file.save(f'{job.filename}.{EXTENSIONS[job.export_format]}', File(output), save=False)
+        except Exception as e:
+            logger.error(f"Export job {job.pk} failed: {str(e)}", exc_info=True)
+            ExportJob.objects.filter(pk=job.pk).update(
+                status=ExportJob.Status.FAILED,
+                error_message=str(e)[:2000],
+                completed_at=timezone.now(),
+            )
+            job.refresh_from_db()
+            return job
+
+        now = timezone.now()
+        ExportJob.objects.filter(pk=job.pk).update(
+            status=ExportJob.Status.COMPLETED,
+            file=job.file.name,
+            file_size=job.file.size,
+            rows_written=rows_written,
+            completed_at=now,
+            expires_at=now + cls.retention(),
+        )
+        job.refresh_from_db()
+        return job
+
+    @classmethod
+    def write(cls, job, view, output):
+        """Write the export into binary file ``output``; returns rows written"""
+        from apps.core.models import ExportJob
+
+        queryset = view.get_queryset()
+        ExportJob.objects.filter(pk=job.pk).update(total_rows=queryset.count())
+
+        chunk_size = cls.chunk_size()
+        written = 0
+
+        def counted(rows):
+            nonlocal written
+            for row in rows:
+                yield row
+                written += 1
+                if written % chunk_size == 0:
+                    ExportJob.objects.filter(pk=job.pk).update(rows_written=written, updated_at=timezone.now())
+
+        headers = view.get_export_headers() if job.export_format != 'json' else None
+        if job.export_format == 'json':
+            records = counted(ExportService.serialized_records(
+                queryset, view.get_serializer_class(), view.get_serializer_context(), chunk_size
+            ))
+            lines = ExportService.json_array(records)
+        elif job.export_format == 'excel':
+            ExportService.write_excel(headers, counted(view.get_export_rows()), output)
+            return written
+        elif job.export_format == 'ndjson':
+            lines = ExportService.ndjson_lines(headers, counted(view.get_export_rows()))
+        else:
+            lines = ExportService.csv_lines(headers, counted(view.get_export_rows()))
+
+        for line in lines:
+            output.write(line.encode('utf-8'))
+        return written
+
+    # ------------------------------------------------------------------
+    # Download
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _read_range(handle, start, length, block_size=64 * 1024):
+        try:
+            handle.seek(start)
+            remaining = length
+            while remaining > 0:
+                data = handle.read(min(block_size, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                yield data
+        finally:
+            handle.close()
+
+    @classmethod
+    def download_response(cls, request, job):
+        """File response for a finished job, honouring a single byte range"""
+        size = job.file_size if job.file_size is not None else job.file.size
+        content_type = CONTENT_TYPES.get(job.export_format, 'application/octet-stream')
+        match = RANGE_PATTERN.match(request.META.get('HTTP_RANGE', '').strip())
+
+        if match and (match.group(1) or match.group(2)):
+            if match.group(1):
+                start = int(match.group(1))
+                end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            else:
+                # Suffix range: the last N bytes
+                start = max(size - int(match.group(2)), 0)
+                end = size - 1
+            if start >= size or start > end:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                cls._read_range(job.file.open('rb'), start, length),
+                status=206,
+                content_type=content_type,
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(length)
+        else:
+            response = FileResponse(job.file.open('rb'), content_type=content_type)
+
+        response['Accept-Ranges'] = 'bytes'
+        return ExportService.attachment(response, job.filename, job.export_format)
+
+    # ------------------------------------------------------------------
+    # Cleanup
+    # ------------------------------------------------------------------
+    @classmethod
+    def purge_expired(cls):
+        """Delete expired and long-failed jobs with their files; returns the number removed"""
+        from apps.core.models import ExportJob
+
+        now = timezone.now()
+        expired = ExportJob.objects.filter(
+            Q(expires_at__lt=now)
+            # Failed jobs get no expiry; they go one retention period after failing
+            | Q(status=ExportJob.Status.FAILED, expires_at__isnull=True, updated_at__lt=now - cls.retention())
+        )
+        count = 0
+        for job in expired.iterator():
+            if job.file:
+                job.file.delete(save=False)
+            job.delete()
+            count += 1
+        return count
+
+    @staticmethod
+    def serialize(job, request=None):
+        """Status payload for API responses"""
+        from django.urls import reverse
+
+        payload = {
+            'id': str(job.pk),
+            'status': job.status,
+            'format': job.export_format,
+            'filename': f'{job.filename}.{EXTENSIONS.get(job.export_format, job.export_format)}',
+            'progress': job.progress,
+            'rows_written': job.rows_written,
+            'total_rows': job.total_rows,
+            'file_size': job.file_size,
+            'error': job.error_message or None,
+            'created_at': job.created_at,
+            'completed_at': job.completed_at,
+            'expires_at': job.expires_at,
+            'status_url': reverse('export-job-detail', kwargs={'pk': job.pk}),
+            'download_url': None,
+        }
+        if job.status == job.Status.COMPLETED:
+            payload['download_url'] = reverse('export-job-download', kwargs={'pk': job.pk})
+        if request is not None:
+            for key in ('status_url', 'download_url'):
+                if payload[key]:
+                    payload[key] = request.build_absolute_uri(payload[key])
+        return payload
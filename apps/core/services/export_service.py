@@ -1,75 +1,192 @@
 import csv
 import json
-from django.http import HttpResponse
+import tempfile
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from django.utils import timezone
 import logging
 
 logger = logging.getLogger(__name__)
 
+EXPORT_CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+EXTENSIONS = {
+    'csv': 'csv',
+    'excel': 'xlsx',
+    'json': 'json',
+    'ndjson': 'ndjson',
+}
+
+
+class Echo:
+    """File-like object whose write() returns the value, for streaming csv.writer"""
+
+    def write(self, value):
+        return value
+
+
 class ExportService:
     """
     Service for handling data exports
+
+    Rows are produced lazily - ``queryset.iterator(chunk_size=...)`` or a
+    ``values_list`` projection - and written straight into a streaming
+    response, so memory stays flat however many rows are exported. XLSX
+    uses openpyxl's write-only mode, which spools rows to a temp file.
     """
-    
+
+    # ------------------------------------------------------------------
+    # Row sources
+    # ------------------------------------------------------------------
     @staticmethod
-    def export_to_csv(queryset, filename, headers, row_callback):
+    def iter_objects(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+        """Iterate model instances without caching the whole queryset"""
+        if hasattr(queryset, 'iterator'):
+            return queryset.iterator(chunk_size=chunk_size)
+        return iter(queryset)
+
+    @classmethod
+    def iter_rows(cls, queryset, row_callback=None, fields=None, chunk_size=EXPORT_CHUNK_SIZE):
         """
-        Export queryset to CSV response
+        Export rows of a queryset: a ``values_list(*fields)`` projection
+        (optionally post-processed by ``row_callback(values)``), or
+        ``row_callback(obj)`` for each instance.
         """
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(headers)
-        
-        for obj in queryset:
-            writer.writerow(row_callback(obj))
-            
-        return response
+        if fields:
+            rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+            return (row_callback(row) for row in rows) if row_callback else rows
+        return (row_callback(obj) for obj in cls.iter_objects(queryset, chunk_size))
+
+    @staticmethod
+    def iter_chunks(iterable, size=EXPORT_CHUNK_SIZE):
+        iterator = iter(iterable)
+        while True:
+            chunk = list(islice(iterator, size))
+            if not chunk:
+                return
+            yield chunk
+
+    # ------------------------------------------------------------------
+    # Encoders (generators of str)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def csv_lines(headers, rows):
+        writer = csv.writer(Echo())
+        yield writer.writerow(headers)
+        for row in rows:
+            yield writer.writerow(row)
+
+    @staticmethod
+    def ndjson_lines(headers, rows):
+        for row in rows:
+            record = row if isinstance(row, dict) else dict(zip(headers, row))
+            yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
 
     @staticmethod
-    def export_to_excel(queryset, filename, headers, row_callback):
+    def json_array(records):
+        """Stream ``records`` (dicts) as one JSON array"""
+        yield '['
+        first = True
+        for record in records:
+            yield ('' if first else ',') + json.dumps(record, cls=DjangoJSONEncoder)
+            first = False
+        yield ']'
+
+    @classmethod
+    def serialized_records(cls, queryset, serializer_class, context=None, chunk_size=EXPORT_CHUNK_SIZE):
+        """Serializer output for each object, serialized one chunk at a time"""
+        for chunk in cls.iter_chunks(cls.iter_objects(queryset, chunk_size), chunk_size):
+            yield from serializer_class(chunk, many=True, context=context or {}).data
+
+    @staticmethod
+    def excel_value(value):
+        # Excel cannot store timezone-aware datetimes
+        if getattr(value, 'tzinfo', None) is not None:
+            value = timezone.localtime(value).replace(tzinfo=None)
+        return value
+
+    @classmethod
+    def write_excel(cls, headers, rows, target, title='Export'):
+        """Write rows to ``target`` (path or file) with an openpyxl write-only workbook"""
+        import openpyxl
+
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet(title=title)
+        ws.append(list(headers))
+        for row in rows:
+            ws.append([cls.excel_value(value) for value in row])
+        wb.save(target)
+
+    # ------------------------------------------------------------------
+    # Responses
+    # ------------------------------------------------------------------
+    @staticmethod
+    def attachment(response, filename, export_format):
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{EXTENSIONS[export_format]}"'
+        return response
+
+    @classmethod
+    def stream(cls, export_format, filename, headers, rows):
         """
-        Export queryset to Excel response
+        Streaming response for ``rows`` (an iterable of sequences, or dicts
+        for ``json``/``ndjson``). CSV and (ND)JSON send the first bytes at
+        once; XLSX is built in a temp file first because it is a zip archive.
         """
-        try:
-            import openpyxl
-        except ImportError:
-            logger.error("openpyxl not installed")
-            return HttpResponse("Excel export not available", status=501)
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Export"
-        
-        # Write headers
-        for col_idx, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col_idx, value=header)
-            
-        # Write data
-        for row_idx, obj in enumerate(queryset, 2):
-            row_data = row_callback(obj)
-            for col_idx, value in enumerate(row_data, 1):
-                # Handle timezone aware datetimes for Excel
-                if hasattr(value, 'tzinfo'):
-                    value = value.replace(tzinfo=None)
-                ws.cell(row=row_idx, column=col_idx, value=value)
-                
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{filename}.xlsx"'
-        wb.save(response)
-        
-        return response
+        if export_format == 'csv':
+            response = StreamingHttpResponse(cls.csv_lines(headers, rows), content_type=CONTENT_TYPES['csv'])
+        elif export_format == 'ndjson':
+            response = StreamingHttpResponse(cls.ndjson_lines(headers, rows), content_type=CONTENT_TYPES['ndjson'])
+        elif export_format == 'json':
+            records = (row if isinstance(row, dict) else dict(zip(headers, row)) for row in rows)
+            response = StreamingHttpResponse(cls.json_array(records), content_type=CONTENT_TYPES['json'])
+        elif export_format == 'excel':
+            try:
+                import openpyxl  # noqa: F401
+            except ImportError:
+                logger.error("openpyxl not installed")
+                return HttpResponse("Excel export not available", status=501)
+            spool = tempfile.TemporaryFile()
+            cls.write_excel(headers, rows, spool)
+            spool.seek(0)
+            response = FileResponse(spool, content_type=CONTENT_TYPES['excel'])
+        else:
+            raise ValueError(f'Unsupported export format: {export_format}')
+        return cls.attachment(response, filename, export_format)
 
-    @staticmethod
-    def export_to_json(queryset, filename, serializer_class, many=True):
+    # ------------------------------------------------------------------
+    # Convenience wrappers
+    # ------------------------------------------------------------------
+    @classmethod
+    def export_to_csv(cls, queryset, filename, headers, row_callback, fields=None):
         """
-        Export queryset to JSON response
+        Export queryset to a streaming CSV response
         """
-        from rest_framework.response import Response
-        serializer = serializer_class(queryset, many=many)
-        response = Response(serializer.data)
-        response['Content-Disposition'] = f'attachment; filename="{filename}.json"'
-        return response
+        return cls.stream('csv', filename, headers, cls.iter_rows(queryset, row_callback, fields))
+
+    @classmethod
+    def export_to_excel(cls, queryset, filename, headers, row_callback, fields=None):
+        """
+        Export queryset to an Excel response (write-only workbook)
+        """
+        return cls.stream('excel', filename, headers, cls.iter_rows(queryset, row_callback, fields))
+
+    @classmethod
+    def export_to_json(cls, queryset, filename, serializer_class, many=True, context=None):
+        """
+        Export queryset to a streaming JSON response
+        """
+        if not many:
+            records = [serializer_class(queryset, context=context or {}).data]
+        else:
+            records = cls.serialized_records(queryset, serializer_class, context)
+        response = StreamingHttpResponse(cls.json_array(records), content_type=CONTENT_TYPES['json'])
+        return cls.attachment(response, filename, 'json')
@@ -0,0 +1,300 @@
+# apps/core/services/partition_service.py
+"""
+Monthly range partitioning for the audit tables (PostgreSQL only).
+
+``audit_logs`` (core, public schema) and ``security_audit_logs`` (security,
+every schema) are converted once by a migration into tables partitioned by
+month on their time column, plus a default partition that catches rows
+outside the prepared range. The ``manage_audit_partitions`` command then
+creates upcoming months ahead of time and detaches (or drops) months older
+than ``AUDIT_LOG_SETTINGS["RETENTION_DAYS"]``, so retention never needs a
+row-by-row DELETE and time-window queries only scan the months they touch.
+
+Partitions are named ``<table>_pYYYYMM``; the default one is
+``<table>_default``.
+"""
+
+import logging
+import re
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PartitionedTable = namedtuple('PartitionedTable', 'table column')
+Partition = namedtuple('Partition', 'name month')
+
+
+class AuditPartitionService:
+    """Conversion, creation and expiry of monthly audit partitions"""
+
+    CORE_AUDIT_LOGS = PartitionedTable('audit_logs', 'timestamp')
+    SECURITY_AUDIT_LOGS = PartitionedTable('security_audit_logs', 'created_at')
+
+    NAME_PATTERN = re.compile(r'_p(\d{4})(\d{2})$')
+
+    @staticmethod
+    def retention_days():
+        return getattr(settings, 'AUDIT_LOG_SETTINGS', {}).get('RETENTION_DAYS', 365)
+
+    @staticmethod
+    def months_ahead():
+        return getattr(settings, 'AUDIT_LOG_SETTINGS', {}).get('PARTITION_MONTHS_AHEAD', 3)
+
+    @staticmethod
+    def is_supported(connection):
+        return connection.vendor == 'postgresql'
+
+    # ------------------------------------------------------------------
+    # Months and names
+    # ------------------------------------------------------------------
+    @staticmethod
+    def month_start(value):
+        if isinstance(value, datetime):
+            value = value.date()
+        return date(value.year, value.month, 1)
+
+    @classmethod
+    def add_months(cls, month, count):
+        index = month.year * 12 + month.month - 1 + count
+        return date(index // 12, index % 12 + 1, 1)
+
+    @classmethod
+    def partition_name(cls, table, month):
+        return f'{table}_p{month:%Y%m}'
+
+    @classmethod
+    def month_of(cls, partition_name):
+        match = cls.NAME_PATTERN.search(partition_name)
+        if not match:
+            return None
+        return date(int(match.group(1)), int(match.group(2)), 1)
+
+    @staticmethod
+    def bound(month):
+        # Explicit UTC so bounds do not depend on the session time zone. DDL
+        # cannot take query parameters, so bounds are inlined from dates only
+        return f'{month:%Y-%m-%d} 00:00:00+00'
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+    @staticmethod
+    def table_exists(cursor, table):
+        cursor.execute('SELECT to_regclass(%s) IS NOT NULL', [table])
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def is_partitioned(cursor, table):
+        cursor.execute(
+            'SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))',
+            [table],
+        )
+        return cursor.fetchone()[0]
+
+    @classmethod
+    def partitions(cls, cursor, table):
+        """Attached monthly partitions of ``table``, oldest first"""
+        cursor.execute(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            """,
+            [table],
+        )
+        found = []
+        for (name,) in cursor.fetchall():
+            month = cls.month_of(name)
+            if month:
+                found.append(Partition(name, month))
+        return sorted(found, key=lambda partition: partition.month)
+
+    # ------------------------------------------------------------------
+    # Creation
+    # ------------------------------------------------------------------
+    @classmethod
+    def create_partition(cls, connection, spec, month):
+        """
+        Create the partition for ``month`` unless it exists. Rows already in
+        the default partition for that month are moved into it first, since
+        PostgreSQL refuses to add a partition that would overlap them.
+        """
+        qn = connection.ops.quote_name
+        name = cls.partition_name(spec.table, month)
+        default = f'{spec.table}_default'
+        start, end = cls.bound(month), cls.bound(cls.add_months(month, 1))
+
+        with connection.cursor() as cursor:
+            if cls.table_exists(cursor, name):
+                return False
+
+            overlaps = False
+            if cls.table_exists(cursor, default):
+                cursor.execute(
+                    f'SELECT EXISTS (SELECT 1 FROM {qn(default)} WHERE {qn(spec.column)} >= %s AND {qn(spec.column)} < %s)',
+                    [start, end],
+                )
+                overlaps = cursor.fetchone()[0]
+
+            if overlaps:
+                cursor.execute(
+                    f'CREATE TABLE {qn(name)} (LIKE {qn(spec.table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+                )
+                cursor.execute(
+                    f'WITH moved AS (DELETE FROM {qn(default)} WHERE {qn(spec.column)} >= %s AND {qn(spec.column)} < %s '
+                    f'RETURNING *) INSERT INTO {qn(name)} SELECT * FROM moved',
+                    [start, end],
+                )
+                cursor.execute(
+                    f"ALTER TABLE {qn(spec.table)} ATTACH PARTITION {qn(name)} FOR VALUES FROM ('{start}') TO ('{end}')"
+                )
+            else:
+                cursor.execute(
+                    f"CREATE TABLE {qn(name)} PARTITION OF {qn(spec.table)} FOR VALUES FROM ('{start}') TO ('{end}')"
+                )
+        return True
+
+    @classmethod
+    def ensure_partitions(cls, connection, spec, months_ahead=None, start=None):
+        """Create partitions from ``start`` (default: this month) through ``months_ahead`` months ahead"""
+        if months_ahead is None:
+            months_ahead = cls.months_ahead()
+        current = cls.month_start(timezone.now())
+        month = cls.month_start(start) if start else current
+        last = cls.add_months(current, months_ahead)
+
+        created = []
+        while month <= last:
+            if cls.create_partition(connection, spec, month):
+                created.append(cls.partition_name(spec.table, month))
+            month = cls.add_months(month, 1)
+        return created
+
+    # ------------------------------------------------------------------
+    # Expiry
+    # ------------------------------------------------------------------
+    @classmethod
+    def expired_partitions(cls, connection, spec, retention_days=None):
+        """Partitions whose whole month is older than the retention window"""
+        if retention_days is None:
+            retention_days = cls.retention_days()
+        cutoff = (timezone.now() - timedelta(days=retention_days)).date()
+        with connection.cursor() as cursor:
+            return [
+                partition for partition in cls.partitions(cursor, spec.table)
+                if cls.add_months(partition.month, 1) <= cutoff
+            ]
+
+    @classmethod
+    def expire_partitions(cls, connection, spec, retention_days=None, drop=False):
+        """
+        Detach expired partitions (left as standalone tables for archiving)
+        or drop them. Returns the affected partition names.
+        """
+        qn = connection.ops.quote_name
+        expired = cls.expired_partitions(connection, spec, retention_days)
+        with connection.cursor() as cursor:
+            for partition in expired:
+                cursor.execute(f'ALTER TABLE {qn(spec.table)} DETACH PARTITION {qn(partition.name)}')
+                if drop:
+                    cursor.execute(f'DROP TABLE {qn(partition.name)}')
+        return [partition.name for partition in expired]
+
+    # ------------------------------------------------------------------
+    # One-off conversion (used by migrations)
+    # ------------------------------------------------------------------
+    @classmethod
+    def convert_to_partitioned(cls, connection, spec, months_ahead=None):
+        """
+        Rebuild ``spec.table`` as a monthly partitioned table with the same
+        columns, defaults, indexes and foreign keys, copying existing rows.
+
+        PostgreSQL requires unique constraints on a partitioned table to
+        include the partition key, so the primary key and unique indexes gain
+        the time column. Foreign keys from other tables into the audit table
+        cannot be kept for the same reason and are dropped (their columns stay).
+        """
+        qn = connection.ops.quote_name
+        table, column = spec.table, spec.column
+        old = f'{table}_unpartitioned'
+
+        with connection.cursor() as cursor:
+            if not cls.table_exists(cursor, table) or cls.is_partitioned(cursor, table):
+                return False
+
+            cursor.execute(
+                """
+                SELECT con.conname, array_agg(att.attname ORDER BY key.ord)
+                FROM pg_constraint con
+                CROSS JOIN LATERAL unnest(con.conkey) WITH ORDINALITY AS key(attnum, ord)
+                JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = key.attnum
+                WHERE con.conrelid = to_regclass(%s) AND con.contype = 'p'
+                GROUP BY con.conname
+                """,
+                [table],
+            )
+            pk_name, pk_columns = cursor.fetchone()
+            cursor.execute(
+                """
+                SELECT pg_get_indexdef(i.indexrelid), i.indisunique
+                FROM pg_index i
+                WHERE i.indrelid = to_regclass(%s) AND NOT i.indisprimary
+                """,
+                [table],
+            )
+            indexes = cursor.fetchall()
+            cursor.execute(
+                """
+                SELECT conname, pg_get_constraintdef(oid)
+                FROM pg_constraint
+                WHERE conrelid = to_regclass(%s) AND contype = 'f'
+                """,
+                [table],
+            )
+            foreign_keys = cursor.fetchall()
+            cursor.execute(
+                """
+                SELECT conrelid::regclass::text, conname
+                FROM pg_constraint
+                WHERE confrelid = to_regclass(%s) AND contype = 'f'
+                """,
+                [table],
+            )
+            incoming = cursor.fetchall()
+
+            cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(old)}')
+            cursor.execute(
+                f'CREATE TABLE {qn(table)} (LIKE {qn(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+                f'INCLUDING STORAGE INCLUDING COMMENTS) PARTITION BY RANGE ({qn(column)})'
+            )
+            cursor.execute(f'CREATE TABLE {qn(table + "_default")} PARTITION OF {qn(table)} DEFAULT')
+
+            cursor.execute(f'SELECT MIN({qn(column)}) FROM {qn(old)}')
+            oldest = cursor.fetchone()[0]
+
+        cls.ensure_partitions(connection, spec, months_ahead=months_ahead, start=oldest)
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(old)}')
+            for referencing_table, constraint in incoming:
+                logger.warning(f"Dropping foreign key {constraint} on {referencing_table}: {table} is now partitioned")
+            cursor.execute(f'DROP TABLE {qn(old)} CASCADE')
+
+            key_columns = list(pk_columns) + ([column] if column not in pk_columns else [])
+            cursor.execute(
+                f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(pk_name)} '
+                f'PRIMARY KEY ({", ".join(qn(name) for name in key_columns)})'
+            )
+            for definition, unique in indexes:
+                definition = re.sub(rf' ON (\S+\.)?{re.escape(old)} ', f' ON {qn(table)} ', definition)
+                if unique and not re.search(rf'\b{re.escape(column)}\b', definition.split(' USING ', 1)[-1]):
+                    definition = re.sub(r'\)$', f', {qn(column)})', definition)
+                cursor.execute(definition)
+            for name, definition in foreign_keys:
+                cursor.execute(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}')
+        return True
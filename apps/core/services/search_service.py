@@ -0,0 +1,362 @@
+# apps/core/services/search_service.py
+"""
+Full-text search over students, staff, books and invoices.
+
+Every searchable object has one ``SearchDocument`` row holding its display
+title and its normalised search terms (names, numbers, e-mail and phone
+parts, guardian or author names...). Signals (``apps/core/signals.py``)
+rewrite the row when the object or a related one is saved; bulk writers
+call ``index_objects`` and ``rebuild_search_index`` rebuilds from scratch.
+
+On PostgreSQL the table carries a generated ``search_vector`` tsvector and
+GIN indexes on it and on the terms (``pg_trgm``), so a search is a single
+indexed query across entity types: every term matches as a prefix
+(``asha ra`` finds "Asha Rao"), ``word_similarity`` tolerates typos
+("ashaa") and results are ranked and cut to N per entity type. Other
+databases (SQLite in tests) fall back to substring matching on the terms.
+"""
+
+import logging
+import re
+from collections import OrderedDict, namedtuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+SearchEntity = namedtuple('SearchEntity', 'model prefetch document')
+
+TERM_PATTERN = re.compile(r'[^\W_]+')
+
+
+def _student_document(student):
+    if not student.is_active:
+        return None
+    return student.full_name, [
+        student.full_name,
+        student.admission_number,
+        student.reg_no,
+        student.personal_email,
+        student.institutional_email,
+        student.mobile_primary,
+        *(guardian.full_name for guardian in student.guardians.all()),
+    ]
+
+
+def _staff_document(staff):
+    if not staff.is_active:
+        return None
+    return staff.full_name, [
+        staff.full_name,
+        staff.employee_id,
+        staff.user.email if staff.user_id else '',
+        staff.personal_email,
+        staff.work_email,
+        staff.personal_phone,
+    ]
+
+
+def _book_document(book):
+    if not book.is_active:
+        return None
+    return book.title, [
+        book.title,
+        book.subtitle,
+        book.isbn,
+        *(author.name for author in book.authors.all()),
+        book.keywords,
+    ]
+
+
+def _invoice_document(invoice):
+    if not invoice.is_active:
+        return None
+    student = invoice.student
+    return invoice.invoice_number, [
+        invoice.invoice_number,
+        student.full_name if student else '',
+        student.admission_number if student else '',
+    ]
+
+
+class SearchIndexService:
+    """Maintenance and querying of the SearchDocument index"""
+
+    ENTITIES = OrderedDict([
+        ('student', SearchEntity('students.Student', ['guardians'], _student_document)),
+        ('staff', SearchEntity('hr.Staff', ['user'], _staff_document)),
+        ('book', SearchEntity('library.Book', ['authors'], _book_document)),
+        ('invoice', SearchEntity('finance.Invoice', ['student'], _invoice_document)),
+    ])
+
+    @staticmethod
+    def is_supported(connection):
+        return connection.vendor == 'postgresql'
+
+    @staticmethod
+    def settings():
+        return getattr(settings, 'SEARCH_INDEX', {})
+
+    @classmethod
+    def results_per_type(cls):
+        return cls.settings().get('RESULTS_PER_TYPE', 10)
+
+    @classmethod
+    def max_filter_results(cls):
+        """Cap on ids used to filter a paginated queryset by a search"""
+        return cls.settings().get('MAX_FILTER_RESULTS', 1000)
+
+    @classmethod
+    def min_query_length(cls):
+        return cls.settings().get('MIN_QUERY_LENGTH', 2)
+
+    @staticmethod
+    def tenant_key(tenant):
+        return str(getattr(tenant, 'pk', tenant) or '')
+
+    @staticmethod
+    def terms(text):
+        """Lower-case word and number terms of ``text``"""
+        return TERM_PATTERN.findall(str(text or '').lower())
+
+    # ------------------------------------------------------------------
+    # Entities
+    # ------------------------------------------------------------------
+    @classmethod
+    def model_for(cls, entity_type):
+        return apps.get_model(cls.ENTITIES[entity_type].model)
+
+    @classmethod
+    def entity_type_for(cls, model):
+        label = model._meta.label
+        for entity_type, entity in cls.ENTITIES.items():
+            if entity.model == label:
+                return entity_type
+        return None
+
+    @classmethod
+    def build_document(cls, entity_type, instance):
+        """Unsaved SearchDocument for ``instance``, or None if it is not searchable"""
+        from apps.core.models import SearchDocument
+
+        built = cls.ENTITIES[entity_type].document(instance)
+        if built is None:
+            return None
+        title, parts = built
+
+        terms = dict.fromkeys(term for part in parts for term in cls.terms(part))
+        return SearchDocument(
+            tenant_id=cls.tenant_key(instance.tenant_id),
+            entity_type=entity_type,
+            object_id=str(instance.pk),
+            title=str(title or '')[:255],
+            content=' '.join(terms),
+        )
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+    @classmethod
+    def index(cls, instance):
+        """Write (or remove) the document of one saved object"""
+        from apps.core.models import SearchDocument
+
+        entity_type = cls.entity_type_for(type(instance))
+        document = cls.build_document(entity_type, instance)
+        if document is None:
+            cls.remove(instance)
+            return None
+        SearchDocument.objects.update_or_create(
+            tenant_id=document.tenant_id,
+            entity_type=entity_type,
+            object_id=document.object_id,
+            defaults={'title': document.title, 'content': document.content},
+        )
+        return document
+
+    @classmethod
+    def remove(cls, instance):
+        from apps.core.models import SearchDocument
+
+        SearchDocument.objects.filter(
+            entity_type=cls.entity_type_for(type(instance)), object_id=str(instance.pk)
+        ).delete()
+
+    @classmethod
+    def index_objects(cls, entity_type, queryset, batch_size=500):
+        """
+        Rewrite the documents of every object in ``queryset`` in batches;
+        used after bulk writes that bypass signals. Returns the number of
+        documents written.
+        """
+        from apps.core.models import SearchDocument
+
+        entity = cls.ENTITIES[entity_type]
+        queryset = queryset.prefetch_related(*entity.prefetch).order_by('pk')
+        written = 0
+        batch = []
+
+        def flush():
+            documents = [document for document in (cls.build_document(entity_type, obj) for obj in batch) if document]
+            with transaction.atomic():
+                SearchDocument.objects.filter(
+                    entity_type=entity_type, object_id__in=[str(obj.pk) for obj in batch]
+                ).delete()
+                SearchDocument.objects.bulk_create(documents, batch_size=batch_size)
+            batch.clear()
+            return len(documents)
+
+        for obj in queryset.iterator(chunk_size=batch_size):
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                written += flush()
+        if batch:
+            written += flush()
+        return written
+
+    @classmethod
+    def rebuild(cls, entity_types=None, tenant=None):
+        """
+        Rebuild the documents of the objects in the current schema,
+        optionally only for ``tenant``. Returns documents written per type.
+        """
+        from apps.core.models import SearchDocument
+
+        written = OrderedDict()
+        for entity_type in entity_types or cls.ENTITIES:
+            queryset = cls.model_for(entity_type).all_objects.all()
+            if tenant is not None:
+                queryset = queryset.filter(tenant=tenant)
+            tenant_ids = {cls.tenant_key(value) for value in queryset.order_by().values_list('tenant_id', flat=True).distinct()}
+
+            SearchDocument.objects.filter(entity_type=entity_type, tenant_id__in=tenant_ids).delete()
+            written[entity_type] = cls.index_objects(entity_type, queryset)
+        return written
+
+    # ------------------------------------------------------------------
+    # Searching
+    # ------------------------------------------------------------------
+    @classmethod
+    def search(cls, tenant, query, entity_types=None, limit=None):
+        """
+        Object ids matching ``query``, best first, at most ``limit`` per
+        entity type: ``{'student': ['<uuid>', ...], 'staff': [...]}``
+        """
+        entity_types = [entity_type for entity_type in (entity_types or cls.ENTITIES) if entity_type in cls.ENTITIES]
+        limit = limit or cls.results_per_type()
+        results = OrderedDict((entity_type, []) for entity_type in entity_types)
+
+        terms = cls.terms(query)
+        if not entity_types or len(''.join(terms)) < cls.min_query_length():
+            return results
+
+        if cls.is_supported(connection):
+            rows = cls._search_postgres(cls.tenant_key(tenant), terms, entity_types, limit)
+        else:
+            rows = cls._search_fallback(cls.tenant_key(tenant), terms, entity_types, limit)
+        for entity_type, object_id in rows:
+            results[entity_type].append(object_id)
+        return results
+
+    @classmethod
+    def search_ids(cls, tenant, entity_type, query, limit=None):
+        return cls.search(tenant, query, [entity_type], limit)[entity_type]
+
+    @staticmethod
+    def tsquery(terms):
+        """Prefix tsquery requiring every term, e.g. ``asha:* & ra:*``"""
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    @classmethod
+    def _search_postgres(cls, tenant_id, terms, entity_types, limit):
+        text = ' '.join(terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT entity_type, object_id FROM (
+                    SELECT entity_type, object_id,
+                           row_number() OVER (PARTITION BY entity_type ORDER BY rank DESC, title) AS position
+                    FROM (
+                        SELECT entity_type, object_id, title,
+                               ts_rank_cd(search_vector, query) + word_similarity(%s, content) AS rank
+                        FROM search_documents, to_tsquery('simple', %s) AS query
+                        WHERE tenant_id = %s
+                          AND entity_type = ANY(%s)
+                          AND (search_vector @@ query OR %s <%% content)
+                    ) matches
+                ) ranked
+                WHERE position <= %s
+                ORDER BY entity_type, position
+                """,
+                [text, cls.tsquery(terms), tenant_id, list(entity_types), text, limit],
+            )
+            return cursor.fetchall()
+
+    @classmethod
+    def _search_fallback(cls, tenant_id, terms, entity_types, limit):
+        from apps.core.models import SearchDocument
+
+        queryset = SearchDocument.objects.filter(tenant_id=tenant_id, entity_type__in=entity_types)
+        for term in terms:
+            queryset = queryset.filter(content__contains=term)
+
+        counts = dict.fromkeys(entity_types, 0)
+        rows = []
+        for entity_type, object_id in queryset.order_by('title').values_list('entity_type', 'object_id'):
+            if counts[entity_type] < limit:
+                counts[entity_type] += 1
+                rows.append((entity_type, object_id))
+        return rows
+
+    @staticmethod
+    def in_order(queryset, ids):
+        """Objects of ``queryset`` with the given ids, in the order of ``ids``"""
+        if not ids:
+            return []
+        objects = {str(obj.pk): obj for obj in queryset.filter(pk__in=ids)}
+        return [objects[object_id] for object_id in ids if object_id in objects]
+
+    @staticmethod
+    def ranked(queryset, ids):
+        """``queryset`` narrowed to ``ids`` and ordered like them, still a queryset"""
+        from django.db.models import Case, IntegerField, Value, When
+
+        if not ids:
+            return queryset.none()
+        rank = Case(
+            *[When(pk=object_id, then=Value(position)) for position, object_id in enumerate(ids)],
+            output_field=IntegerField(),
+        )
+        return queryset.filter(pk__in=ids).order_by(rank)
+
+    # ------------------------------------------------------------------
+    # PostgreSQL schema
+    # ------------------------------------------------------------------
+    @staticmethod
+    def create_postgres_indexes(connection):
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            cursor.execute(
+                "ALTER TABLE search_documents ADD COLUMN search_vector tsvector "
+                "GENERATED ALWAYS AS (to_tsvector('simple'::regconfig, content)) STORED"
+            )
+            cursor.execute(
+                'CREATE INDEX search_documents_vector_idx ON search_documents USING gin (search_vector)'
+            )
+            cursor.execute(
+                'CREATE INDEX search_documents_trgm_idx ON search_documents USING gin (content gin_trgm_ops)'
+            )
+            cursor.execute(
+                'CREATE INDEX search_documents_tenant_idx ON search_documents (tenant_id, entity_type)'
+            )
+        logger.info('Created full-text search indexes on search_documents')
+
+    @staticmethod
+    def drop_postgres_indexes(connection):
+        with connection.cursor() as cursor:
+            cursor.execute('DROP INDEX IF EXISTS search_documents_tenant_idx')
+            cursor.execute('DROP INDEX IF EXISTS search_documents_trgm_idx')
+            cursor.execute('DROP INDEX IF EXISTS search_documents_vector_idx')
+            cursor.execute('ALTER TABLE search_documents DROP COLUMN IF EXISTS search_vector')
@@ -0,0 +1,98 @@
+# apps/core/services/sequence_service.py
+"""
+Per-tenant number sequences.
+
+Document numbers (``INV-2025-00042``, ``PAY-2025-SCHOOL-00017``...) come
+from a ``NumberSequence`` counter row per (tenant, prefix) instead of
+scanning for the highest existing number. The row is locked with
+``SELECT ... FOR UPDATE`` and incremented, so concurrent requests and
+batch jobs never receive the same number and allocation costs one indexed
+row update. ``reserve`` hands out a whole block at once for bulk imports.
+
+The lock is held until the surrounding transaction commits: inside
+``transaction.atomic`` numbers are gap-free (a rollback returns them);
+outside one each allocation commits on its own.
+
+The first allocation for a prefix calls ``seed`` to continue from numbers
+issued before the counter existed.
+"""
+
+import logging
+
+from django.db import IntegrityError, transaction
+
+logger = logging.getLogger(__name__)
+
+
+class NumberSequenceService:
+    """Allocation of numbers from NumberSequence counters"""
+
+    @staticmethod
+    def tenant_key(tenant):
+        return str(getattr(tenant, 'pk', tenant) or '')
+
+    @classmethod
+    def reserve(cls, tenant, key, count=1, start=1, seed=None):
+        """
+        Allocate ``count`` consecutive values of sequence ``key`` and return
+        them as a range. ``seed()`` returns the last value already in use
+        (or None) and is only called when the sequence is created.
+        """
+        from apps.core.models import NumberSequence
+
+        if count < 1:
+            raise ValueError('count must be positive')
+        tenant_id = cls.tenant_key(tenant)
+
+        with transaction.atomic():
+            sequence = NumberSequence.objects.select_for_update().filter(tenant_id=tenant_id, key=key).first()
+            if sequence is None:
+                last_used = seed() if seed else None
+                initial = max(start - 1, last_used or 0)
+                try:
+                    with transaction.atomic():
+                        sequence = NumberSequence.objects.create(tenant_id=tenant_id, key=key, last_value=initial)
+                except IntegrityError:
+                    # Another allocation created it first
+                    sequence = NumberSequence.objects.select_for_update().get(tenant_id=tenant_id, key=key)
+
+            first = sequence.last_value + 1
+            sequence.last_value += count
+            sequence.save(update_fields=['last_value', 'updated_at'])
+        return range(first, first + count)
+
+    @classmethod
+    def next_value(cls, tenant, key, start=1, seed=None):
+        return cls.reserve(tenant, key, 1, start=start, seed=seed)[0]
+
+    @classmethod
+    def next_number(cls, tenant, prefix, width=5, start=1, seed=None):
+        """Next ``prefix`` + zero-padded value, e.g. ``PAY-2025-ABC-00042``"""
+        return f"{prefix}{cls.next_value(tenant, prefix, start=start, seed=seed):0{width}d}"
+
+    @classmethod
+    def reserve_numbers(cls, tenant, prefix, count, width=5, start=1, seed=None):
+        """A block of ``count`` formatted numbers for bulk creation"""
+        return [f"{prefix}{value:0{width}d}" for value in cls.reserve(tenant, prefix, count, start=start, seed=seed)]
+
+    # ------------------------------------------------------------------
+    # Seeds
+    # ------------------------------------------------------------------
+    @staticmethod
+    def last_used(queryset, field, prefix):
+        """
+        Seed for numbers already stored in ``field`` as ``prefix`` + digits:
+        returns a callable giving the highest such number (or None).
+        """
+        def seed():
+            value = queryset.filter(**{f'{field}__startswith': prefix}).order_by(f'-{field}').values_list(
+                field, flat=True
+            ).first()
+            if not value:
+                return None
+            try:
+                return int(value[len(prefix):].split('-')[0])
+            except ValueError:
+                logger.warning(f"Cannot continue sequence {prefix!r} after {value!r}; starting over")
+                return None
+        return seed
@@ -0,0 +1,100 @@
+import logging
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from apps.core.services.search_service import SearchIndexService
+
+logger = logging.getLogger(__name__)
+
+
+def auto_index_enabled():
+    return getattr(settings, 'SEARCH_INDEX', {}).get('AUTO_INDEX', True)
+
+
+def _reindex(instances):
+    """Index the given objects; a failure is logged and never breaks the save"""
+    try:
+        with transaction.atomic():
+            for instance in instances:
+                SearchIndexService.index(instance)
+    except Exception:
+        logger.exception('Could not update search index')
+
+
+# ---------------------------------------------------------
+# Keep search documents in step with the searchable objects
+# ---------------------------------------------------------
+def index_on_save(sender, instance, **kwargs):
+    if auto_index_enabled() and not kwargs.get('raw'):
+        _reindex([instance])
+
+
+def remove_on_delete(sender, instance, **kwargs):
+    if auto_index_enabled():
+        SearchIndexService.remove(instance)
+
+
+# Related objects whose fields are part of another object's document
+def index_guardian_student(sender, instance, **kwargs):
+    if auto_index_enabled() and not kwargs.get('raw') and instance.student_id:
+        Student = apps.get_model('students', 'Student')
+        _reindex(Student.all_objects.filter(pk=instance.student_id))
+
+
+def index_user_staff(sender, instance, update_fields=None, **kwargs):
+    # Logins only touch last_login
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    if auto_index_enabled() and not kwargs.get('raw'):
+        Staff = apps.get_model('hr', 'Staff')
+        _reindex(Staff.all_objects.filter(user=instance).select_related('user'))
+
+
+def index_student_invoices(sender, instance, created, **kwargs):
+    if auto_index_enabled() and not kwargs.get('raw') and not created:
+        Invoice = apps.get_model('finance', 'Invoice')
+        _reindex(Invoice.all_objects.filter(student=instance).select_related('student'))
+
+
+def index_book_authors(sender, instance, action, reverse, pk_set, **kwargs):
+    """Books are saved before their authors are set; reindex once they are"""
+    if not auto_index_enabled():
+        return
+    Book = apps.get_model('library', 'Book')
+    if reverse and action == 'pre_clear':
+        # The cleared books are no longer reachable from the author afterwards
+        instance._search_cleared_book_ids = list(Book.all_objects.filter(authors=instance).values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        _reindex([instance])
+        return
+    book_ids = instance.__dict__.pop('_search_cleared_book_ids', []) if action == 'post_clear' else pk_set
+    _reindex(Book.all_objects.filter(pk__in=book_ids).prefetch_related('authors'))
+
+
+def index_author_books(sender, instance, created, **kwargs):
+    if auto_index_enabled() and not kwargs.get('raw') and not created:
+        Book = apps.get_model('library', 'Book')
+        _reindex(Book.all_objects.filter(authors=instance).prefetch_related('authors'))
+
+
+for entity_type in SearchIndexService.ENTITIES:
+    model = SearchIndexService.model_for(entity_type)
+    post_save.connect(index_on_save, sender=model, dispatch_uid=f'search_index_save_{entity_type}')
+    post_delete.connect(remove_on_delete, sender=model, dispatch_uid=f'search_index_delete_{entity_type}')
+
+post_save.connect(index_guardian_student, sender='students.Guardian', dispatch_uid='search_index_guardian')
+post_delete.connect(index_guardian_student, sender='students.Guardian', dispatch_uid='search_index_guardian_delete')
+post_save.connect(index_user_staff, sender=settings.AUTH_USER_MODEL, dispatch_uid='search_index_user')
+post_save.connect(index_student_invoices, sender='students.Student', dispatch_uid='search_index_student_invoices')
+m2m_changed.connect(
+    index_book_authors,
+    sender=apps.get_model('library', 'Book').authors.through,
+    dispatch_uid='search_index_book_authors'
+)
+post_save.connect(index_author_books, sender='library.Author', dispatch_uid='search_index_author_books')
@@ -0,0 +1,81 @@
+"""
+Background tasks for core services using Celery
+"""
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=30)
+def write_audit_batch(self, rows):
+    """
+    Write audit entries that overflowed a web worker's buffer
+
+    Args:
+        rows: List of AuditLog field dicts (JSON-serialised)
+    """
+    from apps.core.services.audit_writer import audit_writer
+
+    written = audit_writer.write_batch(rows, spill_on_error=False)
+    if written != len(rows):
+        raise self.retry(exc=RuntimeError(f"Could not write {len(rows)} audit entries"))
+    logger.info(f"Wrote {written} overflowed audit entries")
+    return written
+
+
+@shared_task(bind=True)
+def run_export_job(self, job_id):
+    """
+    Produce the file of a background export job
+
+    Args:
+        job_id: ExportJob primary key
+    """
+    from apps.core.services.export_jobs import ExportJobService
+
+    job = ExportJobService.run(job_id)
+    logger.info(f"Export job {job_id} finished with status {job.status} ({job.rows_written} rows)")
+    return job.status
+
+
+@shared_task
+def purge_expired_export_jobs():
+    """Delete expired export jobs and their files"""
+    from apps.core.services.export_jobs import ExportJobService
+
+    removed = ExportJobService.purge_expired()
+    logger.info(f"Purged {removed} expired export jobs")
+    return removed
+
+
+@shared_task
+def rebuild_search_index(schema_name=None, entity_types=None):
+    """
+    Rebuild search documents, catching changes made by bulk updates
+
+    Args:
+        schema_name: Tenant schema to rebuild; all active tenants when omitted
+        entity_types: Entity types to rebuild; all when omitted
+    """
+    from django_tenants.utils import schema_context
+
+    from apps.core.services.search_service import SearchIndexService
+    from apps.tenants.models import Tenant
+
+    if schema_name:
+        schemas = [schema_name]
+    else:
+        schemas = list(
+            Tenant.objects.filter(is_active=True).exclude(schema_name='public').values_list('schema_name', flat=True)
+        )
+
+    total = 0
+    for schema in schemas:
+        with schema_context(schema):
+            written = SearchIndexService.rebuild(entity_types=entity_types)
+        total += sum(written.values())
+    logger.info(f"Rebuilt {total} search documents in {len(schemas)} schemas")
+    return total
@@ -0,0 +1,105 @@
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.services.audit_policy import (
+    AGGREGATE, ALWAYS, SAMPLE, SKIP, AuditPolicy, AuditPolicyService, AuditRequestAggregator,
+)
+from apps.core.services.audit_rollup_service import AuditRollupService
+
+POLICY = {
+    'WRITES': 'always',
+    'READS': 'aggregate',
+    'SAMPLE_RATE': 0.1,
+    'RESOURCES': {'AuditLog': {'READS': 'always'}},
+}
+
+
+@override_settings(AUDIT_LOG_SETTINGS={'POLICY': POLICY})
+class AuditPolicyResolutionTests(SimpleTestCase):
+    def resolve(self, resource_type='Student', view_policy=None, tenant_policy=None):
+        with mock.patch.object(AuditPolicyService, 'tenant_overrides', return_value=tenant_policy or {}):
+            return AuditPolicyService.resolve(resource_type, view_policy, tenant=None)
+
+    def test_settings_defaults_and_resource_overrides(self):
+        self.assertEqual(self.resolve(), AuditPolicy(ALWAYS, AGGREGATE, 0.1))
+        self.assertEqual(self.resolve('AuditLog').reads, ALWAYS)
+
+    def test_view_then_tenant_overrides(self):
+        view_policy = {'READS': 'sample', 'SAMPLE_RATE': 0.5}
+        self.assertEqual(self.resolve(view_policy=view_policy), AuditPolicy(ALWAYS, SAMPLE, 0.5))
+
+        tenant_policy = {'READS': 'skip', 'RESOURCES': {'Student': {'WRITES': 'aggregate'}}}
+        self.assertEqual(
+            self.resolve(view_policy=view_policy, tenant_policy=tenant_policy), AuditPolicy(AGGREGATE, SKIP, 0.5)
+        )
+
+    def test_tenants_cannot_skip_writes(self):
+        tenant_policy = {'WRITES': 'sample', 'RESOURCES': {'Student': {'WRITES': 'skip', 'READS': 'skip'}}}
+        self.assertEqual(self.resolve(tenant_policy=tenant_policy), AuditPolicy(SAMPLE, SKIP, 0.1))
+        self.assertEqual(self.resolve(view_policy={'WRITES': 'skip'}).writes, SKIP)
+
+    def test_unknown_modes_audit_everything(self):
+        policy = self.resolve(view_policy={'READS': 'sometimes', 'SAMPLE_RATE': 'often'})
+        self.assertEqual(policy, AuditPolicy(ALWAYS, ALWAYS, 1.0))
+
+    def test_mode_for_method(self):
+        policy = AuditPolicy(ALWAYS, SKIP, 1.0)
+        self.assertEqual(policy.mode_for('get'), SKIP)
+        self.assertEqual(policy.mode_for('POST'), ALWAYS)
+        self.assertTrue(policy.sampled())
+
+
+class AuditRequestAggregatorTests(SimpleTestCase):
+    def make_aggregator(self):
+        aggregator = AuditRequestAggregator()
+        # Drive flushes by hand instead of from the background thread
+        aggregator._ensure_started = lambda: None
+        return aggregator
+
+    def add(self, aggregator, minute, user=None):
+        now = datetime(2025, 3, 4, 10, minute, 30, tzinfo=dt_timezone.utc)
+        with mock.patch('apps.core.services.audit_policy.timezone.now', return_value=now):
+            aggregator.add('READ', 'Student', user=user, tenant_id=None, view_class='StudentListView')
+
+    @mock.patch('apps.core.services.audit_policy.audit_writer')
+    def test_requests_become_one_row_per_key_and_minute(self, audit_writer):
+        aggregator = self.make_aggregator()
+        for _ in range(3):
+            self.add(aggregator, 1)
+        self.assertEqual(aggregator.pending, 3)
+        audit_writer.submit.assert_not_called()
+
+        # The next minute hands the finished one to the writer
+        self.add(aggregator, 2)
+        row = audit_writer.submit.call_args.args[0]
+        self.assertEqual(row['timestamp'], datetime(2025, 3, 4, 10, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual((row['action'], row['resource_type']), ('READ', 'Student'))
+        self.assertEqual(row['extra_data']['event_count'], 3)
+        self.assertEqual(aggregator.pending, 1)
+
+        self.assertEqual(aggregator.flush(), 1)
+        self.assertEqual(aggregator.pending, 0)
+
+    @mock.patch('apps.core.services.audit_policy.audit_writer')
+    @mock.patch('apps.core.services.audit_policy.time.sleep', side_effect=[None, SystemExit])
+    @mock.patch('django.db.close_old_connections')
+    def test_background_flush_includes_the_current_minute(self, close_old_connections, sleep, audit_writer):
+        aggregator = self.make_aggregator()
+        self.add(aggregator, 1)
+
+        with self.assertRaises(SystemExit):
+            aggregator._run()
+        self.assertEqual(audit_writer.submit.call_args.args[0]['extra_data']['event_count'], 1)
+        self.assertEqual(aggregator.pending, 0)
+
+    def test_rollups_count_aggregated_rows(self):
+        row = {
+            'timestamp': datetime(2025, 3, 4, 10, 1, tzinfo=dt_timezone.utc),
+            'action': 'READ',
+            'resource_type': 'Student',
+            'extra_data': {'aggregated': True, 'event_count': 3},
+        }
+        deltas = AuditRollupService.aggregate_rows([row, dict(row, extra_data={})])
+        self.assertEqual(list(deltas.values())[0]['event_count'], 4)
@@ -0,0 +1,52 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import SimpleTestCase
+
+from apps.core.services.audit_rollup_service import AuditRollupService
+
+
+class AuditRollupServiceTests(SimpleTestCase):
+    def row(self, minute, **fields):
+        row = {
+            'timestamp': datetime(2025, 3, 4, 10, minute, tzinfo=dt_timezone.utc),
+            'tenant_id': 't1',
+            'user_id': '7',
+            'user_email': 'teacher@example.com',
+            'action': 'UPDATE',
+            'resource_type': 'Student',
+            'user_ip': '10.0.0.1',
+        }
+        row.update(fields)
+        return row
+
+    def test_rows_in_the_same_hour_share_a_key(self):
+        deltas = AuditRollupService.aggregate_rows([
+            self.row(5, duration_ms=10),
+            self.row(50, status='FAILED', duration_ms=30),
+            self.row(59, user_ip=None),
+        ])
+        self.assertEqual(len(deltas), 2)
+
+        key = AuditRollupService.key_for(self.row(0))
+        self.assertEqual(key.hour, datetime(2025, 3, 4, 10, tzinfo=dt_timezone.utc))
+        counters = deltas[key]
+        self.assertEqual(counters['event_count'], 2)
+        self.assertEqual(counters['failure_count'], 1)
+        self.assertEqual((counters['total_duration_ms'], counters['duration_count']), (40, 2))
+        self.assertEqual(counters['last_event_at'].minute, 50)
+
+    def test_missing_dimensions_become_empty_strings(self):
+        key = AuditRollupService.key_for(self.row(0, user_id=None, user_ip=None))
+        self.assertEqual((key.user_id, key.user_ip), ('', ''))
+
+    def test_spilled_rows_with_string_timestamps(self):
+        key = AuditRollupService.key_for(self.row(0, timestamp='2025-03-04T10:42:00Z'))
+        self.assertEqual(key.hour, datetime(2025, 3, 4, 10, tzinfo=dt_timezone.utc))
+
+    def test_hour_ceiling(self):
+        exact = datetime(2025, 3, 4, 10, tzinfo=dt_timezone.utc)
+        self.assertEqual(AuditRollupService.ceil(exact), exact)
+        self.assertEqual(
+            AuditRollupService.ceil(datetime(2025, 3, 4, 10, 1, tzinfo=dt_timezone.utc)),
+            datetime(2025, 3, 4, 11, tzinfo=dt_timezone.utc),
+        )
@@ -0,0 +1,54 @@
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.core.services.audit_writer import AuditLogWriter
+
+
+class AuditLogWriterTests(SimpleTestCase):
+    def make_writer(self, **overrides):
+        spill_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(spill_dir.cleanup)
+        settings = {'MODE': 'async', 'BUFFER_SIZE': 3, 'BATCH_SIZE': 2, 'SPILL_DIR': spill_dir.name}
+        settings.update(overrides)
+        writer = AuditLogWriter(**settings)
+        # Drive flushes by hand instead of from the background thread
+        writer._ensure_started = lambda: None
+        return writer
+
+    def test_sync_mode_writes_immediately(self):
+        writer = self.make_writer(MODE='sync')
+        with mock.patch.object(writer, 'write_batch') as write_batch:
+            writer.submit({'action': 'LOGIN'})
+        write_batch.assert_called_once_with([{'action': 'LOGIN'}])
+        self.assertEqual(writer.pending, 0)
+
+    def test_flush_writes_in_batches(self):
+        writer = self.make_writer()
+        for index in range(3):
+            writer.submit({'resource_id': str(index)})
+
+        with mock.patch.object(writer, 'write_batch', side_effect=len) as write_batch:
+            self.assertEqual(writer.flush(), 3)
+        self.assertEqual([len(call.args[0]) for call in write_batch.call_args_list], [2, 1])
+        self.assertEqual(writer.pending, 0)
+
+    def test_full_buffer_drops_when_configured(self):
+        writer = self.make_writer(OVERFLOW='drop')
+        for index in range(5):
+            writer.submit({'resource_id': str(index)})
+        self.assertEqual(writer.pending, 3)
+        self.assertEqual(writer.dropped, 2)
+
+    def test_full_buffer_spills_and_replays(self):
+        writer = self.make_writer()
+        for index in range(4):
+            writer.submit({'resource_id': str(index)})
+        self.assertEqual(writer.spilled, 1)
+
+        with mock.patch('apps.core.services.audit_writer.time.time', return_value=0), \
+                mock.patch.object(writer, 'write_batch', side_effect=len) as write_batch:
+            self.assertEqual(writer.replay_spill(), 1)
+        write_batch.assert_called_once_with([{'resource_id': '3'}], spill_on_error=False)
+        self.assertEqual(writer.replay_spill(), 0)
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.cache import InstrumentedLocMemCache, TenantResolutionCache, cache_metrics, tenant_cache_key
+
+
+class FakeTenant:
+    def __init__(self, pk, slug):
+        self.pk = pk
+        self.slug = slug
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tenant-resolution-tests'}})
+class TenantResolutionCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = TenantResolutionCache(max_entries=2, cache_alias='default')
+        self.cache.shared_cache.clear()
+        self.calls = 0
+
+    def resolver(self, value):
+        def resolve():
+            self.calls += 1
+            return value
+        return resolve
+
+    def test_resolves_once(self):
+        tenant = FakeTenant(1, 'alpha')
+        self.assertEqual(self.cache.get_or_resolve('slug', 'alpha', self.resolver(tenant)).slug, 'alpha')
+        self.assertEqual(self.cache.get_or_resolve('slug', 'alpha', self.resolver(tenant)).slug, 'alpha')
+        self.assertEqual(self.calls, 1)
+
+    def test_misses_are_cached(self):
+        self.assertIsNone(self.cache.get_or_resolve('slug', 'missing', self.resolver(None)))
+        self.assertIsNone(self.cache.get_or_resolve('slug', 'missing', self.resolver(None)))
+        self.assertEqual(self.calls, 1)
+
+    def test_shared_cache_survives_local_clear(self):
+        self.cache.get_or_resolve('id', '1', self.resolver(FakeTenant(1, 'alpha')))
+        self.cache.clear()
+        self.cache.get_or_resolve('id', '1', self.resolver(FakeTenant(1, 'alpha')))
+        self.assertEqual(self.calls, 1)
+
+    def test_invalidate(self):
+        self.cache.get_or_resolve('domain', 'Alpha.example.com', self.resolver(FakeTenant(1, 'alpha')))
+        self.cache.invalidate_domain('alpha.example.com')
+        self.cache.get_or_resolve('domain', 'alpha.example.com', self.resolver(None))
+        self.assertEqual(self.calls, 2)
+
+    def test_lru_eviction(self):
+        for slug in ('a', 'b', 'c'):
+            self.cache.get_or_resolve('slug', slug, self.resolver(FakeTenant(slug, slug)))
+        self.assertEqual(len(self.cache._local), 2)
+
+
+class TenantCacheKeyTests(SimpleTestCase):
+    def test_keys_are_namespaced_by_schema(self):
+        with mock.patch.object(connection, 'schema_name', 'alpha', create=True):
+            alpha = tenant_cache_key('stats', 'eduerp', 1)
+        with mock.patch.object(connection, 'schema_name', 'beta', create=True):
+            beta = tenant_cache_key('stats', 'eduerp', 1)
+
+        self.assertEqual(alpha, 'alpha:eduerp:1:stats')
+        self.assertNotEqual(alpha, beta)
+
+
+class CacheMetricsTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = InstrumentedLocMemCache('metrics-tests', {'ALIAS': 'metrics-tests'})
+        self.cache.clear()
+        cache_metrics.reset()
+
+    def test_hits_misses_and_writes_are_counted(self):
+        self.cache.set('a', 1)
+        self.cache.set('empty', None)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertIsNone(self.cache.get('empty', 'default'))
+        self.assertEqual(self.cache.get('missing', 'default'), 'default')
+        self.assertEqual(self.cache.get_many(['a', 'missing']), {'a': 1})
+        self.cache.delete('a')
+
+        stats = cache_metrics.snapshot('metrics-tests')['metrics-tests']
+        self.assertEqual((stats['hits'], stats['misses']), (3, 2))
+        self.assertEqual((stats['sets'], stats['deletes'], stats['calls']), (2, 1, 7))
+        self.assertEqual(stats['hit_ratio'], 0.6)
+        self.assertGreaterEqual(stats['max_ms'], 0)
+
+    def test_atomic_counter(self):
+        self.cache.add('counter', 0, 60)
+        self.cache.add('counter', 0, 60)
+        self.assertEqual(self.cache.incr('counter'), 1)
+        self.assertEqual(self.cache.incr('counter'), 2)
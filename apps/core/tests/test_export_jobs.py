@@ -0,0 +1,70 @@
+from django.core.files.base import ContentFile
+from django.test import RequestFactory, SimpleTestCase
+
+from apps.core.models import ExportJob
+from apps.core.services.export_jobs import ExportJobService
+
+
+class FakeJob:
+    export_format = 'csv'
+    filename = 'students'
+
+    def __init__(self, content):
+        self.file = ContentFile(content)
+        self.file_size = len(content)
+
+
+class ExportJobServiceTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.job = FakeJob(b'0123456789')
+
+    def download(self, range_header=None):
+        extra = {'HTTP_RANGE': range_header} if range_header else {}
+        return ExportJobService.download_response(self.factory.get('/', **extra), self.job)
+
+    def test_fingerprint_ignores_param_order(self):
+        first = ExportJobService.fingerprint('school', 'app.View', 'csv', {'a': '1', 'b': '2'}, 7)
+        second = ExportJobService.fingerprint('school', 'app.View', 'csv', {'b': '2', 'a': '1'}, 7)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, ExportJobService.fingerprint('school', 'app.View', 'json', {'a': '1', 'b': '2'}, 7))
+        self.assertNotEqual(first, ExportJobService.fingerprint('school', 'app.View', 'csv', {'a': '1', 'b': '2'}, 8))
+
+    def test_full_download(self):
+        response = self.download()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="students.csv"')
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+
+    def test_range_resumes_download(self):
+        response = self.download('bytes=4-')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 4-9/10')
+        self.assertEqual(response['Content-Length'], '6')
+        self.assertEqual(b''.join(response.streaming_content), b'456789')
+
+    def test_suffix_and_bounded_ranges(self):
+        self.assertEqual(b''.join(self.download('bytes=-3').streaming_content), b'789')
+        self.assertEqual(b''.join(self.download('bytes=2-4').streaming_content), b'234')
+
+    def test_unsatisfiable_range(self):
+        response = self.download('bytes=10-')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_progress(self):
+        job = ExportJob(total_rows=200, rows_written=50)
+        self.assertEqual(job.progress, 25)
+
+        job.rows_written = 200
+        self.assertEqual(job.progress, 99)
+
+        job.status = ExportJob.Status.COMPLETED
+        self.assertEqual(job.progress, 100)
+
+        self.assertIsNone(ExportJob(total_rows=None).progress)
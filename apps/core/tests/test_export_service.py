@@ -0,0 +1,55 @@
+import json
+from datetime import date
+
+from django.test import SimpleTestCase
+
+from apps.core.services.export_service import ExportService
+
+
+class FakeQuerySet:
+    """Records how rows are pulled so tests can check nothing is materialised"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.chunk_size = None
+        self.fields = None
+
+    def values_list(self, *fields):
+        self.fields = fields
+        return self
+
+    def iterator(self, chunk_size=None):
+        self.chunk_size = chunk_size
+        return iter(self.rows)
+
+
+class ExportServiceTests(SimpleTestCase):
+    def test_csv_is_streamed(self):
+        queryset = FakeQuerySet([('A1', date(2025, 1, 2)), ('A2', None)])
+        response = ExportService.export_to_csv(queryset, 'students', ['No', 'Date'], None, fields=['no', 'date'])
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="students.csv"')
+        self.assertEqual(queryset.fields, ('no', 'date'))
+        self.assertIsNotNone(queryset.chunk_size)
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.splitlines(), ['No,Date', 'A1,2025-01-02', 'A2,'])
+
+    def test_row_callback_receives_projection(self):
+        rows = ExportService.iter_rows(FakeQuerySet([(1, 2)]), lambda values: [sum(values)], fields=['a', 'b'])
+        self.assertEqual(list(rows), [[3]])
+
+    def test_json_array_and_ndjson(self):
+        array = ''.join(ExportService.json_array({'n': n} for n in range(3)))
+        self.assertEqual(json.loads(array), [{'n': 0}, {'n': 1}, {'n': 2}])
+        self.assertEqual(''.join(ExportService.json_array([])), '[]')
+
+        lines = list(ExportService.ndjson_lines(['No', 'Date'], [('A1', date(2025, 1, 2))]))
+        self.assertEqual(json.loads(lines[0]), {'No': 'A1', 'Date': '2025-01-02'})
+
+    def test_chunks(self):
+        self.assertEqual([len(chunk) for chunk in ExportService.iter_chunks(range(5), 2)], [2, 2, 1])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            ExportService.stream('pdf', 'x', [], [])
@@ -0,0 +1,40 @@
+from django.test import TestCase
+
+from apps.core.models import NumberSequence
+from apps.core.services.sequence_service import NumberSequenceService
+
+
+class NumberSequenceServiceTests(TestCase):
+    def test_numbers_are_consecutive(self):
+        self.assertEqual(NumberSequenceService.next_number('t1', 'PAY-2025-'), 'PAY-2025-00001')
+        self.assertEqual(NumberSequenceService.next_number('t1', 'PAY-2025-'), 'PAY-2025-00002')
+        self.assertEqual(NumberSequence.objects.get(tenant_id='t1', key='PAY-2025-').last_value, 2)
+
+    def test_sequences_are_per_tenant_and_prefix(self):
+        NumberSequenceService.next_value('t1', 'PAY-')
+        NumberSequenceService.next_value('t1', 'PAY-')
+
+        self.assertEqual(NumberSequenceService.next_value('t2', 'PAY-'), 1)
+        self.assertEqual(NumberSequenceService.next_value('t1', 'REF-'), 1)
+
+    def test_block_reservation(self):
+        numbers = NumberSequenceService.reserve_numbers('t1', 'ADM-', 3, width=4)
+
+        self.assertEqual(numbers, ['ADM-0001', 'ADM-0002', 'ADM-0003'])
+        self.assertEqual(NumberSequenceService.next_number('t1', 'ADM-', width=4), 'ADM-0004')
+
+    def test_seed_and_start_only_apply_to_new_sequences(self):
+        calls = []
+
+        def seed():
+            calls.append(1)
+            return 41
+
+        self.assertEqual(NumberSequenceService.next_value('t1', 'INV-', seed=seed), 42)
+        self.assertEqual(NumberSequenceService.next_value('t1', 'INV-', seed=seed), 43)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(NumberSequenceService.next_value('t1', 'PO-', start=1000), 1000)
+
+    def test_count_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            NumberSequenceService.reserve('t1', 'PAY-', 0)
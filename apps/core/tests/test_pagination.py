@@ -0,0 +1,67 @@
+from django.test import TestCase
+
+from apps.core.models import SearchDocument
+from apps.core.utils.pagination import InvalidCursor, KeysetPaginator
+
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        # Rows created in one go share timestamps, so the pk breaks ties
+        SearchDocument.objects.bulk_create([
+            SearchDocument(entity_type='student', object_id=str(index), title=f'Student {index}')
+            for index in range(5)
+        ])
+        self.queryset = SearchDocument.objects.all()
+        self.expected = list(self.queryset.order_by('-updated_at', '-pk'))
+
+    def paginator(self, **kwargs):
+        return KeysetPaginator(self.queryset, 2, '-updated_at', **kwargs)
+
+    def test_walk_forward_and_back(self):
+        paginator = self.paginator()
+        first = paginator.page()
+        self.assertEqual(first.object_list, self.expected[:2])
+        self.assertFalse(first.has_previous())
+
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+        self.assertEqual(second.object_list, self.expected[2:4])
+        self.assertEqual(third.object_list, self.expected[4:])
+        self.assertFalse(third.has_next())
+
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual(back.object_list, self.expected[2:4])
+        self.assertTrue(back.has_next())
+        self.assertEqual(paginator.page(back.previous_cursor).object_list, self.expected[:2])
+        self.assertFalse(paginator.page(back.previous_cursor).has_previous())
+
+    def test_each_page_is_one_query(self):
+        paginator = self.paginator(count=False)
+        cursor = paginator.page().next_cursor
+
+        with self.assertNumQueries(1):
+            page = paginator.page(cursor)
+        self.assertIsNone(page.paginator.count)
+
+    def test_count(self):
+        self.assertEqual(self.paginator().count, 5)
+
+    def test_mixed_direction_ordering(self):
+        ordering = ('entity_type', '-object_id')
+        SearchDocument.objects.bulk_create([
+            SearchDocument(entity_type='staff', object_id=str(index), title=f'Staff {index}')
+            for index in range(3)
+        ])
+        expected = list(self.queryset.order_by(*ordering, '-pk'))
+        paginator = KeysetPaginator(self.queryset, 3, ordering, count=False)
+
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        self.assertEqual([obj for page in pages for obj in page], expected)
+        self.assertEqual(paginator.page(pages[-1].previous_cursor).object_list, expected[3:6])
+
+    def test_invalid_cursor(self):
+        for cursor in ('not-a-cursor', 'e30', 'eyJ2IjogImRheSIsICJwayI6ICIxIn0'):
+            with self.assertRaises(InvalidCursor):
+                self.paginator().page(cursor)
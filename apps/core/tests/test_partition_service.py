@@ -0,0 +1,36 @@
+from datetime import date, datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.core.services.partition_service import AuditPartitionService, Partition
+
+
+class AuditPartitionServiceTests(SimpleTestCase):
+    spec = AuditPartitionService.CORE_AUDIT_LOGS
+
+    def test_month_arithmetic(self):
+        self.assertEqual(AuditPartitionService.add_months(date(2025, 11, 1), 3), date(2026, 2, 1))
+        self.assertEqual(AuditPartitionService.add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
+        self.assertEqual(AuditPartitionService.month_start(datetime(2025, 3, 31, 23, 59)), date(2025, 3, 1))
+
+    def test_partition_names_round_trip(self):
+        name = AuditPartitionService.partition_name('audit_logs', date(2025, 7, 1))
+        self.assertEqual(name, 'audit_logs_p202507')
+        self.assertEqual(AuditPartitionService.month_of(name), date(2025, 7, 1))
+        self.assertIsNone(AuditPartitionService.month_of('audit_logs_default'))
+
+    def test_only_whole_months_past_retention_expire(self):
+        partitions = [
+            Partition('audit_logs_p202403', date(2024, 3, 1)),
+            Partition('audit_logs_p202404', date(2024, 4, 1)),
+            Partition('audit_logs_p202405', date(2024, 5, 1)),
+        ]
+        connection = mock.MagicMock()
+        now = datetime(2025, 5, 15, tzinfo=dt_timezone.utc)
+        with mock.patch.object(AuditPartitionService, 'partitions', return_value=partitions), \
+                mock.patch('apps.core.services.partition_service.timezone.now', return_value=now):
+            expired = AuditPartitionService.expired_partitions(connection, self.spec, retention_days=365)
+
+        # Cutoff is 2024-05-15: April has ended, May still holds retained rows
+        self.assertEqual([partition.name for partition in expired], ['audit_logs_p202403', 'audit_logs_p202404'])
@@ -0,0 +1,97 @@
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from apps.academics.models import AcademicYear
+from apps.core.cache import tenant_resolution_cache
+from apps.core.middleware.tenant import TenantMiddleware
+from apps.core.utils.tenant import clear_tenant, set_current_tenant
+from apps.core.utils.validation import (
+    FIELDS, FULL, TENANT, get_default_save_validation, get_save_validation, save_validation,
+)
+from apps.tenants.models import Domain, Tenant
+
+
+class SaveValidationModeTests(SimpleTestCase):
+    def test_context_manager_sets_and_restores_mode(self):
+        self.assertIsNone(get_save_validation())
+        with save_validation(TENANT):
+            self.assertEqual(get_save_validation(), TENANT)
+            with save_validation(FULL):
+                self.assertEqual(get_save_validation(), FULL)
+            self.assertEqual(get_save_validation(), TENANT)
+        self.assertIsNone(get_save_validation())
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            with save_validation('strict'):
+                pass
+
+    @override_settings(MODEL_VALIDATION={})
+    def test_default_mode(self):
+        self.assertEqual(get_default_save_validation(), FIELDS)
+
+
+class TenantValidationTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant(
+            name="Test School",
+            schema_name="test_school",
+            subdomain="test-school",
+            status="active"
+        )
+        self.tenant.auto_create_schema = False
+        self.tenant.save()
+        Domain.objects.create(tenant=self.tenant, domain="test-school.com", is_primary=True)
+        tenant_resolution_cache.clear()
+        self.addCleanup(clear_tenant)
+
+    def academic_year(self):
+        return AcademicYear(
+            name="2024-2025",
+            code="AY2425",
+            start_date=date(2024, 4, 1),
+            end_date=date(2025, 3, 31),
+            tenant_id=self.tenant.pk
+        )
+
+    def test_current_tenant_is_used_without_query(self):
+        set_current_tenant(self.tenant)
+        year = self.academic_year()
+
+        with self.assertNumQueries(0):
+            year.validate_for_save(TENANT)
+            year.validate_for_save(FIELDS)
+
+    def test_tenant_lookup_is_cached(self):
+        self.academic_year().validate_for_save(TENANT)
+
+        with self.assertNumQueries(0):
+            self.academic_year().validate_for_save(TENANT)
+
+    def test_inactive_tenant_is_rejected(self):
+        self.tenant.is_active = False
+        set_current_tenant(self.tenant)
+
+        with self.assertRaises(ValidationError):
+            self.academic_year().validate_for_save(TENANT)
+
+    def test_deactivated_tenant_is_not_served_to_the_middleware(self):
+        self.academic_year().validate_for_save(TENANT)
+
+        self.tenant.is_active = False
+        self.tenant.save(update_fields=['is_active'])
+        year = self.academic_year()
+
+        with self.assertRaises(ValidationError):
+            year.validate_for_save(TENANT)
+        self.assertIsNone(TenantMiddleware(lambda request: None)._lookup_tenant_by_id(self.tenant.pk))
+
+    def test_save_uses_active_mode(self):
+        set_current_tenant(self.tenant)
+        with save_validation(TENANT):
+            year = self.academic_year()
+            year.save()
+
+        self.assertTrue(AcademicYear.objects.filter(pk=year.pk).exists())
@@ -0,0 +1,128 @@
+from datetime import date
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.academics.models import AcademicYear
+from apps.core.models import SearchDocument
+from apps.core.services.search_service import SearchIndexService
+from apps.students.models import Student
+from apps.students.services.bulk_import import BulkStudentImportService
+from apps.tenants.models import Domain, Tenant
+
+
+class SearchTermsTests(SimpleTestCase):
+    def test_terms_split_names_numbers_and_emails(self):
+        self.assertEqual(
+            SearchIndexService.terms('Asha RAO adm-2025-0001 asha.rao@example.com'),
+            ['asha', 'rao', 'adm', '2025', '0001', 'asha', 'rao', 'example', 'com'],
+        )
+
+    def test_tsquery_matches_every_term_as_prefix(self):
+        self.assertEqual(SearchIndexService.tsquery(['asha', 'ra']), 'asha:* & ra:*')
+
+
+class SearchIndexServiceTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant(
+            name="Test School",
+            schema_name="test_school",
+            subdomain="test-school",
+            status="active"
+        )
+        self.tenant.auto_create_schema = False
+        self.tenant.save()
+        Domain.objects.create(tenant=self.tenant, domain="test-school.com", is_primary=True)
+
+        self.academic_year = AcademicYear.objects.create(
+            name="2024-2025",
+            code="AY2425",
+            start_date=date(2024, 4, 1),
+            end_date=date(2025, 3, 31),
+            tenant=self.tenant
+        )
+
+    def document(self, entity_type, object_id, title, tenant_id=None):
+        return SearchDocument.objects.create(
+            tenant_id=tenant_id or str(self.tenant.pk),
+            entity_type=entity_type,
+            object_id=object_id,
+            title=title,
+            content=' '.join(SearchIndexService.terms(title)),
+        )
+
+    def test_search_groups_results_by_entity_type(self):
+        self.document('student', 's1', 'Asha Rao')
+        self.document('staff', 'e1', 'Ashok Kumar')
+        self.document('book', 'b1', 'Algebra')
+        self.document('student', 's2', 'Asha Rao', tenant_id='other')
+
+        results = SearchIndexService.search(self.tenant, 'ash', ['student', 'staff', 'book'])
+
+        self.assertEqual(dict(results), {'student': ['s1'], 'staff': ['e1'], 'book': []})
+
+    def test_every_term_must_match_and_limit_applies_per_type(self):
+        for index in range(3):
+            self.document('student', f's{index}', f'Asha Rao {index}')
+        self.document('student', 'x', 'Asha Iyer')
+
+        self.assertEqual(len(SearchIndexService.search_ids(self.tenant, 'student', 'asha ra', limit=2)), 2)
+        self.assertEqual(SearchIndexService.search_ids(self.tenant, 'student', 'asha iy'), ['x'])
+        self.assertEqual(SearchIndexService.search_ids(self.tenant, 'student', 'a'), [])
+
+    def test_ranked_keeps_search_order(self):
+        first = self.document('student', 's1', 'Asha Rao')
+        second = self.document('student', 's2', 'Asha Iyer')
+        queryset = SearchDocument.objects.all()
+
+        self.assertEqual(list(SearchIndexService.ranked(queryset, [str(second.pk), str(first.pk)])), [second, first])
+        self.assertEqual(list(SearchIndexService.ranked(queryset, [])), [])
+
+    def test_imported_students_are_indexed(self):
+        content = (
+            "first_name,last_name,dob,email,phone,father_name,father_phone\n"
+            "Asha,Rao,2015-03-02,asha@example.com,9876543210,Ravi Rao,9876500000\n"
+            "Vikram,Shah,2014-07-19,vikram@example.com,9876543211,,\n"
+        )
+        BulkStudentImportService(self.tenant, self.academic_year).import_csv(content)
+        asha = Student.objects.get(personal_email='asha@example.com')
+
+        self.assertEqual(SearchIndexService.search_ids(self.tenant, 'student', 'ravi'), [str(asha.pk)])
+        self.assertEqual(SearchIndexService.search_ids(self.tenant, 'student', asha.admission_number), [str(asha.pk)])
+        self.assertEqual(
+            SearchIndexService.in_order(Student.objects.all(), [str(asha.pk)]), [asha]
+        )
+
+    def test_soft_deleted_students_leave_the_index(self):
+        content = "first_name,last_name,dob,email,phone\nAsha,Rao,2015-03-02,asha@example.com,9876543210\n"
+        BulkStudentImportService(self.tenant, self.academic_year).import_csv(content)
+        student = Student.objects.get(personal_email='asha@example.com')
+
+        student.is_active = False
+        SearchIndexService.index(student)
+
+        self.assertEqual(SearchIndexService.search_ids(self.tenant, 'student', 'asha'), [])
+
+    def test_books_are_searchable_by_authors_set_after_save(self):
+        from apps.core.utils.tenant import tenant_context
+        from apps.library.models import Author, Book, BookCategory, Publisher
+
+        with tenant_context(self.tenant):
+            category = BookCategory.objects.create(name="Mathematics", code="MATH", tenant=self.tenant)
+            publisher = Publisher.objects.create(name="School Press", tenant=self.tenant)
+            author = Author.objects.create(name="Ramanujan", tenant=self.tenant)
+            book = Book.objects.create(
+                isbn="9780000000001",
+                title="Number Theory",
+                category=category,
+                publisher=publisher,
+                publication_year=2020,
+                shelf_number="M1",
+                tenant=self.tenant
+            )
+            book.authors.set([author])
+
+            self.assertEqual(SearchIndexService.search_ids(self.tenant, 'book', 'ramanujan'), [str(book.pk)])
+
+            author.name = "Hardy"
+            author.save()
+            self.assertEqual(SearchIndexService.search_ids(self.tenant, 'book', 'hardy'), [str(book.pk)])
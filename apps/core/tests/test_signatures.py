@@ -0,0 +1,108 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from apps.academics.models import AcademicYear
+from apps.core.services.signature_service import DataSignatureService
+from apps.exams.models import ExamResult
+from apps.students.models import Student
+from apps.students.services.bulk_import import BulkStudentImportService
+from apps.tenants.models import Domain, Tenant
+
+
+class DataSignatureTests(SimpleTestCase):
+    def test_values_are_normalised_like_database_values(self):
+        result = ExamResult(percentage='87.5', total_marks_obtained=Decimal('350'))
+        stored = ExamResult(id=str(result.id), percentage=Decimal('87.50'), total_marks_obtained=Decimal('350.00'))
+
+        self.assertEqual(DataSignatureService.calculate(result), DataSignatureService.calculate(stored))
+
+    def test_signed_and_unsigned_fields(self):
+        result = ExamResult(percentage=Decimal('87.50'))
+        signature = result.calculate_signature()
+
+        result.rank = 3
+        result.request_count = 10
+        self.assertEqual(result.calculate_signature(), signature)
+
+        result.percentage = Decimal('88.00')
+        self.assertNotEqual(result.calculate_signature(), signature)
+
+    def test_refresh_signature_only_for_signed_update_fields(self):
+        result = ExamResult(percentage=Decimal('87.50'))
+
+        self.assertEqual(result.refresh_signature(['rank', 'total_students']), ['rank', 'total_students'])
+        self.assertEqual(result.data_signature, '')
+
+        self.assertEqual(result.refresh_signature(['percentage']), {'percentage', 'data_signature'})
+        self.assertTrue(result.verify_integrity())
+
+    def test_fields_set_on_save_are_not_signed(self):
+        from apps.assignments.models import Submission
+
+        signed = {name for name, _, _ in DataSignatureService.signed_fields(Submission)}
+        self.assertNotIn('submitted_at', signed)
+        self.assertNotIn('submission_file', signed)
+        self.assertNotIn('created_at', signed)
+        self.assertIn('submission_text', signed)
+
+    def test_sign_objects(self):
+        results = DataSignatureService.sign_objects([ExamResult(percentage=Decimal(value)) for value in ('1', '2')])
+
+        self.assertTrue(all(result.verify_integrity() for result in results))
+        self.assertNotEqual(results[0].data_signature, results[1].data_signature)
+
+
+class StoredSignatureTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant(
+            name="Test School",
+            schema_name="test_school",
+            subdomain="test-school",
+            status="active"
+        )
+        self.tenant.auto_create_schema = False
+        self.tenant.save()
+        Domain.objects.create(tenant=self.tenant, domain="test-school.com", is_primary=True)
+
+        academic_year = AcademicYear.objects.create(
+            name="2024-2025",
+            code="AY2425",
+            start_date=date(2024, 4, 1),
+            end_date=date(2025, 3, 31),
+            tenant=self.tenant
+        )
+        content = "first_name,last_name,dob,email,phone\nAsha,Rao,2015-03-02,asha@example.com,9876543210\n"
+        BulkStudentImportService(self.tenant, academic_year).import_csv(content)
+
+    def student(self):
+        return Student.objects.get(personal_email='asha@example.com')
+
+    def test_signatures_verify_after_reload(self):
+        student = self.student()
+        self.assertTrue(student.verify_integrity())
+
+        student.last_name = 'Iyer'
+        student.save(update_fields=['last_name'])
+        self.assertTrue(self.student().verify_integrity())
+
+    def test_verifier_finds_and_resigns_out_of_band_changes(self):
+        Student.objects.filter(pk=self.student().pk).update(last_name='Iyer')
+        self.assertFalse(self.student().verify_integrity())
+
+        self.assertEqual(DataSignatureService.verify_model(Student, chunk_size=1), (1, 1))
+        self.assertEqual(DataSignatureService.verify_model(Student, resign=True), (1, 1))
+        self.assertEqual(DataSignatureService.verify_model(Student), (1, 0))
+
+    def test_auto_now_add_rows_verify_after_reload(self):
+        from apps.core.utils.tenant import tenant_context
+        from apps.hostel.models import DailyMessMenu, MessAttendance
+
+        with tenant_context(self.tenant):
+            menu = DailyMessMenu.objects.create(day='monday', meal='lunch', date=date(2024, 6, 3), tenant=self.tenant)
+            attendance = MessAttendance.objects.create(
+                student=self.student(), daily_menu=menu, amount_paid=Decimal('40'), tenant=self.tenant
+            )
+
+        self.assertTrue(MessAttendance.objects.get(pk=attendance.pk).verify_integrity())
@@ -16,6 +16,12 @@ from .tenant import (
     get_tenant_schema,
 )
 
+# Save validation modes
+from .validation import (
+    save_validation,
+    get_save_validation,
+)
+
 # Then import audit utilities
 try:
     from .audit import (
@@ -63,6 +69,10 @@ __all__ = [
     'user_context',
     'get_tenant_schema',
     
+    # Validation utilities
+    'save_validation',
+    'get_save_validation',
+    
     # Audit utilities
     'audit_log',
     'AuditAction',
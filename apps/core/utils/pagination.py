@@ -0,0 +1,175 @@
+# apps/core/utils/pagination.py
+"""
+Keyset (cursor) pagination shared by BaseListView and BaseListAPIView.
+
+Pages are read in ``(ordering fields..., pk)`` order: the cursor holds the
+values of the first or last row of the current page and the next page is
+``WHERE (created_at, id) < (cursor values) ... LIMIT n + 1``, spelled out
+field by field so each field may have its own direction. With the
+``(tenant, created_at)`` and ``(tenant, is_active, created_at)`` indexes
+of the base models every page costs the same, however deep, and no
+``COUNT(*)`` or ``OFFSET`` is needed.
+
+The optional count is the planner's row estimate for the query on
+PostgreSQL (``pg_class``/``pg_statistic`` statistics, no table scan) and
+an exact count on other databases.
+"""
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def estimate_count(queryset):
+    """Approximate number of rows of ``queryset``"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator"""
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def _json_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` by ``ordering``: one field name or a sequence of
+    them (non-null fields, ``-`` for descending). The primary key is added
+    as the last tie-breaker, in the direction of the last field, unless the
+    ordering already ends with it.
+    """
+
+    def __init__(self, queryset, per_page, ordering='-created_at', count=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        opts = queryset.model._meta
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        # [(lookup name, model field, descending)]
+        self.keys = []
+        for name in ordering:
+            field_name = name.lstrip('-')
+            field = opts.pk if field_name in ('pk', opts.pk.name) else opts.get_field(field_name)
+            self.keys.append((field_name, field, name.startswith('-')))
+        if self.keys[-1][1] is not opts.pk:
+            self.keys.append(('pk', opts.pk, self.keys[-1][2]))
+        self.with_count = count
+        self._count = None
+
+    @property
+    def count(self):
+        """Approximate total, or None when counting is disabled"""
+        if not self.with_count:
+            return None
+        if self._count is None:
+            self._count = estimate_count(self.queryset)
+        return self._count
+
+    # ------------------------------------------------------------------
+    # Cursors
+    # ------------------------------------------------------------------
+    def encode_cursor(self, obj, backwards=False):
+        position = {'v': [_json_value(getattr(obj, field.attname)) for _, field, _ in self.keys]}
+        if backwards:
+            position['b'] = 1
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """``(values, backwards)`` of a cursor"""
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+            values = position['v']
+            if not isinstance(values, list) or len(values) != len(self.keys):
+                raise ValueError('Cursor does not match the ordering')
+            values = [field.to_python(value) for (_, field, _), value in zip(self.keys, values)]
+            return values, bool(position.get('b'))
+        except (binascii.Error, AttributeError, KeyError, TypeError, ValueError, ValidationError) as e:
+            raise InvalidCursor(cursor) from e
+
+    # ------------------------------------------------------------------
+    # Pages
+    # ------------------------------------------------------------------
+    def _ordered(self, backwards):
+        return self.queryset.order_by(*[
+            f'{"-" if descending != backwards else ""}{name}' for name, _, descending in self.keys
+        ])
+
+    def _after(self, values, backwards):
+        """Rows after ``values`` in key order: (a, b) > (x, y) is a > x OR (a = x AND b > y)"""
+        condition = Q()
+        equal = {}
+        for (name, _, descending), value in zip(self.keys, values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def page(self, cursor=None):
+        """The first page, or the page before/after ``cursor``"""
+        backwards = False
+        queryset = self._ordered(backwards)
+        if cursor:
+            values, backwards = self.decode_cursor(cursor)
+            # Reading backwards walks the reversed order, then flips the rows
+            queryset = self._ordered(backwards).filter(self._after(values, backwards))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage(rows, self)
+        has_next = has_more if not backwards else True
+        has_previous = bool(cursor) if not backwards else has_more
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=self.encode_cursor(rows[-1]) if has_next else None,
+            previous_cursor=self.encode_cursor(rows[0], backwards=True) if has_previous else None,
+        )
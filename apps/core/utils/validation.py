@@ -0,0 +1,55 @@
+# apps/core/utils/validation.py
+"""
+Validation modes of TenantAwareModel.save
+
+- ``full``:   ``full_clean()`` including unique and foreign key lookups
+- ``fields``: field and model ``clean()`` validation; uniqueness, check
+              constraints and foreign keys are left to the database
+- ``tenant``: only the owning tenant is checked (trusted service code)
+- ``none``:   no validation (bulk code that validated its input already)
+
+The mode comes from ``save_validation()`` when active, else the model's
+``save_validation_mode``, else ``MODEL_VALIDATION["SAVE_MODE"]``.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+FULL = 'full'
+FIELDS = 'fields'
+TENANT = 'tenant'
+NONE = 'none'
+MODES = (FULL, FIELDS, TENANT, NONE)
+
+# Thread-local storage for the active override
+_thread_locals = threading.local()
+
+
+def get_default_save_validation():
+    """
+    Mode configured in settings
+    """
+    return getattr(settings, 'MODEL_VALIDATION', {}).get('SAVE_MODE', FIELDS)
+
+
+def get_save_validation():
+    """
+    Mode set by an enclosing save_validation() block, or None
+    """
+    return getattr(_thread_locals, 'save_validation', None)
+
+
+@contextmanager
+def save_validation(mode):
+    """
+    Context manager selecting the validation mode of saves in the block
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown save validation mode {mode!r}; expected one of {', '.join(MODES)}")
+    previous = get_save_validation()
+    _thread_locals.save_validation = mode
+    try:
+        yield
+    finally:
+        _thread_locals.save_validation = previous
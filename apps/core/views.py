@@ -28,7 +28,11 @@ from apps.core.permissions.mixins import (
     RoleBasedViewMixin,
     TenantRequiredMixin,
 )
+from apps.core.services.audit_policy import (
+    AGGREGATE, SAMPLE, SKIP, AuditPolicyService, audit_request_aggregator,
+)
 from apps.core.services.audit_service import AuditService
+from apps.core.utils.pagination import InvalidCursor, KeysetPage, KeysetPaginator
 from apps.core.utils.tenant import get_current_tenant
 
 # ===================== PROJECT MODELS =====================
@@ -68,6 +72,7 @@ class BaseView(TenantRequiredMixin, RoleBasedViewMixin, View):
     audit_enabled = True
     audit_resource_type = None  # Auto-detected from model
     audit_action = None  # Auto-detected from HTTP method
+    audit_policy = None  # Overrides AUDIT_LOG_SETTINGS["POLICY"], e.g. {'READS': 'sample', 'SAMPLE_RATE': 0.05}
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -112,6 +117,47 @@ class BaseView(TenantRequiredMixin, RoleBasedViewMixin, View):
         }
         return action_map.get(method, 'READ')
     
+    def get_audit_policy(self):
+        """Audit policy of this view for the current tenant"""
+        return AuditPolicyService.resolve(self.get_audit_resource_type(), self.audit_policy, self.tenant)
+    
+    def audit_request(self, request, response):
+        """Record the request as the audit policy asks: a row, a sampled row, a counter or nothing"""
+        policy = self.get_audit_policy()
+        mode = policy.mode_for(request.method)
+        if mode == SKIP or (mode == SAMPLE and not policy.sampled()):
+            return
+        
+        tenant_id = getattr(self.tenant, 'pk', None)
+        if mode == AGGREGATE:
+            audit_request_aggregator.add(
+                action=self.get_audit_action(),
+                resource_type=self.get_audit_resource_type(),
+                user=request.user,
+                request=request,
+                tenant_id=tenant_id,
+                view_class=self.__class__.__name__,
+            )
+            return
+        
+        extra_data = {
+            'view_class': self.__class__.__name__,
+            'http_method': request.method,
+            'status_code': response.status_code,
+            'path': request.path,
+        }
+        if mode == SAMPLE:
+            extra_data['sample_rate'] = policy.sample_rate
+        AuditService.create_audit_entry(
+            action=self.get_audit_action(),
+            resource_type=self.get_audit_resource_type(),
+            user=request.user,
+            request=request,
+            severity='INFO',
+            tenant_id=tenant_id,
+            extra_data=extra_data
+        )
+    
     def dispatch(self, request, *args, **kwargs):
         """Dispatch request with enhanced logging and audit"""
         try:
@@ -141,19 +187,7 @@ class BaseView(TenantRequiredMixin, RoleBasedViewMixin, View):
             # Audit the request
             if self.audit_enabled and request.user.is_authenticated:
                 try:
-                    AuditService.create_audit_entry(
-                        action=self.get_audit_action(),
-                        resource_type=self.get_audit_resource_type(),
-                        user=request.user,
-                        request=request,
-                        severity='INFO',
-                        extra_data={
-                            'view_class': self.__class__.__name__,
-                            'http_method': request.method,
-                            'status_code': response.status_code,
-                            'path': request.path,
-                        }
-                    )
+                    self.audit_request(request, response)
                 except Exception as e:
                     logger.error(f"Failed to create audit entry: {e}")
             
@@ -360,6 +394,15 @@ class BaseListView(BaseView, ListView):
     ordering = ['-created_at']
     context_object_name = 'object_list'
     
+    # Keyset pagination: pages follow a ?cursor= on keyset_ordering (a field
+    # or tuple of fields, plus pk) instead of ?page=, so deep pages cost the
+    # same as the first
+    pagination_mode = 'page'  # 'page' or 'keyset'
+    keyset_ordering = '-created_at'
+    keyset_page_size = 25
+    approximate_count = True  # planner estimate of the total; False skips it
+    cursor_query_param = 'cursor'
+    
     # Search and filter configuration
     search_fields = []
     filter_form_class = None
@@ -404,6 +447,31 @@ class BaseListView(BaseView, ListView):
         """Override to add custom filtering logic"""
         return queryset
     
+    def get_paginate_by(self, queryset):
+        if self.pagination_mode == 'keyset':
+            return self.paginate_by or self.keyset_page_size
+        return super().get_paginate_by(queryset)
+    
+    def paginate_queryset(self, queryset, page_size):
+        """Page by cursor in keyset mode"""
+        if self.pagination_mode != 'keyset':
+            return super().paginate_queryset(queryset, page_size)
+        
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering, count=self.approximate_count)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_query_param))
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+        return paginator, page, page.object_list, page.has_other_pages()
+    
+    def get_cursor_query(self, cursor):
+        """Query string of the current request pointing at ``cursor``"""
+        query = self.request.GET.copy()
+        query.pop(self.cursor_query_param, None)
+        if cursor:
+            query[self.cursor_query_param] = cursor
+        return query.urlencode()
+    
     def get_context_data(self, **kwargs):
         """Add pagination and filtering context"""
         context = super().get_context_data(**kwargs)
@@ -428,7 +496,15 @@ class BaseListView(BaseView, ListView):
         
         # Add pagination information
         page_obj = context.get('page_obj')
-        if page_obj:
+        if isinstance(page_obj, KeysetPage):
+            context['total_items'] = page_obj.paginator.count
+            context['items_per_page'] = page_obj.paginator.per_page
+            context['first_page_query'] = self.get_cursor_query(None)
+            if page_obj.has_next():
+                context['next_page_query'] = self.get_cursor_query(page_obj.next_cursor)
+            if page_obj.has_previous():
+                context['previous_page_query'] = self.get_cursor_query(page_obj.previous_cursor)
+        elif page_obj:
             context['page_range'] = self.get_page_range(page_obj)
             context['total_items'] = page_obj.paginator.count
             context['items_per_page'] = page_obj.paginator.per_page
@@ -460,12 +536,21 @@ class BaseListView(BaseView, ListView):
                     'has_previous': context['page_obj'].has_previous(),
                     'has_next': context['page_obj'].has_next(),
                     'num_pages': context['page_obj'].paginator.num_pages,
-                } if 'page_obj' in context else None,
+                } if context.get('page_obj') and not isinstance(context['page_obj'], KeysetPage) else None,
                 'paginator': {
                     'count': context['paginator'].count,
                     'num_pages': context['paginator'].num_pages,
-                } if 'paginator' in context else None,
+                } if context.get('paginator') and not isinstance(context['paginator'], KeysetPaginator) else None,
             }
+            if isinstance(context.get('page_obj'), KeysetPage):
+                page_obj = context['page_obj']
+                data['page_obj'] = {
+                    'has_previous': page_obj.has_previous(),
+                    'has_next': page_obj.has_next(),
+                    'next_cursor': page_obj.next_cursor,
+                    'previous_cursor': page_obj.previous_cursor,
+                }
+                data['paginator'] = {'count': page_obj.paginator.count}
             return JsonResponse(data, safe=False)
         
         return super().render_to_response(context, **response_kwargs)
@@ -979,58 +1064,36 @@ class ExportMixin:
     
     export_formats = ['csv', 'excel', 'pdf']
     export_filename = 'export'
+    # values_list projection; when set, get_export_row receives value tuples
+    export_fields = None
+    export_chunk_size = 2000
     
     def get_export_queryset(self):
         """Get queryset for export"""
         return self.get_queryset()
     
+    def get_export_rows(self):
+        """Lazily produced export rows (see ExportService.iter_rows)"""
+        from apps.core.services.export_service import ExportService
+        
+        return ExportService.iter_rows(
+            self.get_export_queryset(),
+            self.get_export_row,
+            fields=self.export_fields,
+            chunk_size=self.export_chunk_size,
+        )
+    
     def export_csv(self, request, *args, **kwargs):
-        """Export data as CSV"""
-        import csv
-        from django.http import HttpResponse
+        """Export data as a streamed CSV"""
+        from apps.core.services.export_service import ExportService
         
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{self.export_filename}.csv"'
-        
-        writer = csv.writer(response)
-        
-        # Write headers
-        headers = self.get_export_headers()
-        writer.writerow(headers)
-        
-        # Write data
-        for obj in self.get_export_queryset():
-            writer.writerow(self.get_export_row(obj))
-        
-        return response
+        return ExportService.stream('csv', self.export_filename, self.get_export_headers(), self.get_export_rows())
     
     def export_excel(self, request, *args, **kwargs):
-        """Export data as Excel"""
-        import openpyxl
-        from django.http import HttpResponse
-        
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Export"
-        
-        # Write headers
-        headers = self.get_export_headers()
-        for col_idx, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col_idx, value=header)
-        
-        # Write data
-        for row_idx, obj in enumerate(self.get_export_queryset(), 2):
-            row_data = self.get_export_row(obj)
-            for col_idx, value in enumerate(row_data, 1):
-                ws.cell(row=row_idx, column=col_idx, value=value)
-        
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        response['Content-Disposition'] = f'attachment; filename="{self.export_filename}.xlsx"'
-        wb.save(response)
+        """Export data as Excel (write-only workbook)"""
+        from apps.core.services.export_service import ExportService
         
-        return response
+        return ExportService.stream('excel', self.export_filename, self.get_export_headers(), self.get_export_rows())
     
     def get_export_headers(self):
         """Get headers for export"""
@@ -0,0 +1,158 @@
+# apps/exams/management/commands/benchmark_exam_ranking.py
+import copy
+import random
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare the per-save ranking loop with the window-function ranking engine'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            default='50,500,5000',
+            help='Comma separated number of results per exam',
+        )
+        parser.add_argument(
+            '--method',
+            default='competition',
+            choices=['competition', 'dense'],
+            help='Ranking method for the engine',
+        )
+        parser.add_argument(
+            '--legacy-limit',
+            type=int,
+            default=500,
+            help='Skip measuring the legacy loop above this many results',
+        )
+
+    def handle(self, *args, **options):
+        from apps.exams.models import Exam
+        from apps.students.models import Student
+
+        exam = Exam.objects.first()
+        template = Student.objects.first()
+        if not exam or not template:
+            raise CommandError('Benchmark needs at least one exam and one student to clone')
+
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--sizes must be a comma separated list of integers')
+
+        self.stdout.write(f'Ranking exam "{exam}" ({options["method"]})\n')
+        self.stdout.write(f'  {"Results":>8}  {"Legacy/save":>24}  {"Legacy/batch (est.)":>20}  {"Engine/batch":>24}')
+
+        for size in sizes:
+            legacy, engine = self.run_size(exam, template, size, options)
+            if legacy:
+                legacy_queries, legacy_time = legacy
+                legacy_cell = f'{legacy_queries:>7} q {legacy_time * 1000:>10.1f} ms'
+                batch_cell = f'{legacy_queries * size:>12} queries'
+            else:
+                legacy_cell = f'{"skipped":>24}'
+                batch_cell = f'{(1 + 2 * size) * size:>12} queries'
+            engine_queries, engine_time = engine
+            self.stdout.write(
+                f'  {size:>8}  {legacy_cell}  {batch_cell:>20}  '
+                f'{engine_queries:>7} q {engine_time * 1000:>10.1f} ms'
+            )
+
+        self.stdout.write(self.style.SUCCESS('\n✅ Benchmark complete (all synthetic rows rolled back)'))
+
+    def run_size(self, exam, template, size, options):
+        """Create ``size`` synthetic results, rank them both ways, roll back"""
+        from apps.exams.models import ExamResult
+
+        measured = {}
+        try:
+            with transaction.atomic():
+                self.create_results(exam, template, size)
+
+                if size <= options['legacy_limit']:
+                    measured['legacy'] = self.measure(lambda: self.legacy_rank(exam))
+                    ExamResult.objects.filter(exam=exam).update(rank=None, total_students=0)
+
+                measured['engine'] = self.measure(lambda: self.engine_rank(exam, options['method']))
+                raise _Rollback
+        except _Rollback:
+            pass
+        return measured.get('legacy'), measured['engine']
+
+    def measure(self, func):
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+        return len(ctx.captured_queries), elapsed
+
+    def create_results(self, exam, template, size):
+        from apps.core.services.signature_service import DataSignatureService
+        from apps.exams.models import ExamResult
+        from apps.students.models import Student
+
+        ExamResult.objects.filter(exam=exam).delete()
+
+        students = []
+        for i in range(size):
+            student = copy.copy(template)
+            student.pk = uuid.uuid4()
+            student._state = copy.copy(template._state)
+            student._state.adding = True
+            student.user = None
+            suffix = uuid.uuid4().hex[:12]
+            student.admission_number = f'BENCH-{suffix}'
+            student.reg_no = f'BENCH-{suffix}'
+            student.personal_email = f'bench-{suffix}@example.com'
+            student.roll_number = str(i + 1)
+            students.append(student)
+        Student.objects.bulk_create(DataSignatureService.sign_objects(students), batch_size=500)
+
+        # Coarse percentages so ties actually occur
+        results = [
+            ExamResult(
+                tenant_id=exam.tenant_id,
+                exam=exam,
+                student=student,
+                total_max_marks=Decimal('100'),
+                total_marks_obtained=Decimal(random.randint(20, 100)),
+                percentage=Decimal(random.randint(20, 100)),
+            )
+            for student in students
+        ]
+        ExamResult.objects.bulk_create(DataSignatureService.sign_objects(results), batch_size=500)
+
+    def legacy_rank(self, exam):
+        """What a single save used to do: rank the exam row by row"""
+        from apps.exams.models import ExamResult
+
+        queryset = ExamResult.objects.filter(
+            exam=exam,
+            percentage__isnull=False
+        ).order_by('-percentage', 'student__roll_number')
+
+        current_rank = 0
+        last_percentage = None
+        for position, result in enumerate(queryset, start=1):
+            if result.percentage != last_percentage:
+                current_rank = position
+                last_percentage = result.percentage
+            ExamResult.objects.filter(pk=result.pk).update(
+                rank=current_rank,
+                total_students=queryset.count()
+            )
+
+    def engine_rank(self, exam, method):
+        from apps.exams.services.ranking import ExamRankingService
+
+        ExamRankingService.recompute(exam.pk, method=method)
@@ -0,0 +1,74 @@
+# apps/exams/management/commands/recalculate_result_statistics.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import schema_context
+
+
+class Command(BaseCommand):
+    help = 'Recalculate ResultStatistics for every exam in a term'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Tenant schema name to recalculate',
+        )
+        parser.add_argument(
+            '--all-tenants',
+            action='store_true',
+            help='Recalculate for all active tenants',
+        )
+        parser.add_argument(
+            '--term',
+            type=str,
+            help='Term ID (defaults to each tenant\'s current term)',
+        )
+
+    def handle(self, *args, **options):
+        from apps.tenants.models import Tenant
+
+        if options['all_tenants']:
+            schemas = list(
+                Tenant.objects.filter(is_active=True).exclude(schema_name='public').values_list('schema_name', flat=True)
+            )
+        elif options['tenant']:
+            schemas = [options['tenant']]
+        else:
+            raise CommandError('Please specify --tenant or --all-tenants')
+
+        total = 0
+        for schema_name in schemas:
+            with schema_context(schema_name):
+                total += self.recalculate_tenant(schema_name, options['term'])
+
+        self.stdout.write(self.style.SUCCESS(f'\n✅ Recalculated statistics for {total} exams'))
+
+    def recalculate_tenant(self, schema_name, term_id):
+        from apps.academics.models import Term
+        from apps.exams.models import Exam, ResultStatistics
+        from apps.exams.services.statistics import ResultStatisticsService
+
+        terms = Term.objects.filter(pk=term_id) if term_id else Term.objects.filter(is_current=True)
+        term = terms.select_related('academic_year').first()
+        if not term:
+            self.stdout.write(self.style.WARNING(f'  {schema_name}: no matching term, skipped'))
+            return 0
+
+        exams = Exam.objects.filter(
+            academic_year=term.academic_year,
+            start_date__gte=term.start_date,
+            start_date__lte=term.end_date,
+        ).only('pk', 'name')
+
+        started = time.perf_counter()
+        count = 0
+        for exam in exams.iterator():
+            stats, _ = ResultStatistics.objects.get_or_create(exam=exam)
+            ResultStatisticsService.recalculate(stats)
+            count += 1
+
+        self.stdout.write(
+            f'  {schema_name}: {term} - {count} exams in {(time.perf_counter() - started) * 1000:.1f} ms'
+        )
+        return count
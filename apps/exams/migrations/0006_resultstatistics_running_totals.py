@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0005_alter_marksheet_issue_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resultstatistics',
+            name='distinction_students',
+            field=models.PositiveIntegerField(default=0, verbose_name='Distinction Students'),
+        ),
+        migrations.AddField(
+            model_name='resultstatistics',
+            name='first_class_students',
+            field=models.PositiveIntegerField(default=0, verbose_name='First Class Students'),
+        ),
+        migrations.AddField(
+            model_name='resultstatistics',
+            name='graded_students',
+            field=models.PositiveIntegerField(default=0, verbose_name='Graded Students'),
+        ),
+        migrations.AddField(
+            model_name='resultstatistics',
+            name='percentage_total',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=12, verbose_name='Sum of Percentages'),
+        ),
+    ]
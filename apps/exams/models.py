@@ -13,7 +13,7 @@ from encrypted_model_fields.fields import EncryptedCharField
 
 # Import core base models
 from apps.core.models import BaseModel, UUIDModel, TimeStampedModel
-from apps.academics.models import Subject, SchoolClass, Section, AcademicYear, GradingSystem, Grade
+from apps.academics.models import Subject, SchoolClass, Section, AcademicYear, Grade
 from apps.students.models import Student
 
 
@@ -415,6 +415,9 @@ class ExamResult(BaseModel):
     is_published = models.BooleanField(default=False, verbose_name=_("Is Published"))
     published_at = models.DateTimeField(null=True, blank=True, verbose_name=_("Published At"))
 
+    # Recomputed in bulk by ExamRankingService, so not part of data_signature
+    signature_exclude = ("rank", "total_students")
+
     class Meta:
         db_table = "exams_exam_result"
         ordering = ["exam", "rank", "student"]
@@ -428,9 +431,26 @@ class ExamResult(BaseModel):
             models.Index(fields=['rank']),
         ]
 
+    # Previous state not loaded (deferred fields); statistics are rebuilt
+    SNAPSHOT_UNKNOWN = object()
+
     def __str__(self):
         return f"{self.student} - {self.exam} - {self.percentage}%"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._statistics_snapshot = instance.statistics_snapshot(loaded_only=True)
+        return instance
+
+    def statistics_snapshot(self, loaded_only=False):
+        """What this result contributes to ResultStatistics, or None"""
+        if loaded_only and self.get_deferred_fields() & {'result_status', 'percentage', 'is_active'}:
+            return self.SNAPSHOT_UNKNOWN
+        if not self.is_active:
+            return None
+        return (self.result_status, self.percentage)
+
     @property
     def is_pass(self):
         """Check if result is passing"""
@@ -451,43 +471,14 @@ class ExamResult(BaseModel):
         """Determine grade based on percentage"""
         if not self.percentage:
             return None
-            
-        grading_system = GradingSystem.objects.filter(is_default=True).first()
-        if not grading_system:
-            return None
-            
-        grade = Grade.objects.filter(
-            grading_system=grading_system,
-            min_percentage__lte=self.percentage,
-            max_percentage__gte=self.percentage
-        ).first()
-        
-        return grade
+
+        from apps.exams.services.grading import grade_band_cache
+        return grade_band_cache.lookup(self.percentage)
 
     def update_rank(self):
-        """Update rank based on percentage"""
-        if not self.percentage:
-            return
-            
-        # Get all results for this exam ordered by percentage descending
-        results = ExamResult.objects.filter(
-            exam=self.exam,
-            percentage__isnull=False
-        ).order_by('-percentage', 'student__roll_number')
-        
-        current_rank = 0
-        last_percentage = None
-        rank_increment = 0
-        
-        for result in results:
-            rank_increment += 1
-            if result.percentage != last_percentage:
-                current_rank = rank_increment
-                last_percentage = result.percentage
-                
-            result.rank = current_rank
-            result.total_students = results.count()
-            result.save(update_fields=['rank', 'total_students'])
+        """Re-rank every result of this exam immediately"""
+        from apps.exams.services.ranking import ExamRankingService
+        ExamRankingService.recompute(self.exam_id)
 
     def clean(self):
         """Validate result data"""
@@ -520,12 +511,21 @@ class ExamResult(BaseModel):
         # Set published timestamp
         if self.is_published and not self.published_at:
             self.published_at = timezone.now()
-            
+
+        previous = None if self._state.adding else getattr(self, '_statistics_snapshot', self.SNAPSHOT_UNKNOWN)
         super().save(*args, **kwargs)
+
+        # Keep running statistics current (incremental mode only)
+        current = self.statistics_snapshot()
+        if previous != current:
+            from apps.exams.services.statistics import ResultStatisticsService
+            ResultStatisticsService.track_result(self, previous, current)
+        self._statistics_snapshot = current
         
-        # Update rank after save
+        # Re-rank the exam once the current batch of writes is committed
         if self.percentage is not None:
-            self.update_rank()
+            from apps.exams.services.ranking import schedule_rank_update
+            schedule_rank_update(self.exam_id)
 
 
 class SubjectResult(BaseModel):
@@ -653,15 +653,8 @@ class SubjectResult(BaseModel):
 
     def determine_grade(self):
         """Determine grade based on subject percentage"""
-        grading_system = GradingSystem.objects.filter(is_default=True).first()
-        if not grading_system:
-            return None
-            
-        return Grade.objects.filter(
-            grading_system=grading_system,
-            min_percentage__lte=self.percentage,
-            max_percentage__gte=self.percentage
-        ).first()
+        from apps.exams.services.grading import grade_band_cache
+        return grade_band_cache.lookup(self.percentage)
 
 
 class MarkSheet(BaseModel):
@@ -923,6 +916,17 @@ class ResultStatistics(BaseModel):
         verbose_name=_("Grade Distribution")
     )
     
+    # Running totals for incremental updates
+    distinction_students = models.PositiveIntegerField(default=0, verbose_name=_("Distinction Students"))
+    first_class_students = models.PositiveIntegerField(default=0, verbose_name=_("First Class Students"))
+    graded_students = models.PositiveIntegerField(default=0, verbose_name=_("Graded Students"))
+    percentage_total = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0.00,
+        verbose_name=_("Sum of Percentages")
+    )
+
     # Subject-wise performance
     subject_performance = models.JSONField(
         default=dict,
@@ -963,34 +967,9 @@ class ResultStatistics(BaseModel):
         return f"Statistics - {self.exam.name}"
 
     def calculate_statistics(self):
-        """Calculate comprehensive result statistics"""
-        results = ExamResult.objects.filter(exam=self.exam)
-        
-        self.total_students = results.count()
-        self.appeared_students = results.exclude(result_status="ABSENT").count()
-        self.passed_students = results.filter(result_status="PASS").count()
-        self.failed_students = results.filter(result_status="FAIL").count()
-        
-        # Calculate percentages
-        if self.appeared_students > 0:
-            self.pass_percentage = (self.passed_students / self.appeared_students) * 100
-        
-        # Calculate average, highest, lowest percentages
-        valid_results = results.filter(percentage__isnull=False)
-        if valid_results.exists():
-            self.average_percentage = valid_results.aggregate(
-                avg=models.Avg('percentage')
-            )['avg'] or 0
-            
-            self.highest_percentage = valid_results.aggregate(
-                max=models.Max('percentage')
-            )['max'] or 0
-            
-            self.lowest_percentage = valid_results.aggregate(
-                min=models.Min('percentage')
-            )['min'] or 0
-        
-        self.save()
+        """Calculate comprehensive result statistics (single aggregate query)"""
+        from apps.exams.services.statistics import ResultStatisticsService
+        ResultStatisticsService.recalculate(self)
 
     def get_performance_summary(self):
         """Get performance summary for reporting"""
@@ -0,0 +1,13 @@
+from .grading import GradeBandCache, GradeBandTable, grade_band_cache
+from .ranking import ExamRankingService, deferred_ranking, schedule_rank_update
+from .statistics import ResultStatisticsService
+
+__all__ = [
+    'ExamRankingService',
+    'GradeBandCache',
+    'GradeBandTable',
+    'ResultStatisticsService',
+    'deferred_ranking',
+    'grade_band_cache',
+    'schedule_rank_update',
+]
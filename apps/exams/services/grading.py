@@ -0,0 +1,157 @@
+"""
+Grade-band lookup cache.
+
+The default grading system's grades are loaded once per tenant into a table
+sorted by ``min_percentage`` and looked up with ``bisect``, so grading a
+result does not query GradingSystem/Grade on every save.
+
+Tables live in process memory. GradingSystem/Grade signals drop the local
+table and bump a per-tenant version in the shared Django cache; other
+workers compare that version at most every ``CHECK_INTERVAL`` seconds.
+"""
+
+import bisect
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+
+
+class GradeBandTable:
+    """Sorted, non-overlapping grade bands of one grading system"""
+
+    def __init__(self, grades):
+        self.grades = sorted(grades, key=lambda grade: (grade.min_percentage, grade.max_percentage))
+        self._mins = [grade.min_percentage for grade in self.grades]
+
+    def __len__(self):
+        return len(self.grades)
+
+    def lookup(self, percentage):
+        """
+        Grade whose [min, max] band contains ``percentage``, or None.
+        Bands may touch at a boundary; like ``Grade``'s default ordering,
+        the lower ``order`` wins.
+        """
+        if percentage is None or not self.grades:
+            return None
+
+        index = bisect.bisect_right(self._mins, percentage) - 1
+        matches = []
+        # Bands don't overlap, so max_percentage is sorted as well
+        while index >= 0 and self.grades[index].max_percentage >= percentage:
+            matches.append(self.grades[index])
+            index -= 1
+
+        if not matches:
+            return None
+        return min(matches, key=lambda grade: (grade.order, grade.min_percentage))
+
+
+class GradeBandCache:
+    """Per-tenant GradeBandTable of the default grading system"""
+
+    VERSION_KEY = 'grade_bands_version:{schema}'
+
+    def __init__(self):
+        self._tables = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+    def _setting(self, name, default):
+        return getattr(settings, 'GRADE_BAND_CACHE', {}).get(name, default)
+
+    @property
+    def enabled(self):
+        return self._setting('ENABLED', True)
+
+    @property
+    def check_interval(self):
+        return self._setting('CHECK_INTERVAL', 30)
+
+    @property
+    def shared_cache(self):
+        from django.core.cache import caches
+
+        return caches[self._setting('CACHE_ALIAS', 'default')]
+
+    def _schema(self, schema_name=None):
+        return schema_name or getattr(connection, 'schema_name', None) or 'public'
+
+    def _shared_version(self, schema):
+        try:
+            return self.shared_cache.get(self.VERSION_KEY.format(schema=schema), 0)
+        except Exception:
+            return 0
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def get_table(self, schema_name=None):
+        """Grade bands of the current tenant's default grading system"""
+        schema = self._schema(schema_name)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._tables.get(schema)
+        if entry is not None:
+            table, version, checked_at = entry
+            if now - checked_at < self.check_interval:
+                return table
+            shared_version = self._shared_version(schema)
+            if shared_version == version:
+                with self._lock:
+                    self._tables[schema] = (table, version, now)
+                return table
+
+        version = self._shared_version(schema)
+        table = self._load()
+        with self._lock:
+            self._tables[schema] = (table, version, now)
+        return table
+
+    def _load(self):
+        from apps.academics.models import Grade, GradingSystem
+
+        self.loads += 1
+        grading_system = GradingSystem.objects.filter(is_default=True).first()
+        if not grading_system:
+            return GradeBandTable([])
+        return GradeBandTable(Grade.objects.filter(grading_system=grading_system))
+
+    def lookup(self, percentage, schema_name=None):
+        """Grade for ``percentage`` under the default grading system"""
+        if percentage is None:
+            return None
+        if not self.enabled:
+            return self._load().lookup(percentage)
+        return self.get_table(schema_name).lookup(percentage)
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+    def invalidate(self, schema_name=None):
+        """Drop the current tenant's table here and in every other worker"""
+        schema = self._schema(schema_name)
+        with self._lock:
+            self._tables.pop(schema, None)
+        key = self.VERSION_KEY.format(schema=schema)
+        try:
+            try:
+                self.shared_cache.incr(key)
+            except ValueError:
+                self.shared_cache.set(key, 1, None)
+        except Exception:
+            pass
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+
+
+# Shared per-process cache
+grade_band_cache = GradeBandCache()
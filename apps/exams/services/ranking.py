@@ -0,0 +1,140 @@
+"""
+Exam ranking engine.
+
+Ranks for a whole exam are computed by the database with one window-function
+query and written back with one bulk update, instead of re-ranking (and
+re-saving) every result each time a single result is saved.
+
+Saving an ExamResult only *schedules* its exam for re-ranking. The actual
+recompute runs once per exam when the surrounding transaction commits, or
+when a ``deferred_ranking()`` block exits, so a batch of N mark entries costs
+one ranking pass rather than N.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import DenseRank, Rank
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+def _pending():
+    if not hasattr(_state, 'pending'):
+        _state.pending = set()
+        _state.depth = 0
+    return _state.pending
+
+
+class ExamRankingService:
+    """
+    Compute ``rank`` and ``total_students`` for every result of an exam.
+
+    ``competition`` ranking gives tied results the same rank and skips the
+    following ranks (1, 2, 2, 4); ``dense`` does not skip (1, 2, 2, 3).
+    """
+
+    COMPETITION = 'competition'
+    DENSE = 'dense'
+    METHODS = {
+        COMPETITION: Rank,
+        DENSE: DenseRank,
+    }
+
+    @classmethod
+    def ranked_results(cls, exam_id, method=COMPETITION):
+        """Queryset of ranked results annotated with ``new_rank`` and ``new_total``"""
+        from apps.exams.models import ExamResult
+
+        if method not in cls.METHODS:
+            raise ValueError(f"Unknown ranking method '{method}'")
+
+        return ExamResult.objects.filter(
+            exam_id=exam_id,
+            percentage__isnull=False
+        ).annotate(
+            new_rank=Window(expression=cls.METHODS[method](), order_by=F('percentage').desc()),
+            new_total=Window(expression=Count('pk')),
+        ).only('pk', 'rank', 'total_students')
+
+    @classmethod
+    def recompute(cls, exam_id, method=COMPETITION, batch_size=500):
+        """
+        Re-rank one exam. Only rows whose rank or total changed are written.
+        Returns the number of results updated.
+        """
+        from apps.exams.models import ExamResult
+
+        changed = []
+        for result in cls.ranked_results(exam_id, method):
+            if result.rank != result.new_rank or result.total_students != result.new_total:
+                result.rank = result.new_rank
+                result.total_students = result.new_total
+                changed.append(result)
+
+        if changed:
+            ExamResult.objects.bulk_update(changed, ['rank', 'total_students'], batch_size=batch_size)
+
+        # Results whose percentage was cleared drop out of the ranking
+        cleared = ExamResult.objects.filter(
+            exam_id=exam_id,
+            percentage__isnull=True,
+            rank__isnull=False
+        ).update(rank=None, total_students=0)
+
+        return len(changed) + cleared
+
+
+def _run_pending(exam_id, schema_name):
+    pending = _pending()
+    key = (schema_name, exam_id)
+    if key not in pending:
+        # Already ranked by an earlier callback in this batch
+        return
+    pending.discard(key)
+    try:
+        ExamRankingService.recompute(exam_id)
+    except Exception as e:
+        logger.error(f"Failed to rank exam {exam_id}: {str(e)}", exc_info=True)
+
+
+def schedule_rank_update(exam_id):
+    """
+    Re-rank ``exam_id`` once the current batch of writes is done: on exit of
+    the outermost ``deferred_ranking()`` block, otherwise on transaction
+    commit (immediately in autocommit mode).
+    """
+    pending = _pending()
+    key = (connection.schema_name if hasattr(connection, 'schema_name') else None, exam_id)
+    pending.add(key)
+    if _state.depth:
+        return
+    transaction.on_commit(lambda: _run_pending(exam_id, key[0]))
+
+
+@contextmanager
+def deferred_ranking():
+    """
+    Collect rank updates for every result saved inside the block and run
+    each affected exam's ranking once when the block exits.
+    """
+    _pending()
+    _state.depth += 1
+    try:
+        yield
+    except BaseException:
+        _state.depth -= 1
+        if not _state.depth:
+            # The failed batch is not ranked; don't leak it into the next one
+            _state.pending.clear()
+        raise
+    _state.depth -= 1
+
+    if not _state.depth:
+        for schema_name, exam_id in list(_state.pending):
+            transaction.on_commit(lambda exam_id=exam_id, schema_name=schema_name: _run_pending(exam_id, schema_name))
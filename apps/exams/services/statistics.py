@@ -0,0 +1,210 @@
+"""
+Result statistics.
+
+``recalculate`` fills a ResultStatistics row from one conditional-aggregation
+query over the exam's active results. With
+``EXAM_STATISTICS['INCREMENTAL']`` on, saving or withdrawing a published
+result also applies the difference between its old and new contribution to
+the running totals, so statistics stay current without re-scanning the exam.
+Saves during mark entry, before publication, leave the running totals alone;
+result generation recalculates the exam in full.
+"""
+
+import logging
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+
+logger = logging.getLogger(__name__)
+
+TWO_PLACES = Decimal('0.01')
+
+
+def _quantize(value):
+    return Decimal(value or 0).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+class ResultStatisticsService:
+    """Full and incremental maintenance of ResultStatistics"""
+
+    DISTINCTION_PERCENTAGE = Decimal('75')
+    FIRST_CLASS_PERCENTAGE = Decimal('60')
+
+    COUNTERS = (
+        'total_students',
+        'appeared_students',
+        'passed_students',
+        'failed_students',
+        'distinction_students',
+        'first_class_students',
+        'graded_students',
+    )
+
+    @staticmethod
+    def incremental_enabled():
+        return getattr(settings, 'EXAM_STATISTICS', {}).get('INCREMENTAL', False)
+
+    # ------------------------------------------------------------------
+    # Full recompute
+    # ------------------------------------------------------------------
+    @classmethod
+    def aggregate(cls, exam_id):
+        """All counters and percentage aggregates of an exam in one query"""
+        from apps.exams.models import ExamResult
+
+        appeared = ~Q(result_status="ABSENT")
+        return ExamResult.objects.filter(exam_id=exam_id, is_active=True).aggregate(
+            total_students=Count('pk'),
+            appeared_students=Count('pk', filter=appeared),
+            passed_students=Count('pk', filter=Q(result_status="PASS")),
+            failed_students=Count('pk', filter=Q(result_status="FAIL")),
+            distinction_students=Count(
+                'pk',
+                filter=appeared & Q(percentage__gte=cls.DISTINCTION_PERCENTAGE)
+            ),
+            first_class_students=Count(
+                'pk',
+                filter=appeared & Q(
+                    percentage__gte=cls.FIRST_CLASS_PERCENTAGE,
+                    percentage__lt=cls.DISTINCTION_PERCENTAGE
+                )
+            ),
+            graded_students=Count('percentage'),
+            percentage_total=Sum('percentage'),
+            highest_percentage=Max('percentage'),
+            lowest_percentage=Min('percentage'),
+        )
+
+    @classmethod
+    def recalculate(cls, stats, save=True):
+        """Refill ``stats`` from the database"""
+        totals = cls.aggregate(stats.exam_id)
+        for field in cls.COUNTERS:
+            setattr(stats, field, totals[field] or 0)
+        stats.percentage_total = totals['percentage_total'] or 0
+        stats.highest_percentage = _quantize(totals['highest_percentage'])
+        stats.lowest_percentage = _quantize(totals['lowest_percentage'])
+        cls.update_derived(stats)
+        if save:
+            stats.save()
+        return stats
+
+    @staticmethod
+    def update_derived(stats):
+        """Percentages that follow from the counters"""
+        def share(count):
+            return _quantize(Decimal(count) * 100 / stats.appeared_students) if stats.appeared_students else _quantize(0)
+
+        stats.pass_percentage = share(stats.passed_students)
+        stats.distinction_percentage = share(stats.distinction_students)
+        stats.first_class_percentage = share(stats.first_class_students)
+        stats.average_percentage = (
+            _quantize(Decimal(stats.percentage_total) / stats.graded_students)
+            if stats.graded_students else _quantize(0)
+        )
+
+    # ------------------------------------------------------------------
+    # Incremental mode
+    # ------------------------------------------------------------------
+    @classmethod
+    def contribution(cls, result_status, percentage):
+        """Counter deltas one result adds to its exam's statistics"""
+        appeared = result_status != "ABSENT"
+        graded = percentage is not None
+        return {
+            'total_students': 1,
+            'appeared_students': int(appeared),
+            'passed_students': int(result_status == "PASS"),
+            'failed_students': int(result_status == "FAIL"),
+            'distinction_students': int(appeared and graded and percentage >= cls.DISTINCTION_PERCENTAGE),
+            'first_class_students': int(
+                appeared and graded
+                and cls.FIRST_CLASS_PERCENTAGE <= percentage < cls.DISTINCTION_PERCENTAGE
+            ),
+            'graded_students': int(graded),
+        }
+
+    @classmethod
+    def apply_change(cls, exam_id, old, new):
+        """
+        Move one result's contribution from ``old`` to ``new``.
+        Each side is a ``(result_status, percentage)`` pair, or None when the
+        result did not exist / no longer counts.
+        """
+        from apps.exams.models import ResultStatistics
+
+        if old == new:
+            return
+
+        with transaction.atomic():
+            stats, created = ResultStatistics.objects.select_for_update().get_or_create(exam_id=exam_id)
+            if created:
+                # No running totals yet; the new row is already in the table
+                cls.recalculate(stats)
+                return
+
+            rescan_extremes = False
+            for sign, side in ((-1, old), (1, new)):
+                if side is None:
+                    continue
+                status, percentage = side
+                percentage = Decimal(percentage) if percentage is not None else None
+                for field, delta in cls.contribution(status, percentage).items():
+                    setattr(stats, field, max(0, getattr(stats, field) + sign * delta))
+                if percentage is None:
+                    continue
+
+                stats.percentage_total = Decimal(stats.percentage_total) + sign * percentage
+                if sign < 0:
+                    # The departing value may have been the highest or lowest
+                    rescan_extremes |= percentage in (stats.highest_percentage, stats.lowest_percentage)
+                elif stats.graded_students == 1:
+                    stats.highest_percentage = stats.lowest_percentage = _quantize(percentage)
+                else:
+                    stats.highest_percentage = max(stats.highest_percentage, _quantize(percentage))
+                    stats.lowest_percentage = min(stats.lowest_percentage, _quantize(percentage))
+
+            if rescan_extremes:
+                cls._rescan_extremes(stats)
+            if not stats.graded_students:
+                stats.percentage_total = 0
+                stats.highest_percentage = stats.lowest_percentage = _quantize(0)
+
+            cls.update_derived(stats)
+            stats.save()
+
+    @staticmethod
+    def _rescan_extremes(stats):
+        from apps.exams.models import ExamResult
+
+        extremes = ExamResult.objects.filter(
+            exam_id=stats.exam_id, is_active=True
+        ).aggregate(
+            highest=Max('percentage'),
+            lowest=Min('percentage'),
+        )
+        stats.highest_percentage = _quantize(extremes['highest'])
+        stats.lowest_percentage = _quantize(extremes['lowest'])
+
+    @classmethod
+    def track_result(cls, result, old, new):
+        """
+        Apply an ExamResult save/delete to its exam's running totals.
+        ``old`` is ``ExamResult.SNAPSHOT_UNKNOWN`` when the previous state
+        was not loaded; the exam is then recalculated in full. Unpublished
+        results are left to the next full recalculation.
+        """
+        from apps.exams.models import ExamResult, ResultStatistics
+
+        if not cls.incremental_enabled() or not result.is_published:
+            return
+        try:
+            if old is ExamResult.SNAPSHOT_UNKNOWN:
+                stats, _ = ResultStatistics.objects.get_or_create(exam_id=result.exam_id)
+                cls.recalculate(stats)
+            else:
+                cls.apply_change(result.exam_id, old, new)
+        except Exception as e:
+            logger.error(f"Failed to update statistics for exam {result.exam_id}: {str(e)}", exc_info=True)
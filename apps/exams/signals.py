@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.academics.models import Grade, GradingSystem
+
+from .models import ExamResult
+from .services.grading import grade_band_cache
+from .services.statistics import ResultStatisticsService
+
+
+# ---------------------------------------------------------
+# Keep the grade-band cache in sync with grading systems
+# ---------------------------------------------------------
+@receiver(post_save, sender=GradingSystem)
+@receiver(post_delete, sender=GradingSystem)
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def invalidate_grade_bands(sender, instance, **kwargs):
+    """Reload grade bands on the next lookup (now and after commit)"""
+    grade_band_cache.invalidate()
+    transaction.on_commit(grade_band_cache.invalidate)
+
+
+# ---------------------------------------------------------
+# Running result statistics (incremental mode)
+# ---------------------------------------------------------
+@receiver(post_delete, sender=ExamResult)
+def remove_result_from_statistics(sender, instance, **kwargs):
+    """Take a hard-deleted result out of its exam's running totals"""
+    previous = getattr(instance, '_statistics_snapshot', ExamResult.SNAPSHOT_UNKNOWN)
+    ResultStatisticsService.track_result(instance, previous, None)
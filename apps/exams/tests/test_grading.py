@@ -0,0 +1,61 @@
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.exams.services.grading import GradeBandCache, GradeBandTable
+
+
+def band(grade, low, high, order=0):
+    return SimpleNamespace(grade=grade, min_percentage=Decimal(low), max_percentage=Decimal(high), order=order)
+
+
+class GradeBandTableTests(SimpleTestCase):
+    def setUp(self):
+        self.table = GradeBandTable([
+            band('C', '0', '59.99', order=3),
+            band('A', '80', '100', order=1),
+            band('B', '60', '79.99', order=2),
+        ])
+
+    def test_lookup_inside_bands(self):
+        self.assertEqual(self.table.lookup(Decimal('92.5')).grade, 'A')
+        self.assertEqual(self.table.lookup(Decimal('60')).grade, 'B')
+        self.assertEqual(self.table.lookup(Decimal('0')).grade, 'C')
+        self.assertEqual(self.table.lookup(100).grade, 'A')
+
+    def test_lookup_in_gap_or_outside(self):
+        self.assertIsNone(self.table.lookup(Decimal('79.995')))
+        self.assertIsNone(self.table.lookup(Decimal('101')))
+        self.assertIsNone(self.table.lookup(None))
+
+    def test_touching_bands_prefer_lower_order(self):
+        table = GradeBandTable([band('B', '60', '80', order=2), band('A', '80', '100', order=1)])
+        self.assertEqual(table.lookup(80).grade, 'A')
+
+
+class GradeBandCacheTests(SimpleTestCase):
+    def test_table_loaded_once_until_invalidated(self):
+        cache = GradeBandCache()
+        table = GradeBandTable([band('A', '0', '100')])
+        with mock.patch.object(cache, '_load', return_value=table) as load:
+            for _ in range(100):
+                self.assertEqual(cache.lookup(50, schema_name='school').grade, 'A')
+            self.assertEqual(load.call_count, 1)
+
+            cache.invalidate(schema_name='school')
+            cache.lookup(50, schema_name='school')
+            self.assertEqual(load.call_count, 2)
+
+    def test_tables_are_per_tenant(self):
+        cache = GradeBandCache()
+        tables = {
+            'one': GradeBandTable([band('A', '0', '100')]),
+            'two': GradeBandTable([band('P', '0', '100')]),
+        }
+        schemas = iter(['one', 'two'])
+        with mock.patch.object(cache, '_load', side_effect=lambda: tables[next(schemas)]):
+            self.assertEqual(cache.lookup(50, schema_name='one').grade, 'A')
+            self.assertEqual(cache.lookup(50, schema_name='two').grade, 'P')
+            self.assertEqual(cache.lookup(50, schema_name='one').grade, 'A')
@@ -0,0 +1,52 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from apps.exams.services.ranking import ExamRankingService, deferred_ranking, schedule_rank_update
+
+
+class DeferredRankingTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(ExamRankingService, 'recompute')
+        self.recompute = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_batch_ranks_each_exam_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with deferred_ranking():
+                for _ in range(50):
+                    schedule_rank_update('exam-a')
+                schedule_rank_update('exam-b')
+                self.recompute.assert_not_called()
+
+        ranked = sorted(call.args[0] for call in self.recompute.call_args_list)
+        self.assertEqual(ranked, ['exam-a', 'exam-b'])
+
+    def test_nested_blocks_run_on_outermost_exit(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with deferred_ranking():
+                with deferred_ranking():
+                    schedule_rank_update('exam-a')
+        self.assertEqual(len(callbacks), 1)
+        self.recompute.assert_called_once_with('exam-a')
+
+    def test_saves_in_one_transaction_rank_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(10):
+                schedule_rank_update('exam-a')
+        self.recompute.assert_called_once_with('exam-a')
+
+    def test_failed_batch_leaves_nothing_pending(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with deferred_ranking():
+                    schedule_rank_update('exam-a')
+                    raise RuntimeError
+            with deferred_ranking():
+                schedule_rank_update('exam-b')
+        self.assertEqual(len(callbacks), 1)
+        self.recompute.assert_called_once_with('exam-b')
+
+    def test_unknown_method_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ExamRankingService.ranked_results('exam-a', method='olympic')
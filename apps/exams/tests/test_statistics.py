@@ -0,0 +1,140 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+
+from apps.exams.services.statistics import ResultStatisticsService
+
+
+class ResultStatisticsServiceTests(SimpleTestCase):
+    def test_contribution_of_absent_student(self):
+        contribution = ResultStatisticsService.contribution("ABSENT", None)
+        self.assertEqual(contribution['total_students'], 1)
+        self.assertEqual(contribution['appeared_students'], 0)
+        self.assertEqual(contribution['graded_students'], 0)
+
+    def test_contribution_classes(self):
+        distinction = ResultStatisticsService.contribution("PASS", Decimal('80'))
+        first_class = ResultStatisticsService.contribution("PASS", Decimal('60'))
+        failed = ResultStatisticsService.contribution("FAIL", Decimal('20'))
+
+        self.assertEqual((distinction['distinction_students'], distinction['first_class_students']), (1, 0))
+        self.assertEqual((first_class['distinction_students'], first_class['first_class_students']), (0, 1))
+        self.assertEqual((failed['passed_students'], failed['failed_students']), (0, 1))
+
+    def test_derived_percentages(self):
+        stats = SimpleNamespace(
+            appeared_students=3,
+            passed_students=2,
+            distinction_students=1,
+            first_class_students=1,
+            graded_students=3,
+            percentage_total=Decimal('200'),
+        )
+        ResultStatisticsService.update_derived(stats)
+
+        self.assertEqual(stats.pass_percentage, Decimal('66.67'))
+        self.assertEqual(stats.distinction_percentage, Decimal('33.33'))
+        self.assertEqual(stats.average_percentage, Decimal('66.67'))
+
+    def test_derived_percentages_without_students(self):
+        stats = SimpleNamespace(
+            appeared_students=0,
+            passed_students=0,
+            distinction_students=0,
+            first_class_students=0,
+            graded_students=0,
+            percentage_total=0,
+        )
+        ResultStatisticsService.update_derived(stats)
+        self.assertEqual(stats.pass_percentage, Decimal('0.00'))
+        self.assertEqual(stats.average_percentage, Decimal('0.00'))
+
+    def test_only_active_results_count(self):
+        from apps.exams.models import ExamResult
+
+        result = ExamResult(result_status="PASS", percentage=Decimal('70'), is_active=True)
+        self.assertEqual(result.statistics_snapshot(), ("PASS", Decimal('70')))
+
+        result.is_active = False
+        self.assertIsNone(result.statistics_snapshot())
+
+
+class GenerateResultsStatisticsTests(TestCase):
+    def setUp(self):
+        from apps.academics.models import AcademicYear, SchoolClass, Section
+        from apps.exams.models import Exam, ExamType
+        from apps.students.models import Student
+        from apps.tenants.models import Domain, Tenant
+        from apps.users.models import User
+
+        self.tenant = Tenant(name="Test School", schema_name="test_school", subdomain="test-school", status="active")
+        self.tenant.auto_create_schema = False
+        self.tenant.save()
+        Domain.objects.create(tenant=self.tenant, domain="test-school.com", is_primary=True)
+
+        today = timezone.now().date()
+        academic_year = AcademicYear.objects.create(
+            name="2024-2025",
+            code="AY2425",
+            start_date=today,
+            end_date=today + timedelta(days=365),
+            tenant=self.tenant
+        )
+        school_class = SchoolClass.objects.create(
+            name="Class 1", numeric_name=1, code="C1", level="PRIMARY", order=1, tenant=self.tenant
+        )
+        section = Section.objects.create(class_name=school_class, name="A", code="A", tenant=self.tenant)
+        exam_type = ExamType.objects.create(name="Final", code="FINAL", weightage=Decimal('100'), tenant=self.tenant)
+        self.exam = Exam.objects.create(
+            name="Final Exam",
+            code="FINAL-C1",
+            exam_type=exam_type,
+            academic_year=academic_year,
+            class_name=school_class,
+            start_date=today,
+            end_date=today + timedelta(days=5),
+            total_marks=Decimal('100'),
+            tenant=self.tenant
+        )
+        for number in range(2):
+            Student.objects.create(
+                tenant=self.tenant,
+                admission_number=f"ADM00{number}",
+                first_name="Stats",
+                last_name=f"Student{number}",
+                personal_email=f"stats{number}@example.com",
+                status="ACTIVE",
+                date_of_birth=date(2010, 1, 1),
+                academic_year=academic_year,
+                gender="M",
+                mobile_primary="+919999999999",
+                reg_no=f"REG-STATS{number}",
+                current_class=school_class,
+                section=section
+            )
+        self.user = User.objects.create_user(
+            email="examiner@example.com",
+            password="password123",
+            first_name="Exam",
+            last_name="Admin",
+            tenant=self.tenant,
+            is_superuser=True
+        )
+
+    def test_generated_results_are_counted(self):
+        from apps.core.utils.tenant import tenant_context
+        from apps.exams.models import ResultStatistics
+        from apps.exams.views import GenerateResultsView
+
+        request = RequestFactory().post('/')
+        request.user = self.user
+        with tenant_context(self.tenant), mock.patch('apps.exams.views.messages'):
+            GenerateResultsView.as_view()(request, pk=self.exam.pk)
+
+        stats = ResultStatistics.objects.get(exam=self.exam)
+        self.assertEqual(stats.total_students, 2)
+        self.assertEqual(stats.appeared_students, 2)
@@ -11,6 +11,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMix
 from apps.core.utils.tenant import get_current_tenant
 from .models import ExamType, Exam, GradingSystem, Grade, ExamResult, SubjectResult, MarkSheet, ResultStatistics
 from .forms import ExamTypeForm, ExamForm, GradingSystemForm, GradeForm
+from .services.ranking import deferred_ranking
 from apps.students.models import Student
 from django.template.loader import render_to_string
 from django.http import HttpResponse
@@ -175,23 +176,24 @@ class GenerateResultsView(PermissionRequiredMixin, View):
         students = Student.objects.filter(current_class=exam.class_name, is_active=True)
         
         results_count = 0
-        for student in students:
-            # Create or get ExamResult
-            result, created = ExamResult.objects.get_or_create(
-                exam=exam,
-                student=student,
-                defaults={'total_max_marks': exam.total_marks}
-            )
+        with deferred_ranking():
+            for student in students:
+                # Create or get ExamResult
+                result, created = ExamResult.objects.get_or_create(
+                    exam=exam,
+                    student=student,
+                    defaults={'total_max_marks': exam.total_marks}
+                )
             
-            # Calculate total marks from subject results
-            subject_marks = SubjectResult.objects.filter(exam_result=result).aggregate(
-                total=models.Sum('total_marks_obtained')
-            )['total'] or 0
+                # Calculate total marks from subject results
+                subject_marks = SubjectResult.objects.filter(exam_result=result).aggregate(
+                    total=models.Sum('total_marks_obtained')
+                )['total'] or 0
             
-            result.total_marks_obtained = subject_marks
-            result.total_max_marks = exam.total_marks
-            result.save() # This triggers rank update and grade determination
-            results_count += 1
+                result.total_marks_obtained = subject_marks
+                result.total_max_marks = exam.total_marks
+                result.save() # Grade determination; ranking runs once when the block exits
+                results_count += 1
             
         # Update statistics
         stats, created = ResultStatistics.objects.get_or_create(exam=exam)
@@ -7,6 +7,7 @@ from django.utils import timezone
 from decimal import Decimal
 from django.utils.translation import gettext_lazy as _
 from apps.core.models import BaseModel
+from apps.core.services.sequence_service import NumberSequenceService
 
 
 class FeeStructure(BaseModel):
@@ -461,21 +462,13 @@ class Invoice(BaseModel):
         config = FinancialConfiguration.get_for_tenant(self.tenant)
         prefix = f"{config.invoice_prefix}-{timezone.now().year}-"
         
-        last_invoice = Invoice.objects.filter(
-            invoice_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('invoice_number').last()
-        
-        if last_invoice:
-            try:
-                last_num = int(last_invoice.invoice_number.split('-')[-1])
-                new_num = last_num + 1
-            except ValueError:
-                new_num = 1
-        else:
-            new_num = config.invoice_start_number
-            
-        return f"{prefix}{new_num:05d}"
+        return NumberSequenceService.next_number(
+            self.tenant, prefix,
+            start=config.invoice_start_number,
+            seed=NumberSequenceService.last_used(
+                Invoice.all_objects.filter(tenant=self.tenant), 'invoice_number', prefix
+            )
+        )
 
     @property
     def is_fully_paid(self):
@@ -811,18 +804,10 @@ class Payment(BaseModel):
     def generate_payment_number(self):
         """Generate unique payment number"""
         prefix = f"PAY-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_payment = Payment.objects.filter(
-            payment_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('payment_number').last()
-        
-        if last_payment:
-            last_num = int(last_payment.payment_number.split('-')[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        return NumberSequenceService.next_number(
+            self.tenant, prefix,
+            seed=NumberSequenceService.last_used(Payment.all_objects.filter(tenant=self.tenant), 'payment_number', prefix)
+        )
 
     def verify_payment(self, user):
         """Verify payment"""
@@ -962,18 +947,10 @@ class Refund(BaseModel):
     def generate_refund_number(self):
         """Generate unique refund number"""
         prefix = f"REF-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_refund = Refund.objects.filter(
-            refund_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('refund_number').last()
-        
-        if last_refund:
-            last_num = int(last_refund.refund_number.split('-')[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        return NumberSequenceService.next_number(
+            self.tenant, prefix,
+            seed=NumberSequenceService.last_used(Refund.all_objects.filter(tenant=self.tenant), 'refund_number', prefix)
+        )
 
     def approve(self, user):
         """Approve refund"""
@@ -1213,18 +1190,10 @@ class Expense(BaseModel):
     def generate_expense_number(self):
         """Generate unique expense number"""
         prefix = f"EXP-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_expense = Expense.objects.filter(
-            expense_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('expense_number').last()
-        
-        if last_expense:
-            last_num = int(last_expense.expense_number.split('-')[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        return NumberSequenceService.next_number(
+            self.tenant, prefix,
+            seed=NumberSequenceService.last_used(Expense.all_objects.filter(tenant=self.tenant), 'expense_number', prefix)
+        )
 
     def submit_for_approval(self):
         """Submit expense for approval"""
@@ -323,6 +323,23 @@ class HostelAttendance(BaseModel):
         related_name="marked_hostel_attendances",
         verbose_name=_("Marked By")
     )
+    # Class and section at marking time (keeps the attendance rollup key stable)
+    class_name = models.ForeignKey(
+        "academics.SchoolClass",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="hostel_attendances",
+        verbose_name=_("Class")
+    )
+    section = models.ForeignKey(
+        "academics.Section",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="hostel_attendances",
+        verbose_name=_("Section")
+    )
 
     class Meta:
         db_table = "hostel_attendance"
@@ -334,6 +351,16 @@ class HostelAttendance(BaseModel):
     def __str__(self):
         return f"{self.student} - {self.date} - {self.status}"
 
+    def save(self, *args, **kwargs):
+        """Record the student's class and section when the record is marked"""
+        if self._state.adding and self.student_id and not self.class_name_id:
+            from apps.students.models import Student
+
+            self.class_name_id, self.section_id = Student._base_manager.filter(pk=self.student_id).values_list(
+                'current_class_id', 'section_id'
+            ).first() or (None, None)
+        super().save(*args, **kwargs)
+
 
 class LeaveApplication(BaseModel):
     """
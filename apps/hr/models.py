@@ -1310,15 +1310,9 @@ class Payroll(BaseModel):
 
     def calculate_salary(self):
         """Calculate salary based on attendance and structure"""
-        # This is a simplified calculation
-        # You would implement complex salary calculation logic here
-        daily_rate = self.basic_salary / self.working_days
-        payable_days = self.present_days + self.leave_days  # Assuming paid leaves
-        
-        self.total_earnings = daily_rate * payable_days
-        self.net_salary = self.total_earnings - self.total_deductions
-        
-        self.save()
+        # Same rules as a payroll run (half days, allowances, PF/ESI, taxes)
+        from .services import PayrollService
+        PayrollService.recalculate(self)
 
 
 class Promotion(BaseModel):
@@ -0,0 +1,6 @@
+from .payroll import PayrollRun, PayrollService
+
+__all__ = [
+    'PayrollRun',
+    'PayrollService',
+]
@@ -0,0 +1,165 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from apps.hr.models import Department, Designation, Payroll, PFESIConfig, SalaryStructure, Staff
+from apps.hr.services import PayrollService
+from apps.tenants.models import Domain, Tenant
+from apps.users.models import User
+
+
+class PayrollRuleTests(SimpleTestCase):
+    def setUp(self):
+        self.staff = Staff(basic_salary=Decimal('20000.00'))
+        self.structure = SalaryStructure(components={'basic': 20000, 'HRA': 8000, 'LOAN': -1000})
+        self.pf_esi = PFESIConfig(
+            pf_employee_contribution=Decimal('12'),
+            pf_employer_contribution=Decimal('12'),
+            esi_employee_contribution=Decimal('0.75'),
+            esi_employer_contribution=Decimal('3.25'),
+        )
+
+    def attendance(self, present, half=0, absent=0, leave=0):
+        return {'present': present, 'half': half, 'absent': absent, 'leave': leave,
+                'marked': present + half + absent + leave}
+
+    def test_full_month(self):
+        payslip = PayrollService.compute(
+            self.staff, self.structure, 25, self.attendance(25), 0, {}, self.pf_esi
+        )
+
+        self.assertEqual(payslip['total_earnings'], Decimal('28000.00'))
+        self.assertEqual(payslip['deductions'], {'LOAN': '1000.00', 'PF': '2400.00'})
+        self.assertEqual(payslip['net_salary'], Decimal('24600.00'))
+        self.assertEqual((payslip['working_days'], payslip['present_days']), (25, 25))
+
+    def test_earnings_follow_payable_days(self):
+        # 20 present + 2 half days + 1 approved leave = 22 of 25 payable days
+        payslip = PayrollService.compute(
+            self.staff, self.structure, 25, self.attendance(20, half=2, absent=2), 1, {}, None
+        )
+
+        self.assertEqual(payslip['basic_salary'], Decimal('20000.00'))
+        self.assertEqual(payslip['allowances'], {'HRA': '7040.00'})
+        self.assertEqual(payslip['total_earnings'], Decimal('24640.00'))
+        self.assertEqual((payslip['present_days'], payslip['leave_days'], payslip['absent_days']), (22, 1, 2))
+
+    def test_unmarked_days_of_a_marked_month_are_absences(self):
+        # 20 present, 1 approved leave never marked, 4 working days unmarked
+        payslip = PayrollService.compute(self.staff, None, 25, self.attendance(20), 1, {}, None)
+
+        self.assertEqual((payslip['present_days'], payslip['leave_days'], payslip['absent_days']), (20, 1, 4))
+        self.assertEqual(payslip['total_earnings'], Decimal('16800.00'))
+
+    def test_unmarked_attendance_is_paid_in_full(self):
+        payslip = PayrollService.compute(self.staff, None, 25, None, 2, {}, None)
+
+        self.assertEqual(payslip['total_earnings'], Decimal('20000.00'))
+        self.assertEqual((payslip['present_days'], payslip['leave_days']), (23, 2))
+
+    def test_tax_slabs(self):
+        slabs = [{'min': 0, 'max': 250000, 'rate': 0}, {'min': 250000, 'max': 500000, 'rate': 5},
+                 {'min': 500000, 'rate': 20}]
+        self.assertEqual(PayrollService.slab_amount(slabs, Decimal('600000'), progressive=True), Decimal('32500'))
+
+        professional = [{'min': 0, 'max': 15000, 'amount': 0}, {'min': 15000, 'amount': 200}]
+        self.assertEqual(PayrollService.slab_amount(professional, Decimal('28000'), progressive=False), Decimal('200'))
+
+        payslip = PayrollService.compute(
+            self.staff, self.structure, 25, self.attendance(25), 0,
+            {'INCOME_TAX': slabs, 'PROFESSIONAL_TAX': professional}, None
+        )
+        # (28000 * 12 = 336000) -> 86000 at 5% = 4300 a year
+        self.assertEqual(payslip['deductions']['INCOME_TAX'], '358.33')
+        self.assertEqual(payslip['deductions']['PROFESSIONAL_TAX'], '200.00')
+
+    def test_month_bounds(self):
+        self.assertEqual(
+            PayrollService.month_bounds(date(2024, 2, 15)), (date(2024, 2, 1), date(2024, 2, 29))
+        )
+
+
+class PayrollGenerationTests(TestCase):
+    def setUp(self):
+        self.tenant = Tenant(
+            name="Test School",
+            schema_name="test_school",
+            subdomain="test-school",
+            status="active"
+        )
+        self.tenant.auto_create_schema = False
+        self.tenant.save()
+        Domain.objects.create(tenant=self.tenant, domain="test-school.com", is_primary=True)
+
+        self.department = Department.objects.create(name="Science", code="SCI", tenant=self.tenant)
+        self.designation = Designation.objects.create(
+            title="LECTURER",
+            category="TEACHING",
+            min_salary=Decimal('10000'),
+            max_salary=Decimal('50000'),
+            tenant=self.tenant
+        )
+        self.staff_count = 0
+
+    def add_staff(self, count):
+        for _ in range(count):
+            self.staff_count += 1
+            number = self.staff_count
+            user = User.objects.create_user(
+                email=f'staff{number}@example.com',
+                password='password123',
+                first_name='Staff',
+                last_name=str(number),
+                tenant=self.tenant
+            )
+            Staff.objects.create(
+                user=user,
+                employee_id=f'EMP{number:04d}',
+                date_of_birth=date(1990, 1, 1),
+                gender='F',
+                personal_email=f'staff{number}@example.com',
+                personal_phone='+919876543210',
+                department=self.department,
+                designation=self.designation,
+                employment_type='PERMANENT',
+                employment_status='ACTIVE',
+                joining_date=date(2020, 1, 1),
+                basic_salary=Decimal('20000.00'),
+                tenant=self.tenant
+            )
+
+    def generate(self, month, **kwargs):
+        return PayrollService.generate(self.tenant, month, **kwargs)
+
+    def test_query_count_does_not_depend_on_staff(self):
+        self.add_staff(2)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(self.generate(date(2024, 1, 1)).payslips), 2)
+
+        self.add_staff(20)
+        with self.assertNumQueries(len(queries)):
+            run = self.generate(date(2024, 2, 1))
+        self.assertEqual(len(run.payslips), 22)
+        self.assertEqual(Payroll.objects.filter(salary_month=date(2024, 2, 1)).count(), 22)
+
+    def test_dry_run_writes_nothing(self):
+        self.add_staff(2)
+        run = self.generate(date(2024, 1, 1), dry_run=True)
+
+        self.assertTrue(run.dry_run)
+        self.assertEqual(len(run.payslips), 2)
+        self.assertEqual(run.payslips[0].total_earnings, Decimal('20000.00'))
+        self.assertFalse(Payroll.all_objects.exists())
+
+    def test_staff_with_a_payslip_are_skipped(self):
+        self.add_staff(2)
+        self.generate(date(2024, 1, 15))
+        self.add_staff(1)
+
+        run = self.generate(date(2024, 1, 1))
+        self.assertEqual(run.skipped, 2)
+        self.assertEqual([payslip.staff.employee_id for payslip in run.payslips], ['EMP0003'])
+        self.assertEqual(Payroll.objects.filter(salary_month=date(2024, 1, 1)).count(), 3)
@@ -18,6 +18,7 @@ from django.views.generic import (
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.contrib import messages
+from django.db import IntegrityError
 from django.db.models import Count, Q, Sum, Avg
 from django.utils import timezone
 from django.shortcuts import get_object_or_404, redirect
@@ -32,6 +33,7 @@ from apps.core.permissions.mixins import (
     RoleRequiredMixin,
     TenantAccessMixin,
 )
+from apps.core.services.search_service import SearchIndexService
 from apps.core.utils.tenant import get_current_tenant
 from apps.core.utils.audit import audit_log
 from apps.core.views import (
@@ -90,6 +92,7 @@ from .forms import (
 
 User = get_user_model()
 from .idcard import StaffIDCardGenerator
+from .services import PayrollService
 
 
 class HRDashboardView(BaseTemplateView):
@@ -1064,46 +1067,6 @@ class StaffImportSampleView(BaseView):
         return response
 
 
-class StaffExportView(ExportMixin, BaseListView):
-    """Export staff list"""
-
-    permission_required = "hr.view_staff"
-    model = Staff
-    export_filename = "staff_export"
-
-    def get(self, request, *args, **kwargs):
-        return self.export(request, *args, **kwargs)
-
-    def get_queryset(self):
-        return (
-            super().get_queryset().select_related("user", "department", "designation")
-        )
-
-    def get_export_headers(self):
-        return [
-            "first_name",
-            "last_name",
-            "email",
-            "phone",
-            "department_id",
-            "designation_id",
-            "joining_date",
-            "date_of_birth",
-        ]
-
-    def get_export_row(self, staff):
-        return [
-            staff.user.first_name,
-            staff.user.last_name,
-            staff.user.email,
-            staff.personal_phone,
-            str(staff.department.id) if staff.department else "",
-            str(staff.designation.id) if staff.designation else "",
-            staff.joining_date,
-            staff.date_of_birth,
-        ]
-
-
 # ==================== DEPARTMENT VIEWS ====================
 
 
@@ -1602,54 +1565,31 @@ class PayrollGenerateView(BaseTemplateView):
             return redirect("hr:payroll_generate")
 
         tenant = get_current_tenant()
-        created_count = 0
-
-        for staff in Staff.objects.filter(
-            tenant=tenant, is_active=True, employment_status="ACTIVE"
-        ):
-            # Check if payroll already exists for this month
-            if Payroll.objects.filter(
-                tenant=tenant, staff=staff, salary_month=month_date
-            ).exists():
-                continue
-
-            # Create payrol entry
-            # defaults for required fields
-            allowances = {}
-            deductions = {}
-            total_earnings = staff.basic_salary  # Simplified initial value
-            total_deductions = 0
-            net_salary = total_earnings - total_deductions
-
-            payroll = Payroll.objects.create(
-                tenant=tenant,
-                staff=staff,
-                salary_month=month_date,
-                pay_date=timezone.now().date(),
-                basic_salary=staff.basic_salary,
-                allowances=allowances,
-                deductions=deductions,
-                total_earnings=total_earnings,
-                total_deductions=total_deductions,
-                net_salary=net_salary,
-                working_days=22,  # Default, should be configurable
-                present_days=22,  # Default, assume full attendance for now
-                status="DRAFT",
-                created_by=request.user,
-                updated_by=request.user,
-                processed_by=request.user,
-            )
+        dry_run = bool(request.POST.get("dry_run"))
 
-            # Recalculate based on actual logic if needed
-            payroll.calculate_salary()
-
-            created_count += 1
+        try:
+            run = PayrollService.generate(tenant, month_date, user=request.user, dry_run=dry_run)
+        except IntegrityError:
+            # Another run for the same month committed first
+            messages.error(request, f"Payroll for {month} is already being generated.")
+            return redirect("hr:payroll_generate")
 
+        if dry_run:
+            context = self.get_context_data(**kwargs)
+            context.update({
+                "selected_month": month,
+                "preview": run.payslips,
+                "preview_skipped": run.skipped,
+                "preview_total": sum((payslip.net_salary for payslip in run.payslips), 0),
+            })
+            return self.render_to_response(context)
+
+        created_count = len(run.payslips)
         audit_log(
             user=request.user,
             action="GENERATE_PAYROLL",
             resource_type="Payroll",
-            details={"month": month, "entries_created": created_count},
+            details={"month": month, "entries_created": created_count, "skipped": run.skipped},
             severity="INFO",
         )
 
@@ -1673,17 +1613,12 @@ class StaffAutocompleteView(BaseView):
         if len(query) < 2:
             return JsonResponse({"results": []})
 
-        filters = (
-            Q(user__first_name__icontains=query)
-            | Q(user__last_name__icontains=query)
-            | Q(user__email__icontains=query)
-            | Q(employee_id__icontains=query)
-        )
-
-        staff_list = (
-            Staff.objects.filter(tenant=tenant, is_active=True)
-            .filter(filters)
-            .select_related("user")[:10]
+        staff_ids = SearchIndexService.search_ids(tenant, "staff", query, limit=10)
+        staff_list = SearchIndexService.in_order(
+            Staff.objects.filter(tenant=tenant, is_active=True).select_related(
+                "user", "designation", "department"
+            ),
+            staff_ids,
         )
 
         results = []
@@ -1750,71 +1685,71 @@ class LeaveBalanceCheckView(BaseView):
 # ==================== EXPORT VIEWS ====================
 
 
-class StaffExportView(BaseView):
+class StaffExportView(ExportMixin, BaseListView):
+    """Export the active staff list as a streamed CSV or Excel file"""
+
     permission_required = "hr.export_staff"
     roles_required = ["admin", "hr_manager"]
+    model = Staff
+    # values_list projection: no Staff/User/Department instances are built
+    export_fields = [
+        "employee_id",
+        "user__first_name",
+        "user__last_name",
+        "user__email",
+        "personal_phone",
+        "department__name",
+        "designation__title",
+        "employment_type",
+        "joining_date",
+        "basic_salary",
+    ]
 
     def get(self, request, *args, **kwargs):
-        import csv
-        from django.http import HttpResponse
-
-        tenant = get_current_tenant()
-
-        # Create the HttpResponse object with the appropriate CSV header
-        response = HttpResponse(content_type="text/csv")
-        response["Content-Disposition"] = (
-            'attachment; filename="staff_list_{}.csv"'.format(
-                timezone.now().strftime("%Y%m%d_%H%M%S")
-            )
-        )
-
-        writer = csv.writer(response)
-
-        # Write headers
-        writer.writerow(
-            [
-                "Employee ID",
-                "Name",
-                "Email",
-                "Phone",
-                "Department",
-                "Designation",
-                "Employment Type",
-                "Joining Date",
-                "Basic Salary",
-            ]
-        )
-
-        # Write data
-        staff_list = Staff.objects.filter(tenant=tenant, is_active=True).select_related(
-            "user", "department", "designation"
-        )
-
-        for staff in staff_list:
-            writer.writerow(
-                [
-                    staff.employee_id,
-                    staff.full_name,
-                    staff.user.email,
-                    staff.personal_phone,
-                    staff.department.name,
-                    staff.designation.title,
-                    staff.get_employment_type_display(),
-                    staff.joining_date.strftime("%Y-%m-%d"),
-                    str(staff.basic_salary),
-                ]
-            )
+        self.export_filename = "staff_list_{}".format(timezone.now().strftime("%Y%m%d_%H%M%S"))
+        response = self.export(request, *args, **kwargs)
 
         audit_log(
             user=request.user,
             action="EXPORT_STAFF",
             resource_type="Staff",
-            details={"format": "csv", "count": staff_list.count()},
+            details={"format": request.GET.get("format", "csv"), "count": self.get_export_queryset().count()},
             severity="INFO",
         )
 
         return response
 
+    def get_export_headers(self):
+        return [
+            "Employee ID",
+            "Name",
+            "Email",
+            "Phone",
+            "Department",
+            "Designation",
+            "Employment Type",
+            "Joining Date",
+            "Basic Salary",
+        ]
+
+    def get_export_row(self, values):
+        (
+            employee_id, first_name, last_name, email, phone,
+            department, designation, employment_type, joining_date, basic_salary,
+        ) = values
+        name = f"{first_name or ''} {last_name or ''}".strip()
+        return [
+            employee_id,
+            name or str(_("Name Vacant")),
+            email,
+            phone,
+            department or "",
+            designation or "",
+            dict(Staff.EMPLOYMENT_TYPE_CHOICES).get(employment_type, employment_type),
+            joining_date.strftime("%Y-%m-%d") if joining_date else "",
+            str(basic_salary),
+        ]
+
 
 # ==================== DASHBOARD WIDGETS ====================
 
@@ -6,6 +6,7 @@ from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from apps.core.models import BaseModel
+from apps.core.services.sequence_service import NumberSequenceService
 
 
 class Category(BaseModel):
@@ -664,18 +665,10 @@ class PurchaseOrder(BaseModel):
     def generate_po_number(self):
         """Generate unique purchase order number"""
         prefix = f"PO-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_po = PurchaseOrder.objects.filter(
-            po_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('po_number').last()
-        
-        if last_po:
-            last_num = int(last_po.po_number.split('-')[-1])
-            new_num = last_num + 1
-        else:
-            new_num = 1
-            
-        return f"{prefix}{new_num:05d}"
+        return NumberSequenceService.next_number(
+            self.tenant, prefix,
+            seed=NumberSequenceService.last_used(PurchaseOrder.all_objects.filter(tenant=self.tenant), 'po_number', prefix)
+        )
 
     def calculate_totals(self):
         """Calculate order totals from items"""
@@ -1,5 +1,6 @@
 from rest_framework import viewsets
 from apps.core.api.permissions import TenantAccessPermission, RoleRequiredPermission
+from apps.core.api.views import KeysetResultsSetPagination
 from rest_framework.permissions import IsAuthenticated
 from apps.core.permissions.mixins import TenantAccessMixin
 from apps.security.models import *
@@ -32,6 +33,7 @@ class AccessControlPolicyViewSet(viewsets.ModelViewSet):
 class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = AuditLog.objects.all()
     serializer_class = AuditLogSerializer
+    pagination_class = KeysetResultsSetPagination
     permission_classes = [IsAuthenticated, TenantAccessPermission, RoleRequiredPermission]
     required_roles = ['admin', 'super_admin']
 
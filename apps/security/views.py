@@ -169,4 +169,5 @@ class AuditLogListView(BaseListView):
     permission_required = 'security.view_auditlog'
     search_fields = ['user__username', 'description', 'ip_address']
     ordering = ['-created_at']
-    paginate_by = 50
+    pagination_mode = 'keyset'
+    keyset_page_size = 50
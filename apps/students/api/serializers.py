@@ -738,14 +738,16 @@ class StudentDetailSerializer(TenantAwareSerializer):
             'created_by', 'updated_by'
         ]
     
+    @staticmethod
+    def attendance_period(request):
+        """(start_date, end_date) reported by attendance_percentage"""
+        if request and 'start_date' in request.query_params:
+            return request.query_params.get('start_date'), request.query_params.get('end_date')
+        return None, None
+    
     def get_attendance_percentage(self, obj):
         """Get current academic year attendance percentage"""
-        request = self.context.get('request')
-        if request and 'start_date' in request.query_params:
-            start_date = request.query_params.get('start_date')
-            end_date = request.query_params.get('end_date')
-            return obj.get_attendance_percentage(start_date, end_date)
-        return obj.get_attendance_percentage()
+        return obj.get_attendance_percentage(*self.attendance_period(self.context.get('request')))
     
     def get_academic_performance(self, obj):
         """Get academic performance summary"""
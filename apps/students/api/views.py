@@ -7,7 +7,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from django.utils import timezone
 from django.db import transaction
-from django.db.models import Count, Q, Avg, Sum
+from django.db.models import Count, Q, Avg, Sum, Prefetch
 from django.shortcuts import get_object_or_404
 from django.http import HttpResponse
 from django.core.exceptions import PermissionDenied
@@ -48,6 +48,7 @@ from apps.students.api.serializers import (
 from apps.core.services.audit_service import AuditService
 from apps.core.services.export_service import ExportService
 from apps.core.services.notification_service import NotificationService
+from apps.core.services.search_service import SearchIndexService
 
 logger = logging.getLogger(__name__)
 
@@ -252,7 +253,18 @@ class StudentCreateAPIView(BaseCreateAPIView):
         return response
 
 
-class StudentDetailAPIView(BaseRetrieveAPIView):
+class StudentDetailQuerysetMixin:
+    """
+    Annotate the attendance, GPA and photo figures StudentDetailSerializer
+    reports, so they are read from the student row (see StudentQuerySet)
+    """
+    
+    def get_queryset(self):
+        start_date, end_date = StudentDetailSerializer.attendance_period(self.request)
+        return super().get_queryset().with_attendance_stats(start_date, end_date).with_gpa().with_photo()
+
+
+class StudentDetailAPIView(StudentDetailQuerysetMixin, BaseRetrieveAPIView):
     """
     Retrieve a single student with all related data
     """
@@ -354,7 +366,7 @@ class StudentDeleteAPIView(BaseDestroyAPIView):
             logger.error(f"Failed to send deletion notification: {e}")
 
 
-class StudentRetrieveUpdateDestroyAPIView(BaseRetrieveUpdateDestroyAPIView):
+class StudentRetrieveUpdateDestroyAPIView(StudentDetailQuerysetMixin, BaseRetrieveUpdateDestroyAPIView):
     """
     Combined view for retrieve, update, and delete operations
     """
@@ -540,7 +552,7 @@ class StudentDocumentRejectAPIView(BaseUpdateAPIView):
 # SPECIALIZED VIEWS
 # ============================================================================
 
-class StudentIDCardAPIView(BaseRetrieveAPIView):
+class StudentIDCardAPIView(StudentDetailQuerysetMixin, BaseRetrieveAPIView):
     """
     Generate Student ID Card
     """
@@ -920,6 +932,7 @@ class StudentExportAPIView(ExportAPIView):
     """
     model = Student
     serializer_class = StudentExportSerializer
+    export_in_background = True
     
     def get_export_filename(self):
         """Get export filename"""
@@ -959,13 +972,12 @@ class StudentExportAPIView(ExportAPIView):
     
     def get_export_row(self, obj):
         """Get data row for export"""
-        # Get primary guardian
-        primary_guardian = obj.guardians.filter(is_primary=True).first()
+        # Primary guardian and current address are prefetched per chunk in get_queryset
+        primary_guardian = obj.primary_guardians[0] if obj.primary_guardians else None
         guardian_name = primary_guardian.full_name if primary_guardian else ''
         guardian_phone = primary_guardian.phone_primary if primary_guardian else ''
         
-        # Get current address
-        current_address = obj.addresses.filter(is_current=True).first()
+        current_address = obj.current_addresses[0] if obj.current_addresses else None
         address = current_address.formatted_address if current_address else ''
         
         return [
@@ -1000,7 +1012,10 @@ class StudentExportAPIView(ExportAPIView):
     
     def get_queryset(self):
         """Get filtered queryset for export"""
-        queryset = super().get_queryset()
+        queryset = super().get_queryset().select_related('current_class', 'section').prefetch_related(
+            Prefetch('guardians', queryset=Guardian.objects.filter(is_primary=True), to_attr='primary_guardians'),
+            Prefetch('addresses', queryset=StudentAddress.objects.filter(is_current=True), to_attr='current_addresses'),
+        )
         
         # Apply additional filters from request
         status_filter = self.request.query_params.get('status')
@@ -1222,10 +1237,9 @@ class StudentSearchAPIView(BaseListAPIView):
         name = search_params.get('name')
         if name:
             queryset = queryset.filter(
-                Q(first_name__icontains=name) |
-                Q(last_name__icontains=name) |
-                Q(middle_name__icontains=name) |
-                Q(full_name__icontains=name)
+                pk__in=SearchIndexService.search_ids(
+                    self.tenant, 'student', name, limit=SearchIndexService.max_filter_results()
+                )
             )
         
         # Contact search
@@ -1296,19 +1310,15 @@ class StudentAutocompleteAPIView(BaseListAPIView):
         
         search_term = self.request.query_params.get('q', '')
         if search_term:
-            queryset = queryset.filter(
-                Q(admission_number__icontains=search_term) |
-                Q(first_name__icontains=search_term) |
-                Q(last_name__icontains=search_term) |
-                Q(full_name__icontains=search_term) |
-                Q(personal_email__icontains=search_term) |
-                Q(mobile_primary__icontains=search_term)
+            # Best matches first
+            queryset = SearchIndexService.ranked(
+                queryset, SearchIndexService.search_ids(self.tenant, 'student', search_term, limit=10)
             )
         
         return queryset[:10]  # Limit to 10 results
 
 
-class StudentDashboardAPIView(BaseRetrieveAPIView):
+class StudentDashboardAPIView(StudentDetailQuerysetMixin, BaseRetrieveAPIView):
     """
     Student dashboard with summary information
     """
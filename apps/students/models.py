@@ -2,6 +2,7 @@ from datetime import datetime, date
 import uuid
 import os
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
@@ -13,7 +14,9 @@ from django.contrib.auth import get_user_model
 from encrypted_model_fields.fields import EncryptedCharField, EncryptedTextField
 
 # Import core base models
+from apps.core.managers import TenantSoftDeleteManager
 from apps.core.models import BaseModel, UUIDModel, TimeStampedModel, SoftDeleteModel
+from apps.core.services.sequence_service import NumberSequenceService
 
 # Phone regex for validation
 phone_regex = RegexValidator(
@@ -21,6 +24,74 @@ phone_regex = RegexValidator(
     message=_("Phone number must be entered in the format: '+999999999'. Up to 15 digits allowed."),
 )
 
+
+class StudentQuerySet(models.QuerySet):
+    """
+    Annotations and prefetches for per-student figures, so lists and
+    serializers read them from the row instead of querying per student.
+    ``Student.get_attendance_percentage``, ``get_academic_performance`` and
+    ``get_photo`` use them when present.
+    """
+
+    @staticmethod
+    def attendance_period_key(start_date=None, end_date=None):
+        return f"{start_date or ''}|{end_date or ''}"
+
+    def with_attendance_stats(self, start_date=None, end_date=None):
+        """Annotate ``attendance_total`` and ``attendance_present`` for the period"""
+        from apps.academics.models import StudentAttendance
+
+        attendances = StudentAttendance.objects.filter(student=models.OuterRef('pk'))
+        if start_date:
+            attendances = attendances.filter(date__gte=start_date)
+        if end_date:
+            attendances = attendances.filter(date__lte=end_date)
+
+        def count(queryset):
+            return Coalesce(models.Subquery(
+                queryset.order_by().values('student').annotate(n=models.Count('pk')).values('n'),
+                output_field=models.IntegerField()
+            ), 0)
+
+        return self.annotate(
+            attendance_total=count(attendances),
+            attendance_present=count(attendances.filter(status="PRESENT")),
+            attendance_period=models.Value(
+                self.attendance_period_key(start_date, end_date), output_field=models.CharField()
+            ),
+        )
+
+    def with_gpa(self):
+        """Annotate ``passed_exam_count`` and ``grade_point_total`` of published passes"""
+        from apps.exams.models import ExamResult
+
+        results = ExamResult.objects.filter(
+            student=models.OuterRef('pk'), result_status="PASS", is_published=True
+        ).order_by().values('student')
+
+        return self.annotate(
+            passed_exam_count=Coalesce(models.Subquery(
+                results.annotate(n=models.Count('pk')).values('n'), output_field=models.IntegerField()
+            ), 0),
+            grade_point_total=models.Subquery(
+                results.annotate(total=models.Sum('grade_point')).values('total'),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            ),
+        )
+
+    def with_photo(self):
+        """Prefetch photo documents into ``photo_documents``"""
+        return self.prefetch_related(models.Prefetch(
+            'documents',
+            queryset=StudentDocument.objects.filter(doc_type="PHOTO").order_by('pk'),
+            to_attr='photo_documents',
+        ))
+
+
+class StudentManager(TenantSoftDeleteManager.from_queryset(StudentQuerySet)):
+    pass
+
+
 class Student(BaseModel):
     """
     Enhanced Student model with multi-tenant support and comprehensive features
@@ -288,6 +359,8 @@ class Student(BaseModel):
     
     # ==================== SYSTEM FIELDS ====================
 
+    objects = StudentManager()
+
     class Meta:
         db_table = "students_student"
         ordering = ["first_name", "last_name"]
@@ -379,6 +452,13 @@ class Student(BaseModel):
     def get_attendance_percentage(self, start_date=None, end_date=None):
         """Calculate attendance percentage for given period"""
         from apps.academics.models import StudentAttendance
+        
+        # Annotated by StudentQuerySet.with_attendance_stats for the same period
+        if getattr(self, 'attendance_period', None) == StudentQuerySet.attendance_period_key(start_date, end_date):
+            if not self.attendance_total:
+                return 0.0
+            return (self.attendance_present / self.attendance_total) * 100
+        
         attendances = StudentAttendance.objects.filter(student=self)
         
         if start_date:
@@ -397,6 +477,16 @@ class Student(BaseModel):
         """Get academic performance summary"""
         from apps.exams.models import ExamResult
         
+        # Annotated by StudentQuerySet.with_gpa
+        if hasattr(self, 'passed_exam_count'):
+            if not self.passed_exam_count:
+                return {"gpa": 0.0, "total_subjects": 0, "rank": None}
+            return {
+                "gpa": float((self.grade_point_total or 0) / self.passed_exam_count),
+                "total_subjects": self.passed_exam_count,
+                "rank": self.get_class_rank()
+            }
+        
         # Consider only passed exams for GPA calculation
         results = ExamResult.objects.filter(
             student=self,
@@ -505,6 +595,9 @@ Best regards,
         return self.documents.filter(doc_type=doc_type).first()    
 
     def get_photo(self):
+        # Prefetched by StudentQuerySet.with_photo
+        if hasattr(self, 'photo_documents'):
+            return self.photo_documents[0] if self.photo_documents else None
         return self.get_document("PHOTO")
 
     def get_birth_certificate(self):
@@ -589,21 +682,18 @@ Best regards,
         self.full_clean()
         super().save(*args, **kwargs)
 
+    @classmethod
+    def reserve_admission_numbers(cls, tenant, count=1):
+        """Allocate ``count`` admission numbers: ADM-{YYYY}-{SCHEMA}-{SEQ}"""
+        prefix = f"ADM-{timezone.now().year}-{tenant.schema_name.upper()}-"
+        return NumberSequenceService.reserve_numbers(
+            tenant, prefix, count, width=4,
+            seed=NumberSequenceService.last_used(cls.all_objects.filter(tenant=tenant), 'admission_number', prefix)
+        )
+
     def generate_admission_number(self):
         """Generate unique admission number"""
-        prefix = f"ADM-{timezone.now().year}-{self.tenant.schema_name.upper()}-"
-        last_student = Student.objects.filter(
-            admission_number__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('admission_number').last()
-        
-        if last_student:
-            last_number = int(last_student.admission_number.split('-')[-1])
-            new_number = last_number + 1
-        else:
-            new_number = 1
-            
-        return f"{prefix}{new_number:04d}"
+        return self.reserve_admission_numbers(self.tenant)[0]
 
     def generate_roll_number(self):
         """Generate incremental roll number based on class/section"""
@@ -626,26 +716,18 @@ Best regards,
             
         return str(new_roll)
 
+    @classmethod
+    def reserve_reg_nos(cls, tenant, count=1):
+        """Allocate ``count`` registration numbers: REG-{YYYY}-{SEQ}"""
+        prefix = f"REG-{timezone.now().year}-"
+        return NumberSequenceService.reserve_numbers(
+            tenant, prefix, count, width=6,
+            seed=NumberSequenceService.last_used(cls.all_objects.filter(tenant=tenant), 'reg_no', prefix)
+        )
+
     def generate_reg_no(self):
         """Generate unique registration number: REG-{YYYY}-{SEQ}"""
-        year = timezone.now().year
-        prefix = f"REG-{year}-"
-        
-        last_student = Student.objects.filter(
-            reg_no__startswith=prefix,
-            tenant=self.tenant
-        ).order_by('reg_no').last()
-        
-        if last_student:
-             try:
-                last_seq = int(last_student.reg_no.split('-')[-1])
-                new_seq = last_seq + 1
-             except ValueError:
-                new_seq = 1
-        else:
-            new_seq = 1
-            
-        return f"{prefix}{new_seq:06d}"
+        return self.reserve_reg_nos(self.tenant)[0]
 
     @property
     def full_name(self):
@@ -0,0 +1,428 @@
+"""
+Set-based bulk student import.
+
+The file is read in one streaming pass and handled in chunks. Classes and
+sections are resolved once into dictionaries, existing students are found
+with one ``IN`` query per chunk, and creates, updates and guardians are
+written with ``bulk_create`` / ``bulk_update``. Because bulk writes skip
+``Student.save()`` and its signals, the importer reserves admission and
+registration numbers in blocks, assigns roll numbers and institutional
+emails, creates the identification and medical records and writes the
+search documents itself.
+"""
+
+import csv
+import io
+import logging
+import re
+from datetime import date, datetime
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from apps.academics.models import SchoolClass, Section
+from apps.core.services.search_service import SearchIndexService
+from apps.core.services.signature_service import DataSignatureService
+from apps.students.models import Guardian, Student, StudentIdentification, StudentMedicalInfo
+
+logger = logging.getLogger(__name__)
+
+
+class BulkStudentImportService:
+    """
+    Import students from CSV or Excel content
+
+    Usage::
+
+        importer = BulkStudentImportService(tenant, academic_year, user=user, update_existing=True)
+        results = importer.import_csv(content)
+    """
+
+    CHUNK_SIZE = 1000
+
+    HEADER_ALIASES = {
+        'firstname': 'first_name',
+        'lastname': 'last_name',
+        'dob': 'date_of_birth',
+        'email': 'personal_email',
+        'phone': 'mobile_primary',
+        'class': 'class_name',
+        'section': 'section_name',
+    }
+
+    DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%m/%d/%Y', '%Y/%m/%d')
+
+    GUARDIAN_COLUMNS = (
+        ('father', 'FATHER'),
+        ('mother', 'MOTHER'),
+        ('guardian', None),
+    )
+
+    # Relations are validated by the lookups above, not one query per field
+    SKIP_FIELD_VALIDATION = (
+        'id', 'tenant', 'user', 'academic_year', 'current_class', 'stream', 'section',
+        'created_by', 'updated_by', 'deleted_by',
+    )
+
+    def __init__(self, tenant, academic_year=None, user=None, update_existing=False,
+                 skip_errors=False, chunk_size=None):
+        self.tenant = tenant
+        self.academic_year = academic_year
+        self.user = user
+        self.update_existing = update_existing
+        self.skip_errors = skip_errors
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.created_ids = []
+        self.results = {
+            'created': 0,
+            'updated': 0,
+            'skipped': 0,
+            'failed': 0,
+            'guardians_created': 0,
+            'errors': [],
+            'warnings': [],
+            'total_rows': 0,
+        }
+        self._classes = None
+        self._sections = None
+        self._seen_emails = set()
+        self._roll_numbers = {}
+        self._email_domain = None
+        self._stopped = False
+
+    # ------------------------------------------------------------------
+    # Readers (generators of (row_number, row_dict))
+    # ------------------------------------------------------------------
+    @classmethod
+    def normalize_header(cls, header, position):
+        if header is None or str(header).strip() == '':
+            return f'column_{position}'
+        header = str(header).strip().lower().replace(' ', '_')
+        return cls.HEADER_ALIASES.get(header, header)
+
+    @classmethod
+    def read_csv(cls, content):
+        if isinstance(content, bytes):
+            content = content.decode('utf-8-sig')
+        sample = content[:1024]
+        delimiters = [',', ';', '\t', '|']
+        counts = {d: sample.count(d) for d in delimiters}
+        delimiter = max(counts, key=counts.get) if any(counts.values()) else ','
+
+        reader = csv.reader(io.StringIO(content), delimiter=delimiter)
+        headers = [cls.normalize_header(h, i) for i, h in enumerate(next(reader, []), start=1)]
+        for row_number, row in enumerate(reader, start=2):
+            values = [value.strip() for value in row] + [''] * (len(headers) - len(row))
+            yield row_number, dict(zip(headers, values))
+
+    @classmethod
+    def read_excel(cls, content):
+        from openpyxl import load_workbook
+
+        source = io.BytesIO(content) if isinstance(content, bytes) else content
+        wb = load_workbook(filename=source, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            headers = [cls.normalize_header(h, i) for i, h in enumerate(next(rows, ()), start=1)]
+            for row_number, row in enumerate(rows, start=2):
+                yield row_number, dict(zip(headers, (cls.cell_value(value) for value in row)))
+        finally:
+            wb.close()
+
+    @staticmethod
+    def cell_value(value):
+        if value is None:
+            return ''
+        if isinstance(value, (datetime, date)):
+            return value.strftime('%Y-%m-%d')
+        return str(value).strip()
+
+    def import_csv(self, content):
+        return self.run(self.read_csv(content))
+
+    def import_excel(self, content):
+        return self.run(self.read_excel(content))
+
+    # ------------------------------------------------------------------
+    # Pipeline
+    # ------------------------------------------------------------------
+    def run(self, rows):
+        """Import ``(row_number, row_dict)`` pairs; returns the results dict"""
+        self._load_lookups()
+        iterator = iter(rows)
+        while not self._stopped:
+            chunk = list(islice(iterator, self.chunk_size))
+            if not chunk:
+                break
+            self.results['total_rows'] += len(chunk)
+            self._process_chunk(chunk)
+
+        self.results['success'] = not self.results['errors'] or self.skip_errors
+        self.results['processed'] = self.results['created'] + self.results['updated'] + self.results['skipped']
+        return self.results
+
+    def _load_lookups(self):
+        self._classes = {}
+        for school_class in SchoolClass.objects.filter(tenant=self.tenant).order_by('pk'):
+            self._classes.setdefault(school_class.name.strip().lower(), school_class)
+        self._sections = {}
+        for section in Section.objects.filter(class_name__tenant=self.tenant).order_by('pk'):
+            self._sections.setdefault((section.class_name_id, section.name.strip().lower()), section)
+
+    def _fail(self, row_number, message):
+        self.results['failed'] += 1
+        if self.skip_errors:
+            self.results['skipped'] += 1
+            self.results['warnings'].append(f"Row {row_number}: {message}")
+        else:
+            self.results['errors'].append(f"Row {row_number}: {message}")
+            self._stopped = True
+
+    def _process_chunk(self, chunk):
+        parsed = []
+        for row_number, row in chunk:
+            if self._stopped:
+                break
+            if all(value in ('', None) for value in row.values()):
+                self.results['skipped'] += 1
+                continue
+            try:
+                data = self.student_data(row, row_number)
+            except ValueError as e:
+                self._fail(row_number, str(e))
+                continue
+            email = data['personal_email']
+            if email in self._seen_emails:
+                self._fail(row_number, f'Duplicate email {email} in file')
+                continue
+            self._seen_emails.add(email)
+            parsed.append((row_number, row, data))
+
+        if not parsed:
+            return
+
+        existing = {
+            student.personal_email: student
+            for student in Student.all_objects.filter(
+                personal_email__in=[data['personal_email'] for _, _, data in parsed]
+            )
+        }
+
+        creates, updates, guardians = [], [], []
+        update_fields = set()
+        now = timezone.now()
+        for row_number, row, data in parsed:
+            if self._stopped:
+                break
+            student = existing.get(data['personal_email'])
+            if student is not None:
+                if not self.update_existing or student.tenant_id != self.tenant.id:
+                    self._fail(row_number, f"Student with email {data['personal_email']} already exists")
+                    continue
+                if student.status != data['status']:
+                    student.status_changed_date = now
+                    update_fields.add('status_changed_date')
+                for field, value in data.items():
+                    setattr(student, field, value)
+                student.updated_at = now
+                student.updated_by = self.user
+                update_fields.update(data)
+                target = updates
+            else:
+                student = Student(tenant=self.tenant, created_by=self.user, updated_by=self.user, **data)
+                target = creates
+
+            try:
+                self.validate(student)
+            except ValidationError as e:
+                self._fail(row_number, '; '.join(e.messages))
+                continue
+            target.append(student)
+            guardians.extend((student, guardian) for guardian in self.guardian_data(row))
+
+        with transaction.atomic():
+            self._create_students(creates)
+            if updates:
+                Student.all_objects.bulk_update(
+                    DataSignatureService.sign_objects(updates),
+                    sorted(update_fields | {'updated_at', 'updated_by', 'data_signature'}),
+                    batch_size=self.chunk_size
+                )
+            self._create_guardians(guardians, has_updates=bool(updates))
+            SearchIndexService.index_objects(
+                'student', Student.all_objects.filter(pk__in=[student.pk for student in creates + updates])
+            )
+
+        self.results['created'] += len(creates)
+        self.results['updated'] += len(updates)
+        self.created_ids.extend(student.pk for student in creates)
+
+    # ------------------------------------------------------------------
+    # Rows
+    # ------------------------------------------------------------------
+    @classmethod
+    def parse_date(cls, value):
+        if not value:
+            return None
+        if isinstance(value, date):
+            return value
+        for fmt in cls.DATE_FORMATS:
+            try:
+                return datetime.strptime(str(value).strip(), fmt).date()
+            except ValueError:
+                continue
+        return None
+
+    def generated_email(self, first_name, last_name, row_number):
+        first_part = re.sub(r'[^a-z0-9]', '', first_name.lower())[:10]
+        last_part = re.sub(r'[^a-z0-9]', '', last_name.lower())[:10]
+        domain = getattr(self.tenant, 'domain', None) or f"{self.tenant.schema_name}.edu"
+        return f"{first_part}.{last_part}{row_number}@{domain}"
+
+    def student_data(self, row, row_number):
+        """Student field values for one row (no queries)"""
+        first_name = (row.get('first_name') or '').strip()
+        last_name = (row.get('last_name') or '').strip()
+        if not first_name and not last_name:
+            raise ValueError('Missing both first and last name')
+
+        personal_email = (row.get('personal_email') or '').strip().lower()
+        if not personal_email:
+            personal_email = self.generated_email(first_name, last_name, row_number)
+
+        data = {
+            'first_name': first_name,
+            'last_name': last_name,
+            'personal_email': personal_email,
+            'gender': (row.get('gender') or 'U').upper()[:1],
+            'date_of_birth': self.parse_date(row.get('date_of_birth')),
+            'mobile_primary': (row.get('mobile_primary') or '')[:15],
+            'status': (row.get('status') or 'ACTIVE').upper(),
+            'category': (row.get('category') or 'GENERAL').upper(),
+        }
+        if self.academic_year:
+            data['academic_year'] = self.academic_year
+
+        class_name = (row.get('class_name') or '').strip().lower()
+        school_class = self._classes.get(class_name) if class_name else None
+        if school_class:
+            data['current_class'] = school_class
+            section_name = (row.get('section_name') or '').strip().lower()
+            section = self._sections.get((school_class.pk, section_name)) if section_name else None
+            if section:
+                data['section'] = section
+        return data
+
+    def guardian_data(self, row):
+        guardians = []
+        for prefix, relation in self.GUARDIAN_COLUMNS:
+            full_name = ' '.join((row.get(f'{prefix}_name') or '').split())
+            if not full_name:
+                continue
+            occupation = (row.get(f'{prefix}_occupation') or '').strip().upper()
+            guardians.append({
+                'relation': relation or (row.get('guardian_relationship') or 'GUARDIAN').strip().upper(),
+                'full_name': full_name,
+                'email': (row.get(f'{prefix}_email') or '').strip().lower(),
+                'phone_primary': (row.get(f'{prefix}_phone') or '')[:17],
+                'occupation': occupation if occupation in dict(Guardian.OCCUPATION_CHOICES) else '',
+            })
+        return guardians
+
+    def validate(self, student):
+        """Field validation plus the query-free checks of ``Student.clean``"""
+        student.clean_fields(exclude=self.SKIP_FIELD_VALIDATION)
+        today = timezone.now().date()
+        if student.date_of_birth >= today:
+            raise ValidationError({'date_of_birth': 'Date of birth must be in the past'})
+        if student.age < 3:
+            raise ValidationError({'date_of_birth': 'Student must be at least 3 years old'})
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def _next_roll_number(self, student):
+        key = (student.academic_year_id, student.current_class_id, student.section_id)
+        if key not in self._roll_numbers:
+            filters = {
+                'tenant': self.tenant,
+                'academic_year_id': student.academic_year_id,
+                'current_class_id': student.current_class_id,
+            }
+            if student.section_id:
+                filters['section_id'] = student.section_id
+            numbers = Student.all_objects.filter(**filters).exclude(roll_number='').values_list('roll_number', flat=True)
+            self._roll_numbers[key] = max((int(number) for number in numbers if number.isdigit()), default=0)
+        self._roll_numbers[key] += 1
+        return str(self._roll_numbers[key])
+
+    def _institutional_domain(self):
+        if self._email_domain is None:
+            domain = self.tenant.domains.filter(is_primary=True).first()
+            self._email_domain = domain.domain if domain else 'student.institution.edu'
+        return self._email_domain
+
+    def _assign_numbers(self, students, field, reserve):
+        if students:
+            for student, number in zip(students, reserve(self.tenant, len(students))):
+                setattr(student, field, number)
+
+    def _create_students(self, students):
+        """bulk_create with the numbers and related records ``Student.save`` would add"""
+        if not students:
+            return
+        # One block reservation per chunk instead of a lookup per student
+        self._assign_numbers([s for s in students if not s.admission_number], 'admission_number',
+                             Student.reserve_admission_numbers)
+        self._assign_numbers([s for s in students if not s.reg_no], 'reg_no', Student.reserve_reg_nos)
+        for student in students:
+            if not student.roll_number:
+                student.roll_number = self._next_roll_number(student)
+            if not student.institutional_email:
+                student.institutional_email = f"{student.admission_number.lower()}@{self._institutional_domain()}"
+
+        Student.objects.bulk_create(DataSignatureService.sign_objects(students), batch_size=self.chunk_size)
+        # What the post_save signal does for single saves
+        for model in (StudentIdentification, StudentMedicalInfo):
+            model.objects.bulk_create(
+                [model(student=student, tenant=self.tenant, created_by=self.user) for student in students],
+                batch_size=self.chunk_size,
+            )
+
+    def _create_guardians(self, guardians, has_updates=False):
+        if not guardians:
+            return
+        existing = set()
+        has_primary = set()
+        if has_updates:
+            rows = Guardian.objects.filter(
+                student__in={student.pk for student, _ in guardians}
+            ).values_list('student_id', 'relation', 'is_primary')
+            for student_id, relation, is_primary in rows:
+                existing.add((student_id, relation))
+                if is_primary:
+                    has_primary.add(student_id)
+
+        records = []
+        for student, data in guardians:
+            if (student.pk, data['relation']) in existing:
+                continue
+            guardian = Guardian(student=student, tenant=self.tenant, created_by=self.user, **data)
+            try:
+                guardian.clean_fields(exclude=self.SKIP_FIELD_VALIDATION + ('student',))
+            except ValidationError as e:
+                self.results['warnings'].append(
+                    f"Guardian {data['full_name']} of {student.personal_email} skipped: {'; '.join(e.messages)}"
+                )
+                continue
+            # First guardian of a student without one becomes primary
+            if student.pk not in has_primary:
+                guardian.is_primary = True
+                has_primary.add(student.pk)
+            existing.add((student.pk, data['relation']))
+            records.append(guardian)
+
+        Guardian.objects.bulk_create(records, batch_size=self.chunk_size)
+        self.results['guardians_created'] += len(records)
@@ -6,7 +6,7 @@ import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any, Union
 from django.db import models
-from django.db.models import Q, Count, Sum, Avg, Max, Min
+from django.db.models import Count, Sum, Avg, Max, Min
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError, PermissionDenied
@@ -18,6 +18,9 @@ from ..models import Student, Guardian, StudentAddress, StudentDocument, Student
 from apps.academics.models import AcademicYear, SchoolClass, Section, Stream
 from apps.core.services.audit_service import AuditService
 from apps.core.services.notification_service import NotificationService
+from apps.core.services.search_service import SearchIndexService
+from apps.core.services.sequence_service import NumberSequenceService
+from apps.core.utils.validation import TENANT, save_validation
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -148,40 +151,14 @@ class StudentService:
             # Get tenant code (first 3 letters)
             tenant_code = tenant.schema_name[:3].upper() if hasattr(tenant, 'schema_name') else "SCH"
             
-            # Get last admission number for this tenant and academic year
-            last_student = Student.objects.filter(
-                tenant=tenant,
-                admission_number__isnull=False
-            ).exclude(admission_number='').order_by('-admission_number').first()
-            
-            if last_student and last_student.admission_number:
-                # Extract number from last admission number
-                match = re.search(r'\d+', last_student.admission_number)
-                if match:
-                    last_number = int(match.group())
-                    new_number = last_number + 1
-                else:
-                    new_number = 1
-            else:
-                new_number = 1
-            
-            # Format number with leading zeros
-            formatted_number = f"{new_number:05d}"
-            
-            # Construct admission number
-            admission_number = f"{tenant_code}/{prefix}/{formatted_number}"
-            
-            # Ensure uniqueness
-            counter = 1
-            original_number = admission_number
-            while Student.objects.filter(
-                tenant=tenant,
-                admission_number=admission_number
-            ).exists():
-                admission_number = f"{original_number}-{counter}"
-                counter += 1
-            
-            return admission_number
+            # Counter per tenant and prefix; unique without scanning existing numbers
+            number_prefix = f"{tenant_code}/{prefix}/"
+            return NumberSequenceService.next_number(
+                tenant, number_prefix,
+                seed=NumberSequenceService.last_used(
+                    Student.all_objects.filter(tenant=tenant), 'admission_number', number_prefix
+                )
+            )
             
         except Exception as e:
             logger.error(f"Error generating admission number: {str(e)}", exc_info=True)
@@ -524,16 +501,11 @@ class StudentService:
             if not query or len(query) < 2:
                 return []
             
-            # Search in multiple fields
-            results = students.filter(
-                Q(admission_number__icontains=query) |
-                Q(first_name__icontains=query) |
-                Q(last_name__icontains=query) |
-                Q(personal_email__icontains=query) |
-                Q(mobile_primary__icontains=query) |
-                Q(guardians__first_name__icontains=query) |
-                Q(guardians__last_name__icontains=query)
-            ).select_related('current_class', 'section').distinct()[:limit]
+            # Ranked ids from the search index (names, numbers, contacts, guardians)
+            student_ids = SearchIndexService.search_ids(tenant, 'student', query, limit=limit)
+            results = SearchIndexService.in_order(
+                students.select_related('current_class', 'section'), student_ids
+            )
             
             # Format results
             formatted_results = []
@@ -704,9 +676,10 @@ class StudentService:
                     # Store old status
                     old_status = student.status
                     
-                    # Update status
+                    # Update status (validated above; only the tenant is re-checked)
                     student.status = new_status
-                    student.save()
+                    with save_validation(TENANT):
+                        student.save()
                     
                     # Create audit log
                     AuditService.log_update(
@@ -1128,7 +1101,6 @@ class DocumentService:
                 errors.append(_("File name is too long. Maximum 255 characters allowed."))
             
             # Check for malicious file names
-            import re
             if re.search(r'[<>:"/\\|?*]', file.name):
                 errors.append(_("File name contains invalid characters."))
             
@@ -3,25 +3,21 @@ Background tasks for student operations using Celery
 """
 
 import logging
-import csv
-import io
-import tempfile
-import os
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 from celery import shared_task
 from django.utils import timezone
 from django.core.files.base import ContentFile
-from django.db import transaction
 from django.db.models import Q
 from django.contrib.auth import get_user_model
 
 # Import models and services
-from .models import Student, Guardian, StudentDocument, StudentAcademicHistory
-from .services import StudentService, GuardianService, DocumentService, StudentImportService
+from .models import Student, StudentDocument, StudentAcademicHistory
+from .services import StudentService, GuardianService
+from .services.bulk_import import BulkStudentImportService
 from apps.core.services.audit_service import AuditService
 from apps.core.services.notification_service import NotificationService
-from apps.academics.models import AcademicYear, SchoolClass, Section
+from apps.academics.models import AcademicYear
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -52,7 +48,7 @@ def process_bulk_upload_async(self, upload_data: Dict) -> Dict:
         
         # Get related objects
         from django.apps import apps
-        Tenant = apps.get_model('core', 'Tenant')
+        Tenant = apps.get_model('tenants', 'Tenant')
         
         tenant = Tenant.objects.get(id=tenant_id)
         academic_year = AcademicYear.objects.get(id=academic_year_id) if academic_year_id else None
@@ -131,480 +127,44 @@ def process_bulk_upload_async(self, upload_data: Dict) -> Dict:
 
 def _process_csv_upload(file_content, file_name, tenant, academic_year, update_existing, skip_errors, user, send_welcome_email):
     """Process CSV file upload"""
-    results = {
-        'created': 0,
-        'updated': 0,
-        'skipped': 0,
-        'errors': [],
-        'warnings': []
-    }
-    
-    try:
-        # Decode file content
-        if isinstance(file_content, bytes):
-            file_content = file_content.decode('utf-8')
-        
-        # Create CSV reader
-        csv_file = io.StringIO(file_content)
-        
-        # Detect delimiter
-        sample = csv_file.read(1024)
-        csv_file.seek(0)
-        
-        # Try common delimiters
-        delimiters = [',', ';', '\t', '|']
-        delimiter_counts = {d: sample.count(d) for d in delimiters}
-        delimiter = max(delimiter_counts, key=delimiter_counts.get) if any(delimiter_counts.values()) else ','
-        
-        # Read CSV
-        reader = csv.reader(csv_file, delimiter=delimiter)
-        rows = list(reader)
-        
-        if len(rows) < 2:
-            results['errors'].append('CSV file has insufficient data')
-            results['success'] = False
-            return results
-        
-        # Process headers
-        headers = [h.strip().lower().replace(' ', '_') for h in rows[0]]
-        
-        # Map headers to field names
-        header_mapping = {
-            'firstname': 'first_name',
-            'lastname': 'last_name',
-            'dob': 'date_of_birth',
-            'email': 'personal_email',
-            'phone': 'mobile_primary',
-            'class': 'class_name',
-            'section': 'section_name',
-            'gender': 'gender',
-            'status': 'status',
-            'category': 'category'
-        }
-        
-        headers = [header_mapping.get(h, h) for h in headers]
-        
-        # Process data rows
-        for i, row in enumerate(rows[1:], start=2):
-            try:
-                if len(row) < len(headers):
-                    row.extend([''] * (len(headers) - len(row)))
-                
-                # Create row dictionary
-                row_dict = {headers[j]: row[j].strip() for j in range(len(headers))}
-                
-                # Skip empty rows
-                if all(value == '' for value in row_dict.values()):
-                    results['skipped'] += 1
-                    continue
-                
-                # Process student
-                result = _process_student_row(
-                    row_dict=row_dict,
-                    row_number=i,
-                    tenant=tenant,
-                    academic_year=academic_year,
-                    update_existing=update_existing,
-                    user=user,
-                    send_welcome_email=send_welcome_email
-                )
-                
-                if result['success']:
-                    if result['action'] == 'created':
-                        results['created'] += 1
-                    elif result['action'] == 'updated':
-                        results['updated'] += 1
-                    else:
-                        results['skipped'] += 1
-                else:
-                    if skip_errors:
-                        results['skipped'] += 1
-                        results['warnings'].append(f"Row {i}: {result['error']}")
-                    else:
-                        results['errors'].append(f"Row {i}: {result['error']}")
-                        if not skip_errors:
-                            break
-                        
-            except Exception as e:
-                error_msg = f"Row {i}: {str(e)}"
-                if skip_errors:
-                    results['skipped'] += 1
-                    results['warnings'].append(error_msg)
-                else:
-                    results['errors'].append(error_msg)
-                    if not skip_errors:
-                        break
-        
-        results['success'] = len(results['errors']) == 0 or skip_errors
-        results['total_rows'] = len(rows) - 1
-        results['processed'] = results['created'] + results['updated'] + results['skipped']
-        
-        return results
-        
-    except Exception as e:
-        logger.error(f"Error processing CSV: {str(e)}", exc_info=True)
-        results['success'] = False
-        results['errors'].append(str(e))
-        return results
+    return _run_bulk_import('csv', file_content, tenant, academic_year, update_existing, skip_errors, user, send_welcome_email)
 
 
 def _process_excel_upload(file_content, file_name, tenant, academic_year, update_existing, skip_errors, user, send_welcome_email):
     """Process Excel file upload"""
-    results = {
-        'created': 0,
-        'updated': 0,
-        'skipped': 0,
-        'errors': [],
-        'warnings': []
-    }
-    
+    return _run_bulk_import('excel', file_content, tenant, academic_year, update_existing, skip_errors, user, send_welcome_email)
+
+
+def _run_bulk_import(file_type, file_content, tenant, academic_year, update_existing, skip_errors, user, send_welcome_email):
+    """Import the file set-based; the caller writes one summary audit entry"""
+    importer = BulkStudentImportService(
+        tenant=tenant,
+        academic_year=academic_year,
+        user=user,
+        update_existing=update_existing,
+        skip_errors=skip_errors
+    )
     try:
-        import openpyxl
-        from openpyxl import load_workbook
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as tmp_file:
-            tmp_file.write(file_content)
-            tmp_file_path = tmp_file.name
-        
-        try:
-            # Load workbook
-            wb = load_workbook(filename=tmp_file_path, read_only=True, data_only=True)
-            ws = wb.active
-            
-            # Get headers from first row
-            headers = []
-            for cell in ws[1]:
-                if cell.value:
-                    header = str(cell.value).strip().lower().replace(' ', '_')
-                    headers.append(header)
-                else:
-                    headers.append(f'column_{cell.column}')
-            
-            # Map headers to field names
-            header_mapping = {
-                'firstname': 'first_name',
-                'lastname': 'last_name',
-                'dob': 'date_of_birth',
-                'email': 'personal_email',
-                'phone': 'mobile_primary',
-                'class': 'class_name',
-                'section': 'section_name',
-                'gender': 'gender',
-                'status': 'status',
-                'category': 'category'
-            }
-            
-            headers = [header_mapping.get(h, h) for h in headers]
-            
-            # Process data rows
-            for i, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-                try:
-                    # Skip empty rows
-                    if all(cell is None or (isinstance(cell, str) and cell.strip() == '') for cell in row):
-                        results['skipped'] += 1
-                        continue
-                    
-                    # Create row dictionary
-                    row_dict = {}
-                    for j, cell_value in enumerate(row):
-                        if j < len(headers):
-                            value = _convert_excel_value(cell_value)
-                            row_dict[headers[j]] = value
-                    
-                    # Process student
-                    result = _process_student_row(
-                        row_dict=row_dict,
-                        row_number=i,
-                        tenant=tenant,
-                        academic_year=academic_year,
-                        update_existing=update_existing,
-                        user=user,
-                        send_welcome_email=send_welcome_email
-                    )
-                    
-                    if result['success']:
-                        if result['action'] == 'created':
-                            results['created'] += 1
-                        elif result['action'] == 'updated':
-                            results['updated'] += 1
-                        else:
-                            results['skipped'] += 1
-                    else:
-                        if skip_errors:
-                            results['skipped'] += 1
-                            results['warnings'].append(f"Row {i}: {result['error']}")
-                        else:
-                            results['errors'].append(f"Row {i}: {result['error']}")
-                            if not skip_errors:
-                                break
-                            
-                except Exception as e:
-                    error_msg = f"Row {i}: {str(e)}"
-                    if skip_errors:
-                        results['skipped'] += 1
-                        results['warnings'].append(error_msg)
-                    else:
-                        results['errors'].append(error_msg)
-                        if not skip_errors:
-                            break
-            
-            results['success'] = len(results['errors']) == 0 or skip_errors
-            results['total_rows'] = ws.max_row - 1
-            results['processed'] = results['created'] + results['updated'] + results['skipped']
-            
-        finally:
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
-        
-        return results
-        
+        if file_type == 'csv':
+            results = importer.import_csv(file_content)
+        else:
+            results = importer.import_excel(file_content)
     except Exception as e:
-        logger.error(f"Error processing Excel: {str(e)}", exc_info=True)
+        logger.error(f"Error processing {file_type} upload: {str(e)}", exc_info=True)
+        results = importer.results
         results['success'] = False
         results['errors'].append(str(e))
         return results
-
-
-def _convert_excel_value(value):
-    """Convert Excel cell value to string"""
-    if value is None:
-        return ''
-    elif isinstance(value, datetime):
-        return value.strftime('%Y-%m-%d')
-    else:
-        return str(value).strip()
-
-
-def _process_student_row(row_dict, row_number, tenant, academic_year, update_existing, user, send_welcome_email):
-    """Process a single student row"""
-    result = {
-        'success': False,
-        'action': 'skipped',
-        'error': None,
-        'student_id': None
-    }
     
-    try:
-        with transaction.atomic():
-            # Extract basic information
-            first_name = row_dict.get('first_name', '').strip()
-            last_name = row_dict.get('last_name', '').strip()
-            personal_email = row_dict.get('personal_email', '').strip().lower()
-            
-            # Validate required fields
-            if not first_name and not last_name:
-                result['error'] = 'Missing both first and last name'
-                return result
-            
-            # Get or create email
-            if not personal_email:
-                # Generate email
-                import re
-                first_part = re.sub(r'[^a-z0-9]', '', first_name.lower())[:10]
-                last_part = re.sub(r'[^a-z0-9]', '', last_name.lower())[:10]
-                domain = getattr(tenant, 'domain', f"{tenant.schema_name}.edu")
-                personal_email = f"{first_part}.{last_part}{row_number}@{domain}"
-            
-            # Check if student exists
-            existing_student = Student.objects.filter(
-                tenant=tenant,
-                personal_email=personal_email
-            ).first()
-            
-            if existing_student and not update_existing:
-                result['error'] = f'Student with email {personal_email} already exists'
-                return result
-            
-            # Prepare student data
-            student_data = {
-                'tenant': tenant,
-                'first_name': first_name,
-                'last_name': last_name,
-                'personal_email': personal_email,
-                'gender': row_dict.get('gender', 'U').upper()[:1],
-                'date_of_birth': _parse_date(row_dict.get('date_of_birth')),
-                'mobile_primary': row_dict.get('mobile_primary', '')[:15],
-                'status': row_dict.get('status', 'ACTIVE').upper(),
-                'category': row_dict.get('category', 'GENERAL').upper(),
-            }
-            
-            # Set academic year
-            if academic_year:
-                student_data['academic_year'] = academic_year
-            
-            # Handle class
-            class_name = row_dict.get('class_name', '').strip()
-            if class_name:
-                school_class = SchoolClass.objects.filter(
-                    tenant=tenant,
-                    name__iexact=class_name
-                ).first()
-                
-                if school_class:
-                    student_data['current_class'] = school_class
-                    
-                    # Handle section
-                    section_name = row_dict.get('section_name', '').strip()
-                    if section_name:
-                        section = Section.objects.filter(
-                            class_name=school_class,
-                            name__iexact=section_name
-                        ).first()
-                        if section:
-                            student_data['section'] = section
-            
-            # Create or update student
-            if existing_student and update_existing:
-                # Update existing student
-                for key, value in student_data.items():
-                    if key != 'tenant':
-                        setattr(existing_student, key, value)
-                existing_student.save()
-                student = existing_student
-                result['action'] = 'updated'
-            else:
-                # Create new student
-                student = Student.objects.create(**student_data)
-                result['action'] = 'created'
-            
-            # Generate admission number if not present
-            if not student.admission_number:
-                student.admission_number = StudentService.generate_admission_number(tenant, academic_year)
-                student.save()
-            
-            # Handle guardian information
-            guardian_data = _extract_guardian_data(row_dict)
-            if guardian_data:
-                _process_guardian_info(student, guardian_data, tenant)
-            
-            # Send welcome email if requested
-            if send_welcome_email and result['action'] == 'created':
-                try:
-                    send_student_welcome_email.delay(student.id)
-                except Exception as e:
-                    logger.warning(f"Failed to queue welcome email: {str(e)}")
-            
-            # Create audit log for individual student
-            AuditService.create_audit_entry(
-                action='CREATE' if result['action'] == 'created' else 'UPDATE',
-                resource_type='Student',
-                user=user,
-                tenant=tenant,
-                request=None,
-                severity='INFO',
-                instance=student,
-                extra_data={
-                    'action': result['action'],
-                    'source': 'bulk_upload',
-                    'row_number': row_number
-                }
-            )
-            
-            result['success'] = True
-            result['student_id'] = student.id
-            return result
-            
-    except Exception as e:
-        logger.error(f"Error processing student row {row_number}: {str(e)}", exc_info=True)
-        result['error'] = str(e)
-        return result
-
-
-def _parse_date(date_str):
-    """Parse date string to date object"""
-    if not date_str:
-        return None
-    
-    date_formats = [
-        '%Y-%m-%d',
-        '%d-%m-%Y',
-        '%d/%m/%Y',
-        '%m/%d/%Y',
-        '%Y/%m/%d'
-    ]
-    
-    for fmt in date_formats:
-        try:
-            return datetime.strptime(str(date_str).strip(), fmt).date()
-        except ValueError:
-            continue
-    
-    return None
-
-
-def _extract_guardian_data(row_dict):
-    """Extract guardian information from row data"""
-    guardian_data = {}
-    
-    # Father information
-    if row_dict.get('father_name'):
-        guardian_data['father'] = {
-            'first_name': row_dict.get('father_name', '').split()[0] if row_dict.get('father_name') else '',
-            'last_name': ' '.join(row_dict.get('father_name', '').split()[1:]) if row_dict.get('father_name') else '',
-            'email': row_dict.get('father_email', ''),
-            'phone': row_dict.get('father_phone', ''),
-            'occupation': row_dict.get('father_occupation', ''),
-            'relationship': 'FATHER'
-        }
-    
-    # Mother information
-    if row_dict.get('mother_name'):
-        guardian_data['mother'] = {
-            'first_name': row_dict.get('mother_name', '').split()[0] if row_dict.get('mother_name') else '',
-            'last_name': ' '.join(row_dict.get('mother_name', '').split()[1:]) if row_dict.get('mother_name') else '',
-            'email': row_dict.get('mother_email', ''),
-            'phone': row_dict.get('mother_phone', ''),
-            'occupation': row_dict.get('mother_occupation', ''),
-            'relationship': 'MOTHER'
-        }
-    
-    # Guardian information
-    if row_dict.get('guardian_name'):
-        guardian_data['guardian'] = {
-            'first_name': row_dict.get('guardian_name', '').split()[0] if row_dict.get('guardian_name') else '',
-            'last_name': ' '.join(row_dict.get('guardian_name', '').split()[1:]) if row_dict.get('guardian_name') else '',
-            'email': row_dict.get('guardian_email', ''),
-            'phone': row_dict.get('guardian_phone', ''),
-            'occupation': row_dict.get('guardian_occupation', ''),
-            'relationship': row_dict.get('guardian_relationship', 'GUARDIAN')
-        }
+    # Send welcome emails once the students are committed
+    if send_welcome_email:
+        for student_id in importer.created_ids:
+            try:
+                send_student_welcome_email.delay(student_id)
+            except Exception as e:
+                logger.warning(f"Failed to queue welcome email: {str(e)}")
     
-    return guardian_data
-
-
-def _process_guardian_info(student, guardian_data, tenant):
-    """Process guardian information"""
-    for role, data in guardian_data.items():
-        try:
-            if data.get('first_name') or data.get('last_name'):
-                # Check if guardian already exists
-                existing_guardian = Guardian.objects.filter(
-                    tenant=tenant,
-                    email=data.get('email')
-                ).first() if data.get('email') else None
-                
-                if not existing_guardian:
-                    # Create new guardian
-                    guardian = Guardian.objects.create(
-                        tenant=tenant,
-                        first_name=data.get('first_name', ''),
-                        last_name=data.get('last_name', ''),
-                        email=data.get('email', ''),
-                        phone=data.get('phone', ''),
-                        occupation=data.get('occupation', ''),
-                        relationship=data.get('relationship', 'OTHER'),
-                        is_primary=(role == 'father')  # Father as primary by default
-                    )
-                else:
-                    guardian = existing_guardian
-                
-                # Add guardian to student
-                if guardian not in student.guardians.all():
-                    student.guardians.add(guardian)
-                    
-        except Exception as e:
-            logger.warning(f"Error processing guardian {role} for student {student.id}: {str(e)}")
+    return results
 
 
 @shared_task
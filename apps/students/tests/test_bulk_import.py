@@ -0,0 +1,103 @@
+from datetime import date
+
+from django.test import TestCase
+
+from apps.academics.models import AcademicYear, SchoolClass, Section
+from apps.students.models import Guardian, Student, StudentIdentification, StudentMedicalInfo
+from apps.students.services.bulk_import import BulkStudentImportService
+from apps.tenants.models import Domain, Tenant
+
+
+class BulkStudentImportTest(TestCase):
+    def setUp(self):
+        self.tenant = Tenant(
+            name="Test School",
+            schema_name="test_school",
+            subdomain="test-school",
+            status="active"
+        )
+        self.tenant.auto_create_schema = False
+        self.tenant.save()
+
+        Domain.objects.create(tenant=self.tenant, domain="test-school.com", is_primary=True)
+
+        self.academic_year = AcademicYear.objects.create(
+            name="2024-2025",
+            code="AY2425",
+            start_date=date(2024, 4, 1),
+            end_date=date(2025, 3, 31),
+            tenant=self.tenant
+        )
+        self.school_class = SchoolClass.objects.create(
+            name="Class 1",
+            numeric_name=1,
+            code="C1",
+            level="PRIMARY",
+            order=1,
+            tenant=self.tenant
+        )
+        self.section = Section.objects.create(
+            name="A",
+            code="A",
+            class_name=self.school_class,
+            tenant=self.tenant
+        )
+
+    def importer(self, **kwargs):
+        return BulkStudentImportService(self.tenant, self.academic_year, **kwargs)
+
+    def test_header_aliases_and_rows(self):
+        content = "FirstName,LastName,DOB,Email\nAsha,Rao,02/03/2015,ASHA@example.com\n"
+        rows = list(BulkStudentImportService.read_csv(content))
+
+        self.assertEqual(rows, [(2, {
+            'first_name': 'Asha', 'last_name': 'Rao', 'date_of_birth': '02/03/2015', 'personal_email': 'ASHA@example.com',
+        })])
+
+    def test_creates_students_with_generated_numbers(self):
+        content = (
+            "first_name,last_name,dob,email,phone,gender,class,section,father_name,father_phone\n"
+            "Asha,Rao,2015-03-02,asha@example.com,9876543210,F,class 1,a,Ravi Rao,9876500000\n"
+            "Vikram,Shah,2014-07-19,vikram@example.com,9876543211,M,Class 1,A,,\n"
+        )
+        results = self.importer().import_csv(content)
+
+        self.assertEqual(results['created'], 2)
+        self.assertEqual(results['errors'], [])
+        students = list(Student.objects.filter(tenant=self.tenant).order_by('admission_number'))
+        self.assertEqual([s.first_name for s in students], ['Asha', 'Vikram'])
+        self.assertEqual(len({s.admission_number for s in students}), 2)
+        self.assertEqual([s.roll_number for s in students], ['1', '2'])
+        self.assertTrue(all(s.current_class_id == self.school_class.pk for s in students))
+        self.assertTrue(all(s.section_id == self.section.pk for s in students))
+        self.assertTrue(students[0].institutional_email.endswith('@test-school.com'))
+        self.assertEqual(StudentIdentification.objects.filter(student__in=students).count(), 2)
+        self.assertEqual(StudentMedicalInfo.objects.filter(student__in=students).count(), 2)
+
+        guardian = Guardian.objects.get(student=students[0])
+        self.assertEqual((guardian.full_name, guardian.relation, guardian.is_primary), ('Ravi Rao', 'FATHER', True))
+
+    def test_existing_students_are_updated_in_bulk(self):
+        content = "first_name,last_name,dob,email,phone\nAsha,Rao,2015-03-02,asha@example.com,9876543210\n"
+        self.importer().import_csv(content)
+
+        updated = content.replace('Rao', 'Iyer')
+        results = self.importer(update_existing=True).import_csv(updated)
+
+        self.assertEqual((results['created'], results['updated']), (0, 1))
+        self.assertEqual(Student.objects.get(personal_email='asha@example.com').last_name, 'Iyer')
+
+    def test_invalid_rows_are_skipped_when_requested(self):
+        content = (
+            "first_name,last_name,dob,email,phone\n"
+            "Asha,Rao,2015-03-02,asha@example.com,9876543210\n"
+            ",,,,\n"
+            "Bad,Date,not-a-date,bad@example.com,9876543210\n"
+            "Asha,Again,2015-03-02,asha@example.com,9876543210\n"
+        )
+        results = self.importer(skip_errors=True).import_csv(content)
+
+        self.assertEqual(results['created'], 1)
+        self.assertEqual(results['failed'], 2)
+        self.assertEqual(results['skipped'], 3)
+        self.assertTrue(results['warnings'][1].startswith('Row 5: Duplicate email'))
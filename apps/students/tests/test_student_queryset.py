@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from apps.students.models import Student, StudentQuerySet
+
+
+class StudentAnnotationTests(SimpleTestCase):
+    """Model helpers read StudentQuerySet annotations instead of querying"""
+
+    def test_attendance_percentage_uses_annotation_for_same_period(self):
+        student = Student()
+        student.attendance_total = 8
+        student.attendance_present = 6
+        student.attendance_period = StudentQuerySet.attendance_period_key('2025-01-01', '2025-01-31')
+
+        self.assertEqual(student.get_attendance_percentage('2025-01-01', '2025-01-31'), 75.0)
+
+    def test_attendance_percentage_without_records(self):
+        student = Student()
+        student.attendance_total = 0
+        student.attendance_present = 0
+        student.attendance_period = StudentQuerySet.attendance_period_key()
+
+        self.assertEqual(student.get_attendance_percentage(), 0.0)
+
+    def test_academic_performance_uses_annotation(self):
+        student = Student()
+        student.passed_exam_count = 4
+        student.grade_point_total = Decimal('30.00')
+
+        self.assertEqual(student.get_academic_performance(), {"gpa": 7.5, "total_subjects": 4, "rank": None})
+
+        student.passed_exam_count = 0
+        self.assertEqual(student.get_academic_performance()["gpa"], 0.0)
+
+    def test_photo_uses_prefetch(self):
+        student = Student()
+        student.photo_documents = []
+        self.assertIsNone(student.get_photo())
+
+        photo = object()
+        student.photo_documents = [photo]
+        self.assertIs(student.get_photo(), photo)
+
+    def test_manager_exposes_queryset_helpers(self):
+        queryset = Student.objects.with_attendance_stats('2025-01-01').with_gpa().with_photo()
+
+        self.assertIsInstance(queryset, StudentQuerySet)
+        self.assertIn('attendance_total', queryset.query.annotations)
+        self.assertIn('passed_exam_count', queryset.query.annotations)
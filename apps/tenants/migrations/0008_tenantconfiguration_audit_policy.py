@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0007_tenantconfiguration_square_logo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenantconfiguration',
+            name='audit_policy',
+            field=models.JSONField(blank=True, default=dict, help_text='e.g. {"READS": "sample", "SAMPLE_RATE": 0.1, "RESOURCES": {"Invoice": {"READS": "always"}}}', verbose_name='Audit Policy'),
+        ),
+    ]
@@ -536,6 +536,14 @@ class TenantConfiguration(UUIDModel, TimeStampedModel):
         verbose_name='Secondary Brand Color'
     )
 
+    # Audit policy overrides (apps/core/services/audit_policy.py)
+    audit_policy = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Audit Policy',
+        help_text='e.g. {"READS": "sample", "SAMPLE_RATE": 0.1, "RESOURCES": {"Invoice": {"READS": "always"}}}'
+    )
+
     class Meta:
         db_table = 'tenant_configurations'
         verbose_name = 'Tenant Configuration'
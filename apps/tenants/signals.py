@@ -1,7 +1,10 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 
+from apps.core.cache import tenant_resolution_cache
+from apps.core.services.audit_policy import AuditPolicyService
+
 from .models import (
     Tenant,
     Domain,
@@ -100,3 +103,45 @@ def ensure_one_default_key(sender, instance, **kwargs):
             service=instance.service,
             is_default=True
         ).exclude(pk=instance.pk).update(is_default=False)
+
+
+
+# ---------------------------------------------------------
+# Keep the tenant resolution cache in sync
+# ---------------------------------------------------------
+@receiver(pre_save, sender=Tenant)
+def remember_previous_tenant_slug(sender, instance, **kwargs):
+    """Remember the stored slug so a rename also drops the old cache entry"""
+    if instance.pk and not instance._state.adding:
+        instance._previous_slug = sender.objects.filter(pk=instance.pk).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Tenant)
+@receiver(post_delete, sender=Tenant)
+def invalidate_tenant_resolution(sender, instance, **kwargs):
+    """Drop cached lookups for a tenant whenever it changes"""
+    tenant_resolution_cache.invalidate_tenant(instance, old_slug=getattr(instance, '_previous_slug', None))
+
+
+@receiver(pre_save, sender=Domain)
+def remember_previous_domain_name(sender, instance, **kwargs):
+    """Remember the stored domain name so a rename also drops the old cache entry"""
+    if instance.pk and not instance._state.adding:
+        instance._previous_domain = sender.objects.filter(pk=instance.pk).values_list('domain', flat=True).first()
+
+
+@receiver(post_save, sender=Domain)
+@receiver(post_delete, sender=Domain)
+def invalidate_domain_resolution(sender, instance, **kwargs):
+    """Drop cached lookups for a domain whenever it changes"""
+    tenant_resolution_cache.invalidate_domain(instance.domain)
+    previous = getattr(instance, '_previous_domain', None)
+    if previous and previous != instance.domain:
+        tenant_resolution_cache.invalidate_domain(previous)
+
+
+@receiver(post_save, sender=TenantConfiguration)
+@receiver(post_delete, sender=TenantConfiguration)
+def invalidate_audit_policy(sender, instance, **kwargs):
+    """Drop the cached audit policy of a tenant whenever its configuration changes"""
+    AuditPolicyService.invalidate_tenant(instance.tenant_id)
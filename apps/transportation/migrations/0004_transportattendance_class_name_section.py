@@ -0,0 +1,37 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def record_marking_class(apps, schema_editor):
+    TransportAttendance = apps.get_model('transportation', 'TransportAttendance')
+    Student = apps.get_model('students', 'Student')
+
+    # Existing records take the student's current class and section
+    classes = Student.objects.filter(pk=models.OuterRef('student_id'))
+    TransportAttendance.objects.update(
+        class_name_id=models.Subquery(classes.values('current_class_id')[:1]),
+        section_id=models.Subquery(classes.values('section_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0003_alter_classteacher_start_date_and_more'),
+        ('students', '0003_alter_student_enrollment_date'),
+        ('transportation', '0003_alter_fuelrecord_date_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transportattendance',
+            name='class_name',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transport_attendances', to='academics.schoolclass', verbose_name='Class'),
+        ),
+        migrations.AddField(
+            model_name='transportattendance',
+            name='section',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transport_attendances', to='academics.section', verbose_name='Section'),
+        ),
+        migrations.RunPython(record_marking_class, migrations.RunPython.noop),
+    ]
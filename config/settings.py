@@ -158,7 +158,9 @@ CORS_ALLOW_HEADERS = list(default_headers) + [
 # Audit settings
 AUDIT_LOG_SETTINGS = {
     "ENABLED": True,
-    "RETENTION_DAYS": 365,
+    "RETENTION_DAYS": 365,  # enforced by manage_audit_partitions
+    "PARTITION_MONTHS_AHEAD": 3,
+    "ROLLUPS_ENABLED": True,  # hourly AuditHourlyRollup counts for the analyzer
     "ARCHIVE_AFTER_DAYS": 90,
     "BATCH_SIZE": 1000,
     "ENABLE_REALTIME_MONITORING": True,
@@ -167,6 +169,55 @@ AUDIT_LOG_SETTINGS = {
     "AUTO_CLEANUP": True,
     "EXPORT_FORMATS": ["PDF", "CSV", "JSON"],
     "MAX_EXPORT_RECORDS": 10000,
+    # What BaseView requests leave in the audit log (apps/core/services/audit_policy.py):
+    # "always" | "sample" | "aggregate" (per-minute counters) | "skip"; tenants override
+    # through TenantConfiguration.audit_policy
+    "POLICY": {
+        "WRITES": "always",
+        "READS": "aggregate",
+        "SAMPLE_RATE": 0.1,
+        "RESOURCES": {
+            "AuditLog": {"READS": "always"},
+        },
+        "TENANT_CACHE_TIMEOUT": 300,
+        "AGGREGATE_FLUSH_INTERVAL": 15,  # seconds between background flushes of aggregated reads
+    },
+    # Buffered writer used by AuditService (apps/core/services/audit_writer.py)
+    "WRITER": {
+        "MODE": env("AUDIT_WRITER_MODE", default="async"),  # async, sync
+        "BUFFER_SIZE": env.int("AUDIT_WRITER_BUFFER_SIZE", default=10000),
+        "BATCH_SIZE": 500,
+        "FLUSH_INTERVAL": 2.0,  # seconds
+        "OVERFLOW": "spill",  # spill, celery, drop
+        "SPILL_DIR": BASE_DIR / "logs" / "audit_spill",
+    },
+}
+
+# Background exports (ExportAPIView.export_in_background, apps/core/services/export_jobs.py)
+EXPORT_JOBS = {
+    "CHUNK_SIZE": 2000,  # rows between progress updates
+    "RETENTION_HOURS": 24,  # finished files are purged after this
+    "STALE_AFTER_MINUTES": 60,  # a job without progress for this long is failed
+}
+
+# Full-text search index (apps/core/services/search_service.py)
+SEARCH_INDEX = {
+    "AUTO_INDEX": True,  # update documents from model signals
+    "RESULTS_PER_TYPE": 10,
+    "MIN_QUERY_LENGTH": 2,
+    "MAX_FILTER_RESULTS": 1000,  # ids used to filter paginated lists
+}
+
+# Validation run by TenantAwareModel.save (apps/core/utils/validation.py):
+# "full" | "fields" (unique/constraint/FK checks left to the database) | "tenant" | "none"
+MODEL_VALIDATION = {
+    "SAVE_MODE": "fields",
+}
+
+# Monthly payroll engine (apps/hr/services/payroll.py)
+PAYROLL = {
+    "WORKING_WEEKDAYS": [0, 1, 2, 3, 4, 5],  # Monday..Saturday when no default WorkSchedule exists
+    "ESI_WAGE_CEILING": 21000,  # ESI applies to monthly gross up to this
 }
 
 
@@ -453,13 +504,6 @@ if not DEBUG:
 
 
 
-# Cache configuration (tenant-aware)
-# CACHES = {
-#     "default": {
-#         "BACKEND": "django.core.cache.backends.redis.RedisCache",
-#         "LOCATION": "redis://127.0.0.1:6379/1",
-#     }
-# }
 # Celery configuration (tenant-aware)
 CELERY_BROKER_URL = env("CELERY_BROKER_URL", default="redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = env("CELERY_RESULT_BACKEND", default="redis://localhost:6379/0")
@@ -467,6 +511,12 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+CELERY_BEAT_SCHEDULE = {
+    "purge-expired-export-jobs": {
+        "task": "apps.core.tasks.purge_expired_export_jobs",
+        "schedule": timedelta(hours=1),
+    },
+}
 
 # File upload limits
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
@@ -476,6 +526,40 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 10485760  # 10MB
 TENANT_LIMIT_SET_CACHE = True
 TENANT_CACHE_TIMEOUT = 300  # 5 minutes
 
+# Tenant lookups done by TenantMiddleware (in-process LRU + shared cache)
+TENANT_RESOLUTION_CACHE = {
+    "ENABLED": True,
+    "CACHE_ALIAS": "shared",
+    "MAX_ENTRIES": 512,
+    "LOCAL_TIMEOUT": 30,  # seconds a worker trusts its own copy
+    "TIMEOUT": TENANT_CACHE_TIMEOUT,
+    "MISS_TIMEOUT": 60,  # unknown hosts/slugs
+}
+
+# Grade bands of the default grading system, cached per tenant
+GRADE_BAND_CACHE = {
+    "ENABLED": True,
+    "CACHE_ALIAS": "shared",
+    "CHECK_INTERVAL": 30,  # seconds before re-checking the shared version
+}
+
+# Result statistics: keep running totals on every ExamResult save instead of
+# only recalculating on demand
+EXAM_STATISTICS = {
+    "INCREMENTAL": env.bool("EXAM_STATISTICS_INCREMENTAL", default=False),
+}
+
+# Seconds attendance dashboard/stats counts are served from cache (0 disables)
+ATTENDANCE_STATS_CACHE_TIMEOUT = 30
+
+# Daily attendance rollups. Rollups are maintained from the moment this is
+# deployed; run rebuild_attendance_rollups once to backfill existing records,
+# then turn on ATTENDANCE_ROLLUP_READS.
+ATTENDANCE_ROLLUP = {
+    "ENABLED": True,  # maintain rollups on every attendance save/delete
+    "USE_FOR_READS": env.bool("ATTENDANCE_ROLLUP_READS", default=False),  # serve dashboard/stats counts from the rollups
+}
+
 # Encryption key for encrypted model fields
 # Generate a secure key: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())"
 # Encryption key for encrypted model fields
@@ -557,26 +641,83 @@ DEEPFACE_SETTINGS = {
     
     # Performance
     'GPU_ENABLED': False,  # Set True if you have CUDA
-    'BATCH_SIZE': 10,
+    'BATCH_SIZE': 10,  # Max frames per model call (websocket worker)
+    'BATCH_WAIT_MS': 20,  # How long a batch waits for frames from other cameras
+    'MAX_PENDING_FRAMES': 64,  # Backpressure: oldest camera frame is dropped beyond this
+    'INFERENCE_WORKERS': 1,  # Threads running model calls per process
 }
 
-# Cache Configuration (Using Local Memory - install django-redis for production)
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'default-cache',
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000
-        }
-    },
-    'deepface': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'deepface-cache',
-        'OPTIONS': {
-            'MAX_ENTRIES': 500
-        }
+# Cache configuration (apps/core/cache.py)
+# - default:  per-tenant data; keys are namespaced by tenant schema
+# - shared:   cross-tenant entries whose keys carry the schema themselves
+#             (tenant resolution, grade band versions)
+# - deepface: face encodings per schema
+# With REDIS_CACHE_URL every worker shares one Redis; without it each
+# process gets an equivalent local-memory cache (development and tests).
+# Hit, miss and latency counters per alias: apps.core.cache.cache_metrics
+REDIS_CACHE_URL = env("REDIS_CACHE_URL", default="")
+CACHE_KEY_PREFIX = env("CACHE_KEY_PREFIX", default="eduerp")
+PLAIN_CACHE_KEY_FUNCTION = "django.core.cache.backends.base.default_key_func"
+
+if REDIS_CACHE_URL:
+    REDIS_CACHE_OPTIONS = {
+        "socket_connect_timeout": 2,
+        "socket_timeout": 2,
+        "retry_on_timeout": True,
+        "health_check_interval": 30,
+    }
+    CACHES = {
+        "default": {
+            "BACKEND": "apps.core.cache.CustomTenantCache",
+            "LOCATION": REDIS_CACHE_URL,
+            "ALIAS": "default",
+            "KEY_PREFIX": CACHE_KEY_PREFIX,
+            "TIMEOUT": 300,
+            "OPTIONS": REDIS_CACHE_OPTIONS,
+        },
+        "shared": {
+            "BACKEND": "apps.core.cache.CustomTenantCache",
+            "LOCATION": REDIS_CACHE_URL,
+            "ALIAS": "shared",
+            "KEY_PREFIX": f"{CACHE_KEY_PREFIX}:shared",
+            "KEY_FUNCTION": PLAIN_CACHE_KEY_FUNCTION,
+            "TIMEOUT": 300,
+            "OPTIONS": REDIS_CACHE_OPTIONS,
+        },
+        "deepface": {
+            "BACKEND": "apps.core.cache.CustomTenantCache",
+            "LOCATION": REDIS_CACHE_URL,
+            "ALIAS": "deepface",
+            "KEY_PREFIX": f"{CACHE_KEY_PREFIX}:deepface",
+            "KEY_FUNCTION": PLAIN_CACHE_KEY_FUNCTION,
+            "TIMEOUT": None,
+            "OPTIONS": REDIS_CACHE_OPTIONS,
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "apps.core.cache.InstrumentedLocMemCache",
+            "LOCATION": "default-cache",
+            "ALIAS": "default",
+            "OPTIONS": {"MAX_ENTRIES": 1000},
+        },
+        "shared": {
+            "BACKEND": "apps.core.cache.InstrumentedLocMemCache",
+            "LOCATION": "shared-cache",
+            "ALIAS": "shared",
+            "KEY_FUNCTION": PLAIN_CACHE_KEY_FUNCTION,
+            "OPTIONS": {"MAX_ENTRIES": 1000},
+        },
+        "deepface": {
+            "BACKEND": "apps.core.cache.InstrumentedLocMemCache",
+            "LOCATION": "deepface-cache",
+            "ALIAS": "deepface",
+            "KEY_FUNCTION": PLAIN_CACHE_KEY_FUNCTION,
+            "TIMEOUT": None,
+            "OPTIONS": {"MAX_ENTRIES": 500},
+        },
     }
-}
 
 # Logging Configuration
 
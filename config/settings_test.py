@@ -25,3 +25,6 @@ PASSWORD_HASHERS = [
 
 # Disable celery for tests
 CELERY_TASK_ALWAYS_EAGER = True
+
+# Write audit entries immediately so tests can assert on them
+AUDIT_LOG_SETTINGS = {**AUDIT_LOG_SETTINGS, "WRITER": {**AUDIT_LOG_SETTINGS["WRITER"], "MODE": "sync"}}